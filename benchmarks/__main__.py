@@ -0,0 +1,112 @@
+"""Run the benchmarks and compare them with the stored baseline.
+
+Usage: python -m benchmarks [--filter TEXT] [--scale N] [--save-baseline]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from typing import Any, Dict, Optional, Sequence
+
+from . import suite  # noqa: F401 - registers the benchmarks
+from .harness import (
+    BENCHMARKS,
+    DEFAULT_ROUNDS,
+    DEFAULT_THRESHOLD,
+    compare,
+    load_results,
+    results_document,
+    run_benchmark,
+    save_results,
+)
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(prog="bench", description=__doc__.splitlines()[0])
+    parser.add_argument("--filter", help="Only run benchmarks whose name contains this text")
+    parser.add_argument(
+        "--scale",
+        type=float,
+        default=1.0,
+        help="Factor applied to page, domain and record counts (default: 1)",
+    )
+    parser.add_argument(
+        "--rounds",
+        type=int,
+        default=DEFAULT_ROUNDS,
+        help=f"Timed rounds per benchmark (default: {DEFAULT_ROUNDS})",
+    )
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument(
+        "--baseline",
+        default=DEFAULT_BASELINE,
+        help="Baseline results to compare with (default: benchmarks/baseline.json)",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Slowdown relative to the baseline that fails the run "
+        f"(default: {DEFAULT_THRESHOLD}, i.e., 25%%)",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store the results as the new baseline instead of comparing",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run the benchmarks.
+
+    Returns:
+        int: 1 if any benchmark regressed beyond the threshold, else 0
+    """
+    args = parse_args(argv)
+    results: Dict[str, Dict[str, Any]] = {}
+    for bench in BENCHMARKS:
+        if args.filter and args.filter not in bench.name:
+            continue
+        with tempfile.TemporaryDirectory(prefix="kreatisite-bench-") as workdir:
+            result = run_benchmark(bench, workdir, args.scale, args.rounds)
+        name = bench.label(args.scale, result.get("items", 0))
+        results[name] = result
+        line = f"{name:32} {result['median'] * 1000:10.1f} ms"
+        if "per_second" in result:
+            line += f" {result['per_second']:12.0f} /s"
+        print(line, flush=True)
+
+    document = results_document(results)
+    if args.output:
+        save_results(document, args.output)
+    if args.save_baseline:
+        save_results(document, args.baseline)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    baseline = load_results(args.baseline)
+    if baseline is None:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+    regressions = 0
+    print(f"\nCompared with {args.baseline} (threshold {args.threshold:.0%}):")
+    for comparison in compare(results, baseline):
+        regressed = comparison.regressed(args.threshold)
+        regressions += regressed
+        print(
+            f"{comparison.name:32} {comparison.ratio:6.2f}x"
+            f"{'  REGRESSION' if regressed else ''}"
+        )
+    if regressions:
+        print(f"{regressions} benchmark(s) regressed", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
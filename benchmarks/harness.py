@@ -0,0 +1,175 @@
+"""Benchmark registry, timing and baseline comparison."""
+
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+RESULTS_VERSION = 1
+DEFAULT_ROUNDS = 5
+# A benchmark regresses when its median is this fraction slower than the baseline
+DEFAULT_THRESHOLD = 0.25
+
+Setup = Callable[[str, float], Tuple[Callable[[], Any], int]]
+
+
+@dataclass
+class Benchmark:
+    """A registered benchmark.
+
+    The setup function receives a scratch directory and the size scale, prepares
+    its inputs outside the timed region and returns the function to time,
+    together with the number of items one call processes (0: not a throughput
+    benchmark).
+    """
+
+    name: str
+    setup: Setup
+    rounds: Optional[int] = None
+    # Count shown for "{n}" in the name at a given scale, if not the item count
+    size: Optional[Callable[[float], int]] = None
+
+    def label(self, scale: float, items: int) -> str:
+        """Return the benchmark's name with "{n}" replaced by its size or item count."""
+        return self.name.format(n=count_label(self.size(scale) if self.size else items))
+
+
+BENCHMARKS: List[Benchmark] = []
+
+
+def benchmark(
+    name: str, rounds: Optional[int] = None, size: Optional[Callable[[float], int]] = None
+) -> Callable[[Setup], Setup]:
+    """Register a benchmark setup function.
+
+    Args:
+        name: Benchmark name; "{n}" is replaced with the scaled item count label
+        rounds: Rounds to run instead of the default, for slow benchmarks
+        size: Function returning the count to show for "{n}" at a given scale,
+            when the item count is not what sizes the benchmark
+    """
+
+    def register(setup: Setup) -> Setup:
+        BENCHMARKS.append(Benchmark(name, setup, rounds, size))
+        return setup
+
+    return register
+
+
+def scaled(count: int, scale: float) -> int:
+    """Scale an item count, keeping at least one item."""
+    return max(1, int(count * scale))
+
+
+def count_label(count: int) -> str:
+    """Format an item count for a benchmark name, e.g., 10000 -> "10k"."""
+    if count >= 1000000 and count % 1000000 == 0:
+        return f"{count // 1000000}M"
+    if count >= 1000 and count % 1000 == 0:
+        return f"{count // 1000}k"
+    return str(count)
+
+
+def run_benchmark(bench: Benchmark, workdir: str, scale: float, rounds: int) -> Dict[str, Any]:
+    """Set up and time a benchmark.
+
+    Args:
+        bench: Benchmark to run
+        workdir: Scratch directory for its inputs
+        scale: Factor applied to the benchmark's item counts
+        rounds: Number of timed calls
+
+    Returns:
+        Dict[str, Any]: Timing summary in seconds, with the throughput if the
+        benchmark processes items
+    """
+    func, items = bench.setup(workdir, scale)
+    times = []
+    for _ in range(bench.rounds or rounds):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    median = statistics.median(times)
+    result: Dict[str, Any] = {
+        "rounds": len(times),
+        "median": median,
+        "min": min(times),
+        "max": max(times),
+    }
+    if items:
+        result["items"] = items
+        result["per_second"] = items / median if median else 0.0
+    return result
+
+
+def results_document(results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Wrap benchmark results with the environment they were measured in."""
+    return {
+        "version": RESULTS_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "results": results,
+    }
+
+
+def save_results(document: Dict[str, Any], path: str) -> None:
+    """Write a results document as JSON."""
+    with open(path, "w") as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def load_results(path: str) -> Optional[Dict[str, Any]]:
+    """Read a results document, or return None if the file does not exist."""
+    try:
+        with open(path, "r") as f:
+            document: Dict[str, Any] = json.load(f)
+    except FileNotFoundError:
+        return None
+    if document.get("version") != RESULTS_VERSION:
+        print(f"Ignoring baseline {path}: unsupported version", file=sys.stderr)
+        return None
+    return document
+
+
+@dataclass
+class Comparison:
+    """Median of one benchmark compared with its baseline."""
+
+    name: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        """Return the current median relative to the baseline."""
+        return self.current / self.baseline if self.baseline else float("inf")
+
+    def regressed(self, threshold: float) -> bool:
+        """Return whether the benchmark is more than threshold slower than the baseline."""
+        return self.ratio > 1 + threshold
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Any]) -> List[Comparison]:
+    """Compare results with the benchmarks of the same name in a baseline.
+
+    Args:
+        results: Current results by benchmark name
+        baseline: Baseline results document
+
+    Returns:
+        List[Comparison]: Comparisons of the benchmarks present in both
+    """
+    previous = baseline.get("results", {})
+    return [
+        Comparison(name, previous[name]["median"], result["median"])
+        for name, result in results.items()
+        if name in previous
+    ]
@@ -0,0 +1,197 @@
+"""Benchmarks of Kreatisite CLI's startup, throughput and parsing hot paths.
+
+Page counts, domain counts and record counts are multiplied by the scale, so
+a quick run (e.g., --scale 0.1) gets differently named results and is never
+compared with a full-size baseline.
+"""
+
+import os
+import subprocess
+import sys
+from typing import Any, Callable, Dict, List, Tuple
+
+import yaml
+
+from kreatisite.aws import use_backend
+from kreatisite.bloom import BloomFilter
+from kreatisite.build import build_site
+from kreatisite.deploy import local_manifest, plan_deploy, remote_manifest
+from kreatisite.dns import load_zone_file
+from kreatisite.domains import check_availability
+from kreatisite.fakeaws import FakeBackend
+
+from .harness import benchmark, scaled
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CONTACTS_EXAMPLE = os.path.join(ROOT, "aws-register-domain.yaml.example")
+PAGES_PER_SECTION = 100
+BENCH_BUCKET = "bench-site"
+
+Timed = Tuple[Callable[[], Any], int]
+
+
+def _cli_start(argv: List[str]) -> Callable[[], Any]:
+    """Return a function running the CLI in a fresh interpreter."""
+    code = "import sys; from kreatisite.cli import main; sys.argv = sys.argv[1:]; sys.exit(main())"
+    env = dict(os.environ, PYTHONPATH=ROOT)
+
+    def run() -> None:
+        subprocess.run(
+            [sys.executable, "-c", code, "kreatisite", *argv],
+            check=True,
+            stdout=subprocess.DEVNULL,
+            env=env,
+        )
+
+    return run
+
+
+@benchmark("cli_start[help]")
+def cli_start_help(workdir: str, scale: float) -> Timed:
+    """Time a cold start of the CLI printing its help."""
+    return _cli_start(["--help"]), 0
+
+
+@benchmark("cli_start[check-domain]")
+def cli_start_check_domain(workdir: str, scale: float) -> Timed:
+    """Time a cold start of the CLI checking one domain against the fake backend."""
+    return _cli_start(["--aws-backend", "fake", "check-domain", "example.com"]), 0
+
+
+@benchmark("check_availability[{n}]")
+def availability(workdir: str, scale: float) -> Timed:
+    """Time bulk availability checks, measuring the overhead per domain without latency."""
+    names = [f"bench-{i}.com" for i in range(scaled(10000, scale))]
+    backend = FakeBackend(taken_fraction=0.5)
+
+    def run() -> None:
+        with use_backend(backend):
+            check_availability(names)
+
+    return run, len(names)
+
+
+def _bloom_capacity(scale: float) -> int:
+    """Return the capacity of the benchmarked filter, which names the benchmark."""
+    return scaled(10_000_000, scale)
+
+
+@benchmark("bloom_skip[{n}]", size=_bloom_capacity)
+def bloom_skip(workdir: str, scale: float) -> Timed:
+    """Time mapping a filter sized for ten million taken names and looking names up in it."""
+    path = os.path.join(workdir, "taken.bloom")
+    with BloomFilter.create(path, capacity=_bloom_capacity(scale)) as bloom:
+        for i in range(0, 10000, 2):
+            bloom.add(f"bench-{i}.com")
+    names = [f"bench-{i}.com" for i in range(10000)]
+
+    def run() -> None:
+        with BloomFilter(path) as taken:
+            [name for name in names if name not in taken]
+
+    return run, len(names)
+
+
+@benchmark("contacts_load[{n}]")
+def contacts_load(workdir: str, scale: float) -> Timed:
+    """Time parsing the register-domain contacts file."""
+    with open(CONTACTS_EXAMPLE, "r") as f:
+        text = f.read()
+    count = scaled(50, scale)
+
+    def run() -> None:
+        for _ in range(count):
+            yaml.safe_load(text)
+
+    return run, count
+
+
+@benchmark("zone_load[{n}]")
+def zone_load(workdir: str, scale: float) -> Timed:
+    """Time loading and validating a zone file."""
+    count = scaled(2000, scale)
+    records: List[Dict[str, Any]] = []
+    for i in range(count):
+        if i % 2:
+            records.append({"name": f"host{i}", "type": "A", "values": [f"192.0.2.{i % 250}"]})
+        else:
+            records.append({"name": f"txt{i}", "type": "TXT", "value": f"token-{i}", "ttl": 60})
+    path = os.path.join(workdir, "zone.yaml")
+    with open(path, "w") as f:
+        yaml.safe_dump({"zone": "example.com", "records": records}, f)
+    return (lambda: load_zone_file(path)), count
+
+
+def write_site(source_dir: str, pages: int) -> None:
+    """Write a synthetic site with the given number of HTML pages.
+
+    Pages are grouped in sections of PAGES_PER_SECTION and link to a shared
+    stylesheet and script, so the build rewrites fingerprinted references.
+    """
+    os.makedirs(os.path.join(source_dir, "assets"), exist_ok=True)
+    with open(os.path.join(source_dir, "assets", "site.css"), "w") as f:
+        f.write("/* site */\nbody {\n  margin: 0;\n  font-family: sans-serif;\n}\n" * 20)
+    with open(os.path.join(source_dir, "assets", "site.js"), "w") as f:
+        f.write("// site\nfunction greet(name) {\n  return 'Hello, ' + name;\n}\n" * 20)
+    paragraph = "<p>\n  Lorem ipsum dolor sit amet, consectetur adipiscing elit.\n</p>\n" * 20
+    for i in range(pages):
+        section = os.path.join(source_dir, f"section-{i // PAGES_PER_SECTION}")
+        if i % PAGES_PER_SECTION == 0:
+            os.makedirs(section, exist_ok=True)
+        with open(os.path.join(section, f"page-{i}.html"), "w") as f:
+            f.write(
+                "<!DOCTYPE html>\n<html>\n<head>\n"
+                f"  <title>Page {i}</title>\n"
+                '  <link rel="stylesheet" href="/assets/site.css">\n'
+                '  <script src="/assets/site.js"></script>\n'
+                "</head>\n<body>\n"
+                f'  <h1>Page {i}</h1>\n  <a href="/section-0/page-0.html">Home</a>\n'
+                f"{paragraph}</body>\n</html>\n"
+            )
+
+
+@benchmark("build_site[{n}]", rounds=3)
+def build_cached(workdir: str, scale: float) -> Timed:
+    """Time rebuilding a site whose outputs are all in the build cache."""
+    pages = scaled(10000, scale)
+    source_dir = os.path.join(workdir, "site")
+    write_site(source_dir, pages)
+    output_dir = os.path.join(workdir, "dist")
+    cache_dir = os.path.join(workdir, "cache")
+
+    def run() -> None:
+        build_site(source_dir, output_dir, cache_dir, log=lambda _: None)
+
+    run()
+    return run, pages
+
+
+def _deploy_planning(pages: Callable[[float], int]) -> Callable[[str, float], Timed]:
+    """Return a benchmark planning the deploy of a synthetic site to the fake S3."""
+
+    def setup(workdir: str, scale: float) -> Timed:
+        count = pages(scale)
+        output_dir = os.path.join(workdir, "dist")
+        write_site(output_dir, count)
+        backend = FakeBackend()
+        backend.call("s3", "CreateBucket", {"Bucket": BENCH_BUCKET})
+        for key in local_manifest(output_dir):
+            body = os.path.join(output_dir, *key.split("/"))
+            backend.call("s3", "PutObject", {"Bucket": BENCH_BUCKET, "Key": key, "Body": body})
+        # Change one page in a hundred, so the plan has uploads to find
+        for i in range(0, count, 100):
+            path = os.path.join(output_dir, f"section-{i // PAGES_PER_SECTION}", f"page-{i}.html")
+            with open(path, "a") as f:
+                f.write("<!-- changed -->\n")
+
+        def run() -> None:
+            with use_backend(backend):
+                plan_deploy(local_manifest(output_dir), remote_manifest(BENCH_BUCKET))
+
+        return run, count
+
+    return setup
+
+
+benchmark("plan_deploy[{n}]")(_deploy_planning(lambda scale: scaled(10000, scale)))
+benchmark("plan_deploy[{n}]", rounds=3)(_deploy_planning(lambda scale: scaled(100000, scale)))
@@ -1,3 +1,8 @@
 """Kreatisite command line application."""
 
+import time
+
 __version__: str = "0.1.0"
+
+# When the package started loading, so that traces can show the import time
+IMPORT_START_NS: int = time.perf_counter_ns()
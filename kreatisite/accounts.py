@@ -0,0 +1,135 @@
+"""Multi-account fan-out for Kreatisite CLI."""
+
+import contextvars
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Generic, Iterable, Iterator, List, Optional, TypeVar
+
+from .aws import Backend, create_backend, use_backend
+from .defaults import DEFAULT_ACCOUNT_RATE
+from .ratelimit import RateLimiter
+
+DEFAULT_ACCOUNT_BURST = 10
+
+T = TypeVar("T")
+
+
+def read_profiles(profiles: Optional[str] = None, path: Optional[str] = None) -> List[str]:
+    """Collect AWS profile names from a comma-separated list and a profile file.
+
+    Args:
+        profiles: Comma-separated profile names (e.g., "prod,staging")
+        path: File with one profile name per line; blank lines and everything after
+            a # are ignored
+
+    Returns:
+        List[str]: Distinct profile names, in the given order
+    """
+    names = [name.strip() for name in (profiles or "").split(",")]
+    if path:
+        with open(path, "r") as f:
+            names.extend(line.split("#", 1)[0].strip() for line in f)
+    return list(dict.fromkeys(name for name in names if name))
+
+
+class ThrottledBackend(Backend):
+    """Backend passing calls to another backend, at most at a given rate."""
+
+    name = "throttled"
+
+    def __init__(
+        self,
+        backend: Backend,
+        rate: float = DEFAULT_ACCOUNT_RATE,
+        burst: int = DEFAULT_ACCOUNT_BURST,
+    ) -> None:
+        """Initialize the backend.
+
+        Args:
+            backend: Backend making the calls
+            rate: Calls per second
+            burst: Calls allowed at once after an idle period
+        """
+        self.backend = backend
+        self.multipart_uploads = backend.multipart_uploads
+        self.limiter = RateLimiter(rate, burst)
+
+    def call(
+        self,
+        service: str,
+        operation: str,
+        params: Optional[Dict[str, Any]] = None,
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        outfile: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Run an AWS API operation, with the same arguments as aws.call."""
+        self.limiter.acquire()
+        return self.backend.call(service, operation, params, endpoint_url, region, outfile)
+
+
+@dataclass
+class Tagged(Generic[T]):
+    """A result of one account, or the error that stopped its work."""
+
+    account: str
+    item: Optional[T] = None
+    error: Optional[str] = None
+
+
+_DONE = object()
+
+
+def fan_out(
+    accounts: List[str],
+    work: Callable[[str], Iterable[T]],
+    backend_factory: Optional[Callable[[str], Backend]] = None,
+    rate: Optional[float] = DEFAULT_ACCOUNT_RATE,
+    burst: int = DEFAULT_ACCOUNT_BURST,
+) -> Iterator[Tagged[T]]:
+    """Run work for every account concurrently and merge the results into one stream.
+
+    Each account gets its own backend, with its own credentials and rate
+    limit, which every AWS call made by its work goes through. Results are
+    yielded as soon as any account produces them.
+
+    Args:
+        accounts: AWS profile names
+        work: Function called with each account, returning or yielding its results
+        backend_factory: Function creating the backend of an account
+            (default: an AWS CLI backend using the account's profile)
+        rate: Calls per second per account (None: the backends are used as
+            they are, e.g., when they are throttled and reused across fan-outs)
+        burst: Calls allowed at once per account after an idle period
+
+    Yields:
+        Tagged[T]: Results tagged with their account; an account whose work
+            fails yields one result with the error
+    """
+    factory = backend_factory or (lambda account: create_backend("cli", profile=account))
+    results: "queue.Queue[Any]" = queue.Queue()
+
+    def run(account: str) -> None:
+        try:
+            backend = factory(account)
+            if rate is not None:
+                backend = ThrottledBackend(backend, rate, burst)
+            with use_backend(backend):
+                for item in work(account):
+                    results.put(Tagged(account, item))
+        except Exception as e:
+            results.put(Tagged(account, error=str(e)))
+        finally:
+            results.put(_DONE)
+
+    for account in accounts:
+        context = contextvars.copy_context()
+        threading.Thread(target=context.run, args=(run, account), daemon=True).start()
+    remaining = len(accounts)
+    while remaining:
+        result = results.get()
+        if result is _DONE:
+            remaining -= 1
+        else:
+            yield result
@@ -0,0 +1,557 @@
+"""AWS API call functions for Kreatisite CLI."""
+
+import codecs
+import contextlib
+import contextvars
+import importlib.util
+import json
+import os
+import re
+import signal
+import subprocess
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import IO, Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .defaults import BACKEND_ENV, BACKEND_NAMES
+from .metrics import AWS_CALL_SECONDS, AWS_CALLS, AWS_RETRIES, AWS_THROTTLES
+from .trace import span
+from .waiter import backoff_delays
+
+# Services whose AWS CLI command name differs from the API service name
+_CLI_SERVICE_NAMES = {"s3": "s3api"}
+_ERROR_CODE_RE = re.compile(r"An error occurred \(([^)]+)\)")
+
+# Error codes AWS uses when a request was rejected by rate limiting
+THROTTLING_CODES = frozenset(
+    {
+        "Throttling",
+        "ThrottlingException",
+        "ThrottledException",
+        "TooManyRequestsException",
+        "RequestLimitExceeded",
+        "SlowDown",
+        "PriorRequestNotComplete",
+    }
+)
+DEFAULT_RETRIES = 5
+# Seconds a timed-out process gets to exit after SIGTERM before it is killed
+KILL_GRACE = 2.0
+_READ_SIZE = 64 * 1024
+
+
+class AwsError(Exception):
+    """Raised when an AWS API call fails."""
+
+    def __init__(self, message: str, code: Optional[str] = None) -> None:
+        """Initialize the error.
+
+        Args:
+            message: Error message reported by AWS
+            code: AWS error code (e.g., NoSuchKey), if known
+        """
+        super().__init__(message)
+        self.code = code
+
+
+def cli_name(name: str) -> str:
+    """Convert an API name to its AWS CLI spelling.
+
+    Args:
+        name: Operation or parameter name (e.g., ListObjectsV2, ContentMD5)
+
+    Returns:
+        str: Kebab-case name (e.g., list-objects-v2, content-md5)
+    """
+    return re.sub(r"(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])", "-", name).lower()
+
+
+def build_cli_command(
+    service: str,
+    operation: str,
+    params: Optional[Dict[str, Any]] = None,
+    endpoint_url: Optional[str] = None,
+    region: Optional[str] = None,
+    outfile: Optional[str] = None,
+) -> List[str]:
+    """Build the AWS CLI command line for an API call.
+
+    Booleans become --flag/--no-flag, structures and lists are passed as JSON.
+
+    Args:
+        service: API service name (e.g., s3, route53)
+        operation: API operation name (e.g., ListObjectsV2)
+        params: API parameters
+        endpoint_url: Alternative endpoint, e.g., a local S3-compatible server
+        region: AWS region (default: the configured region)
+        outfile: File to write a streaming response body to (e.g., for GetObject)
+
+    Returns:
+        List[str]: Command line arguments
+    """
+    cmd = ["aws", _CLI_SERVICE_NAMES.get(service, service), cli_name(operation)]
+    for key, value in (params or {}).items():
+        flag = cli_name(key)
+        if isinstance(value, bool):
+            cmd.append(f"--{flag}" if value else f"--no-{flag}")
+        elif isinstance(value, (dict, list)):
+            cmd.extend([f"--{flag}", json.dumps(value)])
+        else:
+            cmd.extend([f"--{flag}", str(value)])
+    if endpoint_url:
+        cmd.extend(["--endpoint-url", endpoint_url])
+    if region:
+        cmd.extend(["--region", region])
+    if outfile:
+        cmd.append(outfile)
+    cmd.extend(["--output", "json"])
+    return cmd
+
+
+# time.monotonic() value after which no AWS call may run (see set_deadline)
+_deadline: Optional[float] = None
+
+
+def set_deadline(seconds: Optional[float]) -> None:
+    """Set a deadline for all AWS calls made from now on, e.g., for a whole batch.
+
+    Calls made after the deadline fail at once, and running AWS CLI processes
+    are killed when it passes.
+
+    Args:
+        seconds: Seconds from now (None: no deadline)
+    """
+    global _deadline
+    _deadline = None if seconds is None else time.monotonic() + seconds
+
+
+def time_left(timeout: Optional[float] = None) -> Optional[float]:
+    """Return how long a call may take: its own timeout, capped by the deadline.
+
+    Args:
+        timeout: Per-call timeout in seconds (None: no limit)
+
+    Returns:
+        Optional[float]: Seconds, or None if there is no limit
+
+    Raises:
+        AwsError: If the deadline has already passed
+    """
+    if _deadline is None:
+        return timeout
+    left = _deadline - time.monotonic()
+    if left <= 0:
+        raise AwsError("Deadline exceeded before the AWS call could start", "DeadlineExceeded")
+    return left if timeout is None else min(timeout, left)
+
+
+def _drain(stream: IO[bytes], chunks: List[str]) -> None:
+    """Decode a process output stream as it arrives."""
+    decoder = codecs.getincrementaldecoder("utf-8")("replace")
+    for data in iter(lambda: stream.read(_READ_SIZE), b""):
+        chunks.append(decoder.decode(data))
+    chunks.append(decoder.decode(b"", final=True))
+    stream.close()
+
+
+def _kill(process: "subprocess.Popen[bytes]") -> None:
+    """Terminate a process and everything it started, killing it if it lingers."""
+    for sig, grace in ((signal.SIGTERM, KILL_GRACE), (getattr(signal, "SIGKILL", None), None)):
+        try:
+            if hasattr(os, "killpg") and sig is not None:
+                os.killpg(process.pid, sig)
+            else:
+                process.kill()
+        except OSError:
+            pass
+        try:
+            process.wait(timeout=grace)
+            return
+        except subprocess.TimeoutExpired:
+            continue
+
+
+def run_process(cmd: List[str], timeout: Optional[float] = None) -> Tuple[int, str, str]:
+    """Run a command, decoding its output as it arrives, and kill it on timeout.
+
+    The process runs in its own session so that, on timeout, it is killed
+    together with any children it started. Only the UTF-8 decoding is
+    incremental: the output is returned whole, once the process exits.
+
+    Args:
+        cmd: Command line
+        timeout: Maximum number of seconds to wait (None: no limit)
+
+    Returns:
+        Tuple[int, str, str]: Exit code, standard output and standard error
+
+    Raises:
+        subprocess.TimeoutExpired: If the process ran out of time and was killed
+    """
+    with span("spawn", command=" ".join(cmd[:3])):
+        process = subprocess.Popen(
+            cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, start_new_session=True
+        )
+    stdout: List[str] = []
+    stderr: List[str] = []
+    readers = [
+        threading.Thread(target=_drain, args=(process.stdout, stdout), daemon=True),
+        threading.Thread(target=_drain, args=(process.stderr, stderr), daemon=True),
+    ]
+    for reader in readers:
+        reader.start()
+    with span("wait", pid=process.pid):
+        try:
+            returncode = process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            _kill(process)
+            raise
+        for reader in readers:
+            reader.join()
+    return returncode, "".join(stdout), "".join(stderr)
+
+
+class Backend(ABC):
+    """Executes AWS API calls; call() routes every request through the active backend."""
+
+    name = "backend"
+    # Whether large S3 uploads may use the boto3 multipart engine alongside this backend
+    multipart_uploads = True
+
+    @abstractmethod
+    def call(
+        self,
+        service: str,
+        operation: str,
+        params: Optional[Dict[str, Any]] = None,
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        outfile: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Run an AWS API operation, with the same arguments as aws.call."""
+
+
+class SubprocessBackend(Backend):
+    """Backend running each call as an AWS CLI process."""
+
+    name = "cli"
+
+    def __init__(self, timeout: Optional[float] = None, profile: Optional[str] = None) -> None:
+        """Initialize the backend.
+
+        Args:
+            timeout: Seconds after which an AWS CLI process is killed (None: no limit)
+            profile: Named AWS profile to use (None: the default credential chain)
+        """
+        self.timeout = timeout
+        self.profile = profile
+
+    def call(
+        self,
+        service: str,
+        operation: str,
+        params: Optional[Dict[str, Any]] = None,
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        outfile: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Run an AWS API operation, with the same arguments as aws.call."""
+        cmd = build_cli_command(service, operation, params, endpoint_url, region, outfile)
+        if self.profile:
+            cmd.extend(["--profile", self.profile])
+        limit = time_left(self.timeout)
+        try:
+            returncode, stdout, stderr = run_process(cmd, timeout=limit)
+        except subprocess.TimeoutExpired:
+            raise AwsError(f"{operation} timed out after {limit:g} seconds", "RequestTimeout")
+        if returncode != 0:
+            message = stderr.strip() or f"aws exited with code {returncode}"
+            match = _ERROR_CODE_RE.search(message)
+            raise AwsError(message, match.group(1) if match else None)
+        if not stdout.strip():
+            return {}
+        # The AWS CLI prints one JSON document, even for paginated results,
+        # so it is parsed once the process has exited
+        try:
+            with span("decode", size=len(stdout)):
+                response: Dict[str, Any] = json.loads(stdout)
+        except json.JSONDecodeError as e:
+            raise AwsError(f"Malformed response from {operation}: {str(e)}")
+        return response
+
+
+def _json_default(value: Any) -> Any:
+    """Serialize response values the way the AWS CLI prints them."""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if isinstance(value, bytes):
+        return value.decode("utf-8", "replace")
+    return str(value)
+
+
+class NativeBackend(Backend):
+    """Backend calling AWS in-process through boto3, avoiding a process per call.
+
+    Parameters and responses follow the AWS CLI conventions used throughout
+    Kreatisite: a Body parameter names a file to upload, streaming response
+    bodies are written to outfile, and paginated operations are fetched in full.
+    """
+
+    name = "native"
+
+    def __init__(self, timeout: Optional[float] = None, profile: Optional[str] = None) -> None:
+        """Initialize the backend.
+
+        Args:
+            timeout: Connect and read timeout of each request (None: botocore's defaults)
+            profile: Named AWS profile to use (None: the default credential chain)
+
+        Raises:
+            RuntimeError: If boto3 is not installed
+        """
+        if importlib.util.find_spec("boto3") is None:
+            raise RuntimeError(
+                "The native backend requires boto3: pip install 'kreatisite[native]'"
+            )
+        self.timeout = timeout
+        self.profile = profile
+        self._clients: Dict[Tuple[str, Optional[str], Optional[str]], Any] = {}
+        self._lock = threading.Lock()
+
+    def _client(self, service: str, endpoint_url: Optional[str], region: Optional[str]) -> Any:
+        key = (service, endpoint_url, region)
+        with self._lock:
+            if key not in self._clients:
+                import boto3
+                from botocore.config import Config
+
+                config = None
+                if self.timeout is not None:
+                    config = Config(connect_timeout=self.timeout, read_timeout=self.timeout)
+                session = boto3.session.Session(profile_name=self.profile)
+                self._clients[key] = session.client(
+                    service, endpoint_url=endpoint_url, region_name=region, config=config
+                )
+            return self._clients[key]
+
+    def call(
+        self,
+        service: str,
+        operation: str,
+        params: Optional[Dict[str, Any]] = None,
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        outfile: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Run an AWS API operation, with the same arguments as aws.call."""
+        from botocore.exceptions import BotoCoreError, ClientError
+
+        client = self._client(service, endpoint_url, region)
+        method = cli_name(operation).replace("-", "_")
+        kwargs = dict(params or {})
+        body = None
+        try:
+            if isinstance(kwargs.get("Body"), str):
+                body = kwargs["Body"] = open(kwargs["Body"], "rb")
+            if outfile is None and client.can_paginate(method):
+                response: Dict[str, Any] = {}
+                for page in client.get_paginator(method).paginate(**kwargs):
+                    for key, value in page.items():
+                        if isinstance(value, list):
+                            response.setdefault(key, []).extend(value)
+                        else:
+                            response[key] = value
+            else:
+                response = getattr(client, method)(**kwargs)
+            if outfile is not None and "Body" in response:
+                with open(outfile, "wb") as f:
+                    for chunk in iter(lambda: response["Body"].read(1 << 20), b""):
+                        f.write(chunk)
+                del response["Body"]
+        except ClientError as e:
+            raise AwsError(str(e), e.response.get("Error", {}).get("Code"))
+        except BotoCoreError as e:
+            raise AwsError(str(e))
+        finally:
+            if body is not None:
+                body.close()
+        response.pop("ResponseMetadata", None)
+        decoded: Dict[str, Any] = json.loads(json.dumps(response, default=_json_default))
+        return decoded
+
+
+_backend: Optional[Backend] = None
+_backend_lock = threading.Lock()
+# Backend of the current context, e.g., of one account in a fan-out (see use_backend)
+_context_backend: "contextvars.ContextVar[Optional[Backend]]" = contextvars.ContextVar(
+    "kreatisite_aws_backend", default=None
+)
+
+
+def create_backend(
+    name: str, timeout: Optional[float] = None, profile: Optional[str] = None
+) -> Backend:
+    """Create an execution backend by name.
+
+    Args:
+        name: "cli" (AWS CLI processes), "native" (boto3) or "fake" (in-memory)
+        timeout: Maximum number of seconds per AWS call (not used by the fake)
+        profile: Named AWS profile to use (not used by the fake)
+
+    Returns:
+        Backend: The backend
+
+    Raises:
+        ValueError: If the name is unknown
+    """
+    if name == "cli":
+        return SubprocessBackend(timeout, profile)
+    if name == "native":
+        return NativeBackend(timeout, profile)
+    if name == "fake":
+        from .fakeaws import FakeBackend
+
+        return FakeBackend()
+    raise ValueError(f"Unknown AWS backend '{name}' (choose from {', '.join(BACKEND_NAMES)})")
+
+
+def get_backend() -> Backend:
+    """Return the active backend, by default the one named by $KREATISITE_AWS_BACKEND or "cli".
+
+    A backend installed with use_backend() takes precedence in its context.
+
+    Returns:
+        Backend: The backend every call() goes through
+    """
+    global _backend
+    backend = _context_backend.get()
+    if backend is not None:
+        return backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = create_backend(os.environ.get(BACKEND_ENV) or "cli")
+        return _backend
+
+
+def set_backend(backend: Optional[Backend]) -> Optional[Backend]:
+    """Replace the active backend.
+
+    Args:
+        backend: New backend (None: back to the default)
+
+    Returns:
+        Optional[Backend]: The previous backend
+    """
+    global _backend
+    with _backend_lock:
+        previous, _backend = _backend, backend
+    return previous
+
+
+@contextlib.contextmanager
+def use_backend(backend: Backend) -> Iterator[Backend]:
+    """Route the calls of the current context (thread or task) through a backend.
+
+    Threads started inside the block only inherit the backend when they run in
+    a copy of the context, e.g., through contextvars.copy_context().run.
+
+    Args:
+        backend: Backend to use inside the block
+
+    Yields:
+        Backend: The backend
+    """
+    token = _context_backend.set(backend)
+    try:
+        yield backend
+    finally:
+        _context_backend.reset(token)
+
+
+def call(
+    service: str,
+    operation: str,
+    params: Optional[Dict[str, Any]] = None,
+    endpoint_url: Optional[str] = None,
+    region: Optional[str] = None,
+    outfile: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Call an AWS API operation through the active backend.
+
+    Paginated operations are fetched in full, continuation tokens are
+    followed and the pages merged.
+
+    Args:
+        service: API service name (e.g., s3, route53)
+        operation: API operation name (e.g., ListObjectsV2)
+        params: API parameters
+        endpoint_url: Alternative endpoint, e.g., a local S3-compatible server
+        region: AWS region (default: the configured region)
+        outfile: File to write a streaming response body to (e.g., for GetObject)
+
+    Returns:
+        Dict[str, Any]: Decoded response (empty if the operation returns no output)
+
+    Raises:
+        AwsError: If the call fails, times out or returns malformed output
+    """
+    time_left()
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        with span(f"aws {service}:{operation}", region=region):
+            response = get_backend().call(service, operation, params, endpoint_url, region, outfile)
+        outcome = "ok"
+        return response
+    except AwsError as e:
+        if e.code in THROTTLING_CODES:
+            outcome = "throttled"
+            AWS_THROTTLES.inc(service, operation)
+        raise
+    finally:
+        AWS_CALLS.inc(service, operation, outcome)
+        AWS_CALL_SECONDS.observe(time.perf_counter() - start, service, operation)
+
+
+def call_with_retries(
+    service: str,
+    operation: str,
+    params: Optional[Dict[str, Any]] = None,
+    endpoint_url: Optional[str] = None,
+    region: Optional[str] = None,
+    retries: int = DEFAULT_RETRIES,
+    sleep: Optional[Callable[[float], None]] = None,
+) -> Dict[str, Any]:
+    """Call an AWS API operation, retrying with backoff while it is throttled.
+
+    Args:
+        service: API service name
+        operation: API operation name
+        params: API parameters
+        endpoint_url: Alternative endpoint
+        region: AWS region
+        retries: Maximum number of retries after throttling errors
+        sleep: Function used to sleep (default: time.sleep)
+
+    Returns:
+        Dict[str, Any]: Decoded response
+
+    Raises:
+        AwsError: If the call fails, or is still throttled after all retries
+    """
+    sleep = sleep or time.sleep
+    delays = backoff_delays(initial=0.5, maximum=8.0)
+    while True:
+        try:
+            return call(service, operation, params, endpoint_url, region)
+        except AwsError as e:
+            if e.code not in THROTTLING_CODES or retries <= 0:
+                raise
+            delay = next(delays)
+            left = time_left()
+            if left is not None and left <= delay:
+                raise
+        retries -= 1
+        AWS_RETRIES.inc(service, operation)
+        sleep(delay)
@@ -0,0 +1,210 @@
+"""Memory-mapped Bloom filter of known-taken domain names for Kreatisite CLI.
+
+Bulk checks skip the names in the filter without asking AWS or reading the
+history database. The filter file is memory-mapped rather than read, so
+opening a filter of tens of millions of names costs the same as opening an
+empty one; only the pages a lookup touches are read.
+
+A Bloom filter cannot forget names, and a name that becomes available stays
+in it until the filter is rebuilt from the history, so rebuilds are meant to
+run periodically. False positives (free names reported taken) occur at about
+the configured rate while the filter holds at most its capacity.
+"""
+
+import hashlib
+import math
+import mmap
+import os
+import struct
+import tempfile
+from typing import Iterable, Optional, Tuple
+
+from .defaults import DEFAULT_ERROR_RATE, DEFAULT_HEADROOM
+
+MIN_CAPACITY = 1000
+_MAGIC = b"KBLOOM1\x00"
+# Magic, number of bits, number of hashes, capacity, number of names added
+_HEADER = struct.Struct("<8sQQQQ")
+_MASK = (1 << 64) - 1
+
+
+class BloomError(Exception):
+    """Raised when a filter file is missing, truncated or not a filter."""
+
+
+def filter_size(capacity: int, error_rate: float) -> Tuple[int, int]:
+    """Return the optimal number of bits and hashes for a capacity and error rate.
+
+    Args:
+        capacity: Number of names the filter is sized for
+        error_rate: False-positive rate at capacity, between 0 and 1
+
+    Returns:
+        Tuple[int, int]: Number of bits (a multiple of 8) and number of hashes
+    """
+    if not 0 < error_rate < 1:
+        raise ValueError(f"Invalid error rate {error_rate}: must be between 0 and 1")
+    capacity = max(capacity, 1)
+    bits = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+    bits = max(64, (bits + 7) // 8 * 8)
+    hashes = max(1, round(bits / capacity * math.log(2)))
+    return bits, hashes
+
+
+class BloomFilter:
+    """Bloom filter of names, backed by a memory-mapped file."""
+
+    def __init__(self, path: str, writable: bool = False) -> None:
+        """Map an existing filter file.
+
+        Args:
+            path: Filter file path
+            writable: Whether names can be added
+
+        Raises:
+            BloomError: If the file is missing or is not a filter
+        """
+        self.path = path
+        self._writable = writable
+        self._map: Optional[mmap.mmap] = None
+        try:
+            with open(path, "r+b" if writable else "rb") as f:
+                self._map = mmap.mmap(
+                    f.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ
+                )
+        except (OSError, ValueError) as e:
+            raise BloomError(f"Cannot open filter {path}: {str(e)}") from None
+        if len(self._map) < _HEADER.size:
+            self._map.close()
+            raise BloomError(f"{path} is not a filter")
+        magic, bits, hashes, capacity, count = _HEADER.unpack_from(self._map)
+        self.bits: int = bits
+        self.hashes: int = hashes
+        self.capacity: int = capacity
+        # Distinct names added, false positives excepted
+        self.count: int = count
+        if magic != _MAGIC or len(self._map) != _HEADER.size + bits // 8:
+            self._map.close()
+            raise BloomError(f"{path} is not a filter or is truncated")
+
+    @classmethod
+    def create(
+        cls, path: str, capacity: int, error_rate: float = DEFAULT_ERROR_RATE
+    ) -> "BloomFilter":
+        """Create an empty filter file, replacing any file at the path, and map it.
+
+        Args:
+            path: Filter file path
+            capacity: Number of names the filter is sized for
+            error_rate: False-positive rate at capacity
+
+        Returns:
+            BloomFilter: The writable filter
+        """
+        bits, hashes = filter_size(capacity, error_rate)
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, bits, hashes, capacity, 0))
+            f.truncate(_HEADER.size + bits // 8)
+        return cls(path, writable=True)
+
+    @property
+    def full(self) -> bool:
+        """Return whether the filter holds its capacity, beyond which false positives grow."""
+        return self.count >= self.capacity
+
+    def _positions(self, name: str) -> Iterable[int]:
+        """Return the bit positions of a name, by double hashing one 128-bit digest."""
+        digest = hashlib.blake2b(name.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return (((first + i * second) & _MASK) % self.bits for i in range(self.hashes))
+
+    def __contains__(self, name: object) -> bool:
+        """Return whether a name may have been added; False is certain."""
+        assert self._map is not None
+        if not isinstance(name, str):
+            return False
+        data = self._map
+        return all(
+            data[_HEADER.size + (bit >> 3)] & (1 << (bit & 7)) for bit in self._positions(name)
+        )
+
+    def add(self, name: str) -> bool:
+        """Add a name.
+
+        Returns:
+            bool: Whether the name was new to the filter
+        """
+        assert self._map is not None
+        data = self._map
+        new = False
+        for bit in self._positions(name):
+            index = _HEADER.size + (bit >> 3)
+            mask = 1 << (bit & 7)
+            if not data[index] & mask:
+                data[index] |= mask
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+    def flush(self) -> None:
+        """Write added names to the file."""
+        if self._writable and self._map is not None and not self._map.closed:
+            _HEADER.pack_into(
+                self._map, 0, _MAGIC, self.bits, self.hashes, self.capacity, self.count
+            )
+            self._map.flush()
+
+    def close(self) -> None:
+        """Unmap the file, writing added names first."""
+        if self._map is not None and not self._map.closed:
+            self.flush()
+            self._map.close()
+
+    def __enter__(self) -> "BloomFilter":
+        """Return the filter."""
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        """Unmap the file."""
+        self.close()
+
+
+def build_filter(
+    path: str,
+    names: Iterable[str],
+    count: int,
+    error_rate: float = DEFAULT_ERROR_RATE,
+    headroom: float = DEFAULT_HEADROOM,
+) -> int:
+    """Rebuild a filter file from a list of taken names.
+
+    The filter is written next to the path and moved over it when complete,
+    so checks running meanwhile keep using the previous filter.
+
+    Args:
+        path: Filter file path
+        names: Taken names
+        count: Number of names, to size the filter
+        error_rate: False-positive rate at capacity
+        headroom: Share of free capacity to leave for names added later
+
+    Returns:
+        int: Number of distinct names in the filter
+    """
+    capacity = max(MIN_CAPACITY, math.ceil(count * (1 + headroom)))
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix=".kreatisite-bloom-", dir=directory)
+    os.close(fd)
+    try:
+        with BloomFilter.create(temp_path, capacity, error_rate) as bloom:
+            for name in names:
+                bloom.add(name)
+            added = bloom.count
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    return added
@@ -0,0 +1,591 @@
+"""Static site build functions for Kreatisite CLI."""
+
+import gzip
+import hashlib
+import json
+import os
+import posixpath
+import re
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+from .cache import DEFAULT_CACHE_SIZE, TieredCache, cache_key, open_build_cache
+from .defaults import DEFAULT_CACHE_DIR
+from .pages import iter_pages
+from .search import (
+    SEARCH_DOCS_NAME,
+    SEARCH_INDEX_NAME,
+    SEARCH_SCRIPT_NAME,
+    SearchIndexBuilder,
+    write_search_script,
+)
+from .sitemap import SitemapWriter
+from .trace import span
+
+# Assets that get a content hash in their filename and can be cached forever
+FINGERPRINT_EXTENSIONS = frozenset(
+    {".css", ".js", ".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".woff", ".woff2"}
+)
+# Text formats worth shipping as precompressed .gz variants
+COMPRESS_EXTENSIONS = frozenset({".html", ".css", ".js", ".svg", ".json", ".xml", ".txt"})
+HTML_EXTENSIONS = frozenset({".html", ".htm"})
+
+MANIFEST_NAME = "asset-manifest.json"
+FINGERPRINT_LENGTH = 8
+
+_FINGERPRINT_RE = re.compile(r"\.[0-9a-f]{%d}\.[A-Za-z0-9]+$" % FINGERPRINT_LENGTH)
+_CSS_TOKEN_RE = re.compile(
+    r"(\"(?:\\.|[^\"\\])*\"|'(?:\\.|[^'\\])*')|(/\*.*?\*/)|([^\"'/]+|/)", re.DOTALL
+)
+_HTML_RAW_RE = re.compile(
+    r"(<(pre|textarea|script|style)\b[^>]*>)(.*?)(</\2\s*>)", re.IGNORECASE | re.DOTALL
+)
+_HTML_COMMENT_RE = re.compile(r"<!--(?!\[if).*?-->", re.DOTALL)
+_HTML_ATTR_RE = re.compile(
+    r"(\b(?:href|src|poster|data-src)\s*=\s*)([\"'])(.*?)\2", re.IGNORECASE | re.DOTALL
+)
+_HTML_SRCSET_RE = re.compile(r"(\bsrcset\s*=\s*)([\"'])(.*?)\2", re.IGNORECASE | re.DOTALL)
+_CSS_URL_RE = re.compile(r"(url\(\s*)([\"']?)([^\"')]+)\2(\s*\))", re.IGNORECASE)
+_CSS_IMPORT_RE = re.compile(r"(@import\s*)([\"'])(.*?)\2", re.IGNORECASE)
+
+
+class BuildError(Exception):
+    """Raised when the site cannot be built."""
+
+
+@dataclass
+class BuildResult:
+    """Summary of a completed site build."""
+
+    files: List[str] = field(default_factory=list)
+    manifest: Dict[str, str] = field(default_factory=dict)
+    compressed: int = 0
+    cache_hits: int = 0
+    render_hits: int = 0
+
+
+def minify_css(text: str) -> str:
+    """Minify a stylesheet by removing comments and redundant whitespace.
+
+    Args:
+        text: CSS source
+
+    Returns:
+        str: Minified CSS
+    """
+    out: List[str] = []
+    for match in _CSS_TOKEN_RE.finditer(text):
+        string, comment, code = match.groups()
+        if string:
+            out.append(string)
+        elif code:
+            code = re.sub(r"\s+", " ", code)
+            code = re.sub(r"\s*([{};,>])\s*", r"\1", code)
+            code = re.sub(r":\s+", ":", code)
+            out.append(code)
+    return re.sub(r";}", "}", "".join(out)).strip()
+
+
+def minify_js(text: str) -> str:
+    """Minify a script conservatively.
+
+    Only indentation, trailing whitespace and blank lines are removed, which is safe
+    for any script that has no template literals. Scripts containing backticks are
+    left untouched apart from surrounding whitespace.
+
+    Args:
+        text: JavaScript source
+
+    Returns:
+        str: Minified JavaScript
+    """
+    if "`" in text:
+        return text.strip()
+    lines = (line.strip() for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def minify_html(text: str) -> str:
+    """Minify an HTML document.
+
+    Comments (except conditional comments) are removed and whitespace runs are
+    collapsed. Contents of pre and textarea elements are preserved verbatim; inline
+    scripts and styles are minified with the script and stylesheet minifiers.
+
+    Args:
+        text: HTML source
+
+    Returns:
+        str: Minified HTML
+    """
+    preserved: List[str] = []
+
+    def stash(match: "re.Match[str]") -> str:
+        open_tag, tag, body, close_tag = match.groups()
+        tag = tag.lower()
+        if tag == "style":
+            body = minify_css(body)
+        elif tag == "script":
+            body = minify_js(body)
+        preserved.append(open_tag + body + close_tag)
+        return f"\x00{len(preserved) - 1}\x00"
+
+    text = _HTML_RAW_RE.sub(stash, text)
+    text = _HTML_COMMENT_RE.sub("", text)
+    text = re.sub(r"\s+", " ", text).strip()
+    return re.sub(r"\x00(\d+)\x00", lambda m: preserved[int(m.group(1))], text)
+
+
+def fingerprint_name(rel_path: str, data: bytes) -> str:
+    """Return the fingerprinted name of an asset.
+
+    Args:
+        rel_path: Asset path relative to the site root (e.g., css/app.css)
+        data: Final asset contents
+
+    Returns:
+        str: Path with a content hash before the extension (e.g., css/app.3f9a1c2b.css)
+    """
+    digest = hashlib.sha256(data).hexdigest()[:FINGERPRINT_LENGTH]
+    root, ext = posixpath.splitext(rel_path)
+    return f"{root}.{digest}{ext}"
+
+
+def is_fingerprinted(path: str) -> bool:
+    """Check whether a path carries a content hash and is therefore immutable.
+
+    Args:
+        path: File path or URL path
+
+    Returns:
+        bool: True if the filename contains a build fingerprint
+    """
+    return bool(_FINGERPRINT_RE.search(path))
+
+
+def _resolve_reference(ref: str, from_rel: str) -> Optional[str]:
+    """Resolve a reference found in a file to a path relative to the site root."""
+    parts = urlsplit(ref)
+    if parts.scheme or parts.netloc or not parts.path or ref.startswith("#"):
+        return None
+    if parts.path.startswith("/"):
+        target = parts.path.lstrip("/")
+    else:
+        target = posixpath.join(posixpath.dirname(from_rel), parts.path)
+    return posixpath.normpath(target)
+
+
+def rewrite_references(text: str, from_rel: str, mapping: Dict[str, str]) -> str:
+    """Rewrite asset references in HTML or CSS to their fingerprinted names.
+
+    Args:
+        text: Document contents
+        from_rel: Path of the document relative to the site root
+        mapping: Original relative path to fingerprinted relative path
+
+    Returns:
+        str: Document with references rewritten, preserving relative/absolute form
+    """
+
+    def replace_ref(ref: str) -> str:
+        target = _resolve_reference(ref.strip(), from_rel)
+        if target is None or target not in mapping:
+            return ref
+        old_name = posixpath.basename(target)
+        new_name = posixpath.basename(mapping[target])
+        return re.sub(re.escape(old_name) + r"(?=$|[?#])", new_name, ref.strip(), count=1)
+
+    def replace_attr(match: "re.Match[str]") -> str:
+        prefix, quote, ref, *rest = match.groups()
+        return f"{prefix}{quote}{replace_ref(ref)}{quote}{''.join(rest)}"
+
+    def replace_srcset(match: "re.Match[str]") -> str:
+        prefix, quote, value = match.groups()
+        candidates = []
+        for candidate in value.split(","):
+            pieces = candidate.strip().split(None, 1)
+            if pieces:
+                pieces[0] = replace_ref(pieces[0])
+            candidates.append(" ".join(pieces))
+        return f"{prefix}{quote}{', '.join(candidates)}{quote}"
+
+    text = _HTML_ATTR_RE.sub(replace_attr, text)
+    text = _HTML_SRCSET_RE.sub(replace_srcset, text)
+    text = _CSS_URL_RE.sub(replace_attr, text)
+    return _CSS_IMPORT_RE.sub(replace_attr, text)
+
+
+def iter_source_files(source_dir: str) -> List[str]:
+    """List site source files as sorted POSIX paths relative to the source directory.
+
+    Hidden files and directories are skipped.
+
+    Args:
+        source_dir: Site source directory
+
+    Returns:
+        List[str]: Relative file paths
+    """
+    files = []
+    for root, dirs, names in os.walk(source_dir):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        for name in names:
+            if name.startswith("."):
+                continue
+            rel = os.path.relpath(os.path.join(root, name), source_dir)
+            files.append(rel.replace(os.sep, "/"))
+    return sorted(files)
+
+
+def render_file(rel_path: str, data: bytes, mapping: Dict[str, str], minify: bool = True) -> bytes:
+    """Transform a single source file into its build output.
+
+    Args:
+        rel_path: Path of the file relative to the site root
+        data: Source contents
+        mapping: Fingerprint mapping used to rewrite references
+        minify: Whether to minify HTML, CSS and JavaScript
+
+    Returns:
+        bytes: Output contents
+    """
+    ext = posixpath.splitext(rel_path)[1].lower()
+    if ext not in HTML_EXTENSIONS and ext not in (".css", ".js"):
+        return data
+    text = data.decode("utf-8")
+    if minify:
+        if ext in HTML_EXTENSIONS:
+            text = minify_html(text)
+        elif ext == ".css":
+            text = minify_css(text)
+        else:
+            text = minify_js(text)
+    if ext != ".js":
+        text = rewrite_references(text, rel_path, mapping)
+    return text.encode("utf-8")
+
+
+def _css_dependencies(text: str, rel_path: str, stylesheets: Set[str]) -> List[str]:
+    """List the stylesheets a stylesheet imports or otherwise references."""
+    refs = [m.group(3) for m in _CSS_IMPORT_RE.finditer(text)]
+    refs += [m.group(3) for m in _CSS_URL_RE.finditer(text)]
+    targets = (_resolve_reference(ref.strip(), rel_path) for ref in refs)
+    return sorted({t for t in targets if t in stylesheets and t != rel_path})
+
+
+def _render_order(files: List[str], source_dir: str) -> List[str]:
+    """Order files so that every asset is fingerprinted before anything references it.
+
+    Other assets come first, then stylesheets, each after the stylesheets it
+    imports, then pages. Stylesheets importing each other in a cycle keep
+    their alphabetical order, as no order fingerprints them all first.
+
+    Args:
+        files: Source files relative to the source directory
+        source_dir: Site source directory, to read the stylesheets' imports
+
+    Returns:
+        List[str]: The files in render order
+    """
+
+    def rank(rel_path: str) -> Tuple[int, str]:
+        ext = posixpath.splitext(rel_path)[1].lower()
+        if ext in HTML_EXTENSIONS:
+            return (2, rel_path)
+        if ext == ".css":
+            return (1, rel_path)
+        return (0, rel_path)
+
+    ranked = sorted(files, key=rank)
+    stylesheets = {f for f in ranked if rank(f)[0] == 1}
+    dependencies: Dict[str, List[str]] = {}
+    for rel_path in stylesheets:
+        with open(os.path.join(source_dir, rel_path), "r", encoding="utf-8", errors="replace") as f:
+            dependencies[rel_path] = _css_dependencies(f.read(), rel_path, stylesheets)
+
+    ordered_css: List[str] = []
+    visited: Set[str] = set()
+
+    def visit(rel_path: str) -> None:
+        if rel_path in visited:
+            return
+        visited.add(rel_path)
+        for dependency in dependencies[rel_path]:
+            visit(dependency)
+        ordered_css.append(rel_path)
+
+    for rel_path in sorted(stylesheets):
+        visit(rel_path)
+    return (
+        [f for f in ranked if rank(f)[0] == 0]
+        + ordered_css
+        + [f for f in ranked if rank(f)[0] == 2]
+    )
+
+
+def _compress_file(src: str, dest: str) -> None:
+    """Write a gzip variant of a file."""
+    with open(src, "rb") as f:
+        data = f.read()
+    with open(dest, "wb") as f:
+        f.write(gzip.compress(data, compresslevel=9, mtime=0))
+
+
+def precompress(
+    output_dir: str, files: List[str], cache: TieredCache, jobs: Optional[int] = None
+) -> Tuple[int, int]:
+    """Emit .gz variants of compressible files, reusing cached results.
+
+    Compressed output is cached under the hash of the uncompressed content, so
+    unchanged assets are never recompressed across builds or machines. Cache
+    misses are compressed in parallel across processes.
+
+    Args:
+        output_dir: Build output directory
+        files: Output files relative to output_dir
+        cache: Build cache
+        jobs: Number of worker processes (default: CPU count)
+
+    Returns:
+        Tuple[int, int]: Number of files compressed and number served from cache
+    """
+    pending: List[Tuple[str, str, str]] = []
+    hits = 0
+    for rel_path in files:
+        if posixpath.splitext(rel_path)[1].lower() not in COMPRESS_EXTENSIONS:
+            continue
+        src = os.path.join(output_dir, rel_path)
+        with open(src, "rb") as f:
+            key = cache_key("gzip", f.read())
+        dest = f"{src}.gz"
+        compressed = cache.get(key)
+        if compressed is not None:
+            with open(dest, "wb") as f:
+                f.write(compressed)
+            hits += 1
+        else:
+            pending.append((src, dest, key))
+
+    workers = jobs or os.cpu_count() or 1
+    if workers == 1 or len(pending) <= 1:
+        for src, dest, _ in pending:
+            _compress_file(src, dest)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_compress_file, src, dest) for src, dest, _ in pending]
+            for future in futures:
+                future.result()
+    for _, dest, key in pending:
+        with open(dest, "rb") as f:
+            cache.put(key, f.read())
+    return len(pending) + hits, hits
+
+
+def render_cached(
+    cache: TieredCache,
+    rel_path: str,
+    data: bytes,
+    mapping: Dict[str, str],
+    minify: bool = True,
+    mapping_key: str = "",
+) -> Tuple[bytes, bool]:
+    """Render a file through the build cache.
+
+    Only HTML, CSS and JavaScript are cached; other files are copied as is.
+
+    Args:
+        cache: Build cache
+        rel_path: Path of the file relative to the site root
+        data: Source contents
+        mapping: Fingerprint mapping used to rewrite references
+        minify: Whether to minify HTML, CSS and JavaScript
+        mapping_key: Digest of the mapping (default: computed from mapping)
+
+    Returns:
+        Tuple[bytes, bool]: Output contents and whether they came from the cache
+    """
+    ext = posixpath.splitext(rel_path)[1].lower()
+    if ext not in HTML_EXTENSIONS and ext not in (".css", ".js"):
+        return data, False
+    if ext == ".js":
+        # JavaScript references are not rewritten, so the mapping is not an input
+        mapping_key = ""
+    elif not mapping_key:
+        mapping_key = cache_key(json.dumps(mapping, sort_keys=True))
+    key = cache_key("render", rel_path, str(minify), mapping_key, data)
+    output = cache.get(key)
+    if output is not None:
+        return output, True
+    output = render_file(rel_path, data, mapping, minify=minify)
+    cache.put(key, output)
+    return output, False
+
+
+def index_pages(
+    output_dir: str,
+    files: List[str],
+    source_dir: Optional[str] = None,
+    base_url: Optional[str] = None,
+    search_index: bool = False,
+    tmp_dir: Optional[str] = None,
+    log: Callable[[str], None] = print,
+) -> List[str]:
+    """Stream the built pages through the sitemap and search index stages.
+
+    Args:
+        output_dir: Build output directory
+        files: Output files relative to output_dir
+        source_dir: Source directory, used for last-modified times
+        base_url: Site origin; a sitemap is written only if given
+        search_index: Whether to write a search index and its browser reader
+        tmp_dir: Directory for the search index's spilled runs
+        log: Function used to report progress
+
+    Returns:
+        List[str]: Files written, relative to output_dir
+    """
+    pages = [f for f in files if posixpath.splitext(f)[1].lower() in HTML_EXTENSIONS]
+    written: List[str] = []
+    with ExitStack() as stack:
+        sitemap = stack.enter_context(SitemapWriter(output_dir, base_url)) if base_url else None
+        builder = None
+        if search_index:
+            if tmp_dir:
+                os.makedirs(tmp_dir, exist_ok=True)
+            builder = stack.enter_context(
+                SearchIndexBuilder(
+                    os.path.join(output_dir, SEARCH_INDEX_NAME),
+                    os.path.join(output_dir, SEARCH_DOCS_NAME),
+                    tmp_dir=tmp_dir,
+                )
+            )
+        for page in iter_pages(output_dir, pages, source_dir):
+            if sitemap:
+                sitemap.add(f"{sitemap.base_url}{page.url}", page.lastmod)
+            if builder:
+                builder.add(page.url, page.title, page.text)
+
+    if sitemap:
+        written.extend(sitemap.files)
+        log(f"Wrote sitemap with {sitemap.urls} URLs in {len(sitemap.files)} file(s)")
+    if builder:
+        write_search_script(output_dir)
+        written.extend([SEARCH_INDEX_NAME, SEARCH_DOCS_NAME, SEARCH_SCRIPT_NAME])
+        log(f"Indexed {builder.docs} pages ({builder.terms} terms) for search")
+    return written
+
+
+def _prepare_output_dir(output_dir: str) -> None:
+    """Empty the output directory, refusing to touch directories we did not create."""
+    if os.path.isdir(output_dir) and os.listdir(output_dir):
+        if not os.path.exists(os.path.join(output_dir, MANIFEST_NAME)):
+            raise BuildError(
+                f"Output directory '{output_dir}' is not empty and is not a previous build"
+            )
+        shutil.rmtree(output_dir)
+    os.makedirs(output_dir, exist_ok=True)
+
+
+def build_site(
+    source_dir: str,
+    output_dir: str,
+    cache_dir: str = DEFAULT_CACHE_DIR,
+    jobs: Optional[int] = None,
+    minify: bool = True,
+    compress: bool = True,
+    base_url: Optional[str] = None,
+    search_index: bool = False,
+    shared_cache: Optional[str] = None,
+    cache_size: int = DEFAULT_CACHE_SIZE,
+    log: Callable[[str], None] = print,
+) -> BuildResult:
+    """Build a static site: minify, fingerprint and precompress its files.
+
+    Rendered and compressed outputs are stored in a content-addressed cache,
+    keyed by a hash of their inputs and the tool version. The local cache is
+    size limited; a shared cache (a network directory or an S3 prefix) lets
+    fresh machines reuse outputs built elsewhere.
+
+    With a base URL a sitemap is generated, and with search_index a compact
+    client-side search index; both stream the built pages one at a time.
+
+    Args:
+        source_dir: Directory containing the site sources
+        output_dir: Directory to write the build output to
+        cache_dir: Directory for the local build cache
+        jobs: Number of compression worker processes (default: CPU count)
+        minify: Whether to minify HTML, CSS and JavaScript
+        compress: Whether to emit precompressed .gz variants
+        base_url: Site origin (e.g., https://example.com) to generate a sitemap for
+        search_index: Whether to generate a search index
+        shared_cache: Shared cache directory or s3://bucket/prefix URL
+        cache_size: Size limit of the local build cache in bytes
+        log: Function used to report progress
+
+    Returns:
+        BuildResult: Summary of the build
+
+    Raises:
+        BuildError: If the source directory is missing or the output is unsafe to replace
+    """
+    if not os.path.isdir(source_dir):
+        raise BuildError(f"Source directory '{source_dir}' not found")
+    _prepare_output_dir(output_dir)
+
+    result = BuildResult()
+    with open_build_cache(cache_dir, shared_cache, cache_size, log=log) as cache:
+        with span("render"):
+            mapping_key = ""
+            for rel_path in _render_order(iter_source_files(source_dir), source_dir):
+                if not mapping_key and posixpath.splitext(rel_path)[1].lower() in HTML_EXTENSIONS:
+                    # Pages render last, so the mapping no longer changes from here on
+                    mapping_key = cache_key(json.dumps(result.manifest, sort_keys=True))
+                with open(os.path.join(source_dir, rel_path), "rb") as f:
+                    data, hit = render_cached(
+                        cache, rel_path, f.read(), result.manifest, minify, mapping_key
+                    )
+                result.render_hits += hit
+                out_rel = rel_path
+                if posixpath.splitext(rel_path)[1].lower() in FINGERPRINT_EXTENSIONS:
+                    out_rel = fingerprint_name(rel_path, data)
+                    result.manifest[rel_path] = out_rel
+                dest = os.path.join(output_dir, out_rel)
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+                with open(dest, "wb") as f:
+                    f.write(data)
+                result.files.append(out_rel)
+        log(
+            f"Built {len(result.files)} files ({len(result.manifest)} fingerprinted, "
+            f"{result.render_hits} from cache)"
+        )
+
+        if base_url or search_index:
+            with span("index"):
+                result.files.extend(
+                    index_pages(
+                        output_dir,
+                        result.files,
+                        source_dir,
+                        base_url,
+                        search_index,
+                        tmp_dir=os.path.join(cache_dir, "tmp"),
+                        log=log,
+                    )
+                )
+
+        if compress:
+            with span("precompress"):
+                result.compressed, result.cache_hits = precompress(
+                    output_dir, result.files, cache, jobs=jobs
+                )
+            log(f"Precompressed {result.compressed} files ({result.cache_hits} from cache)")
+    if shared_cache:
+        log(f"Build cache: {cache.summary()}")
+
+    with open(os.path.join(output_dir, MANIFEST_NAME), "w") as f:
+        json.dump(result.manifest, f, indent=2, sort_keys=True)
+    return result
@@ -0,0 +1,409 @@
+"""Content-addressed build cache for Kreatisite CLI."""
+
+import hashlib
+import os
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Set, Tuple, Union
+
+from . import __version__
+from .aws import AwsError, call
+from .defaults import DEFAULT_CACHE_SIZE
+from .metrics import CACHE_REQUESTS
+
+# Fraction of the size limit the local cache is trimmed down to when it overflows
+EVICTION_TARGET = 0.8
+DEFAULT_UPLOAD_JOBS = 8
+OBJECTS_DIR = "objects"
+
+
+def cache_key(*parts: Union[str, bytes]) -> str:
+    """Return the cache key of a build output.
+
+    The key is the SHA-256 of the tool version and every input the output
+    depends on, so outputs are shared between machines and invalidated by
+    upgrades.
+
+    Args:
+        parts: Inputs, e.g., the stage name, the file path, options and contents
+
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.sha256(f"kreatisite {__version__}".encode())
+    for part in parts:
+        data = part.encode("utf-8") if isinstance(part, str) else part
+        digest.update(len(data).to_bytes(8, "big"))
+        digest.update(data)
+    return digest.hexdigest()
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    """Write a file so that concurrent readers never see it partially written."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class CacheBackend(ABC):
+    """Storage for cached build outputs, addressed by cache_key()."""
+
+    name = "cache"
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """Return a cached output, or None if it is not cached."""
+
+    @abstractmethod
+    def put(self, key: str, data: bytes) -> None:
+        """Store an output."""
+
+
+class DirectoryCache(CacheBackend):
+    """Cache stored as files in a directory, e.g., on a shared network path.
+
+    Entries are written atomically, so several machines can share the
+    directory without locking.
+    """
+
+    name = "shared"
+
+    def __init__(self, path: str) -> None:
+        """Initialize the cache.
+
+        Args:
+            path: Cache directory (created on first write)
+        """
+        self.path = path
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.path, key[:2], key)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return a cached output, or None if it is not cached."""
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def put(self, key: str, data: bytes) -> None:
+        """Store an output."""
+        _write_atomic(self._path(key), data)
+
+
+class LocalCache(DirectoryCache):
+    """Directory cache that evicts the least recently used entries beyond a size limit."""
+
+    name = "local"
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_CACHE_SIZE) -> None:
+        """Initialize the cache.
+
+        Args:
+            path: Cache directory (created on first write)
+            max_bytes: Total size of the entries kept
+        """
+        super().__init__(path)
+        self.max_bytes = max_bytes
+        self._size: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return a cached output, or None if it is not cached."""
+        data = super().get(key)
+        if data is not None:
+            try:
+                # The modification time records the last use for eviction
+                os.utime(self._path(key))
+            except OSError:
+                pass
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """Store an output, evicting old entries if the cache grows too large."""
+        super().put(key, data)
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self.entries())
+            else:
+                self._size += len(data)
+            if self._size > self.max_bytes:
+                self._size = self.evict(int(self.max_bytes * EVICTION_TARGET))
+
+    def entries(self) -> List[Tuple[float, int, str]]:
+        """List the entries of the cache.
+
+        Returns:
+            List[Tuple[float, int, str]]: Last use time, size and path of each entry
+        """
+        entries = []
+        for root, _, names in os.walk(self.path):
+            for name in names:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def evict(self, max_bytes: Optional[int] = None) -> int:
+        """Delete the least recently used entries until the cache fits.
+
+        Args:
+            max_bytes: Size to shrink the cache to (default: the size limit)
+
+        Returns:
+            int: Total size of the remaining entries
+        """
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= limit:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        return total
+
+
+class S3Cache(CacheBackend):
+    """Cache stored under an S3 prefix."""
+
+    name = "s3"
+
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: Optional[str] = None) -> None:
+        """Initialize the cache.
+
+        Args:
+            bucket: S3 bucket name
+            prefix: Key prefix of the cache entries
+            endpoint_url: Alternative S3-compatible endpoint
+        """
+        self.bucket = bucket
+        self.prefix = prefix.strip("/") + "/" if prefix.strip("/") else ""
+        self.endpoint_url = endpoint_url
+        self._keys: Optional[Set[str]] = None
+        self._lock = threading.Lock()
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}{key[:2]}/{key}"
+
+    def _existing(self) -> Set[str]:
+        """Return the object keys under the prefix, listed once so misses cost no request."""
+        with self._lock:
+            if self._keys is None:
+                response = call(
+                    "s3",
+                    "ListObjectsV2",
+                    {"Bucket": self.bucket, "Prefix": self.prefix},
+                    self.endpoint_url,
+                )
+                self._keys = {obj["Key"] for obj in response.get("Contents") or []}
+            return self._keys
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return a cached output, or None if it is not cached."""
+        if self._key(key) not in self._existing():
+            return None
+        fd, tmp_path = tempfile.mkstemp(prefix="kreatisite-cache-")
+        os.close(fd)
+        try:
+            call(
+                "s3",
+                "GetObject",
+                {"Bucket": self.bucket, "Key": self._key(key)},
+                self.endpoint_url,
+                outfile=tmp_path,
+            )
+            with open(tmp_path, "rb") as f:
+                return f.read()
+        except AwsError as e:
+            if e.code in ("NoSuchKey", "404"):
+                return None
+            raise
+        finally:
+            os.remove(tmp_path)
+
+    def put(self, key: str, data: bytes) -> None:
+        """Store an output."""
+        fd, tmp_path = tempfile.mkstemp(prefix="kreatisite-cache-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            call(
+                "s3",
+                "PutObject",
+                {"Bucket": self.bucket, "Key": self._key(key), "Body": tmp_path},
+                self.endpoint_url,
+            )
+        finally:
+            os.remove(tmp_path)
+        with self._lock:
+            if self._keys is not None:
+                self._keys.add(self._key(key))
+
+
+def open_cache(location: str, endpoint_url: Optional[str] = None) -> CacheBackend:
+    """Open a shared cache.
+
+    Args:
+        location: Directory (e.g., a network mount) or s3://bucket/prefix URL
+        endpoint_url: Alternative S3-compatible endpoint for s3:// locations
+
+    Returns:
+        CacheBackend: The cache
+    """
+    if location.startswith("s3://"):
+        bucket, _, prefix = location[len("s3://") :].partition("/")
+        return S3Cache(bucket, prefix, endpoint_url)
+    return DirectoryCache(location)
+
+
+class TieredCache:
+    """Chain of caches, fastest first.
+
+    Lookups try each tier in order and copy hits into the faster tiers. New
+    outputs are written to the first tier right away and to the others in the
+    background. A tier that fails is reported once and skipped from then on,
+    so an unreachable shared cache slows nothing down.
+    """
+
+    def __init__(
+        self,
+        tiers: List[CacheBackend],
+        jobs: int = DEFAULT_UPLOAD_JOBS,
+        log: Callable[[str], None] = print,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            tiers: Caches, fastest first
+            jobs: Number of concurrent background writes to the slower tiers
+            log: Function used to report failing tiers
+        """
+        self.tiers = tiers
+        self.hits = [0] * len(tiers)
+        self.misses = 0
+        self.log = log
+        self._jobs = jobs
+        self._disabled: Set[int] = set()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> "TieredCache":
+        """Return the cache."""
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Wait for the background writes."""
+        self.close()
+
+    def _disable(self, index: int, error: Exception) -> None:
+        with self._lock:
+            if index in self._disabled:
+                return
+            self._disabled.add(index)
+        self.log(f"Warning: {self.tiers[index].name} cache disabled: {str(error)}")
+
+    def _put_tier(self, index: int, key: str, data: bytes) -> None:
+        if index in self._disabled:
+            return
+        try:
+            self.tiers[index].put(key, data)
+        except (AwsError, OSError) as e:
+            self._disable(index, e)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return a cached output from the fastest tier holding it.
+
+        Args:
+            key: Key from cache_key()
+
+        Returns:
+            Optional[bytes]: Cached output, or None on a miss
+        """
+        for index, tier in enumerate(self.tiers):
+            if index in self._disabled:
+                continue
+            try:
+                data = tier.get(key)
+            except (AwsError, OSError) as e:
+                self._disable(index, e)
+                continue
+            if data is not None:
+                self.hits[index] += 1
+                CACHE_REQUESTS.inc(tier.name, "hit")
+                for faster in range(index):
+                    self._put_tier(faster, key, data)
+                return data
+            CACHE_REQUESTS.inc(tier.name, "miss")
+        self.misses += 1
+        return None
+
+    def put(self, key: str, data: bytes) -> None:
+        """Store an output in every tier.
+
+        Args:
+            key: Key from cache_key()
+            data: Output
+        """
+        if not self.tiers:
+            return
+        self._put_tier(0, key, data)
+        if len(self.tiers) == 1:
+            return
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=max(1, self._jobs))
+        for index in range(1, len(self.tiers)):
+            self._pool.submit(self._put_tier, index, key, data)
+
+    def close(self) -> None:
+        """Wait for the background writes to finish."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def summary(self) -> str:
+        """Describe the hits per tier and the misses.
+
+        Returns:
+            str: E.g., "12 hits (local 10, shared 2), 3 misses"
+        """
+        tiers = ", ".join(f"{tier.name} {hits}" for tier, hits in zip(self.tiers, self.hits))
+        return f"{sum(self.hits)} hits ({tiers}), {self.misses} misses"
+
+
+def open_build_cache(
+    cache_dir: str,
+    shared: Optional[str] = None,
+    max_bytes: int = DEFAULT_CACHE_SIZE,
+    endpoint_url: Optional[str] = None,
+    log: Callable[[str], None] = print,
+) -> TieredCache:
+    """Open the build cache: a size-limited local tier, then an optional shared tier.
+
+    Args:
+        cache_dir: Local cache directory
+        shared: Shared cache directory or s3://bucket/prefix URL
+        max_bytes: Size limit of the local tier
+        endpoint_url: Alternative S3-compatible endpoint for an s3:// shared cache
+        log: Function used to report failing tiers
+
+    Returns:
+        TieredCache: The cache
+    """
+    tiers: List[CacheBackend] = [LocalCache(os.path.join(cache_dir, OBJECTS_DIR), max_bytes)]
+    if shared:
+        tiers.append(open_cache(shared, endpoint_url))
+    return TieredCache(tiers, log=log)
@@ -0,0 +1,237 @@
+"""Record and replay AWS interactions for Kreatisite CLI."""
+
+import base64
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import deque
+from typing import IO, Any, Deque, Dict, List, Optional, Tuple, cast
+
+from .aws import AwsError, Backend
+
+CASSETTE_VERSION = 1
+# Parameters that differ on every run and are left out of request matching
+VOLATILE_PARAMS = frozenset({"CallerReference"})
+# Operation name prefixes of requests that do not change anything
+_READ_PREFIXES = ("Check", "Describe", "Get", "Head", "List")
+
+Key = Tuple[str, str, Optional[str], str]
+
+
+class CassetteError(AwsError):
+    """Raised when a replayed request was not recorded."""
+
+
+def _file_digest(path: str) -> str:
+    """Return the SHA-256 of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _normalize(value: Any) -> Any:
+    """Replace the volatile parts of request parameters."""
+    if isinstance(value, dict):
+        return {
+            key: "*" if key in VOLATILE_PARAMS else _normalize(item) for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [_normalize(item) for item in value]
+    return value
+
+
+def request_key(
+    service: str, operation: str, params: Optional[Dict[str, Any]], region: Optional[str]
+) -> Key:
+    """Return the key a request is matched on.
+
+    Uploaded files (the Body parameter) are matched by content rather than by
+    path, and volatile parameters such as CallerReference are ignored, so a
+    recording replays from any checkout and at any time. The endpoint URL is
+    not part of the key.
+
+    Args:
+        service: API service name
+        operation: API operation name
+        params: API parameters
+        region: AWS region
+
+    Returns:
+        Key: Service, operation, region and canonical parameters
+    """
+    params = dict(params or {})
+    if isinstance(params.get("Body"), str) and os.path.isfile(params["Body"]):
+        params["Body"] = {"sha256": _file_digest(params["Body"])}
+    canonical = json.dumps(_normalize(params), sort_keys=True, separators=(",", ":"))
+    return service, operation, region, canonical
+
+
+def is_read(operation: str) -> bool:
+    """Return whether an operation only reads state, judging by its name."""
+    return operation.startswith(_READ_PREFIXES)
+
+
+def _open(path: str, mode: str) -> IO[str]:
+    """Open a cassette, gzip-compressed if its name ends in .gz."""
+    if path.endswith(".gz"):
+        return cast(IO[str], gzip.open(path, mode + "t", encoding="utf-8"))
+    return open(path, mode, encoding="utf-8")
+
+
+def load_cassette(path: str) -> List[Dict[str, Any]]:
+    """Read the interactions of a cassette.
+
+    Args:
+        path: Cassette file (JSON lines, optionally gzip-compressed)
+
+    Returns:
+        List[Dict[str, Any]]: Interactions in recorded order
+
+    Raises:
+        ValueError: If the file is not a cassette or has an unsupported version
+    """
+    with _open(path, "r") as f:
+        lines = [line for line in f if line.strip()]
+    header = json.loads(lines[0]) if lines else {}
+    if header.get("cassette") != CASSETTE_VERSION:
+        raise ValueError(f"{path} is not a version {CASSETTE_VERSION} cassette")
+    return [json.loads(line) for line in lines[1:]]
+
+
+class RecordingBackend(Backend):
+    """Backend passing calls to another backend and recording them into a cassette.
+
+    Repeated identical reads with no change in between (e.g., a waiter
+    polling until a change is in sync) are collapsed into their last
+    response, so replays never wait for progress that was already recorded.
+    """
+
+    name = "record"
+    multipart_uploads = False
+
+    def __init__(self, backend: Backend, path: str) -> None:
+        """Initialize the backend.
+
+        Args:
+            backend: Backend making the real calls
+            path: Cassette file written by save()
+        """
+        self.backend = backend
+        self.path = path
+        self.interactions: List[Dict[str, Any]] = []
+        self._last_read: Dict[Key, int] = {}
+        self._last_write = -1
+        self._lock = threading.Lock()
+
+    def call(
+        self,
+        service: str,
+        operation: str,
+        params: Optional[Dict[str, Any]] = None,
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        outfile: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Run an AWS API operation, with the same arguments as aws.call."""
+        key = request_key(service, operation, params, region)
+        interaction: Dict[str, Any] = {
+            "service": service,
+            "operation": operation,
+            "region": region,
+            "params": json.loads(key[3]),
+        }
+        try:
+            response = self.backend.call(service, operation, params, endpoint_url, region, outfile)
+        except AwsError as e:
+            interaction["error"] = {"message": str(e), "code": e.code}
+            self._record(key, interaction)
+            raise
+        interaction["response"] = response
+        if outfile is not None and os.path.isfile(outfile):
+            with open(outfile, "rb") as f:
+                interaction["body"] = base64.b64encode(f.read()).decode("ascii")
+        self._record(key, interaction)
+        return response
+
+    def _record(self, key: Key, interaction: Dict[str, Any]) -> None:
+        with self._lock:
+            previous = self._last_read.get(key)
+            if not is_read(key[1]):
+                self._last_write = len(self.interactions)
+                self.interactions.append(interaction)
+            elif previous is not None and previous > self._last_write:
+                self.interactions[previous] = interaction
+            else:
+                self._last_read[key] = len(self.interactions)
+                self.interactions.append(interaction)
+
+    def save(self) -> None:
+        """Write the recorded interactions to the cassette file."""
+        with self._lock:
+            lines = [json.dumps({"cassette": CASSETTE_VERSION})]
+            lines.extend(json.dumps(i, separators=(",", ":")) for i in self.interactions)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with _open(self.path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+
+
+class ReplayBackend(Backend):
+    """Backend answering calls from a cassette, without any network access.
+
+    Requests are matched on service, operation, region and parameters.
+    Identical requests get their recorded responses in order, and the last
+    one again once they are used up.
+    """
+
+    name = "replay"
+    multipart_uploads = False
+
+    def __init__(self, path: str) -> None:
+        """Initialize the backend.
+
+        Args:
+            path: Cassette file written by RecordingBackend
+
+        Raises:
+            ValueError: If the file is not a cassette
+        """
+        self.path = path
+        self._responses: Dict[Key, Deque[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        for interaction in load_cassette(path):
+            params = json.dumps(interaction["params"], sort_keys=True, separators=(",", ":"))
+            key = (interaction["service"], interaction["operation"], interaction["region"], params)
+            self._responses.setdefault(key, deque()).append(interaction)
+
+    def call(
+        self,
+        service: str,
+        operation: str,
+        params: Optional[Dict[str, Any]] = None,
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        outfile: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Run an AWS API operation, with the same arguments as aws.call."""
+        key = request_key(service, operation, params, region)
+        with self._lock:
+            recorded = self._responses.get(key)
+            if not recorded:
+                raise CassetteError(
+                    f"No recorded response in {self.path} for {service}:{operation} {key[3]}",
+                    "CassetteMiss",
+                )
+            interaction = recorded.popleft() if len(recorded) > 1 else recorded[0]
+        if "error" in interaction:
+            raise AwsError(interaction["error"]["message"], interaction["error"]["code"])
+        if outfile is not None and "body" in interaction:
+            with open(outfile, "wb") as f:
+                f.write(base64.b64decode(interaction["body"]))
+        response: Dict[str, Any] = json.loads(json.dumps(interaction["response"]))
+        return response
@@ -0,0 +1,217 @@
+"""ACM certificate functions for Kreatisite CLI."""
+
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from .aws import call
+from .defaults import DEFAULT_CERT_REGION as DEFAULT_REGION
+from .defaults import DEFAULT_CERT_WAIT_TIMEOUT as DEFAULT_WAIT_TIMEOUT
+from .dns import find_hosted_zone_id, list_hosted_zones, normalize_name, submit_changes
+from .waiter import wait_for_all
+
+# Validation records usually show up in DescribeCertificate within seconds
+RECORDS_WAIT_TIMEOUT = 120.0
+DEFAULT_JOBS = 8
+VALIDATION_TTL = 300
+FAILED_STATUSES = ("FAILED", "VALIDATION_TIMED_OUT", "REVOKED", "INACTIVE", "EXPIRED")
+_LISTED_STATUSES = ["PENDING_VALIDATION", "ISSUED"] + list(FAILED_STATUSES)
+
+
+class CertificateError(Exception):
+    """Raised when a certificate cannot be issued."""
+
+
+def certificate_names(domain_name: str, wildcard: bool = False) -> List[str]:
+    """Return the names a site certificate covers: the apex, www and optionally *.
+
+    Args:
+        domain_name: Site domain name (e.g., example.com)
+        wildcard: Also cover every subdomain
+
+    Returns:
+        List[str]: Domain name followed by its alternative names
+    """
+    names = [domain_name, f"www.{domain_name}"]
+    if wildcard:
+        names.append(f"*.{domain_name}")
+    return names
+
+
+def request_certificate(
+    domain_name: str, wildcard: bool = False, region: str = DEFAULT_REGION
+) -> str:
+    """Request a DNS-validated certificate for a site.
+
+    The idempotency token is derived from the names, so repeating the request
+    within an hour returns the same certificate instead of a new one.
+
+    Args:
+        domain_name: Site domain name
+        wildcard: Also cover every subdomain
+        region: ACM region
+
+    Returns:
+        str: Certificate ARN
+    """
+    names = certificate_names(domain_name, wildcard)
+    token = hashlib.sha256(" ".join(names).encode()).hexdigest()[:32]
+    response = call(
+        "acm",
+        "RequestCertificate",
+        {
+            "DomainName": names[0],
+            "SubjectAlternativeNames": names,
+            "ValidationMethod": "DNS",
+            "IdempotencyToken": token,
+        },
+        region=region,
+    )
+    arn: str = response["CertificateArn"]
+    return arn
+
+
+def validation_records(arn: str, region: str = DEFAULT_REGION) -> Optional[List[Dict[str, str]]]:
+    """Return the DNS records that prove control over a certificate's names.
+
+    Args:
+        arn: Certificate ARN
+        region: ACM region
+
+    Returns:
+        Optional[List[Dict[str, str]]]: Records (Name, Type, Value) still needed for
+        validation, or None if ACM has not generated all of them yet
+    """
+    response = call("acm", "DescribeCertificate", {"CertificateArn": arn}, region=region)
+    records = []
+    for option in response["Certificate"].get("DomainValidationOptions", []):
+        if option.get("ValidationStatus") == "SUCCESS":
+            continue
+        if "ResourceRecord" not in option:
+            return None
+        records.append(option["ResourceRecord"])
+    return records
+
+
+def _collect_validation_records(
+    arns: List[str], region: str, jobs: int, timeout: float = RECORDS_WAIT_TIMEOUT
+) -> List[Dict[str, str]]:
+    """Wait for the validation records of all certificates with one shared poller."""
+    records: Dict[str, Dict[str, str]] = {}
+
+    def check(pending: List[str]) -> List[str]:
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+            results = list(pool.map(lambda arn: validation_records(arn, region), pending))
+        done = []
+        for arn, found in zip(pending, results):
+            if found is not None:
+                done.append(arn)
+                # Names sharing a base domain (example.com, *.example.com) share a record
+                for record in found:
+                    records[normalize_name(record["Name"])] = record
+        return done
+
+    wait_for_all(arns, check, timeout, initial=1.0, maximum=5.0)
+    return [records[name] for name in sorted(records)]
+
+
+def write_validation_records(records: List[Dict[str, str]]) -> List[str]:
+    """Create validation CNAMEs with batched Route53 changes, one batch list per zone.
+
+    Args:
+        records: Records from validation_records()
+
+    Returns:
+        List[str]: Route53 change IDs
+    """
+    zones = list_hosted_zones()
+    changes_by_zone: Dict[str, List[Dict[str, Any]]] = {}
+    for record in records:
+        zone_id = find_hosted_zone_id(record["Name"], zones)
+        changes_by_zone.setdefault(zone_id, []).append(
+            {
+                "Action": "UPSERT",
+                "ResourceRecordSet": {
+                    "Name": normalize_name(record["Name"]),
+                    "Type": record["Type"],
+                    "TTL": VALIDATION_TTL,
+                    "ResourceRecords": [{"Value": record["Value"]}],
+                },
+            }
+        )
+    change_ids = []
+    for zone_id, changes in sorted(changes_by_zone.items()):
+        change_ids.extend(submit_changes(zone_id, changes, "kreatisite certificate validation"))
+    return change_ids
+
+
+def wait_for_certificates(
+    arns: List[str], region: str = DEFAULT_REGION, timeout: float = DEFAULT_WAIT_TIMEOUT
+) -> None:
+    """Wait until all certificates are issued, polling them with one listing per round.
+
+    Args:
+        arns: Certificate ARNs
+        region: ACM region
+        timeout: Maximum number of seconds to wait
+
+    Raises:
+        CertificateError: If a certificate fails validation
+        TimeoutError: If some certificates are not issued in time
+    """
+
+    def check(pending: List[str]) -> List[str]:
+        response = call(
+            "acm", "ListCertificates", {"CertificateStatuses": _LISTED_STATUSES}, region=region
+        )
+        statuses = {
+            summary["CertificateArn"]: summary.get("Status")
+            for summary in response.get("CertificateSummaryList", [])
+        }
+        for arn in pending:
+            if statuses.get(arn) in FAILED_STATUSES:
+                raise CertificateError(f"Certificate {arn} is {statuses[arn]}")
+        return [arn for arn in pending if statuses.get(arn) == "ISSUED"]
+
+    wait_for_all(arns, check, timeout)
+
+
+def provision_certificates(
+    domain_names: List[str],
+    wildcard: bool = False,
+    region: str = DEFAULT_REGION,
+    wait: bool = True,
+    timeout: float = DEFAULT_WAIT_TIMEOUT,
+    jobs: int = DEFAULT_JOBS,
+    log: Callable[[str], None] = print,
+) -> Dict[str, str]:
+    """Request certificates for sites, validate them through Route53 and wait for issuance.
+
+    Args:
+        domain_names: Site domain names
+        wildcard: Also cover every subdomain
+        region: ACM region
+        wait: Wait until all certificates are issued
+        timeout: Maximum number of seconds to wait for issuance
+        jobs: Number of concurrent ACM requests
+        log: Function used to report progress
+
+    Returns:
+        Dict[str, str]: Domain name to certificate ARN
+    """
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        arns = list(
+            pool.map(lambda name: request_certificate(name, wildcard, region), domain_names)
+        )
+    for name, arn in zip(domain_names, arns):
+        log(f"Requested certificate for {name}: {arn}")
+
+    records = _collect_validation_records(arns, region, jobs)
+    if records:
+        change_ids = write_validation_records(records)
+        log(f"Wrote {len(records)} validation record(s) in {len(change_ids)} change batch(es)")
+    if wait:
+        log(f"Waiting for {len(arns)} certificate(s) to be issued")
+        wait_for_certificates(arns, region, timeout)
+        log("All certificates issued")
+    return dict(zip(domain_names, arns))
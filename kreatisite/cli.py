@@ -1,17 +1,49 @@
 """Command-line interface for Kreatisite."""
 
+import argparse
 import shutil
 import sys
-from typing import Optional
+import time
+from typing import Optional, Sequence
 
 # Enforce minimum Python version
 if sys.version_info < (3, 9):
     print("Error: Kreatisite requires Python 3.9 or above.", file=sys.stderr)
     sys.exit(1)
 
-
-from .cmd import check_domain_availability, register_domain
+from . import IMPORT_START_NS
+from .aws import Backend, create_backend, get_backend, set_backend, set_deadline
+from .cmd import (
+    build,
+    cert,
+    check_domain_availability,
+    check_domains,
+    deploy,
+    dns,
+    history,
+    inventory,
+    launch,
+    links,
+    register_domain,
+    serve,
+)
+from .metrics import serve_metrics, write_textfile
 from .parser import create_parser
+from .trace import span, start_tracing, stop_tracing
+
+_IMPORT_END = time.perf_counter_ns()
+
+# Commands that call AWS, and so need the AWS CLI unless another backend is used
+AWS_COMMANDS = (
+    "check-domain",
+    "check-domains",
+    "inventory",
+    "register-domain",
+    "deploy",
+    "dns",
+    "cert",
+    "launch",
+)
 
 
 def check_dependencies() -> None:
@@ -37,26 +69,118 @@ def check_dependencies() -> None:
         sys.exit(1)
 
 
-def main() -> Optional[int]:
+def main(argv: Optional[Sequence[str]] = None, backend: Optional[Backend] = None) -> Optional[int]:
     """Run the Kreatisite CLI application.
 
+    Args:
+        argv: Arguments after the program name (default: sys.argv[1:])
+        backend: Backend to send every AWS call to, instead of the one
+            --aws-backend selects (e.g., a FakeBackend in tests)
+
     Returns:
         Optional[int]: Return code, 0 for success, 1 for failure
     """
+    start = time.perf_counter_ns()
     parser = create_parser()
+    created = time.perf_counter_ns()
 
     # Parse arguments
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+
+    # Spans before this point are recorded from timestamps, as the flag was not parsed yet
+    trace = getattr(args, "trace", None)
+    if not trace:
+        return run_command(parser, args, backend)
+    tracer = start_tracing()
+    tracer.add("import", IMPORT_START_NS, _IMPORT_END)
+    tracer.add("create_parser", start, created)
+    tracer.add("parse_args", created, time.perf_counter_ns())
+    try:
+        return run_command(parser, args, backend)
+    finally:
+        stop_tracing()
+        tracer.write(trace)
+
+
+def run_command(
+    parser: argparse.ArgumentParser,
+    args: argparse.Namespace,
+    backend: Optional[Backend] = None,
+) -> Optional[int]:
+    """Set up the AWS backend and run the parsed command.
+
+    Args:
+        parser: The argument parser
+        args: Parsed arguments
+        backend: Backend to send every AWS call to, of every account, instead
+            of the one --aws-backend selects; --replay still takes precedence
+
+    Returns:
+        Optional[int]: Return code, 0 for success, 1 for failure
+    """
+    record = getattr(args, "record", None)
+    replay = getattr(args, "replay", None)
+    if record and replay:
+        print("Error: --record and --replay cannot be used together", file=sys.stderr)
+        return 1
+    if (record or replay) and (
+        getattr(args, "profiles", None) or getattr(args, "profiles_file", None)
+    ):
+        # Each account gets its own backend, and cassettes do not tell accounts apart
+        flag = "--record" if record else "--replay"
+        print(f"Error: {flag} cannot be used with --profiles or --profiles-file", file=sys.stderr)
+        return 1
+
+    # Route AWS calls through another backend if requested; only the CLI backend needs aws
+    name = getattr(args, "aws_backend", None)
+    timeout = getattr(args, "aws_timeout", None)
+    if replay:
+        from .cassette import ReplayBackend
+
+        try:
+            set_backend(ReplayBackend(replay))
+        except (OSError, ValueError) as e:
+            print(f"Error reading cassette: {str(e)}", file=sys.stderr)
+            return 1
+    elif backend is not None:
+        set_backend(backend)
+        # Commands creating a backend per account (--profiles) use this one too
+        args.backend = backend
+    else:
+        if name in ("native", "fake") or timeout is not None:
+            try:
+                set_backend(create_backend(name or "cli", timeout=timeout))
+            except RuntimeError as e:
+                print(f"Error: {str(e)}", file=sys.stderr)
+                return 1
+        # Check dependencies for AWS commands
+        if name not in ("native", "fake") and getattr(args, "command", None) in AWS_COMMANDS:
+            with span("check_dependencies"):
+                check_dependencies()
+    set_deadline(getattr(args, "deadline", None))
+    recorder = None
+    if record:
+        # Imported here, like the replay backend, so runs without a cassette never load it
+        from .cassette import RecordingBackend
 
-    # Check dependencies for AWS commands
-    if hasattr(args, "command") and args.command in ["check-domain", "register-domain"]:
-        check_dependencies()
+        recorder = RecordingBackend(get_backend(), record)
+        set_backend(recorder)
 
     # Command handlers mapping
     command_handlers = {
         "help": lambda _: print_help(),
         "check-domain": lambda args: check_domain_availability(args.domain_name),
+        "check-domains": check_domains,
+        "inventory": inventory,
         "register-domain": register_domain,
+        "build": build,
+        "deploy": deploy,
+        "serve-site": serve,
+        "dns": dns,
+        "history": history,
+        "cert": cert,
+        "launch": launch,
+        "check-links": links,
     }
 
     # Handle commands
@@ -67,8 +191,36 @@ def main() -> Optional[int]:
             parser.print_help()
         return None
 
+    metrics_file = getattr(args, "metrics_file", None)
+    metrics_port = getattr(args, "metrics_port", None)
+    server = None
+    if metrics_port is not None:
+        try:
+            server = serve_metrics(metrics_port)
+        except OSError as e:
+            print(f"Error serving metrics on port {metrics_port}: {str(e)}", file=sys.stderr)
+            return 1
+        print(f"Serving metrics on http://127.0.0.1:{server.server_address[1]}/metrics")
+
+    handler = command_handlers[args.command]
+    profile = getattr(args, "profile", None)
+    if profile:
+        # Imported here so runs without --profile never load the profilers
+        from .profiling import profiled
+
+        handler = profiled(handler, profile, getattr(args, "profile_output", None))
+
     # Execute the appropriate handler
-    return command_handlers[args.command](args)
+    try:
+        with span(f"command {args.command}"):
+            return handler(args)
+    finally:
+        if recorder is not None:
+            recorder.save()
+        if metrics_file:
+            write_textfile(metrics_file)
+        if server is not None:
+            server.shutdown()
 
 
 def print_help() -> None:
@@ -84,13 +236,26 @@ your tasks.
 
 USAGE
 -----
-kreatisite [command] [options]
+kreatisite [--aws-backend cli|native|fake] [--record|--replay CASSETTE]
+           [--aws-timeout SECONDS] [--deadline SECONDS] [--trace FILE]
+           [--metrics-file FILE] [--metrics-port PORT] [command] [options]
 
 COMMANDS
 --------
 help            Display this detailed help information
 check-domain    Check domain availability using AWS Route53
+check-domains   Check the availability of many domains concurrently
+inventory       List the domains, zones and certificates of AWS accounts
 register-domain  Register a domain using AWS Route53
+build           Build the static site into a deployable directory
+deploy          Upload changed build output files to S3
+serve-site      Serve the site locally with live reload
+dns apply       Make a Route53 hosted zone match a YAML zone file
+history         Query, prune and compact the history of availability results
+                and build the filter of known-taken names
+cert            Request and DNS-validate HTTPS certificates with ACM
+launch          Register, provision and deploy a site in one resumable run
+check-links     Check the links and anchors of the build output
 
 EXAMPLES
 --------
@@ -100,6 +265,64 @@ kreatisite help
 # Check domain availability
 kreatisite check-domain example.com
 
+# Check a list of candidate domains, eight at a time
+kreatisite check-domains --file candidates.txt --jobs 8
+
+# Split a long check across three accounts, each with its own rate limit
+kreatisite check-domains --file candidates.txt --profiles prod,staging,sandbox
+
+# Record a nightly check, then list the .io names that became available this week
+kreatisite check-domains --file candidates.txt --history
+kreatisite history query --tld io --status AVAILABLE --changes --since 7d
+
+# When did example.io last change? Then compact results older than 90 days
+kreatisite history query example.io --changes --limit 1
+kreatisite history compact --older-than 90d
+
+# Skip names already known to be taken, using a filter rebuilt from the history
+kreatisite history build-filter taken.bloom
+kreatisite check-domains --file candidates.txt --skip-taken taken.bloom --history
+
+# List the domains, zones and certificates of every account in profiles.txt
+kreatisite inventory --profiles-file profiles.txt --regions us-east-1,eu-west-1
+
+# Try a command offline against the in-memory AWS fake
+kreatisite --aws-backend fake launch example.com --skip-register
+
+# Check a long list, killing hung requests after 20s and stopping after 10 minutes
+kreatisite --aws-timeout 20 --deadline 600 check-domains --file candidates.txt
+
+# Nightly bulk check, exporting metrics for the node exporter's textfile collector
+kreatisite --metrics-file /var/lib/node_exporter/kreatisite.prom check-domains --file names.txt
+
+# See where the time of a slow run goes (open in chrome://tracing or Perfetto)
+kreatisite --trace trace.json deploy example.com
+
+# Record a launch into a cassette, then replay it offline in milliseconds
+kreatisite --record launch.jsonl.gz launch example.com --skip-register
+kreatisite --replay launch.jsonl.gz launch example.com --skip-register
+
+# Build the site in ./site into ./dist
+kreatisite build site --output-dir dist
+
+# Check internal and external links before deploying
+kreatisite check-links dist --external
+
+# Deploy the build output to the example.com bucket
+kreatisite deploy example.com
+
+# Preview the site at http://127.0.0.1:8000/ while editing
+kreatisite serve-site site
+
+# Sync the example.com hosted zone, deleting records not in zone.yaml
+kreatisite dns apply zone.yaml --prune
+
+# Get HTTPS certificates for two sites and wait until they are issued
+kreatisite cert example.com example.org
+
+# Launch example.com end to end; rerun to resume after a failure
+kreatisite launch example.com --source-dir site
+
 NOTES
 -----
 This is an initial version of the application.
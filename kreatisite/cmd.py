@@ -1,11 +1,20 @@
 """Command functions for Kreatisite CLI."""
 
 import argparse
-import subprocess
+import json
+import os
 import sys
-from typing import List
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional
 
-import yaml
+from .aws import AwsError, Backend, call, create_backend, get_backend
+from .metrics import DOMAINS_REGISTERED
+from .trace import span
+
+# Feature modules are imported by the commands using them, so that starting
+# the CLI does not load (e.g.) the build pipeline to check a domain
+if TYPE_CHECKING:
+    from .accounts import Tagged
+    from .domains import Availability
 
 
 def check_domain_availability(domain_name: str) -> int:
@@ -17,43 +26,226 @@ def check_domain_availability(domain_name: str) -> int:
     Returns:
         int: 0 for success, 1 for failure
     """
-    cmd: List[str] = [
-        "aws",
-        "route53domains",
-        "check-domain-availability",
-        "--domain-name",
-        domain_name,
-    ]
+    try:
+        response = call("route53domains", "CheckDomainAvailability", {"DomainName": domain_name})
+    except AwsError as e:
+        # Signal to the user if there was an error
+        print(f"Error: {str(e)}", file=sys.stderr)
+        return 1
+    except Exception as e:
+        print(f"Error executing AWS command: {str(e)}", file=sys.stderr)
+        return 1
+    with span("output"):
+        print(json.dumps(response))
+    return 0
+
+
+def _backend_factory(args: argparse.Namespace) -> Callable[[str], Backend]:
+    """Return a function creating the AWS backend of one account (profile)."""
+    backend: Optional[Backend] = getattr(args, "backend", None)
+    if backend is not None:
+        # A backend given to run_command serves every account
+        return lambda _: backend
+    return lambda profile: create_backend(args.aws_backend, args.aws_timeout, profile)
+
+
+def check_domains(args: argparse.Namespace) -> int:
+    """Check the availability of many domains concurrently, optionally across accounts.
+
+    The names are streamed in chunks; names seen before are skipped, and with
+    a checkpoint an interrupted run resumes after the last completed chunk,
+    checking again the names whose check failed.
+    """
+    import itertools
+    import sqlite3
+    from concurrent.futures import ThreadPoolExecutor
+
+    from .accounts import Tagged, ThrottledBackend, fan_out, read_profiles
+    from .bloom import BloomError, BloomFilter
+    from .domains import Availability, check_availability
+    from .history import HistoryStore
+    from .ingest import IngestError, SeenNames, iter_domain_names, stream_chunks
 
     try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            check=False,
+        accounts = read_profiles(args.profiles, args.profiles_file)
+    except OSError as e:
+        print(f"Error reading domain names: {str(e)}", file=sys.stderr)
+        return 1
+    if not args.domain_names and not args.file:
+        print("Error: No domain names given", file=sys.stderr)
+        return 1
+
+    # Each account's backend is created on its first chunk and reused for the
+    # next ones, so its rate limit holds across the whole sweep
+    factory = _backend_factory(args)
+    backends: Dict[str, Backend] = {}
+
+    def account_backend(account: str) -> Backend:
+        if account not in backends:
+            backends[account] = ThrottledBackend(factory(account), args.account_rate)
+        return backends[account]
+
+    # One pool serves every chunk, with the workers of all accounts, so a long
+    # sweep does not start new threads for each chunk
+    pool = ThreadPoolExecutor(max_workers=max(1, args.jobs) * max(1, len(accounts)))
+
+    def check(names: List[str]) -> Iterable[Tagged[Availability]]:
+        if not accounts:
+            return (Tagged("", r) for r in check_availability(names, executor=pool))
+        # Split the chunk between the accounts, so that each one's rate limit adds up
+        chunks = {account: names[i :: len(accounts)] for i, account in enumerate(accounts)}
+        return fan_out(
+            accounts,
+            lambda account: check_availability(chunks[account], executor=pool),
+            account_backend,
+            rate=None,
         )
 
-        # Print the stdout result
-        if result.stdout:
-            print(result.stdout.strip())
+    names = itertools.chain(args.domain_names, iter_domain_names(args.file) if args.file else ())
+    normalized = (name.strip().lower() for name in names)
+    source = " ".join(args.domain_names + ([args.file] if args.file else []))
+    available = unavailable = errors = skipped = 0
+    store = None
+    taken = None
+    try:
+        if args.skip_taken:
+            taken = BloomFilter(args.skip_taken, writable=True)
+        if args.history:
+            store = HistoryStore(args.history)
+        with SeenNames(args.checkpoint, source) as seen:
+            if seen.offset:
+                print(f"Resuming after {seen.offset} names from {args.checkpoint}")
+            committed = seen.offset
+            retry = False
+            for chunk, offset in stream_chunks(normalized, seen, args.chunk_size):
+                # Names that need no further check: known taken, or given a status
+                done: List[str] = []
+                unknown: List[str] = []
+                for name in chunk:
+                    (done if taken is not None and name in taken else unknown).append(name)
+                skipped += len(done)
+                results = []
+                for tagged in check(unknown):
+                    _print_availability(tagged)
+                    if tagged.error or (tagged.item and tagged.item.error):
+                        errors += 1
+                        continue
+                    if tagged.item and tagged.item.status == "AVAILABLE":
+                        available += 1
+                    else:
+                        unavailable += 1
+                    if tagged.item and tagged.item.status:
+                        done.append(tagged.item.domain_name)
+                        results.append(
+                            (
+                                tagged.item.domain_name,
+                                tagged.item.status,
+                                tagged.account or "default",
+                            )
+                        )
+                if store is not None:
+                    store.record(results)
+                if taken is not None:
+                    for name, status, _ in results:
+                        if status == "UNAVAILABLE":
+                            taken.add(name)
+                    taken.flush()
+                # Only names given a status are committed, and the offset stays
+                # before the first chunk with failures, so a resume retries them
+                # while still skipping the names checked since
+                retry = retry or len(done) < len(chunk)
+                if not retry:
+                    committed = offset
+                seen.commit(done, committed)
+    except BloomError as e:
+        print(f"Error reading the taken-names filter: {str(e)}", file=sys.stderr)
+        print(
+            f"Build it from the history with: kreatisite history build-filter {args.skip_taken}",
+            file=sys.stderr,
+        )
+        return 1
+    except (OSError, EOFError, IngestError, sqlite3.Error) as e:
+        print(f"Error reading domain names: {str(e)}", file=sys.stderr)
+        return 1
+    finally:
+        pool.shutdown()
+        if store is not None:
+            store.close()
+        if taken is not None:
+            taken.close()
+    summary = f"{available} available, {unavailable} unavailable, {errors} errors"
+    if taken is not None:
+        summary += f", {skipped} skipped as known taken"
+        if taken.full:
+            print(
+                f"Warning: {args.skip_taken} is over capacity; rebuild it with "
+                "history build-filter to keep false positives rare",
+                file=sys.stderr,
+            )
+    print(summary)
+    return 1 if errors else 0
 
-        # Signal to the user if there was an error
-        if result.stderr:
-            print(f"Error: {result.stderr.strip()}", file=sys.stderr)
-            return 1
 
-        return 0
-    except Exception as e:
-        print(f"Error executing AWS command: {str(e)}", file=sys.stderr)
+def _print_availability(tagged: "Tagged[Availability]") -> None:
+    """Print one availability result, with its account when checking across accounts."""
+    suffix = f" [{tagged.account}]" if tagged.account else ""
+    result = tagged.item
+    if result is None:
+        print(f"Error checking account {tagged.account}: {tagged.error}", file=sys.stderr)
+    elif result.error:
+        print(f"Error checking {result.domain_name}{suffix}: {result.error}", file=sys.stderr)
+    else:
+        print(f"{result.domain_name} {result.status}{suffix}")
+
+
+def inventory(args: argparse.Namespace) -> int:
+    """List the domains, hosted zones and certificates of one or more accounts."""
+    from dataclasses import asdict
+
+    from .accounts import fan_out, read_profiles
+    from .inventory import Resource, list_resources
+
+    try:
+        accounts = read_profiles(args.profiles, args.profiles_file)
+    except OSError as e:
+        print(f"Error reading profiles: {str(e)}", file=sys.stderr)
         return 1
+    factory: Callable[[str], Backend] = _backend_factory(args)
+    if not accounts:
+        accounts, factory = ["default"], lambda _: get_backend()
+
+    failed = 0
+    count = 0
+    for tagged in fan_out(
+        accounts, lambda _: list_resources(args.regions), factory, rate=args.account_rate
+    ):
+        resource: Optional[Resource] = tagged.item
+        if resource is None:
+            print(f"Error listing account {tagged.account}: {tagged.error}", file=sys.stderr)
+            failed += 1
+            continue
+        count += 1
+        if args.json:
+            print(json.dumps({"account": tagged.account, **asdict(resource)}))
+            continue
+        line = f"{tagged.account} {resource.kind} {resource.name}"
+        if resource.region:
+            line += f" {resource.region}"
+        print(f"{line} ({resource.detail})" if resource.detail else line)
+    if not args.json:
+        print(f"{count} resources in {len(accounts) - failed} of {len(accounts)} accounts")
+    return 1 if failed else 0
 
 
 def register_domain(args: argparse.Namespace) -> int:
     """Register a domain using AWS Route53."""
+    import yaml
+
+    from .domains import ContactsError, read_contacts, registration_params
+
     # Verify config file exists
     try:
-        with open(args.config_file, "r") as f:
-            yaml.safe_load(f)
+        contacts = read_contacts(args.config_file)
     except FileNotFoundError:
         print(f"Error: Config file '{args.config_file}' not found", file=sys.stderr)
         print("", file=sys.stderr)
@@ -68,38 +260,258 @@ def register_domain(args: argparse.Namespace) -> int:
     except yaml.YAMLError as e:
         print(f"Error parsing YAML config file: {str(e)}", file=sys.stderr)
         return 1
+    except ContactsError as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        return 1
 
-    # Build the AWS CLI command using --cli-input-yaml
-    cmd = [
-        "aws",
-        "route53domains",
-        "register-domain",
-        "--domain-name",
-        args.domain_name,
-        "--duration-in-years",
-        str(args.duration_in_years),
-    ]
-    # Auto-renew flag (enabled by default; use --no-auto-renew to disable)
-    if args.auto_renew:
-        cmd.append("--auto-renew")
-    else:
-        cmd.append("--no-auto-renew")
-    # Always enable privacy protection for contacts
-    cmd.append("--privacy-protect-admin-contact")
-    cmd.append("--privacy-protect-registrant-contact")
-    cmd.append("--privacy-protect-tech-contact")
-    # Use YAML file for contact information
-    cmd.extend(["--cli-input-yaml", f"file://{args.config_file}"])
-
-    # Execute the command
+    # Auto-renew is enabled by default; use --no-auto-renew to disable.
+    # Privacy protection is always enabled, whatever the contacts say.
+    params = registration_params(
+        args.domain_name, contacts, args.duration_in_years, bool(args.auto_renew)
+    )
+
+    # Execute the call
     try:
-        result = subprocess.run(cmd, capture_output=True, text=True, check=False)
-        if result.stdout:
-            print(result.stdout.strip())
-        if result.stderr:
-            print(f"Error: {result.stderr.strip()}", file=sys.stderr)
-            return 1
-        return 0
+        response = call("route53domains", "RegisterDomain", params)
+    except AwsError as e:
+        DOMAINS_REGISTERED.inc("error")
+        print(f"Error: {str(e)}", file=sys.stderr)
+        return 1
     except Exception as e:
+        DOMAINS_REGISTERED.inc("error")
         print(f"Error executing AWS command: {str(e)}", file=sys.stderr)
         return 1
+    DOMAINS_REGISTERED.inc("ok")
+    if response:
+        with span("output"):
+            print(json.dumps(response))
+    return 0
+
+
+def build(args: argparse.Namespace) -> int:
+    """Build the static site into a deployable output directory."""
+    from .build import BuildError, build_site
+
+    try:
+        build_site(
+            args.source_dir,
+            args.output_dir,
+            cache_dir=args.cache_dir,
+            jobs=args.jobs,
+            minify=args.minify,
+            base_url=args.base_url,
+            search_index=args.search_index,
+            shared_cache=args.shared_cache,
+            cache_size=args.cache_size * 1024 * 1024,
+        )
+    except (BuildError, OSError, UnicodeDecodeError) as e:
+        print(f"Error building site: {str(e)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def deploy(args: argparse.Namespace) -> int:
+    """Deploy the build output to the site's S3 bucket."""
+    from .deploy import deploy_site
+    from .invalidation import create_invalidation, plan_invalidation, wait_for_invalidation
+
+    if not os.path.isdir(args.output_dir):
+        print(f"Error: Build output '{args.output_dir}' not found", file=sys.stderr)
+        print("Run 'kreatisite build' first", file=sys.stderr)
+        return 1
+    try:
+        plan = deploy_site(
+            args.output_dir,
+            args.bucket or args.domain_name,
+            prefix=args.prefix,
+            endpoint_url=args.endpoint_url,
+            jobs=args.jobs,
+            delete=args.delete,
+            dry_run=args.dry_run,
+        )
+    except (AwsError, OSError) as e:
+        print(f"Error deploying site: {str(e)}", file=sys.stderr)
+        return 1
+    if not args.distribution_id:
+        return 0
+
+    paths = plan_invalidation(plan.changed_keys, plan.site_keys, args.max_invalidation_paths)
+    if not paths:
+        print("Nothing to invalidate")
+        return 0
+    print(f"Invalidating {len(paths)} path(s): {' '.join(paths)}")
+    if args.dry_run:
+        return 0
+    try:
+        invalidation_id = create_invalidation(args.distribution_id, paths)
+        print(f"Created invalidation {invalidation_id}")
+        if args.wait:
+            wait_for_invalidation(args.distribution_id, invalidation_id)
+            print(f"Invalidation {invalidation_id} completed")
+    except (AwsError, TimeoutError) as e:
+        print(f"Error invalidating CloudFront cache: {str(e)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def serve(args: argparse.Namespace) -> int:
+    """Serve the site locally with live reload."""
+    from .server import serve_site
+
+    if not os.path.isdir(args.source_dir):
+        print(f"Error: Source directory '{args.source_dir}' not found", file=sys.stderr)
+        return 1
+    try:
+        serve_site(args.source_dir, args.host, args.port, args.poll_interval)
+    except OSError as e:
+        print(f"Error starting server: {str(e)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def dns(args: argparse.Namespace) -> int:
+    """Run a dns subcommand."""
+    from .dns import DnsConfigError, apply_zone_file
+
+    try:
+        apply_zone_file(args.zone_file, prune=args.prune, dry_run=args.dry_run, wait=args.wait)
+    except (DnsConfigError, AwsError, TimeoutError) as e:
+        print(f"Error applying zone file: {str(e)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def history(args: argparse.Namespace) -> int:
+    """Run a history subcommand."""
+    import sqlite3
+    from dataclasses import asdict
+
+    from .bloom import build_filter
+    from .history import HistoryStore, format_time, parse_time
+
+    try:
+        with HistoryStore(args.history) as store:
+            if args.history_command == "query":
+                since = parse_time(args.since) if args.since else None
+                until = parse_time(args.until) if args.until else None
+                records = store.query(
+                    args.domain_name,
+                    tld=args.tld.lower().lstrip(".") if args.tld else None,
+                    status=args.status,
+                    since=since,
+                    until=until,
+                    changes_only=args.changes,
+                    limit=args.limit,
+                )
+                for record in records:
+                    if args.json:
+                        print(json.dumps(asdict(record)))
+                        continue
+                    changed = " (changed)" if record.changed else ""
+                    print(
+                        f"{format_time(record.checked_at)} {record.domain_name} "
+                        f"{record.status} [{record.source}]{changed}"
+                    )
+                return 0
+            if args.history_command == "build-filter":
+                count = build_filter(
+                    args.filter_file,
+                    store.names_latest("UNAVAILABLE"),
+                    store.count_latest("UNAVAILABLE"),
+                    error_rate=args.error_rate,
+                    headroom=args.headroom,
+                )
+                print(f"Wrote {count} taken names to {args.filter_file}")
+                return 0
+            before = parse_time(args.older_than)
+            if args.history_command == "prune":
+                removed = store.prune(before)
+            else:
+                removed = store.compact(before)
+            store.vacuum()
+            print(f"Removed {removed} results, {len(store)} left")
+    except ValueError as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        return 1
+    except (OSError, sqlite3.Error) as e:
+        print(f"Error reading history {args.history}: {str(e)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+def cert(args: argparse.Namespace) -> int:
+    """Request, validate and await HTTPS certificates for sites."""
+    from .cert import CertificateError, provision_certificates
+    from .dns import DnsConfigError
+
+    try:
+        arns = provision_certificates(
+            args.domain_names,
+            wildcard=args.wildcard,
+            region=args.region,
+            wait=args.wait,
+            timeout=args.timeout,
+        )
+    except (CertificateError, DnsConfigError, AwsError, TimeoutError) as e:
+        print(f"Error provisioning certificates: {str(e)}", file=sys.stderr)
+        return 1
+    for domain_name, arn in arns.items():
+        print(f"{domain_name}: {arn}")
+    return 0
+
+
+def launch(args: argparse.Namespace) -> int:
+    """Run the full site launch pipeline, resuming from its checkpoint."""
+    from .launch import checkpoint_path, launch_steps
+    from .pipeline import Checkpoint, PipelineError, format_timings, run_pipeline
+
+    if args.register_domain and not os.path.exists(args.config_file):
+        print(f"Error: Config file '{args.config_file}' not found", file=sys.stderr)
+        print("Use --skip-register if the domain is already registered", file=sys.stderr)
+        return 1
+    path = args.checkpoint or checkpoint_path(args.domain_name)
+    if args.restart and os.path.exists(path):
+        os.remove(path)
+    steps = launch_steps(
+        args.domain_name,
+        args.config_file,
+        args.source_dir,
+        args.output_dir,
+        bucket_region=args.bucket_region,
+        register_domain=args.register_domain,
+    )
+    try:
+        result = run_pipeline(steps, Checkpoint(path), jobs=args.jobs)
+    except PipelineError as e:
+        print(f"Error launching site: {str(e)}", file=sys.stderr)
+        print("Run the launch command again to resume from the failed step", file=sys.stderr)
+        return 1
+    print(format_timings(steps, result))
+    print(f"Site launched: https://{args.domain_name}/")
+    return 0
+
+
+def links(args: argparse.Namespace) -> int:
+    """Check the links of the build output; fail if any are broken."""
+    from .linkcheck import ExternalChecker, check_links
+
+    if not os.path.isdir(args.output_dir):
+        print(f"Error: Build output '{args.output_dir}' not found", file=sys.stderr)
+        print("Run 'kreatisite build' first", file=sys.stderr)
+        return 1
+    external = None
+    if args.external:
+        external = ExternalChecker(
+            jobs=args.external_jobs,
+            host_rate=args.rate,
+            timeout=args.timeout,
+            cache_file=args.cache_file,
+        )
+    report = check_links(args.output_dir, jobs=args.jobs, external=external)
+    for broken in report.broken:
+        print(f"{broken.page}:{broken.line}: {broken.url} ({broken.reason})")
+    print(
+        f"Checked {report.links} links on {report.pages} pages "
+        f"({report.external} external URLs): {len(report.broken)} broken"
+    )
+    return 1 if report.broken else 0
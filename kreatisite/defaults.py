@@ -0,0 +1,43 @@
+"""Default settings of Kreatisite CLI.
+
+The argument parser shows these in its help, and is built on every run, so
+this module imports nothing that is slow to load; the feature modules import
+their defaults from here.
+"""
+
+import os
+
+# AWS execution backends
+BACKEND_NAMES = ("cli", "native", "fake")
+BACKEND_ENV = "KREATISITE_AWS_BACKEND"
+RECORD_ENV = "KREATISITE_RECORD"
+REPLAY_ENV = "KREATISITE_REPLAY"
+METRICS_FILE_ENV = "KREATISITE_METRICS_FILE"
+
+# Requests per second each account may make; AWS rate limits are per account
+DEFAULT_ACCOUNT_RATE = 5.0
+DEFAULT_CHECK_JOBS = 8
+DEFAULT_CHUNK_SIZE = 1000
+DEFAULT_INVENTORY_REGIONS = ("us-east-1",)
+
+DEFAULT_CACHE_DIR = ".kreatisite-cache"
+DEFAULT_CACHE_SIZE = 1024 * 1024 * 1024
+DEFAULT_HISTORY_PATH = os.path.join(DEFAULT_CACHE_DIR, "history.db")
+
+DEFAULT_ERROR_RATE = 0.01
+# Free capacity given to a rebuilt filter, for the names found taken until the next rebuild
+DEFAULT_HEADROOM = 0.25
+
+DEFAULT_UPLOAD_JOBS = 16
+DEFAULT_MAX_PATHS = 100
+DEFAULT_BUCKET_REGION = "us-east-1"
+# CloudFront only accepts certificates from us-east-1
+DEFAULT_CERT_REGION = "us-east-1"
+DEFAULT_CERT_WAIT_TIMEOUT = 3600.0
+DEFAULT_PIPELINE_JOBS = 4
+DEFAULT_POLL_INTERVAL = 0.1
+
+DEFAULT_EXTERNAL_JOBS = 8
+# Requests per second sent to any one host
+DEFAULT_HOST_RATE = 2.0
+DEFAULT_LINK_TIMEOUT = 10.0
@@ -0,0 +1,304 @@
+"""Site deployment functions for Kreatisite CLI."""
+
+import hashlib
+import mimetypes
+import os
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+from . import multipart
+from .aws import AwsError, call, get_backend
+from .build import HTML_EXTENSIONS, is_fingerprinted
+from .defaults import DEFAULT_UPLOAD_JOBS
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "public, max-age=0, must-revalidate"
+# DeleteObjects accepts at most 1000 keys per request
+DELETE_BATCH_SIZE = 1000
+
+
+@dataclass
+class DeployPlan:
+    """Differences between the local build output and the bucket contents."""
+
+    uploads: List[str] = field(default_factory=list)
+    copies: List[Tuple[str, str]] = field(default_factory=list)
+    deletes: List[str] = field(default_factory=list)
+    unchanged: int = 0
+    site_keys: List[str] = field(default_factory=list)
+
+    @property
+    def changed_keys(self) -> List[str]:
+        """Return every key whose content changes with this plan."""
+        return sorted(self.uploads + [dest for _, dest in self.copies] + self.deletes)
+
+
+def file_etag(path: str) -> str:
+    """Compute the S3 ETag of a file uploaded in a single request (its MD5).
+
+    Args:
+        path: Local file path
+
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def local_manifest(output_dir: str, multipart_threshold: Optional[int] = None) -> Dict[str, str]:
+    """Map every file in the build output to its content hash.
+
+    Args:
+        output_dir: Build output directory
+        multipart_threshold: Size from which files are uploaded in parts, which
+            changes the ETag S3 assigns to them (None: never)
+
+    Returns:
+        Dict[str, str]: Relative POSIX path to ETag
+    """
+    manifest = {}
+    for root, _, names in os.walk(output_dir):
+        for name in names:
+            path = os.path.join(root, name)
+            rel = os.path.relpath(path, output_dir).replace(os.sep, "/")
+            if _is_large(path, multipart_threshold):
+                manifest[rel] = multipart.multipart_etag(path)
+            else:
+                manifest[rel] = file_etag(path)
+    return manifest
+
+
+def _is_large(path: str, multipart_threshold: Optional[int]) -> bool:
+    """Check whether a file is uploaded with multipart upload."""
+    return multipart_threshold is not None and os.path.getsize(path) >= multipart_threshold
+
+
+def remote_manifest(
+    bucket: str, prefix: str = "", endpoint_url: Optional[str] = None
+) -> Dict[str, str]:
+    """Map every object under a bucket prefix to its ETag with one paginated listing.
+
+    Args:
+        bucket: S3 bucket name
+        prefix: Key prefix the site is deployed under
+        endpoint_url: Alternative S3-compatible endpoint
+
+    Returns:
+        Dict[str, str]: Key relative to the prefix to ETag
+    """
+    response = call("s3", "ListObjectsV2", {"Bucket": bucket, "Prefix": prefix}, endpoint_url)
+    return {
+        obj["Key"][len(prefix) :]: obj["ETag"].strip('"') for obj in response.get("Contents", [])
+    }
+
+
+def plan_deploy(local: Dict[str, str], remote: Dict[str, str], delete: bool = True) -> DeployPlan:
+    """Compute the minimal set of operations that makes the bucket match the build.
+
+    New content that already exists in the bucket under another key is copied
+    server-side instead of uploaded.
+
+    Args:
+        local: Local manifest from local_manifest()
+        remote: Remote manifest from remote_manifest()
+        delete: Whether to delete objects that are no longer part of the build
+
+    Returns:
+        DeployPlan: Planned operations
+    """
+    plan = DeployPlan(site_keys=sorted(local))
+    remote_by_etag: Dict[str, str] = {}
+    for key, etag in remote.items():
+        remote_by_etag.setdefault(etag, key)
+
+    for key in sorted(local):
+        etag = local[key]
+        if remote.get(key) == etag:
+            plan.unchanged += 1
+        elif etag in remote_by_etag:
+            plan.copies.append((remote_by_etag[etag], key))
+        else:
+            plan.uploads.append(key)
+    if delete:
+        plan.deletes = sorted(key for key in remote if key not in local)
+
+    # Pages go last so they never reference assets that are not uploaded yet
+    plan.uploads.sort(key=lambda key: (_is_page(key), key))
+    return plan
+
+
+def _is_page(key: str) -> bool:
+    """Check whether a key is an HTML page (or its precompressed variant)."""
+    if key.endswith(".gz"):
+        key = key[:-3]
+    return posixpath.splitext(key)[1].lower() in HTML_EXTENSIONS
+
+
+def object_headers(key: str) -> Dict[str, str]:
+    """Return the content and caching headers to store with an object.
+
+    Args:
+        key: Object key relative to the site root
+
+    Returns:
+        Dict[str, str]: S3 PutObject/CopyObject header parameters
+    """
+    headers = {}
+    if key.endswith(".gz"):
+        key = key[:-3]
+        headers["ContentEncoding"] = "gzip"
+    content_type = mimetypes.guess_type(key)[0] or "application/octet-stream"
+    if content_type.startswith("text/") or content_type in ("application/javascript",):
+        content_type += "; charset=utf-8"
+    headers["ContentType"] = content_type
+    if is_fingerprinted(key):
+        headers["CacheControl"] = IMMUTABLE_CACHE_CONTROL
+    else:
+        headers["CacheControl"] = REVALIDATE_CACHE_CONTROL
+    return headers
+
+
+def execute_plan(
+    plan: DeployPlan,
+    output_dir: str,
+    bucket: str,
+    prefix: str = "",
+    endpoint_url: Optional[str] = None,
+    jobs: int = DEFAULT_UPLOAD_JOBS,
+    multipart_threshold: Optional[int] = None,
+    client: Any = None,
+) -> None:
+    """Apply a deploy plan to the bucket through a concurrent upload pool.
+
+    Copies and uploads run first; deletions run last so the live site is never
+    missing files it references. Files of at least multipart_threshold bytes are
+    uploaded one at a time with the multipart engine, which parallelizes parts.
+
+    Args:
+        plan: Plan from plan_deploy()
+        output_dir: Build output directory
+        bucket: S3 bucket name
+        prefix: Key prefix the site is deployed under
+        endpoint_url: Alternative S3-compatible endpoint
+        jobs: Number of concurrent transfers
+        multipart_threshold: Size from which files are uploaded in parts (None: never)
+        client: S3 client for multipart uploads (default: created on demand)
+    """
+
+    def local_path(key: str) -> str:
+        return os.path.join(output_dir, *key.split("/"))
+
+    def copy(pair: Tuple[str, str]) -> None:
+        src, dest = pair
+        params = {
+            "Bucket": bucket,
+            "Key": prefix + dest,
+            # S3 URL-decodes the copy source, so keys with spaces, + or % must be encoded
+            "CopySource": quote(f"{bucket}/{prefix}{src}"),
+            "MetadataDirective": "REPLACE",
+        }
+        call("s3", "CopyObject", {**params, **object_headers(dest)}, endpoint_url)
+
+    def upload(key: str) -> None:
+        params = {
+            "Bucket": bucket,
+            "Key": prefix + key,
+            "Body": local_path(key),
+        }
+        call("s3", "PutObject", {**params, **object_headers(key)}, endpoint_url)
+
+    large = [key for key in plan.uploads if _is_large(local_path(key), multipart_threshold)]
+    large_keys = set(large)
+    small = [key for key in plan.uploads if key not in large_keys]
+    if large and client is None:
+        client = multipart.create_client(endpoint_url)
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        _run_all(pool, copy, plan.copies)
+        _run_all(pool, upload, [key for key in small if not _is_page(key)])
+        for key in large:
+            multipart.upload_file(
+                local_path(key), bucket, prefix + key, client, extra_args=object_headers(key)
+            )
+        _run_all(pool, upload, [key for key in small if _is_page(key)])
+
+    for start in range(0, len(plan.deletes), DELETE_BATCH_SIZE):
+        batch = plan.deletes[start : start + DELETE_BATCH_SIZE]
+        objects = [{"Key": prefix + key} for key in batch]
+        response = call(
+            "s3",
+            "DeleteObjects",
+            {"Bucket": bucket, "Delete": {"Objects": objects, "Quiet": True}},
+            endpoint_url,
+        )
+        # DeleteObjects succeeds as a whole even when single keys fail
+        errors = (response or {}).get("Errors") or []
+        if errors:
+            failed = ", ".join(
+                f"{e.get('Key')} ({e.get('Code')}: {e.get('Message')})" for e in errors[:5]
+            )
+            more = f" and {len(errors) - 5} more" if len(errors) > 5 else ""
+            raise AwsError(f"Could not delete {failed}{more}", errors[0].get("Code"))
+
+
+def _run_all(pool: ThreadPoolExecutor, func: Callable, items: List) -> None:
+    """Run func over items in the pool and re-raise the first failure."""
+    for future in [pool.submit(func, item) for item in items]:
+        future.result()
+
+
+def deploy_site(
+    output_dir: str,
+    bucket: str,
+    prefix: str = "",
+    endpoint_url: Optional[str] = None,
+    jobs: int = DEFAULT_UPLOAD_JOBS,
+    delete: bool = True,
+    dry_run: bool = False,
+    multipart_threshold: Optional[int] = multipart.MULTIPART_THRESHOLD,
+    client: Any = None,
+    log: Callable[[str], None] = print,
+) -> DeployPlan:
+    """Publish a build output directory to S3, transferring only the differences.
+
+    Args:
+        output_dir: Build output directory
+        bucket: S3 bucket name
+        prefix: Key prefix to deploy under
+        endpoint_url: Alternative S3-compatible endpoint
+        jobs: Number of concurrent transfers
+        delete: Whether to delete objects that are no longer part of the build
+        dry_run: Only compute and report the plan
+        multipart_threshold: Size from which files are uploaded in parts (None: never);
+            ignored unless a client is given or boto3 is installed and the AWS
+            backend talks to real S3
+        client: S3 client for multipart uploads (default: created on demand)
+        log: Function used to report progress
+
+    Returns:
+        DeployPlan: The plan that was (or would be) applied
+    """
+    if prefix and not prefix.endswith("/"):
+        prefix += "/"
+    if client is None and (not multipart.available() or not get_backend().multipart_uploads):
+        multipart_threshold = None
+    plan = plan_deploy(
+        local_manifest(output_dir, multipart_threshold),
+        remote_manifest(bucket, prefix, endpoint_url),
+        delete,
+    )
+    log(
+        f"{len(plan.uploads)} to upload, {len(plan.copies)} to copy, "
+        f"{len(plan.deletes)} to delete, {plan.unchanged} unchanged"
+    )
+    if not dry_run:
+        execute_plan(
+            plan, output_dir, bucket, prefix, endpoint_url, jobs, multipart_threshold, client
+        )
+    return plan
@@ -0,0 +1,357 @@
+"""Route53 DNS record functions for Kreatisite CLI."""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import yaml
+
+from .aws import call
+from .waiter import wait_until
+
+# ChangeResourceRecordSets limits; UPSERT changes count twice towards both
+MAX_BATCH_RECORDS = 1000
+MAX_BATCH_VALUE_CHARS = 32000
+DEFAULT_TTL = 300
+DEFAULT_WAIT_TIMEOUT = 600.0
+
+_ESCAPE_RE = re.compile(r"\\(\d{3})")
+
+RecordKey = Tuple[str, str, str]
+
+
+class DnsConfigError(Exception):
+    """Raised when a zone file is missing or invalid."""
+
+
+@dataclass
+class DnsPlan:
+    """Changes needed to bring a hosted zone to its desired state."""
+
+    changes: List[Dict[str, Any]] = field(default_factory=list)
+    unchanged: int = 0
+
+    def summary(self) -> str:
+        """Return a one-line summary of the plan."""
+        counts = {action: 0 for action in ("CREATE", "UPSERT", "DELETE")}
+        for change in self.changes:
+            counts[change["Action"]] += 1
+        return (
+            f"{counts['CREATE']} to create, {counts['UPSERT']} to update, "
+            f"{counts['DELETE']} to delete, {self.unchanged} unchanged"
+        )
+
+
+def normalize_name(name: str, zone: str = "") -> str:
+    """Return a record name as a lowercase, fully qualified name with a trailing dot.
+
+    Args:
+        name: Record name; relative names and "@" are resolved against the zone
+        zone: Zone apex (e.g., example.com)
+
+    Returns:
+        str: Normalized name (e.g., www.example.com.)
+    """
+    name = _ESCAPE_RE.sub(lambda m: chr(int(m.group(1), 8)), name.strip()).lower()
+    zone = zone.strip().rstrip(".").lower()
+    if name in ("@", "") and zone:
+        return zone + "."
+    if name.endswith("."):
+        return name
+    if zone and name != zone and not name.endswith("." + zone):
+        name = f"{name}.{zone}"
+    return name + "."
+
+
+def record_key(record: Dict[str, Any]) -> RecordKey:
+    """Return the identity of a record set: name, type and set identifier."""
+    return (normalize_name(record["Name"]), record["Type"], record.get("SetIdentifier", ""))
+
+
+def _canonical(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize a record set so that equivalent records compare equal."""
+    result = dict(record, Name=normalize_name(record["Name"]))
+    if "ResourceRecords" in result:
+        result["ResourceRecords"] = sorted(result["ResourceRecords"], key=lambda r: r["Value"])
+    if "AliasTarget" in result:
+        alias = dict(result["AliasTarget"])
+        alias["DNSName"] = normalize_name(alias["DNSName"])
+        result["AliasTarget"] = alias
+    return result
+
+
+def _record_from_config(entry: Dict[str, Any], zone: str) -> Dict[str, Any]:
+    """Convert a zone file entry into a Route53 resource record set."""
+    try:
+        record: Dict[str, Any] = {
+            "Name": normalize_name(str(entry["name"]), zone),
+            "Type": str(entry["type"]).upper(),
+        }
+    except KeyError as e:
+        raise DnsConfigError(f"Record {entry!r} is missing {e}")
+    if "set_identifier" in entry:
+        record["SetIdentifier"] = str(entry["set_identifier"])
+    if "weight" in entry:
+        record["Weight"] = int(entry["weight"])
+
+    if "alias" in entry:
+        alias = entry["alias"]
+        record["AliasTarget"] = {
+            "HostedZoneId": alias["hosted_zone_id"],
+            "DNSName": normalize_name(alias["dns_name"]),
+            "EvaluateTargetHealth": bool(alias.get("evaluate_target_health", False)),
+        }
+        return record
+
+    values = entry.get("values", entry.get("value"))
+    if values is None:
+        raise DnsConfigError(f"Record {record['Name']} {record['Type']} has no values or alias")
+    if not isinstance(values, list):
+        values = [values]
+    if record["Type"] in ("TXT", "SPF"):
+        values = [v if str(v).startswith('"') else f'"{v}"' for v in values]
+    record["TTL"] = int(entry.get("ttl", DEFAULT_TTL))
+    record["ResourceRecords"] = [{"Value": str(v)} for v in values]
+    return record
+
+
+def load_zone_file(path: str) -> Tuple[str, Optional[str], List[Dict[str, Any]]]:
+    """Load the desired state of a hosted zone from a YAML file.
+
+    Args:
+        path: Zone file path
+
+    Returns:
+        Tuple[str, Optional[str], List[Dict[str, Any]]]: Zone name, hosted zone ID
+        (if given) and desired record sets
+
+    Raises:
+        DnsConfigError: If the file is missing or invalid
+    """
+    try:
+        with open(path, "r") as f:
+            config = yaml.safe_load(f) or {}
+    except FileNotFoundError:
+        raise DnsConfigError(f"Zone file '{path}' not found")
+    except yaml.YAMLError as e:
+        raise DnsConfigError(f"Error parsing YAML zone file: {str(e)}")
+    if not isinstance(config, dict) or "zone" not in config:
+        raise DnsConfigError(f"Zone file '{path}' must define 'zone' and 'records'")
+    zone = str(config["zone"]).rstrip(".")
+    records = [_record_from_config(entry, zone) for entry in config.get("records") or []]
+    seen = set()
+    for record in records:
+        key = record_key(record)
+        if key in seen:
+            raise DnsConfigError(f"Duplicate record {key[0]} {key[1]}")
+        seen.add(key)
+    return zone, config.get("hosted_zone_id"), records
+
+
+def list_hosted_zones() -> List[Dict[str, Any]]:
+    """Fetch all public hosted zones of the account.
+
+    Returns:
+        List[Dict[str, Any]]: Route53 hosted zones
+    """
+    response = call("route53", "ListHostedZones")
+    return [
+        zone
+        for zone in response.get("HostedZones", [])
+        if not zone.get("Config", {}).get("PrivateZone")
+    ]
+
+
+def find_hosted_zone_id(name: str, zones: Optional[List[Dict[str, Any]]] = None) -> str:
+    """Find the hosted zone that a name belongs to (the longest matching zone).
+
+    Args:
+        name: Zone apex or any name inside the zone
+        zones: Hosted zones from list_hosted_zones() (default: fetched on demand)
+
+    Returns:
+        str: Hosted zone ID without the /hostedzone/ prefix
+
+    Raises:
+        DnsConfigError: If no hosted zone contains the name
+    """
+    name = normalize_name(name)
+    if zones is None:
+        zones = list_hosted_zones()
+    matches = [zone for zone in zones if name == zone["Name"] or name.endswith("." + zone["Name"])]
+    if not matches:
+        raise DnsConfigError(f"No hosted zone found for {name}")
+    best = max(matches, key=lambda zone: len(zone["Name"]))
+    return str(best["Id"]).split("/")[-1]
+
+
+def list_records(hosted_zone_id: str) -> List[Dict[str, Any]]:
+    """Fetch every record set in a hosted zone with one paginated listing.
+
+    Args:
+        hosted_zone_id: Hosted zone ID
+
+    Returns:
+        List[Dict[str, Any]]: Route53 resource record sets
+    """
+    response = call("route53", "ListResourceRecordSets", {"HostedZoneId": hosted_zone_id})
+    return list(response.get("ResourceRecordSets", []))
+
+
+def plan_changes(
+    current: List[Dict[str, Any]],
+    desired: List[Dict[str, Any]],
+    zone: str,
+    prune: bool = False,
+) -> DnsPlan:
+    """Diff the current and desired record sets into a minimal change list.
+
+    Deletions come first so a name can switch type (e.g., A to CNAME). The
+    apex SOA and NS records are never deleted.
+
+    Args:
+        current: Record sets from list_records()
+        desired: Record sets from load_zone_file()
+        zone: Zone apex
+        prune: Whether to delete records that are not in the desired state
+
+    Returns:
+        DnsPlan: Planned changes
+    """
+    apex = normalize_name(zone)
+    current_by_key = {record_key(r): _canonical(r) for r in current}
+    desired_by_key = {record_key(r): _canonical(r) for r in desired}
+    plan = DnsPlan()
+
+    if prune:
+        for key, record in sorted(current_by_key.items()):
+            protected = key[0] == apex and key[1] in ("SOA", "NS")
+            if key not in desired_by_key and not protected:
+                plan.changes.append({"Action": "DELETE", "ResourceRecordSet": record})
+    for key, record in sorted(desired_by_key.items()):
+        existing = current_by_key.get(key)
+        if existing is None:
+            plan.changes.append({"Action": "CREATE", "ResourceRecordSet": record})
+        elif existing != record:
+            plan.changes.append({"Action": "UPSERT", "ResourceRecordSet": record})
+        else:
+            plan.unchanged += 1
+    return plan
+
+
+def _change_cost(change: Dict[str, Any]) -> Tuple[int, int]:
+    """Return the record count and value characters a change counts towards the limits."""
+    records = change["ResourceRecordSet"].get("ResourceRecords", [])
+    weight = 2 if change["Action"] == "UPSERT" else 1
+    count = max(1, len(records))
+    chars = sum(len(r["Value"]) for r in records)
+    return count * weight, chars * weight
+
+
+def batch_changes(changes: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+    """Pack changes, in order, into as few requests as the Route53 limits allow.
+
+    Args:
+        changes: Changes from plan_changes()
+
+    Returns:
+        List[List[Dict[str, Any]]]: Change batches
+    """
+    batches: List[List[Dict[str, Any]]] = []
+    records = chars = 0
+    for change in changes:
+        cost_records, cost_chars = _change_cost(change)
+        if (
+            not batches
+            or records + cost_records > MAX_BATCH_RECORDS
+            or chars + cost_chars > MAX_BATCH_VALUE_CHARS
+        ):
+            batches.append([])
+            records = chars = 0
+        batches[-1].append(change)
+        records += cost_records
+        chars += cost_chars
+    return batches
+
+
+def submit_changes(
+    hosted_zone_id: str, changes: List[Dict[str, Any]], comment: str = "kreatisite"
+) -> List[str]:
+    """Submit changes to a hosted zone in as few batches as possible.
+
+    Args:
+        hosted_zone_id: Hosted zone ID
+        changes: Changes from plan_changes()
+        comment: Comment stored with each change batch
+
+    Returns:
+        List[str]: Change IDs, one per batch
+    """
+    change_ids = []
+    for batch in batch_changes(changes):
+        response = call(
+            "route53",
+            "ChangeResourceRecordSets",
+            {"HostedZoneId": hosted_zone_id, "ChangeBatch": {"Comment": comment, "Changes": batch}},
+        )
+        change_ids.append(response["ChangeInfo"]["Id"].split("/")[-1])
+    return change_ids
+
+
+def wait_for_changes(change_ids: List[str], timeout: float = DEFAULT_WAIT_TIMEOUT) -> None:
+    """Wait until submitted change batches have propagated to all Route53 servers.
+
+    Args:
+        change_ids: IDs from submit_changes()
+        timeout: Maximum number of seconds to wait
+
+    Raises:
+        TimeoutError: If the changes do not propagate in time
+    """
+    pending = list(change_ids)
+
+    def in_sync() -> bool:
+        while pending:
+            response = call("route53", "GetChange", {"Id": pending[0]})
+            if response["ChangeInfo"]["Status"] != "INSYNC":
+                return False
+            pending.pop(0)
+        return True
+
+    wait_until(in_sync, timeout)
+
+
+def apply_zone_file(
+    path: str,
+    prune: bool = False,
+    dry_run: bool = False,
+    wait: bool = False,
+    log: Callable[[str], None] = print,
+) -> DnsPlan:
+    """Make a hosted zone match a zone file.
+
+    Args:
+        path: Zone file path
+        prune: Whether to delete records that are not in the zone file
+        dry_run: Only compute and report the plan
+        wait: Wait for the changes to propagate
+        log: Function used to report progress
+
+    Returns:
+        DnsPlan: The plan that was (or would be) applied
+    """
+    zone, hosted_zone_id, desired = load_zone_file(path)
+    hosted_zone_id = hosted_zone_id or find_hosted_zone_id(zone)
+    plan = plan_changes(list_records(hosted_zone_id), desired, zone, prune)
+    for change in plan.changes:
+        record = change["ResourceRecordSet"]
+        log(f"{change['Action']:<6} {record['Name']} {record['Type']}")
+    log(plan.summary())
+    if dry_run or not plan.changes:
+        return plan
+    change_ids = submit_changes(hosted_zone_id, plan.changes)
+    log(f"Submitted {len(change_ids)} change batch(es)")
+    if wait:
+        wait_for_changes(change_ids)
+        log("Changes are in sync")
+    return plan
@@ -0,0 +1,138 @@
+"""Domain availability functions for Kreatisite CLI."""
+
+import contextvars
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+import yaml
+
+from .aws import DEFAULT_RETRIES, AwsError, call_with_retries
+from .defaults import DEFAULT_CHECK_JOBS
+from .metrics import DOMAINS_CHECKED, DOMAINS_PER_SECOND
+
+# Route53 Domains is only available in us-east-1
+DOMAINS_REGION = "us-east-1"
+
+
+class ContactsError(Exception):
+    """Raised when a contacts file does not hold a mapping of contact fields."""
+
+
+@dataclass
+class Availability:
+    """Availability of one domain."""
+
+    domain_name: str
+    status: Optional[str] = None
+    error: Optional[str] = None
+
+
+def read_contacts(path: str) -> Dict[str, Any]:
+    """Read the registration contacts from a YAML file.
+
+    Args:
+        path: YAML file with the admin, registrant and tech contacts
+
+    Returns:
+        Dict[str, Any]: RegisterDomain parameters from the file
+
+    Raises:
+        OSError: If the file cannot be read
+        yaml.YAMLError: If the file is not valid YAML
+        ContactsError: If the file is empty or not a mapping
+    """
+    with open(path, "r") as f:
+        contacts = yaml.safe_load(f)
+    if not isinstance(contacts, dict) or not contacts:
+        raise ContactsError(
+            f"Config file '{path}' must be a mapping of contacts "
+            "(AdminContact, RegistrantContact, TechContact)"
+        )
+    return contacts
+
+
+def registration_params(
+    domain_name: str,
+    contacts: Dict[str, Any],
+    duration_in_years: int = 1,
+    auto_renew: bool = True,
+) -> Dict[str, Any]:
+    """Build the RegisterDomain parameters of a domain.
+
+    The explicit settings win over the same keys in the contacts, and privacy
+    protection is always enabled, so a contacts file cannot turn it off.
+
+    Args:
+        domain_name: Domain name
+        contacts: Parameters from the contacts file
+        duration_in_years: Registration period
+        auto_renew: Whether the domain renews automatically
+
+    Returns:
+        Dict[str, Any]: RegisterDomain parameters
+    """
+    params: Dict[str, Any] = {
+        "DomainName": domain_name,
+        "DurationInYears": duration_in_years,
+        "AutoRenew": auto_renew,
+        "PrivacyProtectAdminContact": True,
+        "PrivacyProtectRegistrantContact": True,
+        "PrivacyProtectTechContact": True,
+    }
+    # Contacts come after the settings, which keeps the command line order stable
+    params.update((key, value) for key, value in contacts.items() if key not in params)
+    return params
+
+
+def check_availability(
+    domain_names: Iterable[str],
+    jobs: int = DEFAULT_CHECK_JOBS,
+    retries: int = DEFAULT_RETRIES,
+    executor: Optional[Executor] = None,
+) -> List[Availability]:
+    """Check the availability of many domains concurrently.
+
+    Throttled requests are retried with backoff, so large lists can use more
+    workers than the API's rate limit allows.
+
+    Args:
+        domain_names: Domain names; duplicates are checked once
+        jobs: Number of concurrent requests
+        retries: Maximum number of retries per domain after throttling errors
+        executor: Executor to run the checks on, e.g., one shared by the
+            chunks of a long stream (default: a new pool of jobs workers)
+
+    Returns:
+        List[Availability]: One result per distinct domain, in the given order
+    """
+    names = list(dict.fromkeys(name.strip().lower() for name in domain_names))
+
+    def check(name: str) -> Availability:
+        try:
+            response = call_with_retries(
+                "route53domains",
+                "CheckDomainAvailability",
+                {"DomainName": name},
+                region=DOMAINS_REGION,
+                retries=retries,
+            )
+        except AwsError as e:
+            DOMAINS_CHECKED.inc("ERROR")
+            return Availability(name, error=str(e))
+        status = response.get("Availability")
+        DOMAINS_CHECKED.inc(str(status))
+        return Availability(name, status=status)
+
+    if executor is None:
+        with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+            return check_availability(names, jobs, retries, pool)
+    start = time.perf_counter()
+    # Workers run in copies of this context, so they use the caller's AWS backend
+    futures = [executor.submit(contextvars.copy_context().run, check, name) for name in names]
+    results = [future.result() for future in futures]
+    elapsed = time.perf_counter() - start
+    if names and elapsed > 0:
+        DOMAINS_PER_SECOND.set(len(names) / elapsed)
+    return results
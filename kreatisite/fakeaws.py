@@ -0,0 +1,544 @@
+"""In-memory AWS backend for Kreatisite CLI tests and offline benchmarks."""
+
+import hashlib
+import json
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import unquote
+
+from .aws import AwsError, Backend
+from .dns import normalize_name
+from .ratelimit import RateLimiter
+
+ACCOUNT_ID = "000000000000"
+
+Handler = Callable[[Dict[str, Any], Optional[str]], Dict[str, Any]]
+
+
+def _error(code: str, operation: str, message: str) -> AwsError:
+    """Build an error formatted like the AWS CLI reports it."""
+    return AwsError(
+        f"An error occurred ({code}) when calling the {operation} operation: {message}", code
+    )
+
+
+def _digest(*parts: str) -> str:
+    return hashlib.sha256(" ".join(parts).encode()).hexdigest()
+
+
+class FakeBackend(Backend):
+    """Deterministic in-memory stand-in for the AWS services Kreatisite uses.
+
+    Each call sleeps for a fixed latency plus seeded random jitter, and calls
+    beyond throttle_rate per second to one service fail with
+    ThrottlingException, like AWS rate limits. Registrations, DNS changes,
+    certificate validation and invalidations complete immediately, and
+    certificates are issued as soon as their validation records exist in a
+    fake hosted zone.
+    """
+
+    name = "fake"
+    multipart_uploads = False
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        throttle_rate: Optional[float] = None,
+        throttle_burst: int = 10,
+        taken: Iterable[str] = (),
+        taken_fraction: float = 0.0,
+        seed: int = 0,
+        clock: Optional[Callable[[], float]] = None,
+        sleep: Optional[Callable[[float], None]] = None,
+    ) -> None:
+        """Initialize the backend with empty services.
+
+        Args:
+            latency: Seconds every call takes
+            jitter: Maximum random seconds added to the latency
+            throttle_rate: Calls per second allowed per service (None: unlimited)
+            throttle_burst: Calls per service allowed in a burst
+            taken: Domains registered by someone else
+            taken_fraction: Fraction of all other domains reported as taken
+            seed: Seed of the latency jitter
+            clock: Monotonic clock used for throttling (default: time.monotonic)
+            sleep: Function used to simulate latency (default: time.sleep)
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle_rate = throttle_rate
+        self.throttle_burst = throttle_burst
+        self.taken = {name.lower().rstrip(".") for name in taken}
+        self.taken_fraction = taken_fraction
+        self.calls: Dict[str, int] = {}
+        self.throttled = 0
+        self.domains: Dict[str, Dict[str, Any]] = {}
+        self.buckets: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.zones: Dict[str, Dict[str, Any]] = {}
+        self.certificates: Dict[str, Dict[str, Any]] = {}
+        self.distributions: Dict[str, Dict[str, Any]] = {}
+        self.origin_access_controls: Dict[str, Dict[str, Any]] = {}
+        self._operations: Dict[str, str] = {}
+        self._invalidations: Dict[str, Dict[str, Any]] = {}
+        self._random = random.Random(seed)
+        self._clock = clock or time.monotonic
+        self._sleep = sleep or time.sleep
+        self._limiters: Dict[str, RateLimiter] = {}
+        self._ids = 0
+        self._lock = threading.Lock()
+        self._handlers: Dict[Tuple[str, str], Handler] = {
+            ("route53domains", "CheckDomainAvailability"): self._check_domain_availability,
+            ("route53domains", "RegisterDomain"): self._register_domain,
+            ("route53domains", "GetOperationDetail"): self._get_operation_detail,
+            ("route53domains", "ListDomains"): self._list_domains,
+            ("s3", "CreateBucket"): self._create_bucket,
+            ("s3", "PutPublicAccessBlock"): self._put_bucket_setting,
+            ("s3", "PutBucketPolicy"): self._put_bucket_setting,
+            ("s3", "ListObjectsV2"): self._list_objects,
+            ("s3", "PutObject"): self._put_object,
+            ("s3", "CopyObject"): self._copy_object,
+            ("s3", "GetObject"): self._get_object,
+            ("s3", "HeadObject"): self._head_object,
+            ("s3", "DeleteObjects"): self._delete_objects,
+            ("route53", "CreateHostedZone"): self._create_hosted_zone,
+            ("route53", "ListHostedZones"): self._list_hosted_zones,
+            ("route53", "ListResourceRecordSets"): self._list_record_sets,
+            ("route53", "ChangeResourceRecordSets"): self._change_record_sets,
+            ("route53", "GetChange"): self._get_change,
+            ("acm", "RequestCertificate"): self._request_certificate,
+            ("acm", "DescribeCertificate"): self._describe_certificate,
+            ("acm", "ListCertificates"): self._list_certificates,
+            ("cloudfront", "CreateOriginAccessControl"): self._create_origin_access_control,
+            ("cloudfront", "ListOriginAccessControls"): self._list_origin_access_controls,
+            ("cloudfront", "CreateDistribution"): self._create_distribution,
+            ("cloudfront", "ListDistributions"): self._list_distributions,
+            ("cloudfront", "CreateInvalidation"): self._create_invalidation,
+            ("cloudfront", "GetInvalidation"): self._get_invalidation,
+        }
+
+    def call(
+        self,
+        service: str,
+        operation: str,
+        params: Optional[Dict[str, Any]] = None,
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        outfile: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Run an AWS API operation, with the same arguments as aws.call."""
+        with self._lock:
+            name = f"{service}:{operation}"
+            self.calls[name] = self.calls.get(name, 0) + 1
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            limiter = None
+            if self.throttle_rate:
+                limiter = self._limiters.get(service)
+                if limiter is None:
+                    limiter = self._limiters[service] = RateLimiter(
+                        self.throttle_rate, self.throttle_burst, clock=self._clock
+                    )
+        if delay > 0:
+            self._sleep(delay)
+        if limiter is not None and not limiter.try_acquire():
+            with self._lock:
+                self.throttled += 1
+            raise _error("ThrottlingException", operation, "Rate exceeded")
+
+        handler = self._handlers.get((service, operation))
+        if handler is None:
+            raise _error("InvalidAction", operation, f"{service} {operation} is not simulated")
+        # Requests and responses are copied so callers never share state with the fake
+        request = json.loads(json.dumps(params or {}))
+        with self._lock:
+            response = handler(request, outfile)
+        decoded: Dict[str, Any] = json.loads(json.dumps(response))
+        return decoded
+
+    def _next_id(self, prefix: str = "") -> str:
+        self._ids += 1
+        return f"{prefix}{self._ids:012d}"
+
+    # Route53 Domains
+
+    def is_available(self, domain_name: str) -> bool:
+        """Check whether a domain is free to register.
+
+        Args:
+            domain_name: Domain name
+
+        Returns:
+            bool: False for domains in taken, registered ones and a deterministic
+            taken_fraction of all others
+        """
+        name = domain_name.lower().rstrip(".")
+        if name in self.taken or name in self.domains:
+            return False
+        return int(_digest("taken", name)[:8], 16) / 0xFFFFFFFF >= self.taken_fraction
+
+    def _check_domain_availability(
+        self, params: Dict[str, Any], _: Optional[str]
+    ) -> Dict[str, Any]:
+        available = self.is_available(params["DomainName"])
+        return {"Availability": "AVAILABLE" if available else "UNAVAILABLE"}
+
+    def _register_domain(self, params: Dict[str, Any], _: Optional[str]) -> Dict[str, Any]:
+        name = params["DomainName"].lower().rstrip(".")
+        if not self.is_available(name):
+            raise _error("DomainLimitExceeded", "RegisterDomain", f"{name} is not available")
+        self.domains[name] = {"DomainName": name, "AutoRenew": params.get("AutoRenew", True)}
+        operation_id = self._next_id("op-")
+        self._operations[operation_id] = name
+        return {"OperationId": operation_id}
+
+    def _get_operation_detail(self, params: Dict[str, Any], _: Optional[str]) -> Dict[str, Any]:
+        operation_id = params["OperationId"]
+        if operation_id not in self._operations:
+            raise _error("InvalidInput", "GetOperationDetail", f"Unknown operation {operation_id}")
+        return {
+            "OperationId": operation_id,
+            "Status": "SUCCESSFUL",
+            "DomainName": self._operations[operation_id],
+            "Type": "REGISTER_DOMAIN",
+        }
+
+    def _list_domains(self, params: Dict[str, Any], _: Optional[str]) -> Dict[str, Any]:
+        return {"Domains": [dict(domain) for _, domain in sorted(self.domains.items())]}
+
+    # S3
+
+    def _bucket(self, operation: str, name: str) -> Dict[str, Dict[str, Any]]:
+        if name not in self.buckets:
+            raise _error("NoSuchBucket", operation, "The specified bucket does not exist")
+        return self.buckets[name]
+
+    def _create_bucket(self, params: Dict[str, Any], _: Optional[str]) -> Dict[str, Any]:
+        if params["Bucket"] in self.buckets:
+            raise _error("BucketAlreadyOwnedByYou", "CreateBucket", "Bucket already exists")
+        self.buckets[params["Bucket"]] = {}
+        return {"Location": f"/{params['Bucket']}"}
+
+    def _put_bucket_setting(self, params: Dict[str, Any], _: Optional[str]) -> Dict[str, Any]:
+        self._bucket("PutBucketPolicy", params["Bucket"])
+        return {}
+
+    def _list_objects(self, params: Dict[str, Any], _: Optional[str]) -> Dict[str, Any]:
+        bucket = self._bucket("ListObjectsV2", params["Bucket"])
+        prefix = params.get("Prefix", "")
+        contents = [
+            {"Key": key, "ETag": obj["ETag"], "Size": len(obj["Data"])}
+            for key, obj in sorted(bucket.items())
+            if key.startswith(prefix)
+        ]
+        return {"Contents": contents, "KeyCount": len(contents)} if contents else {"KeyCount": 0}
+
+    def _store(self, bucket: Dict[str, Dict[str, Any]], key: str, data: bytes, params: Dict) -> str:
+        etag = f'"{hashlib.md5(data).hexdigest()}"'
+        headers = {
+            name: params[name]
+            for name in ("ContentType", "CacheControl", "ContentEncoding")
+            if name in params
+        }
+        bucket[key] = {"Data": data, "ETag": etag, **headers}
+        return etag
+
+    def _object(self, operation: str, bucket_name: str, key: str) -> Dict[str, Any]:
+        bucket = self._bucket(operation, bucket_name)
+        if key not in bucket:
+            raise _error("NoSuchKey", operation, "The specified key does not exist.")
+        return bucket[key]
+
+    def _put_object(self, params: Dict[str, Any], _: Optional[str]) -> Dict[str, Any]:
+        bucket = self._bucket("PutObject", params["Bucket"])
+        data = b""
+        if params.get("Body"):
+            with open(params["Body"], "rb") as f:
+                data = f.read()
+        return {"ETag": self._store(bucket, params["Key"], data, params)}
+
+    def _copy_object(self, params: Dict[str, Any], _: Optional[str]) -> Dict[str, Any]:
+        source_bucket, _, source_key = unquote(params["CopySource"]).partition("/")
+        source = self._object("CopyObject", source_bucket, source_key)
+        bucket = self._bucket("CopyObject", params["Bucket"])
+        headers = params if params.get("MetadataDirective") == "REPLACE" else source
+        etag = self._store(bucket, params["Key"], source["Data"], headers)
+        return {"CopyObjectResult": {"ETag": etag}}
+
+    def _get_object(self, params: Dict[str, Any], outfile: Optional[str]) -> Dict[str, Any]:
+        obj = self._object("GetObject", params["Bucket"], params["Key"])
+        if outfile:
+            with open(outfile, "wb") as f:
+                f.write(obj["Data"])
+        return {
+            "ContentLength": len(obj["Data"]),
+            **{name: value for name, value in obj.items() if name != "Data"},
+        }
+
+    def _head_object(self, params: Dict[str, Any], _: Optional[str]) -> Dict[str, Any]:
+        bucket = self._bucket("HeadObject", params["Bucket"])
+        if params["Key"] not in bucket:
+            raise _error("404", "HeadObject", "Not Found")
+        return self._get_object(params, None)
+
+    def _delete_objects(self, params: Dict[str, Any], _: Optional[str]) -> Dict[str, Any]:
+        bucket = self._bucket("DeleteObjects", params["Bucket"])
+        keys = [obj["Key"] for obj in params["Delete"]["Objects"]]
+        for key in keys:
+            bucket.pop(key, None)
+        return {} if params["Delete"].get("Quiet") else {"Deleted": [{"Key": k} for k in keys]}
+
+    # Route53
+
+    def _zone(self, operation: str, zone_id: str) -> Dict[str, Any]:
+        zone_id = zone_id.split("/")[-1]
+        if zone_id not in self.zones:
+            raise _error("NoSuchHostedZone", operation, f"No hosted zone found with ID: {zone_id}")
+        return self.zones[zone_id]
+
+    def _create_hosted_zone(self, params: Dict[str, Any], _: Optional[str]) -> Dict[str, Any]:
+        for zone in self.zones.values():
+            if zone["CallerReference"] == params["CallerReference"]:
+                raise _error(
+                    "HostedZoneAlreadyExists", "CreateHostedZone", "Caller reference already used"
+                )
+        zone_id = "Z" + self._next_id()
+        name = normalize_name(params["Name"])
+        name_servers = [f"ns-{i}.awsdns-{zone_id[-2:]}.net." for i in range(1, 5)]
+        soa = f"{name_servers[0]} awsdns-hostmaster.amazon.com. 1 7200 900 1209600 86400"
+        self.zones[zone_id] = {
+            "Id": f"/hostedzone/{zone_id}",
+            "Name": name,
+            "CallerReference": params["CallerReference"],
+            "Records": {
+                (name, "NS", ""): {
+                    "Name": name,
+                    "Type": "NS",
+                    "TTL": 172800,
+                    "ResourceRecords": [{"Value": ns} for ns in name_servers],
+                },
+                (name, "SOA", ""): {
+                    "Name": name,
+                    "Type": "SOA",
+                    "TTL": 900,
+                    "ResourceRecords": [{"Value": soa}],
+                },
+            },
+        }
+        return {
+            "HostedZone": self._zone_summary(self.zones[zone_id]),
+            "ChangeInfo": {"Id": f"/change/{self._next_id('C')}", "Status": "PENDING"},
+            "DelegationSet": {"NameServers": name_servers},
+        }
+
+    def _zone_summary(self, zone: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "Id": zone["Id"],
+            "Name": zone["Name"],
+            "CallerReference": zone["CallerReference"],
+            "Config": {"PrivateZone": False},
+            "ResourceRecordSetCount": len(zone["Records"]),
+        }
+
+    def _list_hosted_zones(self, params: Dict[str, Any], _: Optional[str]) -> Dict[str, Any]:
+        zones = sorted(self.zones.values(), key=lambda zone: zone["Name"])
+        return {"HostedZones": [self._zone_summary(zone) for zone in zones]}
+
+    def _list_record_sets(self, params: Dict[str, Any], _: Optional[str]) -> Dict[str, Any]:
+        zone = self._zone("ListResourceRecordSets", params["HostedZoneId"])
+        records = [record for _, record in sorted(zone["Records"].items())]
+        return {"ResourceRecordSets": records}
+
+    def _change_record_sets(self, params: Dict[str, Any], _: Optional[str]) -> Dict[str, Any]:
+        operation = "ChangeResourceRecordSets"
+        zone = self._zone(operation, params["HostedZoneId"])
+        records = dict(zone["Records"])
+        # Validate the whole batch before applying it, as Route53 applies batches atomically
+        for change in params["ChangeBatch"]["Changes"]:
+            record = dict(change["ResourceRecordSet"])
+            record["Name"] = normalize_name(record["Name"])
+            key = (record["Name"], record["Type"], record.get("SetIdentifier", ""))
+            action = change["Action"]
+            if action == "CREATE" and key in records:
+                raise _error(
+                    "InvalidChangeBatch",
+                    operation,
+                    f"Tried to create resource record set {key[0]} type {key[1]} "
+                    "but it already exists",
+                )
+            if action == "DELETE":
+                if records.get(key) != record:
+                    raise _error(
+                        "InvalidChangeBatch",
+                        operation,
+                        f"Tried to delete resource record set {key[0]} type {key[1]} "
+                        "but it was not found",
+                    )
+                del records[key]
+            else:
+                records[key] = record
+        zone["Records"] = records
+        return {"ChangeInfo": {"Id": f"/change/{self._next_id('C')}", "Status": "PENDING"}}
+
+    def _get_change(self, params: Dict[str, Any], _: Optional[str]) -> Dict[str, Any]:
+        return {"ChangeInfo": {"Id": f"/change/{params['Id']}", "Status": "INSYNC"}}
+
+    # ACM
+
+    def _validation_record(self, domain_name: str) -> Dict[str, str]:
+        base = domain_name[2:] if domain_name.startswith("*.") else domain_name
+        digest = _digest("acm", base)
+        return {
+            "Name": f"_{digest[:32]}.{base}.",
+            "Type": "CNAME",
+            "Value": f"_{digest[32:]}.acm-validations.aws.",
+        }
+
+    def _record_exists(self, record: Dict[str, str]) -> bool:
+        key = (normalize_name(record["Name"]), record["Type"], "")
+        for zone in self.zones.values():
+            existing = zone["Records"].get(key)
+            if existing and {"Value": record["Value"]} in existing.get("ResourceRecords", []):
+                return True
+        return False
+
+    def _certificate_status(self, certificate: Dict[str, Any]) -> str:
+        if certificate["Status"] == "PENDING_VALIDATION" and all(
+            self._record_exists(self._validation_record(name)) for name in certificate["Names"]
+        ):
+            certificate["Status"] = "ISSUED"
+        return str(certificate["Status"])
+
+    def _request_certificate(self, params: Dict[str, Any], _: Optional[str]) -> Dict[str, Any]:
+        token = params.get("IdempotencyToken")
+        for arn, certificate in self.certificates.items():
+            if token and certificate["Token"] == token:
+                return {"CertificateArn": arn}
+        names = [params["DomainName"]] + [
+            name
+            for name in params.get("SubjectAlternativeNames", [])
+            if name != params["DomainName"]
+        ]
+        arn = f"arn:aws:acm:us-east-1:{ACCOUNT_ID}:certificate/{self._next_id()}"
+        self.certificates[arn] = {
+            "DomainName": params["DomainName"],
+            "Names": names,
+            "Token": token,
+            "Status": "PENDING_VALIDATION",
+        }
+        return {"CertificateArn": arn}
+
+    def _certificate(self, operation: str, arn: str) -> Dict[str, Any]:
+        if arn not in self.certificates:
+            raise _error("ResourceNotFoundException", operation, f"Certificate {arn} not found")
+        return self.certificates[arn]
+
+    def _describe_certificate(self, params: Dict[str, Any], _: Optional[str]) -> Dict[str, Any]:
+        arn = params["CertificateArn"]
+        certificate = self._certificate("DescribeCertificate", arn)
+        status = self._certificate_status(certificate)
+        options: List[Dict[str, Any]] = []
+        for name in certificate["Names"]:
+            record = self._validation_record(name)
+            options.append(
+                {
+                    "DomainName": name,
+                    "ValidationStatus": "SUCCESS" if self._record_exists(record) else status,
+                    "ValidationMethod": "DNS",
+                    "ResourceRecord": record,
+                }
+            )
+        return {
+            "Certificate": {
+                "CertificateArn": arn,
+                "DomainName": certificate["DomainName"],
+                "SubjectAlternativeNames": certificate["Names"],
+                "Status": status,
+                "DomainValidationOptions": options,
+            }
+        }
+
+    def _list_certificates(self, params: Dict[str, Any], _: Optional[str]) -> Dict[str, Any]:
+        statuses = params.get("CertificateStatuses")
+        summaries = []
+        for arn, certificate in self.certificates.items():
+            status = self._certificate_status(certificate)
+            if not statuses or status in statuses:
+                summaries.append(
+                    {
+                        "CertificateArn": arn,
+                        "DomainName": certificate["DomainName"],
+                        "Status": status,
+                    }
+                )
+        return {"CertificateSummaryList": summaries}
+
+    # CloudFront
+
+    def _create_origin_access_control(self, params: Dict[str, Any], _: Optional[str]) -> Dict:
+        config = params["OriginAccessControlConfig"]
+        for oac in self.origin_access_controls.values():
+            if oac["OriginAccessControlConfig"]["Name"] == config["Name"]:
+                raise _error(
+                    "OriginAccessControlAlreadyExists",
+                    "CreateOriginAccessControl",
+                    "An origin access control with this name already exists",
+                )
+        oac_id = self._next_id("E")
+        self.origin_access_controls[oac_id] = {"Id": oac_id, "OriginAccessControlConfig": config}
+        return {"OriginAccessControl": self.origin_access_controls[oac_id]}
+
+    def _list_origin_access_controls(self, params: Dict[str, Any], _: Optional[str]) -> Dict:
+        items = [
+            {"Id": oac["Id"], **oac["OriginAccessControlConfig"]}
+            for oac in self.origin_access_controls.values()
+        ]
+        return {"OriginAccessControlList": {"Items": items, "IsTruncated": False}}
+
+    def _create_distribution(self, params: Dict[str, Any], _: Optional[str]) -> Dict[str, Any]:
+        config = params["DistributionConfig"]
+        for distribution in self.distributions.values():
+            if distribution["DistributionConfig"]["CallerReference"] == config["CallerReference"]:
+                raise _error(
+                    "DistributionAlreadyExists",
+                    "CreateDistribution",
+                    "Caller reference already used",
+                )
+        distribution_id = self._next_id("E")
+        self.distributions[distribution_id] = {
+            "Id": distribution_id,
+            "ARN": f"arn:aws:cloudfront::{ACCOUNT_ID}:distribution/{distribution_id}",
+            "DomainName": f"d{distribution_id.lower()}.cloudfront.net",
+            "Status": "Deployed",
+            "DistributionConfig": config,
+        }
+        return {"Distribution": self.distributions[distribution_id]}
+
+    def _list_distributions(self, params: Dict[str, Any], _: Optional[str]) -> Dict[str, Any]:
+        items = [
+            {
+                "Id": d["Id"],
+                "ARN": d["ARN"],
+                "DomainName": d["DomainName"],
+                "Status": d["Status"],
+                "Aliases": d["DistributionConfig"].get("Aliases", {"Quantity": 0}),
+                "Comment": d["DistributionConfig"].get("Comment", ""),
+            }
+            for d in self.distributions.values()
+        ]
+        return {"DistributionList": {"Items": items, "IsTruncated": False}}
+
+    def _create_invalidation(self, params: Dict[str, Any], _: Optional[str]) -> Dict[str, Any]:
+        invalidation_id = self._next_id("I")
+        self._invalidations[invalidation_id] = {
+            "Id": invalidation_id,
+            "Status": "Completed",
+            "InvalidationBatch": params["InvalidationBatch"],
+        }
+        return {"Invalidation": dict(self._invalidations[invalidation_id], Status="InProgress")}
+
+    def _get_invalidation(self, params: Dict[str, Any], _: Optional[str]) -> Dict[str, Any]:
+        if params["Id"] not in self._invalidations:
+            raise _error("NoSuchInvalidation", "GetInvalidation", "Invalidation not found")
+        return {"Invalidation": self._invalidations[params["Id"]]}
@@ -0,0 +1,337 @@
+"""Queryable history of domain availability results for Kreatisite CLI.
+
+Every recorded result is kept as a time series in a local SQLite database.
+Storage is kept compact: names, statuses and sources are stored once and
+referenced by integer IDs, timestamps are whole seconds, and each result
+records whether the name's status changed with it. A partial index over the
+changes answers "when did this name last change" and "which names became
+available last week" without scanning the results.
+
+Old results can be pruned outright, or compacted: unchanged repeats are
+dropped while the changes, and each name's first and latest results, are kept.
+"""
+
+import os
+import re
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .defaults import DEFAULT_HISTORY_PATH
+
+# Page cache of the history database, in KiB
+HISTORY_CACHE_KIB = 8192
+# SQLite limits the number of parameters of one statement
+_QUERY_BATCH = 500
+_DURATION = re.compile(r"^(\d+)([mhdw])$")
+_DURATION_SECONDS = {"m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS labels (
+        id INTEGER PRIMARY KEY,
+        value TEXT UNIQUE NOT NULL
+    )""",
+    # The latest status of each name, to tell whether a new result changes it
+    """CREATE TABLE IF NOT EXISTS names (
+        id INTEGER PRIMARY KEY,
+        name TEXT UNIQUE NOT NULL,
+        tld TEXT NOT NULL,
+        status INTEGER,
+        checked_at INTEGER
+    )""",
+    "CREATE INDEX IF NOT EXISTS names_tld ON names (tld)",
+    """CREATE TABLE IF NOT EXISTS results (
+        name_id INTEGER NOT NULL,
+        checked_at INTEGER NOT NULL,
+        status INTEGER NOT NULL,
+        source INTEGER NOT NULL,
+        changed INTEGER NOT NULL,
+        PRIMARY KEY (name_id, checked_at)
+    ) WITHOUT ROWID""",
+    "CREATE INDEX IF NOT EXISTS results_time ON results (checked_at)",
+    "CREATE INDEX IF NOT EXISTS results_changes ON results (checked_at, status) WHERE changed = 1",
+)
+
+
+@dataclass
+class Record:
+    """One recorded availability result."""
+
+    domain_name: str
+    tld: str
+    status: str
+    checked_at: int
+    source: str
+    changed: bool
+
+
+def tld_of(domain_name: str) -> str:
+    """Return the part of a domain name after its first label, e.g., io or co.uk."""
+    return domain_name.split(".", 1)[1] if "." in domain_name else domain_name
+
+
+def parse_time(text: str, now: Optional[float] = None) -> int:
+    """Parse a point in time given as an age or a date.
+
+    Args:
+        text: Age such as 30m, 12h, 7d or 2w, or an ISO date or date and time
+            (UTC unless it has an offset)
+        now: Current time as a Unix timestamp (default: the current time)
+
+    Returns:
+        int: Unix timestamp
+
+    Raises:
+        ValueError: If the text is neither an age nor a date
+    """
+    match = _DURATION.match(text.strip())
+    if match:
+        age = int(match.group(1)) * _DURATION_SECONDS[match.group(2)]
+        return int((time.time() if now is None else now) - age)
+    try:
+        moment = datetime.fromisoformat(text.strip().replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError(f"Invalid time {text!r}: use an age such as 7d or an ISO date") from None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp())
+
+
+def format_time(timestamp: int) -> str:
+    """Format a Unix timestamp as an ISO date and time in UTC."""
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class HistoryStore:
+    """Time series of availability results in an SQLite database."""
+
+    def __init__(self, path: str = DEFAULT_HISTORY_PATH) -> None:
+        """Open or create the database.
+
+        Args:
+            path: Database path
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.execute(f"PRAGMA cache_size = -{HISTORY_CACHE_KIB}")
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.execute("PRAGMA synchronous = NORMAL")
+        with self._db:
+            for statement in _SCHEMA:
+                self._db.execute(statement)
+        self._labels: Dict[str, int] = {
+            value: label for label, value in self._db.execute("SELECT id, value FROM labels")
+        }
+
+    def _label(self, value: str) -> int:
+        """Return the ID of a status or source, adding it if it is new."""
+        label = self._labels.get(value)
+        if label is None:
+            cursor = self._db.execute("INSERT INTO labels (value) VALUES (?)", (value,))
+            label = self._labels[value] = int(cursor.lastrowid or 0)
+        return label
+
+    def _names(self, names: List[str]) -> Dict[str, Tuple[int, Optional[int], Optional[int]]]:
+        """Return the ID, latest status and latest check time of known names."""
+        known: Dict[str, Tuple[int, Optional[int], Optional[int]]] = {}
+        for i in range(0, len(names), _QUERY_BATCH):
+            batch = names[i : i + _QUERY_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._db.execute(
+                f"SELECT name, id, status, checked_at FROM names WHERE name IN ({placeholders})",
+                batch,
+            )
+            known.update((name, (id_, status, at)) for name, id_, status, at in rows)
+        return known
+
+    def record(
+        self, results: Iterable[Tuple[str, str, str]], checked_at: Optional[float] = None
+    ) -> int:
+        """Record a batch of results in one transaction.
+
+        A name's first result is not counted as a change, as its earlier
+        status is unknown.
+
+        Args:
+            results: (domain name, status, source) of each result; the source
+                tells where it came from, e.g., the AWS profile
+            checked_at: Unix timestamp of the results (default: now)
+
+        Returns:
+            int: Number of results recorded
+        """
+        batch = list(results)
+        if not batch:
+            return 0
+        at = int(time.time() if checked_at is None else checked_at)
+        with self._db:
+            names = list(dict.fromkeys(name for name, _, _ in batch))
+            known = self._names(names)
+            new = [name for name in names if name not in known]
+            if new:
+                self._db.executemany(
+                    "INSERT INTO names (name, tld) VALUES (?, ?)",
+                    ((name, tld_of(name)) for name in new),
+                )
+                known.update(self._names(new))
+            rows = []
+            for name, status, source in batch:
+                name_id, latest, latest_at = known[name]
+                status_id = self._label(status)
+                current = latest_at is None or at >= latest_at
+                changed = current and latest is not None and latest != status_id
+                rows.append((name_id, at, status_id, self._label(source), int(changed)))
+                if current:
+                    known[name] = (name_id, status_id, at)
+            self._db.executemany(
+                "INSERT OR REPLACE INTO results (name_id, checked_at, status, source, changed) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._db.executemany(
+                "UPDATE names SET status = ?, checked_at = ? WHERE id = ?",
+                ((status, at, name_id) for name_id, status, at in (known[n] for n in names)),
+            )
+        return len(rows)
+
+    def query(
+        self,
+        domain_name: Optional[str] = None,
+        tld: Optional[str] = None,
+        status: Optional[str] = None,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+        changes_only: bool = False,
+        limit: Optional[int] = None,
+    ) -> List[Record]:
+        """Return recorded results, newest first.
+
+        Args:
+            domain_name: Only results of this name
+            tld: Only results of names under this TLD (e.g., io)
+            status: Only results with this status (e.g., AVAILABLE)
+            since: Only results checked at or after this Unix timestamp
+            until: Only results checked before this Unix timestamp
+            changes_only: Only results that changed their name's status
+            limit: Maximum number of results
+
+        Returns:
+            List[Record]: Matching results
+        """
+        conditions = []
+        params: List[object] = []
+        for clause, value in (
+            ("n.name = ?", domain_name),
+            ("n.tld = ?", tld),
+            ("r.checked_at >= ?", since),
+            ("r.checked_at < ?", until),
+        ):
+            if value is not None:
+                conditions.append(clause)
+                params.append(value)
+        if status is not None:
+            if status not in self._labels:
+                return []
+            conditions.append("r.status = ?")
+            params.append(self._labels[status])
+        if changes_only:
+            conditions.append("r.changed = 1")
+        sql = (
+            "SELECT n.name, n.tld, s.value, r.checked_at, src.value, r.changed "
+            "FROM results r JOIN names n ON n.id = r.name_id "
+            "JOIN labels s ON s.id = r.status JOIN labels src ON src.id = r.source"
+        )
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY r.checked_at DESC, n.name"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [
+            Record(name, tld_, status_, at, source, bool(changed))
+            for name, tld_, status_, at, source, changed in self._db.execute(sql, params)
+        ]
+
+    def last_change(self, domain_name: str) -> Optional[Record]:
+        """Return the latest result that changed a name's status, if any."""
+        records = self.query(domain_name=domain_name, changes_only=True, limit=1)
+        return records[0] if records else None
+
+    def count_latest(self, status: str) -> int:
+        """Return the number of names whose latest status is the given one."""
+        if status not in self._labels:
+            return 0
+        row = self._db.execute(
+            "SELECT COUNT(*) FROM names WHERE status = ?", (self._labels[status],)
+        ).fetchone()
+        return int(row[0])
+
+    def names_latest(self, status: str) -> Iterator[str]:
+        """Yield the names whose latest status is the given one, without loading them all."""
+        if status not in self._labels:
+            return
+        for (name,) in self._db.execute(
+            "SELECT name FROM names WHERE status = ?", (self._labels[status],)
+        ):
+            yield name
+
+    def prune(self, before: int) -> int:
+        """Delete every result checked before a time.
+
+        The latest status of each name is kept, so later changes are still
+        detected.
+
+        Args:
+            before: Unix timestamp
+
+        Returns:
+            int: Number of results deleted
+        """
+        with self._db:
+            cursor = self._db.execute("DELETE FROM results WHERE checked_at < ?", (before,))
+        return cursor.rowcount
+
+    def compact(self, before: int) -> int:
+        """Drop the unchanged repeats among the results checked before a time.
+
+        Changes are kept, as are each name's first and latest results, so the
+        status of a name at any time can still be told.
+
+        Args:
+            before: Unix timestamp
+
+        Returns:
+            int: Number of results deleted
+        """
+        with self._db:
+            cursor = self._db.execute(
+                "DELETE FROM results WHERE checked_at < ? AND changed = 0 "
+                "AND checked_at > (SELECT MIN(first.checked_at) FROM results first "
+                "WHERE first.name_id = results.name_id) "
+                "AND checked_at < (SELECT n.checked_at FROM names n WHERE n.id = results.name_id)",
+                (before,),
+            )
+        return cursor.rowcount
+
+    def vacuum(self) -> None:
+        """Return the space of deleted results to the file system."""
+        self._db.execute("VACUUM")
+
+    def __len__(self) -> int:
+        """Return the number of recorded results."""
+        return int(self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0])
+
+    def close(self) -> None:
+        """Close the database."""
+        self._db.close()
+
+    def __enter__(self) -> "HistoryStore":
+        """Return the store."""
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        """Close the database."""
+        self.close()
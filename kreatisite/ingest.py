@@ -0,0 +1,189 @@
+"""Resumable streaming ingestion of domain name lists for Kreatisite CLI.
+
+Candidate lists are read lazily, plain or gzipped or from stdin, and handed
+out in fixed-size chunks. Names already seen are kept in an SQLite database
+on disk rather than in memory, which also serves as the checkpoint: each
+chunk's names and the input offset after it are committed in one
+transaction, so an interrupted sweep resumes after the last committed chunk.
+"""
+
+import gzip
+import io
+import itertools
+import os
+import sqlite3
+import sys
+import tempfile
+from typing import IO, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .defaults import DEFAULT_CHUNK_SIZE
+
+# Page cache of the seen-names database, in KiB; the rest stays on disk
+SEEN_CACHE_KIB = 8192
+# SQLite limits the number of parameters of one statement
+_QUERY_BATCH = 500
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+class IngestError(Exception):
+    """Raised when a checkpoint does not match the input being read."""
+
+
+def open_names(path: str) -> IO[str]:
+    """Open a list of names for lazy reading.
+
+    Args:
+        path: File path, gzip-compressed or plain, or "-" for standard input
+
+    Returns:
+        IO[str]: Text stream of the list
+    """
+    if path == "-":
+        return sys.stdin
+    buffered = open(path, "rb")
+    if buffered.peek(2)[:2] == _GZIP_MAGIC:
+        return io.TextIOWrapper(gzip.GzipFile(fileobj=buffered), encoding="utf-8")
+    return io.TextIOWrapper(buffered, encoding="utf-8")
+
+
+def iter_domain_names(path: str) -> Iterator[str]:
+    """Yield domain names from a list, one per line, without loading it.
+
+    Blank lines and everything after a # are ignored.
+
+    Args:
+        path: File path, gzip-compressed or plain, or "-" for standard input
+
+    Yields:
+        str: Domain names
+    """
+    f = open_names(path)
+    try:
+        for line in f:
+            name = line.split("#", 1)[0].strip()
+            if name:
+                yield name
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+class SeenNames:
+    """Disk-backed set of the names already checked, with the committed input offset.
+
+    Without a path the database is a temporary file, removed on close, so
+    deduplication still uses bounded memory.
+    """
+
+    def __init__(self, path: Optional[str] = None, source: str = "") -> None:
+        """Open or create the database.
+
+        Args:
+            path: Checkpoint database path (None: temporary)
+            source: Description of the input (e.g., its path); resuming a
+                checkpoint of another input is refused
+
+        Raises:
+            IngestError: If the checkpoint was written for another input
+        """
+        self._temporary = path is None
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix="kreatisite-seen-", suffix=".db")
+            os.close(fd)
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.execute(f"PRAGMA cache_size = -{SEEN_CACHE_KIB}")
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.execute("PRAGMA synchronous = NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS seen (name TEXT PRIMARY KEY) WITHOUT ROWID")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._db.commit()
+        recorded = self._get("source")
+        if recorded is None:
+            self._set("source", source)
+            self._db.commit()
+        elif recorded != source:
+            self.close()
+            raise IngestError(f"Checkpoint {path} belongs to another input ({recorded})")
+
+    def _get(self, key: str) -> Optional[str]:
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return None if row is None else str(row[0])
+
+    def _set(self, key: str, value: str) -> None:
+        self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    @property
+    def offset(self) -> int:
+        """Return the number of input names consumed by committed chunks."""
+        return int(self._get("offset") or 0)
+
+    def __len__(self) -> int:
+        """Return the number of distinct names committed."""
+        return int(self._db.execute("SELECT COUNT(*) FROM seen").fetchone()[0])
+
+    def unseen(self, names: Iterable[str]) -> List[str]:
+        """Return the distinct names not committed yet, in the given order."""
+        candidates = list(dict.fromkeys(names))
+        seen: Set[str] = set()
+        for i in range(0, len(candidates), _QUERY_BATCH):
+            batch = candidates[i : i + _QUERY_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._db.execute(f"SELECT name FROM seen WHERE name IN ({placeholders})", batch)
+            seen.update(row[0] for row in rows)
+        return [name for name in candidates if name not in seen]
+
+    def commit(self, names: Iterable[str], offset: int) -> None:
+        """Record checked names and the input offset they bring the sweep to, atomically."""
+        with self._db:
+            self._db.executemany(
+                "INSERT OR IGNORE INTO seen (name) VALUES (?)", ((name,) for name in names)
+            )
+            self._set("offset", str(offset))
+
+    def close(self) -> None:
+        """Close the database, removing it if it was temporary."""
+        self._db.close()
+        if self._temporary:
+            for suffix in ("", "-wal", "-shm"):
+                try:
+                    os.remove(self.path + suffix)
+                except FileNotFoundError:
+                    pass
+
+    def __enter__(self) -> "SeenNames":
+        """Return the set."""
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        """Close the database."""
+        self.close()
+
+
+def stream_chunks(
+    names: Iterable[str], seen: SeenNames, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[Tuple[List[str], int]]:
+    """Split a stream of names into chunks of names that still need checking.
+
+    Names before the committed offset are skipped without being checked, as
+    are names seen before. The caller checks each chunk and then commits it
+    with seen.commit(chunk, offset).
+
+    Args:
+        names: Stream of names, normalized by the caller
+        seen: Seen names and committed offset
+        chunk_size: Number of input names per chunk
+
+    Yields:
+        Tuple[List[str], int]: Names to check, and the input offset after the chunk
+    """
+    offset = seen.offset
+    stream = itertools.islice(names, offset, None)
+    while True:
+        chunk = list(itertools.islice(stream, chunk_size))
+        if not chunk:
+            return
+        offset += len(chunk)
+        yield seen.unseen(chunk), offset
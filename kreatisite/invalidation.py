@@ -0,0 +1,187 @@
+"""CloudFront invalidation functions for Kreatisite CLI."""
+
+import posixpath
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set
+from urllib.parse import quote
+
+from .aws import call
+from .build import is_fingerprinted
+from .defaults import DEFAULT_MAX_PATHS
+from .waiter import wait_until
+
+# CloudFront allows at most 15 wildcard paths in flight per distribution
+MAX_WILDCARD_PATHS = 15
+# A directory is replaced by a wildcard once this share of its files changed
+DEFAULT_MIN_COVERAGE = 0.5
+DEFAULT_WAIT_TIMEOUT = 1800.0
+
+
+def _ancestors(key: str) -> List[str]:
+    """Return the directories containing a key, from the root ("") downwards."""
+    parts = key.split("/")[:-1]
+    return [""] + ["/".join(parts[: i + 1]) for i in range(len(parts))]
+
+
+def _urls(key: str) -> List[str]:
+    """Return the URL paths under which an object is served."""
+    urls = ["/" + key]
+    if posixpath.basename(key) == "index.html":
+        directory = posixpath.dirname(key)
+        urls.append(f"/{directory}/" if directory else "/")
+    return urls
+
+
+def _wildcard(directory: str) -> str:
+    """Return the wildcard path covering a directory."""
+    return f"/{directory}/*" if directory else "/*"
+
+
+def _under(key: str, directory: str) -> bool:
+    """Check whether a key or directory lies inside a directory."""
+    return directory == "" or key == directory or key.startswith(directory + "/")
+
+
+def _is_immutable(key: str) -> bool:
+    """Check whether a key is a fingerprinted asset (or its precompressed variant)."""
+    return is_fingerprinted(key[:-3] if key.endswith(".gz") else key)
+
+
+def plan_invalidation(
+    changed_keys: Iterable[str],
+    site_keys: Optional[Iterable[str]] = None,
+    max_paths: int = DEFAULT_MAX_PATHS,
+    min_coverage: float = DEFAULT_MIN_COVERAGE,
+) -> List[str]:
+    """Collapse changed object keys into a minimal list of invalidation paths.
+
+    Fingerprinted assets are skipped since their URLs never change content. A
+    directory is invalidated with a single wildcard when at least min_coverage of
+    its files changed. Further directories are then collapsed, picking the one
+    that invalidates the fewest unchanged files per path saved, until the plan
+    fits in max_paths paths and the wildcard limit.
+
+    Args:
+        changed_keys: Keys uploaded, copied or deleted by a deploy
+        site_keys: All keys of the deployed site (default: only the changed keys)
+        max_paths: Maximum number of paths in the plan
+        min_coverage: Share of changed files from which a directory is wildcarded
+
+    Returns:
+        List[str]: Sorted, URL-encoded invalidation paths
+    """
+    changed = sorted({key for key in changed_keys if not _is_immutable(key)})
+    if not changed:
+        return []
+    changed_set = set(changed)
+    everything = changed_set | {key for key in site_keys or [] if not _is_immutable(key)}
+
+    changed_count: Counter = Counter()
+    total_count: Counter = Counter()
+    for key in everything:
+        for directory in _ancestors(key):
+            total_count[directory] += 1
+            if key in changed_set:
+                changed_count[directory] += 1
+
+    selected: Set[str] = set()
+    for directory in sorted(changed_count, key=lambda d: (d.count("/") if d else -1, d)):
+        if any(_under(directory, s) for s in selected):
+            continue
+        count = changed_count[directory]
+        if count >= 2 and count / total_count[directory] >= min_coverage:
+            selected.add(directory)
+
+    def entries() -> Dict[str, List[str]]:
+        """Group the current plan by path, mapping each to the keys/dirs it stands for."""
+        plan: Dict[str, List[str]] = {_wildcard(d): [d] for d in selected}
+        for key in changed:
+            if not any(_under(key, d) for d in selected):
+                for url in _urls(key):
+                    plan[url] = [key]
+        return plan
+
+    plan = entries()
+    while len(plan) > max_paths or len(selected) > MAX_WILDCARD_PATHS:
+        # Count, per directory, the plan paths (and wildcards) a wildcard there would replace
+        covered: Counter = Counter()
+        covered_wildcards: Counter = Counter()
+        for path, members in plan.items():
+            is_wildcard = path.endswith("*")
+            member = members[0]
+            for directory in _ancestors(member) + ([member] if is_wildcard else []):
+                covered[directory] += 1
+                covered_wildcards[directory] += is_wildcard
+        counts = covered_wildcards if len(selected) > MAX_WILDCARD_PATHS else covered
+        candidates = [d for d in counts if counts[d] >= 2 and d not in selected]
+        if not candidates:
+            break
+        # Prefer the wildcard that needlessly invalidates the fewest files per path saved
+        best = min(
+            candidates,
+            key=lambda d: (
+                (total_count[d] - changed_count[d]) / (counts[d] - 1),
+                -(d.count("/") if d else -1),
+            ),
+        )
+        selected = {s for s in selected if not _under(s, best)} | {best}
+        plan = entries()
+    return sorted(quote(path, safe="/*") for path in plan)
+
+
+def create_invalidation(
+    distribution_id: str, paths: List[str], endpoint_url: Optional[str] = None
+) -> str:
+    """Submit all paths as a single CloudFront invalidation.
+
+    Args:
+        distribution_id: CloudFront distribution ID
+        paths: Paths from plan_invalidation()
+        endpoint_url: Alternative CloudFront endpoint
+
+    Returns:
+        str: Invalidation ID
+    """
+    batch = {
+        "Paths": {"Quantity": len(paths), "Items": paths},
+        "CallerReference": f"kreatisite-{time.time_ns()}",
+    }
+    response = call(
+        "cloudfront",
+        "CreateInvalidation",
+        {"DistributionId": distribution_id, "InvalidationBatch": batch},
+        endpoint_url,
+    )
+    invalidation_id: str = response["Invalidation"]["Id"]
+    return invalidation_id
+
+
+def wait_for_invalidation(
+    distribution_id: str,
+    invalidation_id: str,
+    timeout: float = DEFAULT_WAIT_TIMEOUT,
+    endpoint_url: Optional[str] = None,
+) -> None:
+    """Wait with exponential backoff until an invalidation has completed.
+
+    Args:
+        distribution_id: CloudFront distribution ID
+        invalidation_id: ID returned by create_invalidation()
+        timeout: Maximum number of seconds to wait
+        endpoint_url: Alternative CloudFront endpoint
+
+    Raises:
+        TimeoutError: If the invalidation does not complete in time
+    """
+
+    def completed() -> bool:
+        response = call(
+            "cloudfront",
+            "GetInvalidation",
+            {"DistributionId": distribution_id, "Id": invalidation_id},
+            endpoint_url,
+        )
+        return bool(response["Invalidation"]["Status"] == "Completed")
+
+    wait_until(completed, timeout)
@@ -0,0 +1,53 @@
+"""AWS resource inventory functions for Kreatisite CLI."""
+
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional
+
+from .aws import call
+from .defaults import DEFAULT_INVENTORY_REGIONS
+from .domains import DOMAINS_REGION
+
+
+@dataclass
+class Resource:
+    """A site resource found in an AWS account."""
+
+    kind: str
+    name: str
+    region: Optional[str] = None
+    detail: str = ""
+
+
+def list_resources(regions: Iterable[str] = DEFAULT_INVENTORY_REGIONS) -> Iterator[Resource]:
+    """List the registered domains, hosted zones and certificates of an account.
+
+    Args:
+        regions: Regions to list ACM certificates in (domains and zones are global)
+
+    Yields:
+        Resource: Resources, listed one kind at a time
+    """
+    response = call("route53domains", "ListDomains", region=DOMAINS_REGION)
+    for domain in response.get("Domains", []):
+        detail = "auto-renew" if domain.get("AutoRenew") else "no auto-renew"
+        if domain.get("Expiry"):
+            detail += f", expires {domain['Expiry']}"
+        yield Resource("domain", domain["DomainName"], detail=detail)
+
+    response = call("route53", "ListHostedZones")
+    for zone in response.get("HostedZones", []):
+        private = zone.get("Config", {}).get("PrivateZone")
+        detail = f"{zone.get('ResourceRecordSetCount', 0)} records"
+        yield Resource(
+            "zone", zone["Name"].rstrip("."), detail=detail + (", private" if private else "")
+        )
+
+    for region in regions:
+        response = call("acm", "ListCertificates", region=region)
+        for certificate in response.get("CertificateSummaryList", []):
+            yield Resource(
+                "certificate",
+                certificate["DomainName"],
+                region=region,
+                detail=certificate.get("Status", ""),
+            )
@@ -0,0 +1,355 @@
+"""Site launch pipeline for Kreatisite CLI."""
+
+import json
+import os
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .aws import AwsError, call
+from .build import DEFAULT_CACHE_DIR, build_site
+from .cert import provision_certificates
+from .defaults import DEFAULT_BUCKET_REGION
+from .deploy import deploy_site
+from .dns import list_hosted_zones, normalize_name, submit_changes
+from .domains import DOMAINS_REGION, read_contacts, registration_params
+from .pipeline import Step
+from .waiter import wait_until
+
+DEFAULT_REGISTER_TIMEOUT = 3600.0
+# Hosted zone ID used by every CloudFront alias target
+CLOUDFRONT_HOSTED_ZONE_ID = "Z2FDTNDATAQYW2"
+# AWS managed "CachingOptimized" cache policy
+CACHING_OPTIMIZED_POLICY_ID = "658327ea-f89d-4fab-a63d-7e88639e58f6"
+
+
+def checkpoint_path(domain_name: str, cache_dir: str = DEFAULT_CACHE_DIR) -> str:
+    """Return the default checkpoint file of a site launch.
+
+    Args:
+        domain_name: Site domain name
+        cache_dir: Cache directory
+
+    Returns:
+        str: Checkpoint file path
+    """
+    return os.path.join(cache_dir, f"launch-{domain_name}.json")
+
+
+def register(domain_name: str, config_file: str, timeout: float = DEFAULT_REGISTER_TIMEOUT) -> str:
+    """Register a domain, unless the account already owns it, and wait for completion.
+
+    Args:
+        domain_name: Domain name
+        config_file: YAML file with the admin, registrant and tech contacts
+        timeout: Maximum number of seconds to wait for the registration
+
+    Returns:
+        str: "owned" if the domain was already registered, else "registered"
+    """
+    response = call("route53domains", "ListDomains", region=DOMAINS_REGION)
+    if any(d["DomainName"] == domain_name for d in response.get("Domains", [])):
+        return "owned"
+
+    params = registration_params(domain_name, read_contacts(config_file))
+    response = call("route53domains", "RegisterDomain", params, region=DOMAINS_REGION)
+    operation_id = response["OperationId"]
+
+    def registered() -> bool:
+        detail = call(
+            "route53domains",
+            "GetOperationDetail",
+            {"OperationId": operation_id},
+            region=DOMAINS_REGION,
+        )
+        if detail["Status"] in ("ERROR", "FAILED"):
+            raise AwsError(f"Registration of {domain_name} failed: {detail.get('Message', '')}")
+        return bool(detail["Status"] == "SUCCESSFUL")
+
+    wait_until(registered, timeout, initial=10.0, maximum=60.0)
+    return "registered"
+
+
+def ensure_hosted_zone(domain_name: str) -> str:
+    """Return the hosted zone of a domain, creating it if needed.
+
+    Args:
+        domain_name: Domain name
+
+    Returns:
+        str: Hosted zone ID
+    """
+    apex = normalize_name(domain_name)
+    for zone in list_hosted_zones():
+        if zone["Name"] == apex:
+            return str(zone["Id"]).split("/")[-1]
+    response = call(
+        "route53",
+        "CreateHostedZone",
+        {"Name": domain_name, "CallerReference": f"kreatisite-{domain_name}"},
+    )
+    return str(response["HostedZone"]["Id"]).split("/")[-1]
+
+
+def ensure_bucket(bucket: str, region: str = DEFAULT_BUCKET_REGION) -> str:
+    """Create a private bucket for the site, if the account does not own it yet.
+
+    Args:
+        bucket: Bucket name
+        region: Bucket region
+
+    Returns:
+        str: Bucket name
+    """
+    params: Dict[str, Any] = {"Bucket": bucket}
+    if region != "us-east-1":
+        params["CreateBucketConfiguration"] = {"LocationConstraint": region}
+    try:
+        call("s3", "CreateBucket", params, region=region)
+    except AwsError as e:
+        if e.code != "BucketAlreadyOwnedByYou":
+            raise
+    block = {
+        "BlockPublicAcls": True,
+        "IgnorePublicAcls": True,
+        "BlockPublicPolicy": True,
+        "RestrictPublicBuckets": True,
+    }
+    call(
+        "s3",
+        "PutPublicAccessBlock",
+        {"Bucket": bucket, "PublicAccessBlockConfiguration": block},
+        region=region,
+    )
+    return bucket
+
+
+def create_distribution(
+    domain_name: str, bucket: str, certificate_arn: str, region: str = DEFAULT_BUCKET_REGION
+) -> Dict[str, str]:
+    """Create a CloudFront distribution serving the bucket over HTTPS.
+
+    The bucket stays private; CloudFront reads it through an origin access
+    control that the bucket policy grants read access to. A distribution or
+    origin access control left by an earlier, interrupted run is reused, so
+    the step can be rerun.
+
+    Args:
+        domain_name: Site domain name (served with and without www)
+        bucket: Site bucket
+        certificate_arn: ACM certificate covering the site's names
+        region: Bucket region
+
+    Returns:
+        Dict[str, str]: Distribution ID, ARN and CloudFront domain name
+    """
+    distribution = find_distribution(domain_name)
+    if distribution is None:
+        distribution = _create_distribution(domain_name, bucket, certificate_arn, region)
+
+    policy = {
+        "Version": "2012-10-17",
+        "Statement": [
+            {
+                "Effect": "Allow",
+                "Principal": {"Service": "cloudfront.amazonaws.com"},
+                "Action": "s3:GetObject",
+                "Resource": f"arn:aws:s3:::{bucket}/*",
+                "Condition": {"StringEquals": {"AWS:SourceArn": distribution["ARN"]}},
+            }
+        ],
+    }
+    call("s3", "PutBucketPolicy", {"Bucket": bucket, "Policy": json.dumps(policy)}, region=region)
+    return {
+        "id": distribution["Id"],
+        "arn": distribution["ARN"],
+        "domain_name": distribution["DomainName"],
+    }
+
+
+def _list_all(operation: str, list_key: str) -> Iterator[Dict[str, Any]]:
+    """Yield every item of a paginated CloudFront listing."""
+    params: Dict[str, Any] = {}
+    while True:
+        listing = call("cloudfront", operation, params).get(list_key, {})
+        yield from listing.get("Items") or []
+        if not listing.get("IsTruncated"):
+            return
+        params = {"Marker": listing["NextMarker"]}
+
+
+def find_distribution(domain_name: str) -> Optional[Dict[str, Any]]:
+    """Return the CloudFront distribution serving a site, if one exists.
+
+    Args:
+        domain_name: Site domain name, one of the distribution's aliases
+
+    Returns:
+        Optional[Dict[str, Any]]: Distribution summary with Id, ARN and DomainName
+    """
+    for distribution in _list_all("ListDistributions", "DistributionList"):
+        if domain_name in (distribution.get("Aliases", {}).get("Items") or []):
+            return distribution
+    return None
+
+
+def ensure_origin_access_control(name: str) -> str:
+    """Return the ID of the S3 origin access control with a name, creating it if needed.
+
+    Args:
+        name: Origin access control name
+
+    Returns:
+        str: Origin access control ID
+    """
+    for oac in _list_all("ListOriginAccessControls", "OriginAccessControlList"):
+        if oac.get("Name") == name:
+            return str(oac["Id"])
+    response = call(
+        "cloudfront",
+        "CreateOriginAccessControl",
+        {
+            "OriginAccessControlConfig": {
+                "Name": name,
+                "SigningProtocol": "sigv4",
+                "SigningBehavior": "always",
+                "OriginAccessControlOriginType": "s3",
+            }
+        },
+    )
+    return str(response["OriginAccessControl"]["Id"])
+
+
+def _create_distribution(
+    domain_name: str, bucket: str, certificate_arn: str, region: str
+) -> Dict[str, Any]:
+    """Create the distribution of a site and return it."""
+    oac_id = ensure_origin_access_control(f"kreatisite-{domain_name}")
+    config = {
+        "CallerReference": f"kreatisite-{domain_name}",
+        "Comment": domain_name,
+        "Enabled": True,
+        "Aliases": {"Quantity": 2, "Items": [domain_name, f"www.{domain_name}"]},
+        "DefaultRootObject": "index.html",
+        "HttpVersion": "http2and3",
+        "IsIPV6Enabled": True,
+        "Origins": {
+            "Quantity": 1,
+            "Items": [
+                {
+                    "Id": "site",
+                    "DomainName": f"{bucket}.s3.{region}.amazonaws.com",
+                    "S3OriginConfig": {"OriginAccessIdentity": ""},
+                    "OriginAccessControlId": oac_id,
+                }
+            ],
+        },
+        "DefaultCacheBehavior": {
+            "TargetOriginId": "site",
+            "ViewerProtocolPolicy": "redirect-to-https",
+            "CachePolicyId": CACHING_OPTIMIZED_POLICY_ID,
+            "Compress": True,
+        },
+        "ViewerCertificate": {
+            "ACMCertificateArn": certificate_arn,
+            "SSLSupportMethod": "sni-only",
+            "MinimumProtocolVersion": "TLSv1.2_2021",
+        },
+    }
+    response = call("cloudfront", "CreateDistribution", {"DistributionConfig": config})
+    return dict(response["Distribution"])
+
+
+def alias_changes(domain_name: str, target: str) -> List[Dict[str, Any]]:
+    """Return the changes pointing a site's apex and www names at CloudFront.
+
+    Args:
+        domain_name: Site domain name
+        target: CloudFront distribution domain name
+
+    Returns:
+        List[Dict[str, Any]]: UPSERT changes for A and AAAA alias records
+    """
+    return [
+        {
+            "Action": "UPSERT",
+            "ResourceRecordSet": {
+                "Name": normalize_name(name),
+                "Type": record_type,
+                "AliasTarget": {
+                    "HostedZoneId": CLOUDFRONT_HOSTED_ZONE_ID,
+                    "DNSName": normalize_name(target),
+                    "EvaluateTargetHealth": False,
+                },
+            },
+        }
+        for name in (domain_name, f"www.{domain_name}")
+        for record_type in ("A", "AAAA")
+    ]
+
+
+def launch_steps(
+    domain_name: str,
+    config_file: str,
+    source_dir: str,
+    output_dir: str,
+    bucket_region: str = DEFAULT_BUCKET_REGION,
+    register_domain: bool = True,
+    log: Callable[[str], None] = print,
+) -> List[Step]:
+    """Return the steps that take a site from domain registration to deployed content.
+
+    Independent steps (e.g., the bucket, the site build and the certificate)
+    run concurrently; each step only waits for the results it needs.
+
+    Args:
+        domain_name: Site domain name, also used as the bucket name
+        config_file: YAML file with the domain contacts
+        source_dir: Site sources
+        output_dir: Build output directory
+        bucket_region: Region of the site bucket
+        register_domain: Whether to register the domain if the account does not own it
+        log: Function used to report progress from within steps
+
+    Returns:
+        List[Step]: Pipeline steps
+    """
+
+    def quiet(_: str) -> None:
+        pass
+
+    def register_step(ctx: Dict[str, Any]) -> str:
+        return register(domain_name, config_file) if register_domain else "skipped"
+
+    def zone_step(ctx: Dict[str, Any]) -> str:
+        return ensure_hosted_zone(domain_name)
+
+    def cert_step(ctx: Dict[str, Any]) -> str:
+        return provision_certificates([domain_name], log=quiet)[domain_name]
+
+    def bucket_step(ctx: Dict[str, Any]) -> str:
+        return ensure_bucket(domain_name, bucket_region)
+
+    def cdn_step(ctx: Dict[str, Any]) -> Dict[str, str]:
+        return create_distribution(domain_name, ctx["bucket"], ctx["cert"], bucket_region)
+
+    def dns_step(ctx: Dict[str, Any]) -> List[str]:
+        changes = alias_changes(domain_name, ctx["cdn"]["domain_name"])
+        return submit_changes(ctx["zone"], changes)
+
+    def build_step(ctx: Dict[str, Any]) -> int:
+        base_url = f"https://{domain_name}"
+        return len(build_site(source_dir, output_dir, base_url=base_url, log=quiet).files)
+
+    def deploy_step(ctx: Dict[str, Any]) -> int:
+        plan = deploy_site(output_dir, ctx["bucket"], log=log)
+        return len(plan.changed_keys)
+
+    return [
+        Step("register", register_step),
+        Step("zone", zone_step, ("register",)),
+        Step("cert", cert_step, ("zone",)),
+        Step("bucket", bucket_step),
+        Step("cdn", cdn_step, ("cert", "bucket")),
+        Step("dns", dns_step, ("zone", "cdn")),
+        Step("build", build_step),
+        Step("deploy", deploy_step, ("bucket", "build")),
+    ]
@@ -0,0 +1,316 @@
+"""Link checking functions for Kreatisite CLI."""
+
+import json
+import os
+import posixpath
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import unquote, urldefrag, urljoin, urlsplit
+
+from .build import HTML_EXTENSIONS, iter_source_files
+from .defaults import DEFAULT_EXTERNAL_JOBS, DEFAULT_HOST_RATE
+from .defaults import DEFAULT_LINK_TIMEOUT as DEFAULT_TIMEOUT
+from .pages import page_url
+from .ratelimit import KeyedRateLimiter
+
+DEFAULT_CACHE_TTL = 24 * 3600
+USER_AGENT = "kreatisite-link-checker"
+
+# Attributes holding a single URL, by tag
+_LINK_ATTRIBUTES = {
+    "a": "href",
+    "area": "href",
+    "link": "href",
+    "img": "src",
+    "script": "src",
+    "iframe": "src",
+    "source": "src",
+    "video": "src",
+    "audio": "src",
+    "track": "src",
+    "embed": "src",
+}
+_IGNORED_SCHEMES = ("mailto:", "tel:", "javascript:", "data:", "sms:")
+# Fragments browsers resolve without a matching id
+_IMPLICIT_FRAGMENTS = frozenset({"", "top"})
+
+
+@dataclass
+class PageLinks:
+    """Anchors defined by a page and the links it contains."""
+
+    path: str
+    ids: List[str] = field(default_factory=list)
+    links: List[Tuple[int, str]] = field(default_factory=list)
+
+
+@dataclass
+class BrokenLink:
+    """A link that does not resolve."""
+
+    page: str
+    line: int
+    url: str
+    reason: str
+
+
+@dataclass
+class LinkReport:
+    """Result of checking the links of a site."""
+
+    pages: int = 0
+    links: int = 0
+    external: int = 0
+    broken: List[BrokenLink] = field(default_factory=list)
+
+
+class _LinkParser(HTMLParser):
+    """Collect the ids and links of an HTML page."""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.ids: List[str] = []
+        self.links: List[Tuple[int, str]] = []
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        values = dict(attrs)
+        line = self.getpos()[0]
+        if values.get("id"):
+            self.ids.append(str(values["id"]))
+        if tag == "a" and values.get("name"):
+            self.ids.append(str(values["name"]))
+        attribute = _LINK_ATTRIBUTES.get(tag)
+        if attribute and values.get(attribute):
+            self.links.append((line, str(values[attribute]).strip()))
+        if values.get("srcset"):
+            for candidate in str(values["srcset"]).split(","):
+                if candidate.strip():
+                    self.links.append((line, candidate.split()[0]))
+
+
+def parse_page(output_dir: str, rel_path: str) -> PageLinks:
+    """Parse the anchors and links of one page.
+
+    Args:
+        output_dir: Build output directory
+        rel_path: Page path relative to output_dir
+
+    Returns:
+        PageLinks: Anchors and links of the page
+    """
+    parser = _LinkParser()
+    with open(os.path.join(output_dir, rel_path), "r", encoding="utf-8") as f:
+        parser.feed(f.read())
+    parser.close()
+    return PageLinks(rel_path, parser.ids, parser.links)
+
+
+def parse_pages(output_dir: str, pages: List[str], jobs: Optional[int] = None) -> List[PageLinks]:
+    """Parse pages in parallel across processes.
+
+    Args:
+        output_dir: Build output directory
+        pages: Pages relative to output_dir
+        jobs: Number of worker processes (default: CPU count)
+
+    Returns:
+        List[PageLinks]: Parsed pages, in the given order
+    """
+    workers = jobs or os.cpu_count() or 1
+    if workers == 1 or len(pages) <= 1:
+        return [parse_page(output_dir, page) for page in pages]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(parse_page, [output_dir] * len(pages), pages, chunksize=16))
+
+
+class LinkIndex:
+    """Index of every URL a site serves and the anchors defined on each page."""
+
+    def __init__(self, files: Iterable[str], pages: Iterable[PageLinks]) -> None:
+        """Build the index.
+
+        Args:
+            files: All output files relative to the output directory
+            pages: Parsed pages
+        """
+        self.urls: Set[str] = set()
+        for rel_path in files:
+            self.urls.add("/" + rel_path)
+            url = page_url(rel_path)
+            self.urls.add(unquote(url))
+            if url.endswith("/") and url != "/":
+                self.urls.add(unquote(url[:-1]))
+        self.anchors: Dict[str, Set[str]] = {}
+        for page in pages:
+            ids = set(page.ids)
+            self.anchors["/" + page.path] = ids
+            self.anchors[unquote(page_url(page.path))] = ids
+
+    def resolve(self, page: str, url: str) -> Optional[str]:
+        """Check an internal link.
+
+        Args:
+            page: Page containing the link, relative to the output directory
+            url: Link as written in the page
+
+        Returns:
+            Optional[str]: Why the link is broken, or None if it resolves
+        """
+        target, fragment = urldefrag(urljoin("/" + page, url))
+        path = unquote(urlsplit(target).path) or "/"
+        if path not in self.urls:
+            return "not found"
+        fragment = unquote(fragment)
+        anchors = self.anchors.get(path)
+        if anchors is None:
+            anchors = self.anchors.get(path + "/")
+        if anchors is not None and fragment not in _IMPLICIT_FRAGMENTS and fragment not in anchors:
+            return f"missing anchor #{fragment}"
+        return None
+
+
+def is_external(url: str) -> bool:
+    """Check whether a link points to another site."""
+    return url.startswith(("http://", "https://", "//"))
+
+
+class ExternalChecker:
+    """Check external URLs concurrently, rate limited per host, with a result cache."""
+
+    def __init__(
+        self,
+        jobs: int = DEFAULT_EXTERNAL_JOBS,
+        host_rate: float = DEFAULT_HOST_RATE,
+        timeout: float = DEFAULT_TIMEOUT,
+        cache_file: Optional[str] = None,
+        cache_ttl: float = DEFAULT_CACHE_TTL,
+    ) -> None:
+        """Initialize the checker.
+
+        Args:
+            jobs: Number of concurrent requests
+            host_rate: Requests per second sent to any one host
+            timeout: Seconds to wait for each response
+            cache_file: JSON file caching successful checks (None: no cache)
+            cache_ttl: Seconds a cached success stays valid
+        """
+        self.jobs = jobs
+        self.timeout = timeout
+        self.cache_file = cache_file
+        self.cache_ttl = cache_ttl
+        self.limiter = KeyedRateLimiter(host_rate)
+        self.requests = 0
+        self.cache: Dict[str, float] = {}
+        if cache_file and os.path.exists(cache_file):
+            with open(cache_file, "r") as f:
+                self.cache = json.load(f)
+
+    def fetch(self, url: str) -> Optional[str]:
+        """Request a URL, trying HEAD first and falling back to GET.
+
+        Args:
+            url: Absolute URL
+
+        Returns:
+            Optional[str]: Why the URL is broken, or None if it responds successfully
+        """
+        self.limiter.acquire(urlsplit(url).netloc)
+        self.requests += 1
+        for method in ("HEAD", "GET"):
+            request = urllib.request.Request(url, method=method, headers={"User-Agent": USER_AGENT})
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout):
+                    return None
+            except urllib.error.HTTPError as e:
+                if method == "HEAD" and e.code in (403, 405, 501):
+                    continue
+                return f"HTTP {e.code}"
+            except (urllib.error.URLError, OSError) as e:
+                reason = getattr(e, "reason", e)
+                return f"unreachable ({reason})"
+        return None
+
+    def check(self, urls: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Check URLs, skipping those that succeeded recently.
+
+        Args:
+            urls: Absolute URLs
+
+        Returns:
+            Dict[str, Optional[str]]: URL to failure reason (None if it works)
+        """
+        now = time.time()
+        results: Dict[str, Optional[str]] = {}
+        pending = []
+        for url in sorted(set(urls)):
+            if now - self.cache.get(url, 0) < self.cache_ttl:
+                results[url] = None
+            else:
+                pending.append(url)
+        with ThreadPoolExecutor(max_workers=max(1, self.jobs)) as pool:
+            for url, reason in zip(pending, pool.map(self.fetch, pending)):
+                results[url] = reason
+                if reason is None:
+                    self.cache[url] = now
+        if self.cache_file and pending:
+            os.makedirs(os.path.dirname(os.path.abspath(self.cache_file)), exist_ok=True)
+            with open(self.cache_file, "w") as f:
+                json.dump(self.cache, f, indent=2, sort_keys=True)
+        return results
+
+
+def check_links(
+    output_dir: str,
+    jobs: Optional[int] = None,
+    external: Optional[ExternalChecker] = None,
+    log: Callable[[str], None] = print,
+) -> LinkReport:
+    """Check every internal link and anchor of a built site, and optionally external links.
+
+    Pages are parsed once, in parallel, into an index of URLs and anchors that
+    all links are then resolved against.
+
+    Args:
+        output_dir: Build output directory
+        jobs: Number of parser processes (default: CPU count)
+        external: Checker for external links (None: skip them)
+        log: Function used to report progress
+
+    Returns:
+        LinkReport: Broken links and counts
+    """
+    files = iter_source_files(output_dir)
+    pages = [f for f in files if posixpath.splitext(f)[1].lower() in HTML_EXTENSIONS]
+    parsed = parse_pages(output_dir, pages, jobs)
+    index = LinkIndex(files, parsed)
+    report = LinkReport(pages=len(parsed))
+
+    external_links: Dict[str, List[Tuple[str, int, str]]] = {}
+    for page in parsed:
+        for line, url in page.links:
+            if not url or url.lower().startswith(_IGNORED_SCHEMES):
+                continue
+            report.links += 1
+            if is_external(url):
+                absolute = urldefrag("https:" + url if url.startswith("//") else url)[0]
+                external_links.setdefault(absolute, []).append((page.path, line, url))
+                continue
+            reason = index.resolve(page.path, url)
+            if reason:
+                report.broken.append(BrokenLink(page.path, line, url, reason))
+
+    if external is not None and external_links:
+        log(f"Checking {len(external_links)} external URLs")
+        report.external = len(external_links)
+        for absolute, reason in external.check(external_links).items():
+            if reason:
+                for page_path, line, url in external_links[absolute]:
+                    report.broken.append(BrokenLink(page_path, line, url, reason))
+
+    report.broken.sort(key=lambda b: (b.page, b.line, b.url))
+    return report
@@ -0,0 +1,346 @@
+"""Prometheus-format metrics for Kreatisite CLI.
+
+Batch runs write the metrics to a file for the node exporter's textfile
+collector; long-running commands can serve them over HTTP. Updates go to a
+per-thread shard of each metric, so recording takes no lock; shards are only
+merged when the metrics are rendered. When a thread ends, its shards are folded
+into the totals, so short-lived worker threads do not pile up shards.
+"""
+
+import bisect
+import os
+import threading
+import weakref
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+# Latency buckets in seconds, from fast API calls up to slow CLI process starts
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the exposition format."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """Format label pairs, e.g., {service="s3",operation="PutObject"}."""
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value, without a fraction for whole numbers."""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _add(totals: Dict[Labels, List[float]], shard: Dict[Labels, List[float]]) -> None:
+    """Add the values of a shard to the totals."""
+    for labels, values in list(shard.items()):
+        total = totals.setdefault(labels, [0.0] * len(values))
+        for i, value in enumerate(list(values)):
+            total[i] += value
+
+
+class _ShardHolder:
+    """Holds a thread's shard in thread-local storage; freed when the thread ends."""
+
+    __slots__ = ("shard", "__weakref__")
+
+    def __init__(self) -> None:
+        """Initialize an empty shard."""
+        self.shard: Dict[Labels, List[float]] = {}
+
+
+class Metric(ABC):
+    """A named metric with labels, recorded into per-thread shards."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        """Initialize the metric and register it for rendering.
+
+        Args:
+            name: Metric name (e.g., kreatisite_aws_calls_total)
+            help: Description shown in the HELP line
+            labels: Label names; values are passed positionally when recording
+        """
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._local = threading.local()
+        self._shards: List[Dict[Labels, List[float]]] = []
+        # Totals of the shards of threads that have ended
+        self._retired: Dict[Labels, List[float]] = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _shard(self) -> Dict[Labels, List[float]]:
+        """Return the calling thread's shard, creating it on first use."""
+        holder: Optional[_ShardHolder] = getattr(self._local, "holder", None)
+        if holder is None:
+            holder = self._local.holder = _ShardHolder()
+            with self._lock:
+                self._shards.append(holder.shard)
+            # The thread's local storage is freed when the thread ends
+            weakref.finalize(holder, self._retire, holder.shard)
+        return holder.shard
+
+    def _retire(self, shard: Dict[Labels, List[float]]) -> None:
+        """Fold the shard of an ended thread into the retired totals."""
+        with self._lock:
+            for i, live in enumerate(self._shards):
+                if live is shard:
+                    del self._shards[i]
+                    break
+            _add(self._retired, shard)
+
+    def _merged(self) -> Dict[Labels, List[float]]:
+        """Sum the shards of all threads, including those that have ended."""
+        merged: Dict[Labels, List[float]] = {}
+        with self._lock:
+            _add(merged, self._retired)
+            shards = list(self._shards)
+        for shard in shards:
+            _add(merged, shard)
+        return merged
+
+    @abstractmethod
+    def samples(self) -> List[str]:
+        """Return the sample lines of the metric."""
+
+    def render(self) -> str:
+        """Return the metric in the Prometheus text exposition format."""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        return "\n".join(lines + self.samples()) + "\n"
+
+
+class Counter(Metric):
+    """A monotonically increasing count."""
+
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        """Increase the count.
+
+        Args:
+            labels: Label values, in the order of the label names
+            amount: Amount to add
+        """
+        shard = self._shard()
+        values = shard.get(labels)
+        if values is None:
+            values = shard[labels] = [0.0]
+        values[0] += amount
+
+    def value(self, *labels: str) -> float:
+        """Return the current count for the given label values."""
+        return self._merged().get(labels, [0.0])[0]
+
+    def samples(self) -> List[str]:
+        """Return the sample lines of the metric."""
+        return [
+            f"{self.name}{_format_labels(self.labels, labels)} {_format_value(values[0])}"
+            for labels, values in sorted(self._merged().items())
+        ]
+
+
+class Gauge(Counter):
+    """A value that can go up and down; the last value set wins."""
+
+    kind = "gauge"
+
+    def set(self, value: float, *labels: str) -> None:
+        """Set the value.
+
+        Args:
+            value: New value
+            labels: Label values, in the order of the label names
+        """
+        # Gauges are set rarely, so they keep a single shared shard
+        with self._lock:
+            if not self._shards:
+                self._shards.append({})
+            self._shards[0][labels] = [value]
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        """Increase the value."""
+        with self._lock:
+            if not self._shards:
+                self._shards.append({})
+            values = self._shards[0].setdefault(labels, [0.0])
+            values[0] += amount
+
+
+class Histogram(Metric):
+    """A distribution of observed values, counted in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        """Initialize the histogram.
+
+        Args:
+            name: Metric name (e.g., kreatisite_aws_call_seconds)
+            help: Description shown in the HELP line
+            labels: Label names
+            buckets: Upper bounds of the buckets, in increasing order
+        """
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str) -> None:
+        """Record an observation.
+
+        Args:
+            value: Observed value (e.g., a duration in seconds)
+            labels: Label values, in the order of the label names
+        """
+        shard = self._shard()
+        values = shard.get(labels)
+        if values is None:
+            # One count per bucket and one for +Inf, then the sum and the count
+            values = shard[labels] = [0.0] * (len(self.buckets) + 3)
+        values[bisect.bisect_left(self.buckets, value)] += 1
+        values[-2] += value
+        values[-1] += 1
+
+    def samples(self) -> List[str]:
+        """Return the sample lines of the metric."""
+        lines = []
+        names = self.labels + ("le",)
+        bounds = [_format_value(b) for b in self.buckets] + ["+Inf"]
+        for labels, values in sorted(self._merged().items()):
+            cumulative = 0.0
+            for bound, count in zip(bounds, values):
+                cumulative += count
+                lines.append(
+                    f"{self.name}_bucket{_format_labels(names, labels + (bound,))} "
+                    f"{_format_value(cumulative)}"
+                )
+            suffix = _format_labels(self.labels, labels)
+            lines.append(f"{self.name}_sum{suffix} {_format_value(values[-2])}")
+            lines.append(f"{self.name}_count{suffix} {_format_value(values[-1])}")
+        return lines
+
+
+REGISTRY: List[Metric] = []
+
+AWS_CALLS = Counter(
+    "kreatisite_aws_calls_total",
+    "AWS API calls by operation and outcome (ok, error or throttled)",
+    ("service", "operation", "outcome"),
+)
+AWS_CALL_SECONDS = Histogram(
+    "kreatisite_aws_call_seconds",
+    "Latency of AWS API calls",
+    ("service", "operation"),
+)
+AWS_THROTTLES = Counter(
+    "kreatisite_aws_throttles_total",
+    "AWS API calls rejected by rate limiting",
+    ("service", "operation"),
+)
+AWS_RETRIES = Counter(
+    "kreatisite_aws_retries_total",
+    "AWS API calls retried after throttling",
+    ("service", "operation"),
+)
+CACHE_REQUESTS = Counter(
+    "kreatisite_cache_requests_total",
+    "Build cache lookups by tier and result (hit or miss)",
+    ("tier", "result"),
+)
+DOMAINS_CHECKED = Counter(
+    "kreatisite_domains_checked_total",
+    "Domain availability checks by result",
+    ("status",),
+)
+DOMAINS_PER_SECOND = Gauge(
+    "kreatisite_domains_per_second",
+    "Domains checked per second by the last availability batch",
+)
+DOMAINS_REGISTERED = Counter(
+    "kreatisite_domains_registered_total",
+    "Domain registrations by outcome",
+    ("outcome",),
+)
+
+
+def render_metrics(metrics: Optional[Sequence[Metric]] = None) -> str:
+    """Render metrics in the Prometheus text exposition format.
+
+    Args:
+        metrics: Metrics to render (default: all registered metrics)
+
+    Returns:
+        str: Exposition text
+    """
+    return "".join(metric.render() for metric in (REGISTRY if metrics is None else metrics))
+
+
+def write_textfile(path: str) -> None:
+    """Write all metrics to a file for the node exporter's textfile collector.
+
+    The file is replaced atomically, so the collector never reads it half written.
+
+    Args:
+        path: Output file path, conventionally ending in .prom
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(render_metrics())
+    os.replace(tmp_path, path)
+
+
+def serve_metrics(port: int, host: str = "127.0.0.1") -> "ThreadingHTTPServer":
+    """Serve the metrics on http://host:port/metrics from a background thread.
+
+    http.server is imported here, so commands run without --metrics-port do
+    not pay for loading it.
+
+    Args:
+        port: Port to listen on (0: any free port)
+        host: Address to bind to
+
+    Returns:
+        ThreadingHTTPServer: The server; call shutdown() to stop it
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        """Serves the metrics at /metrics."""
+
+        def do_GET(self) -> None:
+            """Respond with the metrics, or 404 for other paths."""
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render_metrics().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            """Keep scrapes out of the command output."""
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
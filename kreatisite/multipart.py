@@ -0,0 +1,232 @@
+"""S3 multipart upload functions for Kreatisite CLI."""
+
+import base64
+import hashlib
+import importlib.util
+import io
+import mmap
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Files at least this large are uploaded in parts
+MULTIPART_THRESHOLD = 64 * 1024 * 1024
+DEFAULT_PART_SIZE = 16 * 1024 * 1024
+DEFAULT_UPLOAD_WORKERS = 4
+# S3 allows at most 10000 parts per upload
+MAX_PARTS = 10000
+
+
+class _MemoryViewReader(io.RawIOBase):
+    """Seekable read-only file object over a memoryview that never copies the whole part."""
+
+    def __init__(self, view: memoryview) -> None:
+        self._view = view
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: len(self._view)}[whence]
+        self._pos = max(0, base + offset)
+        return self._pos
+
+    def readinto(self, buffer: Any) -> int:
+        chunk = self._view[self._pos : self._pos + len(buffer)]
+        buffer[: len(chunk)] = chunk
+        self._pos += len(chunk)
+        return len(chunk)
+
+    def read(self, size: int = -1) -> bytes:
+        end = len(self._view) if size is None or size < 0 else self._pos + size
+        chunk = self._view[self._pos : end]
+        self._pos += len(chunk)
+        return chunk.tobytes()
+
+
+def available() -> bool:
+    """Check whether the native S3 client needed for multipart uploads is installed.
+
+    Returns:
+        bool: True if boto3 can be imported
+    """
+    return importlib.util.find_spec("boto3") is not None
+
+
+def create_client(endpoint_url: Optional[str] = None) -> Any:
+    """Create the S3 client used for multipart uploads.
+
+    Args:
+        endpoint_url: Alternative S3-compatible endpoint
+
+    Returns:
+        Any: A boto3 S3 client
+
+    Raises:
+        RuntimeError: If boto3 is not installed
+    """
+    if not available():
+        raise RuntimeError("Multipart uploads require boto3: pip install 'kreatisite[native]'")
+    import boto3
+
+    return boto3.client("s3", endpoint_url=endpoint_url)
+
+
+def part_size_for(file_size: int, part_size: int = DEFAULT_PART_SIZE) -> int:
+    """Return a part size that keeps the upload within the S3 part count limit.
+
+    Args:
+        file_size: Size of the file in bytes
+        part_size: Preferred part size
+
+    Returns:
+        int: Part size, a multiple of the memory page size
+    """
+    while file_size > part_size * MAX_PARTS:
+        part_size *= 2
+    return part_size - part_size % mmap.PAGESIZE or mmap.PAGESIZE
+
+
+def iter_parts(view: memoryview, part_size: int) -> Iterator[Tuple[int, int, memoryview]]:
+    """Split a mapped file into zero-copy parts.
+
+    Args:
+        view: memoryview over the whole file
+        part_size: Size of each part (the last one may be smaller)
+
+    Yields:
+        Tuple[int, int, memoryview]: Part number (from 1), offset and part view
+    """
+    for number, offset in enumerate(range(0, len(view), part_size), start=1):
+        yield number, offset, view[offset : offset + part_size]
+
+
+def multipart_etag(path: str, part_size: int = DEFAULT_PART_SIZE) -> str:
+    """Compute the ETag S3 assigns to a file uploaded with upload_file().
+
+    Args:
+        path: Local file path
+        part_size: Preferred part size used for the upload
+
+    Returns:
+        str: ETag in the form <md5 of part md5s>-<part count>
+    """
+    size = os.path.getsize(path)
+    part_size = part_size_for(size, part_size)
+    digests = []
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        with memoryview(mm) as view:
+            for _, offset, part in iter_parts(view, part_size):
+                digests.append(hashlib.md5(part).digest())
+                part.release()
+                _drop_pages(mm, offset, part_size)
+    return f"{hashlib.md5(b''.join(digests)).hexdigest()}-{len(digests)}"
+
+
+def _drop_pages(mm: mmap.mmap, offset: int, length: int) -> None:
+    """Tell the kernel a finished range of the mapping will not be needed again."""
+    if hasattr(mm, "madvise") and hasattr(mmap, "MADV_DONTNEED"):
+        mm.madvise(mmap.MADV_DONTNEED, offset, min(length, len(mm) - offset))
+
+
+def upload_file(
+    path: str,
+    bucket: str,
+    key: str,
+    client: Any,
+    extra_args: Optional[Dict[str, str]] = None,
+    part_size: int = DEFAULT_PART_SIZE,
+    workers: int = DEFAULT_UPLOAD_WORKERS,
+    max_in_flight: Optional[int] = None,
+) -> str:
+    """Upload a file with S3 multipart upload straight from a memory map.
+
+    Parts are memoryviews over the mapping, so no part is ever copied into a bytes
+    object. Each part's MD5 is computed just before it is sent and used as its
+    Content-MD5. At most max_in_flight parts are resident at once; pages of
+    finished parts are released, keeping memory use flat for any file size.
+    The upload is aborted if any part or its completion fails.
+
+    Args:
+        path: Local file path
+        bucket: S3 bucket name
+        key: Object key
+        client: S3 client (see create_client())
+        extra_args: Additional CreateMultipartUpload parameters (e.g., ContentType)
+        part_size: Preferred part size
+        workers: Number of concurrent part uploads
+        max_in_flight: Maximum number of parts in memory (default: 2 * workers)
+
+    Returns:
+        str: ETag of the completed object
+    """
+    size = os.path.getsize(path)
+    part_size = part_size_for(size, part_size)
+    in_flight = threading.BoundedSemaphore(max_in_flight or 2 * workers)
+    upload_id = client.create_multipart_upload(Bucket=bucket, Key=key, **(extra_args or {}))[
+        "UploadId"
+    ]
+
+    failed = threading.Event()
+
+    def send(number: int, offset: int, part: memoryview) -> Dict[str, Any]:
+        try:
+            if failed.is_set():
+                return {}
+            digest = hashlib.md5(part).digest()
+            response = client.upload_part(
+                Bucket=bucket,
+                Key=key,
+                UploadId=upload_id,
+                PartNumber=number,
+                Body=_MemoryViewReader(part),
+                ContentLength=len(part),
+                ContentMD5=base64.b64encode(digest).decode("ascii"),
+            )
+            return {"PartNumber": number, "ETag": response["ETag"], "Digest": digest}
+        except BaseException:
+            failed.set()
+            raise
+        finally:
+            part.release()
+            _drop_pages(mm, offset, part_size)
+            in_flight.release()
+
+    futures: List[Future] = []
+    try:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with memoryview(mm) as view, ThreadPoolExecutor(max_workers=workers) as pool:
+                for number, offset, part in iter_parts(view, part_size):
+                    in_flight.acquire()
+                    if failed.is_set():
+                        part.release()
+                        break
+                    futures.append(pool.submit(send, number, offset, part))
+                # Parts queued after a failure are skipped but still release their views
+                parts = [future.result() for future in futures]
+        client.complete_multipart_upload(
+            Bucket=bucket,
+            Key=key,
+            UploadId=upload_id,
+            MultipartUpload={
+                "Parts": [{"PartNumber": p["PartNumber"], "ETag": p["ETag"]} for p in parts]
+            },
+        )
+    except BaseException:
+        try:
+            client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+        except Exception:
+            # The upload's own error is the one worth reporting
+            pass
+        raise
+
+    combined = hashlib.md5(b"".join(p["Digest"] for p in parts)).hexdigest()
+    return f"{combined}-{len(parts)}"
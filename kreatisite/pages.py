@@ -0,0 +1,95 @@
+"""Page metadata extraction functions for Kreatisite CLI."""
+
+import html
+import os
+import posixpath
+import re
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional, Tuple
+from urllib.parse import quote
+
+_TITLE_RE = re.compile(r"<title\b[^>]*>(.*?)</title\s*>", re.IGNORECASE | re.DOTALL)
+_NOINDEX_RE = re.compile(
+    r"<meta\b[^>]*name\s*=\s*[\"']robots[\"'][^>]*content\s*=\s*[\"'][^\"']*noindex",
+    re.IGNORECASE,
+)
+_SKIPPED_RE = re.compile(
+    r"<(script|style|noscript|template|head)\b[^>]*>.*?</\1\s*>", re.IGNORECASE | re.DOTALL
+)
+_TAG_RE = re.compile(r"<[^>]*>")
+_SPACE_RE = re.compile(r"\s+")
+
+
+@dataclass
+class PageInfo:
+    """Metadata of one built page."""
+
+    path: str
+    url: str  # URL path, e.g., /blog/
+    title: str
+    text: str
+    lastmod: Optional[float] = None
+
+
+def page_url(rel_path: str, base_url: str = "") -> str:
+    """Return the URL a page is served at; index pages map to their directory.
+
+    Args:
+        rel_path: Page path relative to the output directory
+        base_url: Site origin (e.g., https://example.com)
+
+    Returns:
+        str: Absolute URL if base_url is given, else the URL path
+    """
+    if posixpath.basename(rel_path) == "index.html":
+        rel_path = posixpath.dirname(rel_path)
+        rel_path = f"{rel_path}/" if rel_path else ""
+    return f"{base_url.rstrip('/')}/{quote(rel_path)}"
+
+
+def extract_page(markup: str) -> Tuple[str, str, bool]:
+    """Extract the title, visible text and noindex flag of an HTML page.
+
+    Args:
+        markup: HTML document
+
+    Returns:
+        Tuple[str, str, bool]: Title, body text with collapsed whitespace, and
+        whether the page asks not to be indexed
+    """
+    match = _TITLE_RE.search(markup)
+    title = html.unescape(_SPACE_RE.sub(" ", match.group(1))).strip() if match else ""
+    text = _TAG_RE.sub(" ", _SKIPPED_RE.sub(" ", markup))
+    text = html.unescape(_SPACE_RE.sub(" ", text)).strip()
+    return title, text, bool(_NOINDEX_RE.search(markup))
+
+
+def iter_pages(
+    output_dir: str,
+    pages: Iterable[str],
+    source_dir: Optional[str] = None,
+) -> Iterator[PageInfo]:
+    """Yield the metadata of indexable pages one at a time.
+
+    Pages are read lazily, so only one page is held in memory at a time.
+    Pages marked noindex are skipped.
+
+    Args:
+        output_dir: Build output directory
+        pages: HTML pages relative to output_dir
+        source_dir: Source directory, used for last-modified times
+
+    Yields:
+        PageInfo: Page metadata
+    """
+    for rel_path in pages:
+        with open(os.path.join(output_dir, rel_path), "r", encoding="utf-8") as f:
+            title, text, noindex = extract_page(f.read())
+        if noindex:
+            continue
+        lastmod = None
+        if source_dir:
+            source = os.path.join(source_dir, rel_path)
+            if os.path.exists(source):
+                lastmod = os.path.getmtime(source)
+        yield PageInfo(rel_path, page_url(rel_path), title, text, lastmod)
@@ -1,6 +1,71 @@
 """Parser creation functions for Kreatisite CLI."""
 
 import argparse
+import os
+from typing import List
+
+from .defaults import (
+    BACKEND_ENV,
+    BACKEND_NAMES,
+    DEFAULT_ACCOUNT_RATE,
+    DEFAULT_BUCKET_REGION,
+    DEFAULT_CACHE_DIR,
+    DEFAULT_CACHE_SIZE,
+    DEFAULT_CERT_REGION,
+    DEFAULT_CERT_WAIT_TIMEOUT,
+    DEFAULT_CHECK_JOBS,
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_ERROR_RATE,
+    DEFAULT_EXTERNAL_JOBS,
+    DEFAULT_HEADROOM,
+    DEFAULT_HISTORY_PATH,
+    DEFAULT_HOST_RATE,
+    DEFAULT_INVENTORY_REGIONS,
+    DEFAULT_LINK_TIMEOUT,
+    DEFAULT_MAX_PATHS,
+    DEFAULT_PIPELINE_JOBS,
+    DEFAULT_POLL_INTERVAL,
+    DEFAULT_UPLOAD_JOBS,
+    METRICS_FILE_ENV,
+    RECORD_ENV,
+    REPLAY_ENV,
+)
+
+
+def comma_list(value: str) -> List[str]:
+    """Split a comma-separated option value, e.g., "us-east-1,eu-west-1".
+
+    Args:
+        value: Option value
+
+    Returns:
+        List[str]: Non-empty items
+    """
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def add_account_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the options that fan a command out across AWS accounts.
+
+    Args:
+        parser: Command parser
+    """
+    parser.add_argument(
+        "--profiles",
+        default=None,
+        help="Comma-separated AWS profiles to run across concurrently, one per account",
+    )
+    parser.add_argument(
+        "--profiles-file",
+        default=None,
+        help="File with more AWS profiles, one per line",
+    )
+    parser.add_argument(
+        "--account-rate",
+        type=float,
+        default=DEFAULT_ACCOUNT_RATE,
+        help=f"AWS requests per second per account (default: {DEFAULT_ACCOUNT_RATE:g})",
+    )
 
 
 def create_check_domain_parser(subparsers: argparse._SubParsersAction) -> None:
@@ -19,6 +84,91 @@ def create_check_domain_parser(subparsers: argparse._SubParsersAction) -> None:
     )
 
 
+def create_check_domains_parser(subparsers: argparse._SubParsersAction) -> None:
+    """Create the check-domains command parser.
+
+    Args:
+        subparsers: The subparser group to add the command to
+    """
+    check_domains_parser = subparsers.add_parser(
+        "check-domains",
+        help="Check the availability of many domains concurrently",
+    )
+    check_domains_parser.add_argument(
+        "domain_names",
+        nargs="*",
+        help="Domain names to check",
+    )
+    check_domains_parser.add_argument(
+        "--file",
+        default=None,
+        help="File with more domain names, one per line; gzip-compressed files and - "
+        "(standard input) are read as a stream",
+    )
+    check_domains_parser.add_argument(
+        "--checkpoint",
+        metavar="FILE",
+        default=None,
+        help="Database of the names checked so far; an interrupted run given the same "
+        "checkpoint and input resumes where it stopped",
+    )
+    check_domains_parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help=f"Names read and checkpointed at a time (default: {DEFAULT_CHUNK_SIZE})",
+    )
+    check_domains_parser.add_argument(
+        "--history",
+        metavar="FILE",
+        nargs="?",
+        const=DEFAULT_HISTORY_PATH,
+        default=None,
+        help="Record the results in a history database, queried with the history command "
+        f"(default file: {DEFAULT_HISTORY_PATH})",
+    )
+    check_domains_parser.add_argument(
+        "--skip-taken",
+        dest="skip_taken",
+        metavar="FILTER",
+        default=None,
+        help="Skip the names in this filter of known-taken names (see history build-filter) "
+        "and add the names found taken to it",
+    )
+    check_domains_parser.add_argument(
+        "--jobs",
+        type=int,
+        default=DEFAULT_CHECK_JOBS,
+        help=f"Number of concurrent requests (default: {DEFAULT_CHECK_JOBS})",
+    )
+    add_account_arguments(check_domains_parser)
+
+
+def create_inventory_parser(subparsers: argparse._SubParsersAction) -> None:
+    """Create the inventory command parser.
+
+    Args:
+        subparsers: The subparser group to add the command to
+    """
+    inventory_parser = subparsers.add_parser(
+        "inventory",
+        help="List the domains, hosted zones and certificates of AWS accounts",
+    )
+    inventory_parser.add_argument(
+        "--regions",
+        type=comma_list,
+        default=list(DEFAULT_INVENTORY_REGIONS),
+        help="Comma-separated regions to list certificates in "
+        f"(default: {','.join(DEFAULT_INVENTORY_REGIONS)})",
+    )
+    inventory_parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print one JSON object per resource",
+    )
+    add_account_arguments(inventory_parser)
+
+
 def create_register_domain_parser(subparsers: argparse._SubParsersAction) -> None:
     """Create the register-domain command parser.
 
@@ -56,6 +206,497 @@ def create_register_domain_parser(subparsers: argparse._SubParsersAction) -> Non
     )
 
 
+def create_build_parser(subparsers: argparse._SubParsersAction) -> None:
+    """Create the build command parser.
+
+    Args:
+        subparsers: The subparser group to add the command to
+    """
+    build_parser = subparsers.add_parser(
+        "build",
+        help="Build the static site (minify, fingerprint, precompress)",
+    )
+    build_parser.add_argument(
+        "source_dir",
+        nargs="?",
+        default="site",
+        help="Directory containing the site sources (default: site)",
+    )
+    build_parser.add_argument(
+        "--output-dir",
+        dest="output_dir",
+        default="dist",
+        help="Directory to write the build output to (default: dist)",
+    )
+    build_parser.add_argument(
+        "--cache-dir",
+        dest="cache_dir",
+        default=DEFAULT_CACHE_DIR,
+        help=f"Directory for cached build results (default: {DEFAULT_CACHE_DIR})",
+    )
+    build_parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Number of parallel compression workers (default: CPU count)",
+    )
+    build_parser.add_argument(
+        "--no-minify",
+        dest="minify",
+        action="store_false",
+        default=True,
+        help="Copy HTML, CSS and JavaScript without minifying",
+    )
+    build_parser.add_argument(
+        "--base-url",
+        dest="base_url",
+        default=None,
+        help="Site origin, e.g., https://example.com; generates sitemap.xml",
+    )
+    build_parser.add_argument(
+        "--search-index",
+        dest="search_index",
+        action="store_true",
+        help="Generate a compact client-side search index",
+    )
+    build_parser.add_argument(
+        "--shared-cache",
+        dest="shared_cache",
+        default=os.environ.get("KREATISITE_SHARED_CACHE"),
+        help="Shared build cache: a directory (e.g., a network mount) or s3://bucket/prefix "
+        "(default: $KREATISITE_SHARED_CACHE)",
+    )
+    build_parser.add_argument(
+        "--cache-size",
+        dest="cache_size",
+        type=int,
+        default=DEFAULT_CACHE_SIZE // (1024 * 1024),
+        help="Size limit of the local build cache in MiB "
+        f"(default: {DEFAULT_CACHE_SIZE // (1024 * 1024)})",
+    )
+
+
+def create_deploy_parser(subparsers: argparse._SubParsersAction) -> None:
+    """Create the deploy command parser.
+
+    Args:
+        subparsers: The subparser group to add the command to
+    """
+    deploy_parser = subparsers.add_parser(
+        "deploy",
+        help="Upload changed build output files to S3",
+    )
+    deploy_parser.add_argument(
+        "domain_name",
+        help="Domain name of the site; also the bucket name unless --bucket is given",
+    )
+    deploy_parser.add_argument(
+        "--output-dir",
+        dest="output_dir",
+        default="dist",
+        help="Build output directory to deploy (default: dist)",
+    )
+    deploy_parser.add_argument(
+        "--bucket",
+        default=None,
+        help="S3 bucket to deploy to (default: the domain name)",
+    )
+    deploy_parser.add_argument(
+        "--prefix",
+        default="",
+        help="Key prefix to deploy under (default: bucket root)",
+    )
+    deploy_parser.add_argument(
+        "--jobs",
+        type=int,
+        default=DEFAULT_UPLOAD_JOBS,
+        help=f"Number of concurrent uploads (default: {DEFAULT_UPLOAD_JOBS})",
+    )
+    deploy_parser.add_argument(
+        "--no-delete",
+        dest="delete",
+        action="store_false",
+        default=True,
+        help="Keep objects that are no longer part of the build",
+    )
+    deploy_parser.add_argument(
+        "--dry-run",
+        dest="dry_run",
+        action="store_true",
+        help="Show what would change without touching the bucket",
+    )
+    deploy_parser.add_argument(
+        "--endpoint-url",
+        dest="endpoint_url",
+        default=None,
+        help="Alternative S3 endpoint, e.g., a local S3-compatible server",
+    )
+    deploy_parser.add_argument(
+        "--distribution-id",
+        dest="distribution_id",
+        default=None,
+        help="CloudFront distribution to invalidate changed paths in",
+    )
+    deploy_parser.add_argument(
+        "--max-invalidation-paths",
+        dest="max_invalidation_paths",
+        type=int,
+        default=DEFAULT_MAX_PATHS,
+        help=f"Maximum paths per invalidation (default: {DEFAULT_MAX_PATHS})",
+    )
+    deploy_parser.add_argument(
+        "--wait",
+        action="store_true",
+        help="Wait for the CloudFront invalidation to complete",
+    )
+
+
+def create_serve_site_parser(subparsers: argparse._SubParsersAction) -> None:
+    """Create the serve-site command parser.
+
+    Args:
+        subparsers: The subparser group to add the command to
+    """
+    serve_parser = subparsers.add_parser(
+        "serve-site",
+        help="Serve the site locally with live reload",
+    )
+    serve_parser.add_argument(
+        "source_dir",
+        nargs="?",
+        default="site",
+        help="Directory containing the site sources (default: site)",
+    )
+    serve_parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="Interface to listen on (default: 127.0.0.1)",
+    )
+    serve_parser.add_argument(
+        "--port",
+        type=int,
+        default=8000,
+        help="Port to listen on (default: 8000)",
+    )
+    serve_parser.add_argument(
+        "--poll-interval",
+        dest="poll_interval",
+        type=float,
+        default=DEFAULT_POLL_INTERVAL,
+        help="Seconds between scans when file notifications are unavailable "
+        f"(default: {DEFAULT_POLL_INTERVAL})",
+    )
+
+
+def create_dns_parser(subparsers: argparse._SubParsersAction) -> None:
+    """Create the dns command parser and its subcommands.
+
+    Args:
+        subparsers: The subparser group to add the command to
+    """
+    dns_parser = subparsers.add_parser(
+        "dns",
+        help="Manage Route53 hosted zone records",
+    )
+    dns_subparsers = dns_parser.add_subparsers(dest="dns_command", help="DNS commands")
+    dns_subparsers.required = True
+
+    apply_parser = dns_subparsers.add_parser(
+        "apply",
+        help="Make a hosted zone match a YAML zone file",
+    )
+    apply_parser.add_argument(
+        "zone_file",
+        help="Path to the YAML zone file",
+    )
+    apply_parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="Delete records that are not in the zone file (apex SOA and NS are kept)",
+    )
+    apply_parser.add_argument(
+        "--dry-run",
+        dest="dry_run",
+        action="store_true",
+        help="Show what would change without touching the hosted zone",
+    )
+    apply_parser.add_argument(
+        "--wait",
+        action="store_true",
+        help="Wait for the changes to propagate",
+    )
+
+
+def create_history_parser(subparsers: argparse._SubParsersAction) -> None:
+    """Create the history command parser and its subcommands.
+
+    Args:
+        subparsers: The subparser group to add the command to
+    """
+    history_parser = subparsers.add_parser(
+        "history",
+        help="Query and maintain the history of availability results",
+    )
+    history_subparsers = history_parser.add_subparsers(
+        dest="history_command", help="History commands"
+    )
+    history_subparsers.required = True
+
+    query_parser = history_subparsers.add_parser(
+        "query",
+        help="List recorded availability results, newest first",
+    )
+    query_parser.add_argument(
+        "domain_name",
+        nargs="?",
+        default=None,
+        help="Only results of this domain name",
+    )
+    query_parser.add_argument(
+        "--tld",
+        default=None,
+        help="Only results of names under this TLD (e.g., io or co.uk)",
+    )
+    query_parser.add_argument(
+        "--status",
+        default=None,
+        type=str.upper,
+        help="Only results with this status (e.g., AVAILABLE)",
+    )
+    query_parser.add_argument(
+        "--since",
+        default=None,
+        help="Only results since this age (e.g., 7d, 12h) or ISO date",
+    )
+    query_parser.add_argument(
+        "--until",
+        default=None,
+        help="Only results before this age or ISO date",
+    )
+    query_parser.add_argument(
+        "--changes",
+        action="store_true",
+        help="Only results that changed the name's status",
+    )
+    query_parser.add_argument(
+        "--limit",
+        type=int,
+        default=None,
+        help="Maximum number of results",
+    )
+    query_parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print one JSON object per result",
+    )
+
+    prune_parser = history_subparsers.add_parser(
+        "prune",
+        help="Delete results older than an age",
+    )
+    compact_parser = history_subparsers.add_parser(
+        "compact",
+        help="Drop unchanged repeats older than an age, keeping every status change",
+    )
+    for maintenance_parser in (prune_parser, compact_parser):
+        maintenance_parser.add_argument(
+            "--older-than",
+            dest="older_than",
+            required=True,
+            help="Age (e.g., 90d) or ISO date",
+        )
+
+    filter_parser = history_subparsers.add_parser(
+        "build-filter",
+        help="Rebuild the filter of known-taken names used by check-domains --skip-taken",
+    )
+    filter_parser.add_argument(
+        "filter_file",
+        help="Filter file to write",
+    )
+    filter_parser.add_argument(
+        "--error-rate",
+        dest="error_rate",
+        type=float,
+        default=DEFAULT_ERROR_RATE,
+        help="Share of free names the filter may report taken " f"(default: {DEFAULT_ERROR_RATE})",
+    )
+    filter_parser.add_argument(
+        "--headroom",
+        type=float,
+        default=DEFAULT_HEADROOM,
+        help="Extra capacity for names found taken until the next rebuild, as a share "
+        f"of the current names (default: {DEFAULT_HEADROOM})",
+    )
+
+    for history_subparser in (query_parser, prune_parser, compact_parser, filter_parser):
+        history_subparser.add_argument(
+            "--history",
+            metavar="FILE",
+            default=DEFAULT_HISTORY_PATH,
+            help=f"History database (default: {DEFAULT_HISTORY_PATH})",
+        )
+
+
+def create_cert_parser(subparsers: argparse._SubParsersAction) -> None:
+    """Create the cert command parser.
+
+    Args:
+        subparsers: The subparser group to add the command to
+    """
+    cert_parser = subparsers.add_parser(
+        "cert",
+        help="Request and DNS-validate HTTPS certificates with ACM",
+    )
+    cert_parser.add_argument(
+        "domain_names",
+        nargs="+",
+        help="Domain names to request certificates for (each also covers www)",
+    )
+    cert_parser.add_argument(
+        "--wildcard",
+        action="store_true",
+        help="Also cover every subdomain (*.domain)",
+    )
+    cert_parser.add_argument(
+        "--region",
+        default=DEFAULT_CERT_REGION,
+        help=f"ACM region (default: {DEFAULT_CERT_REGION}, required for CloudFront)",
+    )
+    cert_parser.add_argument(
+        "--no-wait",
+        dest="wait",
+        action="store_false",
+        default=True,
+        help="Return once the validation records are written",
+    )
+    cert_parser.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_CERT_WAIT_TIMEOUT,
+        help=f"Seconds to wait for issuance (default: {DEFAULT_CERT_WAIT_TIMEOUT:g})",
+    )
+
+
+def create_launch_parser(subparsers: argparse._SubParsersAction) -> None:
+    """Create the launch command parser.
+
+    Args:
+        subparsers: The subparser group to add the command to
+    """
+    launch_parser = subparsers.add_parser(
+        "launch",
+        help="Register, provision and deploy a site in one resumable run",
+    )
+    launch_parser.add_argument(
+        "domain_name",
+        help="Domain name of the site; also the bucket name",
+    )
+    launch_parser.add_argument(
+        "--config-file",
+        dest="config_file",
+        default="aws-register-domain.yaml",
+        help="YAML config file with contact information (default: aws-register-domain.yaml)",
+    )
+    launch_parser.add_argument(
+        "--skip-register",
+        dest="register_domain",
+        action="store_false",
+        default=True,
+        help="Do not register the domain (it is managed elsewhere)",
+    )
+    launch_parser.add_argument(
+        "--source-dir",
+        dest="source_dir",
+        default="site",
+        help="Directory containing the site sources (default: site)",
+    )
+    launch_parser.add_argument(
+        "--output-dir",
+        dest="output_dir",
+        default="dist",
+        help="Directory to write the build output to (default: dist)",
+    )
+    launch_parser.add_argument(
+        "--bucket-region",
+        dest="bucket_region",
+        default=DEFAULT_BUCKET_REGION,
+        help=f"Region of the site bucket (default: {DEFAULT_BUCKET_REGION})",
+    )
+    launch_parser.add_argument(
+        "--checkpoint",
+        default=None,
+        help="Checkpoint file of completed steps "
+        f"(default: {DEFAULT_CACHE_DIR}/launch-<domain>.json)",
+    )
+    launch_parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Ignore the checkpoint and run every step again",
+    )
+    launch_parser.add_argument(
+        "--jobs",
+        type=int,
+        default=DEFAULT_PIPELINE_JOBS,
+        help=f"Maximum number of steps running at once (default: {DEFAULT_PIPELINE_JOBS})",
+    )
+
+
+def create_check_links_parser(subparsers: argparse._SubParsersAction) -> None:
+    """Create the check-links command parser.
+
+    Args:
+        subparsers: The subparser group to add the command to
+    """
+    check_links_parser = subparsers.add_parser(
+        "check-links",
+        help="Check the links and anchors of the build output",
+    )
+    check_links_parser.add_argument(
+        "output_dir",
+        nargs="?",
+        default="dist",
+        help="Build output directory to check (default: dist)",
+    )
+    check_links_parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Number of parallel page parsers (default: CPU count)",
+    )
+    check_links_parser.add_argument(
+        "--external",
+        action="store_true",
+        help="Also check links to other sites",
+    )
+    check_links_parser.add_argument(
+        "--external-jobs",
+        dest="external_jobs",
+        type=int,
+        default=DEFAULT_EXTERNAL_JOBS,
+        help=f"Number of concurrent external requests (default: {DEFAULT_EXTERNAL_JOBS})",
+    )
+    check_links_parser.add_argument(
+        "--rate",
+        type=float,
+        default=DEFAULT_HOST_RATE,
+        help=f"Requests per second sent to any one host (default: {DEFAULT_HOST_RATE:g})",
+    )
+    check_links_parser.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_LINK_TIMEOUT,
+        help=f"Seconds to wait for each external response (default: {DEFAULT_LINK_TIMEOUT:g})",
+    )
+    check_links_parser.add_argument(
+        "--cache-file",
+        dest="cache_file",
+        default=os.path.join(DEFAULT_CACHE_DIR, "links.json"),
+        help="File caching working external links for a day "
+        f"(default: {DEFAULT_CACHE_DIR}/links.json)",
+    )
+
+
 def create_parser() -> argparse.ArgumentParser:
     """Create and configure the argument parser.
 
@@ -67,6 +708,75 @@ def create_parser() -> argparse.ArgumentParser:
         description="Kreatisite - A command line application",
         epilog="For more information, visit https://devixlabs.com",
     )
+    parser.add_argument(
+        "--aws-backend",
+        dest="aws_backend",
+        choices=BACKEND_NAMES,
+        default=os.environ.get(BACKEND_ENV) or "cli",
+        help="How AWS is called: cli (AWS CLI), native (boto3) or fake (in-memory, "
+        f"for trying commands offline) (default: ${BACKEND_ENV} or cli)",
+    )
+    parser.add_argument(
+        "--aws-timeout",
+        type=float,
+        metavar="SECONDS",
+        help="Give up on (and kill) any single AWS request taking longer than this",
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        metavar="SECONDS",
+        help="Give up on all AWS requests once the whole command has run this long",
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        default=None,
+        help="Write timed spans of the run to FILE in Chrome trace-event format",
+    )
+    parser.add_argument(
+        "--profile",
+        choices=["cpu", "alloc"],
+        default=None,
+        help="Profile the command: cpu writes cProfile statistics, alloc the peak memory "
+        "and top allocation sites from tracemalloc",
+    )
+    parser.add_argument(
+        "--profile-output",
+        metavar="FILE",
+        default=None,
+        help="Profile output file; cpu profiles ending in .folded or .collapsed are written "
+        "as collapsed stacks for flame graphs (default: kreatisite-cpu.prof or "
+        "kreatisite-alloc.txt)",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        metavar="FILE",
+        default=os.environ.get(METRICS_FILE_ENV),
+        help="Write Prometheus metrics to FILE when the command ends, for the node "
+        f"exporter's textfile collector (default: ${METRICS_FILE_ENV})",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        metavar="PORT",
+        default=None,
+        help="Serve Prometheus metrics on http://127.0.0.1:PORT/metrics while the command runs",
+    )
+    cassette = parser.add_mutually_exclusive_group()
+    cassette.add_argument(
+        "--record",
+        metavar="CASSETTE",
+        default=os.environ.get(RECORD_ENV),
+        help="Record every AWS request and response into a cassette file "
+        f"(.gz to compress) (default: ${RECORD_ENV})",
+    )
+    cassette.add_argument(
+        "--replay",
+        metavar="CASSETTE",
+        default=os.environ.get(REPLAY_ENV),
+        help=f"Answer AWS requests from a recorded cassette, offline (default: ${REPLAY_ENV})",
+    )
 
     # Create subparsers for commands
     subparsers = parser.add_subparsers(dest="command", help="Commands")
@@ -79,6 +789,16 @@ def create_parser() -> argparse.ArgumentParser:
 
     # Create command parsers
     create_check_domain_parser(subparsers)
+    create_check_domains_parser(subparsers)
+    create_inventory_parser(subparsers)
     create_register_domain_parser(subparsers)
+    create_build_parser(subparsers)
+    create_deploy_parser(subparsers)
+    create_serve_site_parser(subparsers)
+    create_dns_parser(subparsers)
+    create_history_parser(subparsers)
+    create_cert_parser(subparsers)
+    create_launch_parser(subparsers)
+    create_check_links_parser(subparsers)
 
     return parser
@@ -0,0 +1,231 @@
+"""Dependency-graph step executor for Kreatisite CLI."""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .defaults import DEFAULT_PIPELINE_JOBS as DEFAULT_JOBS
+from .trace import span
+
+
+class PipelineError(Exception):
+    """Raised when a pipeline is invalid or one of its steps fails."""
+
+    def __init__(self, message: str, step: Optional[str] = None) -> None:
+        """Initialize the error.
+
+        Args:
+            message: Error message
+            step: Name of the failed step, if any
+        """
+        super().__init__(message)
+        self.step = step
+
+
+@dataclass
+class Step:
+    """A pipeline step: a function run once all the steps it requires are done.
+
+    The function receives the results of all completed steps by name and
+    returns its own result, which must be JSON serializable so it can be
+    checkpointed.
+    """
+
+    name: str
+    func: Callable[[Dict[str, Any]], Any]
+    requires: Tuple[str, ...] = ()
+
+
+@dataclass
+class PipelineResult:
+    """Results and timings of a pipeline run."""
+
+    results: Dict[str, Any] = field(default_factory=dict)
+    durations: Dict[str, float] = field(default_factory=dict)
+    resumed: List[str] = field(default_factory=list)
+    wall_time: float = 0.0
+
+
+class Checkpoint:
+    """JSON file recording the result and duration of every completed step."""
+
+    def __init__(self, path: Optional[str]) -> None:
+        """Load the checkpoint file, if it exists.
+
+        Args:
+            path: Checkpoint file path (None: keep checkpoints in memory only)
+        """
+        self.path = path
+        self.steps: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, "r") as f:
+                self.steps = json.load(f).get("steps", {})
+
+    def record(self, name: str, result: Any, duration: float) -> None:
+        """Record a completed step and atomically rewrite the checkpoint file."""
+        with self._lock:
+            self.steps[name] = {"result": result, "duration": duration}
+            if not self.path:
+                return
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"steps": self.steps}, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.path)
+
+
+def _check_graph(steps: List[Step]) -> None:
+    """Reject duplicate names, unknown requirements and cycles."""
+    by_name = {step.name: step for step in steps}
+    if len(by_name) != len(steps):
+        raise PipelineError("Duplicate step names")
+    for step in steps:
+        for required in step.requires:
+            if required not in by_name:
+                raise PipelineError(f"Step {step.name} requires unknown step {required}")
+    done: set = set()
+    remaining = list(steps)
+    while remaining:
+        ready = [step for step in remaining if set(step.requires) <= done]
+        if not ready:
+            names = ", ".join(step.name for step in remaining)
+            raise PipelineError(f"Dependency cycle between steps: {names}")
+        done.update(step.name for step in ready)
+        remaining = [step for step in remaining if step.name not in done]
+
+
+def _run_step(step: Step, context: Dict[str, Any]) -> Any:
+    """Run one step, as a trace span."""
+    with span(f"step {step.name}"):
+        return step.func(context)
+
+
+def run_pipeline(
+    steps: List[Step],
+    checkpoint: Optional[Checkpoint] = None,
+    jobs: int = DEFAULT_JOBS,
+    log: Callable[[str], None] = print,
+) -> PipelineResult:
+    """Run steps concurrently as soon as the steps they require have completed.
+
+    Steps already recorded in the checkpoint are not run again. When a step
+    fails, no further steps are started; running steps are allowed to finish
+    and are checkpointed, so a rerun resumes from the failed step.
+
+    Args:
+        steps: Pipeline steps
+        checkpoint: Checkpoint of completed steps (default: in memory only)
+        jobs: Maximum number of steps running at once
+        log: Function used to report progress
+
+    Returns:
+        PipelineResult: Results and durations of all steps
+
+    Raises:
+        PipelineError: If the graph is invalid or a step fails
+    """
+    _check_graph(steps)
+    checkpoint = checkpoint or Checkpoint(None)
+    result = PipelineResult()
+    names = {step.name for step in steps}
+    for name, entry in checkpoint.steps.items():
+        if name not in names:
+            continue
+        result.results[name] = entry["result"]
+        result.durations[name] = entry["duration"]
+        result.resumed.append(name)
+        log(f"[{name}] already done")
+
+    pending = [step for step in steps if step.name not in result.results]
+    running: Dict[Future, Tuple[Step, float]] = {}
+    failure: Optional[PipelineError] = None
+    start = time.monotonic()
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        while pending or running:
+            if failure is None:
+                for step in [s for s in pending if all(r in result.results for r in s.requires)]:
+                    pending.remove(step)
+                    log(f"[{step.name}] started")
+                    context = dict(result.results)
+                    running[pool.submit(_run_step, step, context)] = (step, time.monotonic())
+            if not running:
+                break
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                step, started = running.pop(future)
+                duration = time.monotonic() - started
+                try:
+                    value = future.result()
+                except Exception as e:
+                    log(f"[{step.name}] failed after {duration:.1f}s: {str(e)}")
+                    failure = failure or PipelineError(f"Step {step.name} failed: {e}", step.name)
+                    continue
+                checkpoint.record(step.name, value, duration)
+                result.results[step.name] = value
+                result.durations[step.name] = duration
+                log(f"[{step.name}] done in {duration:.1f}s")
+
+    result.wall_time = time.monotonic() - start
+    if failure is not None:
+        raise failure
+    return result
+
+
+def critical_path(steps: List[Step], durations: Dict[str, float]) -> List[str]:
+    """Find the chain of dependent steps that bounds the pipeline's duration.
+
+    Args:
+        steps: Pipeline steps
+        durations: Duration of each step in seconds
+
+    Returns:
+        List[str]: Step names along the critical path, in execution order
+    """
+    by_name = {step.name: step for step in steps}
+    finish: Dict[str, float] = {}
+    previous: Dict[str, Optional[str]] = {}
+
+    def finish_time(name: str) -> float:
+        if name not in finish:
+            requires = by_name[name].requires
+            before = max(requires, key=finish_time) if requires else None
+            previous[name] = before
+            finish[name] = (finish_time(before) if before else 0.0) + durations.get(name, 0.0)
+        return finish[name]
+
+    if not steps:
+        return []
+    name: Optional[str] = max((step.name for step in steps), key=finish_time)
+    path = []
+    while name is not None:
+        path.append(name)
+        name = previous[name]
+    return path[::-1]
+
+
+def format_timings(steps: List[Step], result: PipelineResult) -> str:
+    """Format the critical path of a run as a timing breakdown.
+
+    Args:
+        steps: Pipeline steps
+        result: Result of run_pipeline()
+
+    Returns:
+        str: Multi-line report
+    """
+    path = critical_path(steps, result.durations)
+    lines = ["Critical path:"]
+    for name in path:
+        note = " (resumed)" if name in result.resumed else ""
+        lines.append(f"  {name:<12} {result.durations.get(name, 0.0):8.1f}s{note}")
+    total = sum(result.durations.get(name, 0.0) for name in path)
+    serial = sum(d for name, d in result.durations.items() if name not in result.resumed)
+    lines.append(f"  {'total':<12} {total:8.1f}s")
+    lines.append(f"Wall time {result.wall_time:.1f}s; steps run serially would take {serial:.1f}s")
+    return "\n".join(lines)
@@ -0,0 +1,217 @@
+"""CPU and allocation profiling for Kreatisite CLI.
+
+The CLI imports this module only when --profile is given, so runs without
+the flag neither import the profilers nor pay for them.
+"""
+
+import cProfile
+import linecache
+import os
+import pstats
+import sys
+import threading
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Output files ending in these suffixes get collapsed stacks instead of pstats
+COLLAPSED_SUFFIXES = (".folded", ".collapsed")
+DEFAULT_TOP_ALLOCATIONS = 25
+ALLOC_TRACEBACK_FRAMES = 10
+# Stacks deeper than this, or taking less time than this, are cut off when collapsing
+MAX_STACK_DEPTH = 200
+MIN_STACK_SECONDS = 0.00001
+
+Func = Tuple[str, int, str]
+Handler = Callable[[Any], Optional[int]]
+
+
+def default_output(mode: str) -> str:
+    """Return the default output file of a profiling mode."""
+    return "kreatisite-cpu.prof" if mode == "cpu" else "kreatisite-alloc.txt"
+
+
+def _label(func: Func) -> str:
+    """Format a profiled function as module-relative file:function."""
+    filename, line, name = func
+    if filename == "~":
+        return name.strip("<>")
+    parts = filename.replace(os.sep, "/").split("/")
+    return f"{'/'.join(parts[-2:])}:{name}:{line}"
+
+
+def collapsed_stacks(stats: Dict[Func, Any]) -> List[str]:
+    """Convert cProfile statistics into collapsed stacks for flame graphs.
+
+    cProfile records caller/callee pairs rather than full stacks, so the
+    stacks are rebuilt by walking the call graph from the entry points and
+    splitting each function's own time across its callers by their share of
+    its cumulative time.
+
+    Args:
+        stats: The stats attribute of pstats.Stats
+
+    Returns:
+        List[str]: Lines of "outer;...;inner microseconds"
+    """
+    callees: Dict[Func, Dict[Func, float]] = {}
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            callees.setdefault(caller, {})[func] = edge[3]
+    totals: Dict[str, float] = {}
+
+    def walk(func: Func, stack: Tuple[str, ...], share: float) -> None:
+        stack = stack + (_label(func),)
+        key = ";".join(stack)
+        totals[key] = totals.get(key, 0.0) + stats[func][2] * share
+        if len(stack) >= MAX_STACK_DEPTH:
+            return
+        for callee, edge_time in callees.get(func, {}).items():
+            callee_total = stats[callee][3]
+            if share * edge_time < MIN_STACK_SECONDS or _label(callee) in stack:
+                continue
+            walk(callee, stack, share * min(1.0, edge_time / callee_total))
+
+    for func, entry in stats.items():
+        if not entry[4]:
+            walk(func, (), 1.0)
+    lines = []
+    for stack, seconds in sorted(totals.items()):
+        microseconds = int(seconds * 1_000_000)
+        if microseconds > 0:
+            lines.append(f"{stack} {microseconds}")
+    return lines
+
+
+class CpuProfile:
+    """cProfile profiles of the calling thread and the threads it starts."""
+
+    def __init__(self) -> None:
+        """Initialize the profile."""
+        self.profiles: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    def _start_thread(self, *_: Any) -> None:
+        """Start profiling a new thread; installed with threading.setprofile."""
+        profile = cProfile.Profile()
+        with self._lock:
+            self.profiles.append(profile)
+        profile.enable()
+
+    def __enter__(self) -> "CpuProfile":
+        """Start profiling."""
+        threading.setprofile(self._start_thread)
+        self._start_thread()
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        """Stop profiling the calling thread and stop profiling new threads."""
+        threading.setprofile(None)  # type: ignore[arg-type]
+        self.profiles[0].disable()
+
+    def stats(self) -> pstats.Stats:
+        """Return the statistics of all profiled threads combined."""
+        with self._lock:
+            profiles = list(self.profiles)
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+        return stats
+
+    def write(self, path: str) -> None:
+        """Write the profile as pstats, or as collapsed stacks for .folded/.collapsed files.
+
+        Args:
+            path: Output file path
+        """
+        stats = self.stats()
+        if path.endswith(COLLAPSED_SUFFIXES):
+            with open(path, "w") as f:
+                f.writelines(line + "\n" for line in collapsed_stacks(stats.stats))  # type: ignore
+        else:
+            stats.dump_stats(path)
+
+
+def _size(size: float) -> str:
+    """Format a byte count, e.g., 1.5 MiB."""
+    for unit in ("B", "KiB", "MiB"):
+        if abs(size) < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GiB"
+
+
+def allocation_report(
+    snapshot: tracemalloc.Snapshot,
+    peak: int,
+    current: int,
+    top: int = DEFAULT_TOP_ALLOCATIONS,
+) -> str:
+    """Summarize a tracemalloc snapshot.
+
+    Args:
+        snapshot: Snapshot taken when the command ended
+        peak: Peak traced memory in bytes
+        current: Traced memory in bytes when the command ended
+        top: Number of allocation sites to list
+
+    Returns:
+        str: Report with the peak and the sites holding the most memory
+    """
+    snapshot = snapshot.filter_traces(
+        (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        )
+    )
+    lines = [
+        f"Peak traced memory: {_size(peak)}",
+        f"Traced memory at exit: {_size(current)}",
+        "",
+        f"Top {top} allocation sites still held at exit:",
+    ]
+    for index, stat in enumerate(snapshot.statistics("lineno")[:top], 1):
+        frame = stat.traceback[0]
+        lines.append(
+            f"{index:4}. {frame.filename}:{frame.lineno}: "
+            f"{_size(stat.size)} in {stat.count} blocks"
+        )
+        source = linecache.getline(frame.filename, frame.lineno).strip()
+        if source:
+            lines.append(f"        {source}")
+    return "\n".join(lines) + "\n"
+
+
+def profiled(handler: Handler, mode: str, output: Optional[str] = None) -> Handler:
+    """Wrap a command handler so its run is profiled.
+
+    Args:
+        handler: Command handler taking the parsed arguments
+        mode: "cpu" for cProfile statistics, "alloc" for tracemalloc allocation sites
+        output: Output file (default: kreatisite-cpu.prof or kreatisite-alloc.txt)
+
+    Returns:
+        Handler: Handler writing the profile once the command ends
+    """
+    path = output or default_output(mode)
+
+    def run(args: Any) -> Optional[int]:
+        if mode == "cpu":
+            profile = CpuProfile()
+            try:
+                with profile:
+                    return handler(args)
+            finally:
+                profile.write(path)
+                print(f"Wrote CPU profile to {path}", file=sys.stderr)
+        tracemalloc.start(ALLOC_TRACEBACK_FRAMES)
+        try:
+            return handler(args)
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            with open(path, "w") as f:
+                f.write(allocation_report(snapshot, peak, current))
+            print(f"Wrote allocation profile to {path} (peak {_size(peak)})", file=sys.stderr)
+
+    return run
@@ -0,0 +1,98 @@
+"""Rate limiting functions for Kreatisite CLI."""
+
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+
+class RateLimiter:
+    """Thread-safe token bucket allowing a steady rate with short bursts."""
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        clock: Optional[Callable[[], float]] = None,
+        sleep: Optional[Callable[[float], None]] = None,
+    ) -> None:
+        """Initialize the limiter with a full bucket.
+
+        Args:
+            rate: Tokens added per second
+            burst: Bucket capacity
+            clock: Monotonic clock (default: time.monotonic)
+            sleep: Function used to sleep (default: time.sleep)
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._clock = clock or time.monotonic
+        self._sleep = sleep or time.sleep
+        self._tokens = float(self.burst)
+        self._updated = self._clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self) -> bool:
+        """Take a token if one is available, without waiting.
+
+        Returns:
+            bool: True if a token was taken
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def acquire(self) -> float:
+        """Take a token, sleeping until one is available.
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        with self._lock:
+            self._refill()
+            # Reserve the token now so concurrent callers queue up behind each other
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            self._sleep(wait)
+        return wait
+
+
+class KeyedRateLimiter:
+    """One token bucket per key, e.g., per host."""
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        """Initialize the limiter.
+
+        Args:
+            rate: Tokens added per second for each key
+            burst: Bucket capacity for each key
+        """
+        self.rate = rate
+        self.burst = burst
+        self._limiters: Dict[str, RateLimiter] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str) -> float:
+        """Take a token from the bucket of a key, sleeping until one is available.
+
+        Args:
+            key: Bucket key
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        with self._lock:
+            limiter = self._limiters.get(key)
+            if limiter is None:
+                limiter = self._limiters[key] = RateLimiter(self.rate, self.burst)
+        return limiter.acquire()
@@ -1,7 +1,28 @@
 """Scripts for development and build processes."""
 
+import argparse
+import hashlib
+import json
+import os
 import subprocess
 import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+CHECK_CACHE = os.path.join(".kreatisite-cache", "check.json")
+LINT_CONFIG_FILES = (".flake8", "setup.cfg", "tox.ini")
+TYPE_CONFIG_FILES = ("mypy.ini", "pyproject.toml")
+UNIT_TEST_COMMAND = [
+    "pytest",
+    "-q",
+    "-m",
+    "unit",
+    "--cov=kreatisite",
+    "--cov-report=term-missing",
+    "--cov-fail-under=80",
+]
 
 
 def lint() -> int:
@@ -36,52 +57,126 @@ def test() -> int:
     return 0
 
 
-def run_unit_tests() -> int:
+def _test_arguments(name: str, argv: Optional[Sequence[str]]) -> argparse.Namespace:
+    """Parse the options of a test script."""
+    parser = argparse.ArgumentParser(prog=name)
+    parser.add_argument(
+        "--impact",
+        action="store_true",
+        help="Run only the tests affected by changes since the test impact map was recorded",
+    )
+    parser.add_argument(
+        "--changed",
+        nargs="*",
+        metavar="PATH",
+        help="Changed files to select tests for, instead of asking git (implies --impact)",
+    )
+    return parser.parse_args(sys.argv[1:] if argv is None else argv)
+
+
+def _run_impacted_tests(marker: str, command: List[str], changed: Optional[List[str]]) -> int:
+    """Run the tests affected by changes, or all tests while recording the impact map.
+
+    Args:
+        marker: pytest marker of the tests
+        command: pytest command running all tests with the marker
+        changed: Changed files (default: asked from git)
+
+    Returns:
+        int: pytest's return code
+    """
+    from .testimpact import (
+        build_impact_map,
+        changed_files,
+        impact_map_path,
+        load_impact_map,
+        save_impact_map,
+        select_tests,
+    )
+
+    path = impact_map_path(marker)
+    impact = load_impact_map(path)
+    selected = None
+    if impact is not None:
+        if changed is None:
+            changed = changed_files(impact)
+        if changed is not None:
+            selected = select_tests(impact, changed)
+    if selected is None:
+        print("Test impact map missing or stale; running all tests and recording it")
+        if "--cov=kreatisite" not in command:
+            command = command + ["--cov=kreatisite", "--cov-report="]
+        result = subprocess.run(command + ["--cov-context=test"], check=False)
+        save_impact_map(build_impact_map(), path)
+        return result.returncode
+    if not selected:
+        print("No tests affected by the changes")
+        return 0
+    print(f"Running {len(selected)} affected test(s)")
+    return subprocess.run(["pytest", "-v", "-m", marker, *selected], check=False).returncode
+
+
+def run_unit_tests(argv: Optional[Sequence[str]] = None) -> int:
     """Run unit tests with coverage reporting.
 
+    Args:
+        argv: Command line arguments (default: sys.argv[1:]); --impact runs
+            only the tests affected by changes
+
     Returns:
         int: 0 if tests pass, 1 if they fail
     """
+    args = _test_arguments("unit-tests", argv)
     print("🧪 Running Unit Tests (fast, mocked)...")
     print("=" * 50)
 
     # Run unit tests with coverage
-    result = subprocess.run(
-        [
-            "pytest",
-            "-v",
-            "-m",
-            "unit",
-            "--cov=kreatisite",
-            "--cov-report=term-missing",
-            "--cov-fail-under=80",
-        ],
-        check=False,
-    )
+    command = [
+        "pytest",
+        "-v",
+        "-m",
+        "unit",
+        "--cov=kreatisite",
+        "--cov-report=term-missing",
+        "--cov-fail-under=80",
+    ]
+    if args.impact or args.changed is not None:
+        returncode = _run_impacted_tests("unit", command, args.changed)
+    else:
+        returncode = subprocess.run(command, check=False).returncode
 
-    if result.returncode != 0:
+    if returncode != 0:
         print("❌ Unit tests failed!", file=sys.stderr)
-        return result.returncode
+        return returncode
 
     print("✅ Unit tests passed!")
     return 0
 
 
-def run_integration_tests() -> int:
+def run_integration_tests(argv: Optional[Sequence[str]] = None) -> int:
     """Run integration tests.
 
+    Args:
+        argv: Command line arguments (default: sys.argv[1:]); --impact runs
+            only the tests affected by changes
+
     Returns:
         int: 0 if tests pass, 1 if they fail
     """
+    args = _test_arguments("integration-tests", argv)
     print("🔗 Running Integration Tests (installed package)...")
     print("=" * 50)
 
     # Run integration tests
-    result = subprocess.run(["pytest", "-v", "-m", "integration"], check=False)
+    command = ["pytest", "-v", "-m", "integration"]
+    if args.impact or args.changed is not None:
+        returncode = _run_impacted_tests("integration", command, args.changed)
+    else:
+        returncode = subprocess.run(command, check=False).returncode
 
-    if result.returncode != 0:
+    if returncode != 0:
         print("❌ Integration tests failed!", file=sys.stderr)
-        return result.returncode
+        return returncode
 
     print("✅ Integration tests passed!")
     return 0
@@ -98,14 +193,14 @@ def run_comprehensive_tests() -> int:
 
     # Phase 1: Unit Tests with Coverage
     print("\n📋 Phase 1: Unit Tests with Coverage Requirements")
-    unit_result = run_unit_tests()
+    unit_result = run_unit_tests([])
     if unit_result != 0:
         print("❌ Comprehensive tests failed at Phase 1 (Unit Tests)")
         return unit_result
 
     # Phase 2: Integration Tests
     print("\n📋 Phase 2: Integration Tests")
-    integration_result = run_integration_tests()
+    integration_result = run_integration_tests([])
     if integration_result != 0:
         print("❌ Comprehensive tests failed at Phase 2 (Integration Tests)")
         return integration_result
@@ -126,32 +221,243 @@ def run_comprehensive_tests() -> int:
     return 0
 
 
-def check_all() -> int:
+@dataclass
+class Stage:
+    """A check run as a subprocess, possibly concurrently with others."""
+
+    name: str
+    command: List[str]
+    returncode: Optional[int] = None
+    seconds: float = 0.0
+    cached: bool = False
+    output: List[str] = field(default_factory=list)
+    # Hashes of the inputs, stored in the check cache when they pass
+    keys: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def result(self) -> str:
+        """Return the outcome shown in the summary."""
+        if self.cached:
+            return "cached"
+        return "passed" if self.returncode == 0 else "failed"
+
+
+def run_stages(stages: Sequence[Stage]) -> None:
+    """Run stages concurrently, printing their output as it arrives.
+
+    Every line is prefixed with its stage name, so interleaved output stays
+    readable. Stages already marked as cached are not run.
+
+    Args:
+        stages: Stages to run; their return codes, output and timings are filled in
+    """
+    lock = threading.Lock()
+    width = max(len(stage.name) for stage in stages)
+
+    def run(stage: Stage) -> None:
+        start = time.perf_counter()
+        try:
+            process = subprocess.Popen(
+                stage.command,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                bufsize=1,
+            )
+        except OSError as e:
+            stage.output.append(str(e))
+            with lock:
+                print(f"[{stage.name:{width}}] {e}", flush=True)
+            stage.returncode = 127
+        else:
+            assert process.stdout is not None
+            for line in process.stdout:
+                stage.output.append(line.rstrip("\n"))
+                with lock:
+                    print(f"[{stage.name:{width}}] {line}", end="", flush=True)
+            stage.returncode = process.wait()
+        stage.seconds = time.perf_counter() - start
+
+    threads = [threading.Thread(target=run, args=(stage,)) for stage in stages if not stage.cached]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def _file_hash(path: str, salt: str = "") -> str:
+    """Return the SHA-256 of a file's content, mixed with a salt."""
+    digest = hashlib.sha256(salt.encode("utf-8"))
+    with open(path, "rb") as f:
+        digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _config_hash(paths: Sequence[str]) -> str:
+    """Return a combined hash of the configuration files that exist."""
+    return hashlib.sha256(
+        "".join(f"{path}:{_file_hash(path)}" for path in paths if os.path.exists(path)).encode()
+    ).hexdigest()
+
+
+def _source_files(directory: str = "kreatisite") -> List[str]:
+    """Return the Python files of a package, sorted."""
+    return sorted(
+        os.path.join(root, name).replace(os.sep, "/")
+        for root, _, names in os.walk(directory)
+        for name in names
+        if name.endswith(".py")
+    )
+
+
+def load_check_cache(path: str = CHECK_CACHE) -> Dict[str, Dict[str, str]]:
+    """Load the results of earlier checks, or an empty cache."""
+    try:
+        with open(path, "r") as f:
+            cache: Dict[str, Dict[str, str]] = json.load(f)
+            return cache
+    except (OSError, ValueError):
+        return {}
+
+
+def save_check_cache(cache: Dict[str, Dict[str, str]], path: str = CHECK_CACHE) -> None:
+    """Store the results of the checks for the next run."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(cache, f, indent=1, sort_keys=True)
+
+
+def lint_stage(cache: Dict[str, Dict[str, str]]) -> Stage:
+    """Create a flake8 stage checking only files changed since they last passed.
+
+    Args:
+        cache: Check cache; its "flake8" entry maps clean files to content hashes
+
+    Returns:
+        Stage: The stage, marked as cached if every file is unchanged
+    """
+    salt = _config_hash(LINT_CONFIG_FILES)
+    clean = cache.get("flake8", {})
+    hashes = {path: _file_hash(path, salt) for path in _source_files()}
+    changed = {path: key for path, key in hashes.items() if clean.get(path) != key}
+    return Stage("flake8", ["flake8", *changed], cached=not changed, keys=changed)
+
+
+def type_stage(cache: Dict[str, Dict[str, str]]) -> Stage:
+    """Create a mypy stage, skipped if no source changed since it last passed.
+
+    Types flow between modules, so the stage is cached for the package as a
+    whole rather than per file; mypy's own incremental cache speeds up the
+    files that did not change.
+
+    Args:
+        cache: Check cache; its "mypy" entry holds the hash of the passing sources
+
+    Returns:
+        Stage: The stage, marked as cached if nothing changed
+    """
+    salt = _config_hash(TYPE_CONFIG_FILES)
+    key = hashlib.sha256(
+        "".join(f"{path}:{_file_hash(path, salt)}" for path in _source_files()).encode()
+    ).hexdigest()
+    cached = cache.get("mypy", {}).get("sources") == key
+    return Stage("mypy", ["mypy", "kreatisite"], cached=cached, keys={"sources": key})
+
+
+def record_results(stage: Stage, cache: Dict[str, Dict[str, str]]) -> None:
+    """Store the input hashes of a passed stage in the check cache.
+
+    flake8 reports errors per file, so when it fails, the files it reported
+    nothing for are still stored as clean.
+
+    Args:
+        stage: Stage that ran
+        cache: Check cache to update
+    """
+    if stage.cached or not stage.keys or stage.returncode is None:
+        return
+    if stage.returncode == 0:
+        cache.setdefault(stage.name, {}).update(stage.keys)
+    elif stage.name == "flake8" and stage.returncode == 1:
+        failed = {line.split(":", 1)[0] for line in stage.output}
+        clean = {path: key for path, key in stage.keys.items() if path not in failed}
+        cache.setdefault(stage.name, {}).update(clean)
+
+
+def print_summary(stages: Sequence[Stage], wall_time: float) -> None:
+    """Print the result and duration of every stage."""
+    print("\n" + "=" * 60)
+    print(f"{'Stage':<14}{'Result':<10}{'Time':>8}")
+    for stage in stages:
+        print(f"{stage.name:<14}{stage.result:<10}{stage.seconds:>7.1f}s")
+    total = sum(stage.seconds for stage in stages)
+    print(f"Wall time {wall_time:.1f}s (stages {total:.1f}s)")
+    print("=" * 60)
+
+
+def check_all(argv: Optional[Sequence[str]] = None) -> int:
     """Run all checks (linting, type checking, tests, etc.).
 
+    flake8, mypy and the unit tests run concurrently, then the integration
+    and E2E smoke tests. Files that passed flake8 and sources that passed
+    mypy are not checked again until they change.
+
+    Args:
+        argv: Command line arguments (default: sys.argv[1:]); --fast skips the
+            integration and E2E tests, --no-cache checks every file
+
     Returns:
         int: 0 if all checks pass, non-zero if any check fails
     """
+    parser = argparse.ArgumentParser(prog="check", description="Run all checks")
+    parser.add_argument(
+        "--fast", action="store_true", help="Skip the integration and E2E smoke tests"
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Check every file, ignoring earlier results"
+    )
+    args = parser.parse_args(sys.argv[1:] if argv is None else argv)
+
     print("🔍 Running All Checks...")
     print("=" * 60)
+    start = time.perf_counter()
+    cache = {} if args.no_cache else load_check_cache()
+    stages = [lint_stage(cache), type_stage(cache), Stage("unit", UNIT_TEST_COMMAND)]
+    run_stages(stages)
+    for stage in stages:
+        record_results(stage, cache)
+    save_check_cache(cache)
+
+    if not args.fast and all(stage.returncode in (0, None) for stage in stages):
+        later = [
+            Stage("integration", ["pytest", "-q", "-m", "integration"]),
+            Stage("e2e", ["pytest", "-q", "-m", "e2e", "--timeout=60", "tests/test_e2e_smoke.py"]),
+        ]
+        run_stages(later)
+        stages.extend(later)
+
+    print_summary(stages, time.perf_counter() - start)
+    for stage in stages:
+        if stage.returncode:
+            print(f"❌ {stage.name} failed!", file=sys.stderr)
+            return stage.returncode
+    print("✅ ALL CHECKS PASSED!")
+    return 0
 
-    # Run linting
-    print("\n📋 Step 1: Linting")
-    lint_result = lint()
-    if lint_result != 0:
-        return lint_result
 
-    # Run comprehensive tests (unit, integration, e2e)
-    print("\n📋 Step 2: Comprehensive Test Suite")
-    test_result = run_comprehensive_tests()
-    if test_result != 0:
-        return test_result
+def bench() -> int:
+    """Run the benchmarks and compare them with the stored baseline.
 
-    print("\n" + "=" * 60)
-    print("✅ ALL CHECKS PASSED!")
-    print("   - Linting: ✅")
-    print("   - Comprehensive Tests: ✅")
-    print("=" * 60)
+    Arguments after "poetry run bench" are passed on (e.g., --save-baseline).
+
+    Returns:
+        int: 0 if no benchmark regressed, non-zero otherwise
+    """
+    print("⏱️  Running benchmarks...")
+    result = subprocess.run([sys.executable, "-m", "benchmarks", *sys.argv[1:]], check=False)
+    if result.returncode != 0:
+        print("❌ Benchmarks regressed or failed!", file=sys.stderr)
+        return result.returncode
     return 0
 
 
@@ -0,0 +1,145 @@
+/*
+ * Browser reader for the search index written by `kreatisite build site --search-index`.
+ *
+ * Usage:
+ *   KreatisiteSearch.load("/").then(function (index) {
+ *     index.search("latest posts"); // [{url: "/blog/", title: "Blog"}, ...]
+ *   });
+ *
+ * The index (search-index.bin) holds, after the magic bytes KSI1, the varint
+ * document count, term count and dictionary length, then the front-coded term
+ * dictionary and the delta-encoded posting lists. Queries are split into terms
+ * the same way pages were, and a document matches if it holds every term.
+ */
+(function (root) {
+  "use strict";
+
+  var MAGIC = "KSI1";
+  var MIN_TERM_LENGTH = 2;
+  var MAX_TERM_LENGTH = 32;
+  var WORD_RE = /[\p{L}\p{N}_]+/gu;
+
+  function readVarint(bytes, state) {
+    var value = 0;
+    var scale = 1;
+    var byte;
+    do {
+      byte = bytes[state.offset++];
+      value += (byte & 0x7f) * scale;
+      scale *= 128;
+    } while (byte >= 0x80);
+    return value;
+  }
+
+  function tokenize(text) {
+    var terms = {};
+    (text.toLowerCase().match(WORD_RE) || []).forEach(function (word) {
+      var length = Array.from(word).length;
+      if (length >= MIN_TERM_LENGTH && length <= MAX_TERM_LENGTH) {
+        terms[word] = true;
+      }
+    });
+    return Object.keys(terms).sort();
+  }
+
+  function SearchIndex(buffer, documents) {
+    var bytes = new Uint8Array(buffer);
+    if (String.fromCharCode.apply(null, bytes.subarray(0, MAGIC.length)) !== MAGIC) {
+      throw new Error("Not a search index");
+    }
+    var decoder = new TextDecoder("utf-8");
+    var state = { offset: MAGIC.length };
+    readVarint(bytes, state);
+    var count = readVarint(bytes, state);
+    var dictionaryLength = readVarint(bytes, state);
+    var postingsOffset = state.offset + dictionaryLength;
+    var previous = new Uint8Array(0);
+
+    this.bytes = bytes;
+    this.documents = documents;
+    // Term -> [posting list offset, document frequency]
+    this.terms = new Map();
+    for (var i = 0; i < count; i++) {
+      var shared = readVarint(bytes, state);
+      var suffixLength = readVarint(bytes, state);
+      var encoded = new Uint8Array(shared + suffixLength);
+      encoded.set(previous.subarray(0, shared));
+      encoded.set(bytes.subarray(state.offset, state.offset + suffixLength), shared);
+      state.offset += suffixLength;
+      var frequency = readVarint(bytes, state);
+      var length = readVarint(bytes, state);
+      this.terms.set(decoder.decode(encoded), [postingsOffset, frequency]);
+      postingsOffset += length;
+      previous = encoded;
+    }
+  }
+
+  SearchIndex.prototype.postings = function (term) {
+    var entry = this.terms.get(term);
+    if (!entry) {
+      return [];
+    }
+    var state = { offset: entry[0] };
+    var docs = new Array(entry[1]);
+    var last = 0;
+    for (var i = 0; i < entry[1]; i++) {
+      last += readVarint(this.bytes, state);
+      docs[i] = last;
+    }
+    return docs;
+  };
+
+  SearchIndex.prototype.search = function (query) {
+    var terms = tokenize(query);
+    if (!terms.length) {
+      return [];
+    }
+    var self = this;
+    // Intersect the rarest terms first to keep the candidate set small
+    terms.sort(function (a, b) {
+      return (self.terms.has(a) ? self.terms.get(a)[1] : 0) -
+        (self.terms.has(b) ? self.terms.get(b)[1] : 0);
+    });
+    var matches = null;
+    for (var i = 0; i < terms.length; i++) {
+      var docs = this.postings(terms[i]);
+      matches = matches === null ? docs : docs.filter(function (doc) {
+        return this.has(doc);
+      }, new Set(matches));
+      if (!matches.length) {
+        return [];
+      }
+    }
+    return matches.map(function (doc) {
+      return self.documents[doc];
+    });
+  };
+
+  function load(base) {
+    var prefix = base || "/";
+    if (prefix.charAt(prefix.length - 1) !== "/") {
+      prefix += "/";
+    }
+    function get(name, read) {
+      return fetch(prefix + name).then(function (response) {
+        if (!response.ok) {
+          throw new Error("Cannot load " + name + ": " + response.status);
+        }
+        return read(response);
+      });
+    }
+    return Promise.all([
+      get("search-index.bin", function (r) { return r.arrayBuffer(); }),
+      get("search-docs.json", function (r) { return r.json(); }),
+    ]).then(function (parts) {
+      return new SearchIndex(parts[0], parts[1]);
+    });
+  }
+
+  var api = { load: load, SearchIndex: SearchIndex, tokenize: tokenize };
+  if (typeof module === "object" && module.exports) {
+    module.exports = api;
+  } else {
+    root.KreatisiteSearch = api;
+  }
+})(typeof self !== "undefined" ? self : this);
@@ -0,0 +1,325 @@
+"""Compact client-side search index builder for Kreatisite CLI.
+
+Pages load the index in the browser with search.js, the reader written next
+to it, which decodes the same format as read_search_index() below.
+"""
+
+import heapq
+import json
+import os
+import re
+import shutil
+import tempfile
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple
+
+SEARCH_INDEX_NAME = "search-index.bin"
+SEARCH_DOCS_NAME = "search-docs.json"
+SEARCH_SCRIPT_NAME = "search.js"
+MAGIC = b"KSI1"
+# (term, document) pairs buffered before a sorted run is spilled to disk
+DEFAULT_MAX_BUFFER = 500000
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = 32
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into the distinct lowercase terms the index stores.
+
+    Args:
+        text: Page title and text
+
+    Returns:
+        List[str]: Sorted distinct terms
+    """
+    return sorted(
+        {
+            word
+            for word in _WORD_RE.findall(text.lower())
+            if MIN_TERM_LENGTH <= len(word) <= MAX_TERM_LENGTH
+        }
+    )
+
+
+def encode_varint(value: int) -> bytes:
+    """Encode a non-negative integer as a LEB128 varint.
+
+    Args:
+        value: Integer to encode
+
+    Returns:
+        bytes: 1 to 10 bytes, 7 bits per byte, least significant first
+    """
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def decode_varint(data: bytes, offset: int) -> Tuple[int, int]:
+    """Decode a LEB128 varint.
+
+    Args:
+        data: Encoded bytes
+        offset: Position of the varint
+
+    Returns:
+        Tuple[int, int]: Decoded value and the position after it
+    """
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def _common_prefix(a: bytes, b: bytes) -> int:
+    """Return the length of the common prefix of two byte strings."""
+    limit = min(len(a), len(b))
+    i = 0
+    while i < limit and a[i] == b[i]:
+        i += 1
+    return i
+
+
+def _read_run(path: str) -> Iterator[Tuple[str, int]]:
+    """Yield the (term, document) pairs of a spilled run in order."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            term, doc = line.rstrip("\n").split("\t")
+            yield term, int(doc)
+
+
+class SearchIndexBuilder:
+    """Build a search index from a stream of pages with bounded memory.
+
+    (term, document) pairs are buffered and spilled to sorted run files once
+    max_buffer pairs accumulate; close() merges the runs and writes the index
+    in one pass. Documents (URL and title) are streamed to a JSON array as
+    they are added.
+
+    The index file holds, after the magic bytes KSI1, the varint document
+    count, term count and dictionary length, then the term dictionary and the
+    posting lists. Dictionary entries are front coded against the previous
+    term: varints for the shared prefix length and suffix length, the UTF-8
+    suffix, the document frequency and the posting list length in bytes.
+    Posting lists hold delta-encoded document numbers as varints.
+    """
+
+    def __init__(
+        self,
+        index_path: str,
+        docs_path: str,
+        max_buffer: int = DEFAULT_MAX_BUFFER,
+        tmp_dir: Optional[str] = None,
+    ) -> None:
+        """Initialize the builder.
+
+        Args:
+            index_path: Index file to write
+            docs_path: Document list file to write
+            max_buffer: Pairs buffered in memory before spilling a sorted run
+            tmp_dir: Directory for spilled runs (default: system temp directory)
+        """
+        self.index_path = index_path
+        self.max_buffer = max_buffer
+        self.docs = 0
+        self.terms = 0
+        self.runs: List[str] = []
+        self._buffer: List[Tuple[str, int]] = []
+        self._tmp_dir = tempfile.mkdtemp(prefix="kreatisite-search-", dir=tmp_dir)
+        self._docs_file: IO[str] = open(docs_path, "w", encoding="utf-8")
+        self._docs_file.write("[")
+        self._closed = False
+
+    def __enter__(self) -> "SearchIndexBuilder":
+        """Return the builder."""
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Write the index, or just clean up if an error occurred."""
+        if exc_info[0] is None:
+            self.close()
+        else:
+            self._cleanup()
+
+    def add(self, url: str, title: str, text: str) -> int:
+        """Add a page to the index.
+
+        Args:
+            url: Page URL
+            title: Page title
+            text: Page text
+
+        Returns:
+            int: Document number of the page
+        """
+        doc = self.docs
+        separator = "," if doc else ""
+        self._docs_file.write(f"{separator}\n{json.dumps({'url': url, 'title': title})}")
+        self.docs += 1
+        self._buffer.extend((term, doc) for term in tokenize(f"{title} {text}"))
+        if len(self._buffer) >= self.max_buffer:
+            self._spill()
+        return doc
+
+    def _spill(self) -> None:
+        self._buffer.sort()
+        path = os.path.join(self._tmp_dir, f"run-{len(self.runs)}.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.writelines(f"{term}\t{doc}\n" for term, doc in self._buffer)
+        self.runs.append(path)
+        self._buffer = []
+
+    def _merged(self) -> Iterator[Tuple[str, List[int]]]:
+        """Yield each term with its sorted documents, merging the runs lazily."""
+        self._buffer.sort()
+        streams = [_read_run(path) for path in self.runs] + [iter(self._buffer)]
+        term: Optional[str] = None
+        docs: List[int] = []
+        for next_term, doc in heapq.merge(*streams):
+            if next_term != term:
+                if term is not None:
+                    yield term, docs
+                term, docs = next_term, []
+            docs.append(doc)
+        if term is not None:
+            yield term, docs
+
+    def close(self) -> Tuple[int, int]:
+        """Merge the runs and write the index.
+
+        Returns:
+            Tuple[int, int]: Number of documents and terms indexed
+        """
+        if self._closed:
+            return self.docs, self.terms
+        self._docs_file.write("\n]\n")
+        self._docs_file.close()
+
+        dictionary_path = os.path.join(self._tmp_dir, "dictionary.bin")
+        postings_path = os.path.join(self._tmp_dir, "postings.bin")
+        previous = b""
+        with open(dictionary_path, "wb") as dictionary, open(postings_path, "wb") as postings:
+            for term, docs in self._merged():
+                encoded = term.encode()
+                shared = _common_prefix(previous, encoded)
+                posting = bytearray()
+                last = 0
+                for doc in docs:
+                    posting += encode_varint(doc - last)
+                    last = doc
+                dictionary.write(
+                    encode_varint(shared)
+                    + encode_varint(len(encoded) - shared)
+                    + encoded[shared:]
+                    + encode_varint(len(docs))
+                    + encode_varint(len(posting))
+                )
+                postings.write(posting)
+                previous = encoded
+                self.terms += 1
+
+        with open(self.index_path, "wb") as out:
+            out.write(MAGIC)
+            out.write(encode_varint(self.docs))
+            out.write(encode_varint(self.terms))
+            out.write(encode_varint(os.path.getsize(dictionary_path)))
+            for path in (dictionary_path, postings_path):
+                with open(path, "rb") as f:
+                    shutil.copyfileobj(f, out)
+        self._cleanup()
+        return self.docs, self.terms
+
+    def _cleanup(self) -> None:
+        if not self._docs_file.closed:
+            self._docs_file.close()
+        self._buffer = []
+        shutil.rmtree(self._tmp_dir, ignore_errors=True)
+        self._closed = True
+
+
+def write_search_script(output_dir: str) -> str:
+    """Copy the browser reader of the search index into a build output.
+
+    Args:
+        output_dir: Build output directory
+
+    Returns:
+        str: Path of the written script
+    """
+    path = os.path.join(output_dir, SEARCH_SCRIPT_NAME)
+    shutil.copyfile(os.path.join(os.path.dirname(__file__), SEARCH_SCRIPT_NAME), path)
+    return path
+
+
+def read_search_index(path: str) -> Iterator[Tuple[str, List[int]]]:
+    """Decode a search index file term by term.
+
+    Args:
+        path: Index file written by SearchIndexBuilder
+
+    Yields:
+        Tuple[str, List[int]]: Term and the documents containing it
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(MAGIC):
+        raise ValueError(f"{path} is not a search index")
+    offset = len(MAGIC)
+    _, offset = decode_varint(data, offset)
+    terms, offset = decode_varint(data, offset)
+    dictionary_length, offset = decode_varint(data, offset)
+    postings_offset = offset + dictionary_length
+    previous = b""
+    for _ in range(terms):
+        shared, offset = decode_varint(data, offset)
+        suffix_length, offset = decode_varint(data, offset)
+        encoded = previous[:shared] + data[offset : offset + suffix_length]
+        offset += suffix_length
+        count, offset = decode_varint(data, offset)
+        length, offset = decode_varint(data, offset)
+        docs = []
+        position, last = postings_offset, 0
+        for _ in range(count):
+            delta, position = decode_varint(data, position)
+            last += delta
+            docs.append(last)
+        postings_offset += length
+        previous = encoded
+        yield encoded.decode(), docs
+
+
+def search(index_path: str, docs_path: str, query: str) -> List[Dict[str, str]]:
+    """Return the documents containing every term of a query.
+
+    Args:
+        index_path: Index file written by SearchIndexBuilder
+        docs_path: Document list written by SearchIndexBuilder
+        query: Search terms
+
+    Returns:
+        List[Dict[str, str]]: Matching documents (url and title), in site order
+    """
+    wanted = set(tokenize(query))
+    if not wanted:
+        return []
+    matches: Optional[set] = None
+    for term, docs in read_search_index(index_path):
+        if term in wanted:
+            matches = set(docs) if matches is None else matches & set(docs)
+            wanted.discard(term)
+    if wanted or not matches:
+        return []
+    with open(docs_path, "r", encoding="utf-8") as f:
+        documents = json.load(f)
+    return [documents[doc] for doc in sorted(matches)]
@@ -0,0 +1,396 @@
+"""Local development server functions for Kreatisite CLI."""
+
+import importlib.util
+import mimetypes
+import os
+import posixpath
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import unquote, urlsplit
+
+from .build import HTML_EXTENSIONS, iter_source_files, render_file
+from .defaults import DEFAULT_POLL_INTERVAL
+
+LIVERELOAD_PATH = "/__kreatisite/livereload"
+# Changes arriving within this window are rebuilt together
+DEBOUNCE_SECONDS = 0.02
+KEEPALIVE_SECONDS = 15.0
+
+LIVERELOAD_SCRIPT = (
+    "<script>new EventSource(%r).onmessage=function(){location.reload()};</script>"
+    % LIVERELOAD_PATH
+)
+
+
+class SiteCache:
+    """In-memory build of a site, updated file by file as sources change."""
+
+    def __init__(self, source_dir: str, live_reload: bool = True) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            source_dir: Site source directory
+            live_reload: Whether to inject the live-reload script into pages
+        """
+        self.source_dir = source_dir
+        self.live_reload = live_reload
+        self._pages: Dict[str, Tuple[bytes, str]] = {}
+        self._lock = threading.Lock()
+
+    def load_all(self) -> int:
+        """Build every source file into the cache.
+
+        Returns:
+            int: Number of files built
+        """
+        return len(self.update(iter_source_files(self.source_dir)))
+
+    def _render(self, rel_path: str) -> Tuple[bytes, str]:
+        """Render one source file the way it will be served."""
+        with open(os.path.join(self.source_dir, rel_path), "rb") as f:
+            data = render_file(rel_path, f.read(), {}, minify=False)
+        content_type = mimetypes.guess_type(rel_path)[0] or "application/octet-stream"
+        if posixpath.splitext(rel_path)[1].lower() in HTML_EXTENSIONS and self.live_reload:
+            script = LIVERELOAD_SCRIPT.encode("utf-8")
+            index = data.lower().rfind(b"</body>")
+            data = data[:index] + script + data[index:] if index >= 0 else data + script
+        if content_type.startswith("text/") or content_type == "application/javascript":
+            content_type += "; charset=utf-8"
+        return data, content_type
+
+    def update(self, rel_paths: Iterable[str]) -> List[str]:
+        """Rebuild the given files or directories, dropping those that were deleted.
+
+        Args:
+            rel_paths: Changed paths relative to the source directory
+
+        Returns:
+            List[str]: Files that were rebuilt or removed
+        """
+        affected: Set[str] = set()
+        for rel_path in rel_paths:
+            path = os.path.join(self.source_dir, rel_path)
+            if os.path.isdir(path):
+                affected.update(posixpath.join(rel_path, f) for f in iter_source_files(path))
+            with self._lock:
+                prefix = rel_path.rstrip("/") + "/"
+                affected.update(p for p in self._pages if p == rel_path or p.startswith(prefix))
+            if os.path.isfile(path):
+                affected.add(rel_path)
+
+        for rel_path in affected:
+            try:
+                page: Optional[Tuple[bytes, str]] = self._render(rel_path)
+            except (OSError, UnicodeDecodeError):
+                page = None
+            with self._lock:
+                if page is None:
+                    self._pages.pop(rel_path, None)
+                else:
+                    self._pages[rel_path] = page
+        return sorted(affected)
+
+    def get(self, url_path: str) -> Optional[Tuple[bytes, str]]:
+        """Look up the response for a URL path.
+
+        Args:
+            url_path: Request path (e.g., /, /blog/, /css/app.css)
+
+        Returns:
+            Optional[Tuple[bytes, str]]: Body and content type, or None if not found
+        """
+        rel_path = posixpath.normpath(unquote(url_path)).lstrip("/")
+        if url_path.endswith("/") or rel_path in ("", "."):
+            rel_path = posixpath.join("" if rel_path == "." else rel_path, "index.html")
+        with self._lock:
+            return self._pages.get(rel_path) or self._pages.get(
+                posixpath.join(rel_path, "index.html")
+            )
+
+
+class LiveReload:
+    """Fan-out of reload events to connected browsers."""
+
+    def __init__(self) -> None:
+        """Initialize with no subscribers."""
+        self._subscribers: Set["queue.Queue[str]"] = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self) -> "queue.Queue[str]":
+        """Register a browser connection and return its event queue."""
+        events: "queue.Queue[str]" = queue.Queue()
+        with self._lock:
+            self._subscribers.add(events)
+        return events
+
+    def unsubscribe(self, events: "queue.Queue[str]") -> None:
+        """Forget a browser connection."""
+        with self._lock:
+            self._subscribers.discard(events)
+
+    def notify(self, message: str = "reload") -> int:
+        """Send an event to every connected browser.
+
+        Returns:
+            int: Number of browsers notified
+        """
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for events in subscribers:
+            events.put(message)
+        return len(subscribers)
+
+
+class PollingWatcher(threading.Thread):
+    """Watcher that detects changes by periodically comparing file metadata."""
+
+    def __init__(
+        self,
+        source_dir: str,
+        on_change: Callable[[Set[str]], None],
+        interval: float = DEFAULT_POLL_INTERVAL,
+    ) -> None:
+        """Initialize the watcher.
+
+        Args:
+            source_dir: Directory to watch
+            on_change: Called with the set of changed relative paths
+            interval: Seconds between scans
+        """
+        super().__init__(daemon=True)
+        self.source_dir = source_dir
+        self.on_change = on_change
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        """Collect the modification time and size of every source file."""
+        snapshot = {}
+        for rel_path in iter_source_files(self.source_dir):
+            try:
+                stat = os.stat(os.path.join(self.source_dir, rel_path))
+            except OSError:
+                continue
+            snapshot[rel_path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def run(self) -> None:
+        """Scan for changes until stopped."""
+        while not self._stopped.wait(self.interval):
+            snapshot = self._scan()
+            changed = {
+                path
+                for path in set(snapshot) | set(self._snapshot)
+                if snapshot.get(path) != self._snapshot.get(path)
+            }
+            self._snapshot = snapshot
+            if changed:
+                self.on_change(changed)
+
+    def stop(self) -> None:
+        """Stop scanning."""
+        self._stopped.set()
+
+
+def start_watcher(
+    source_dir: str,
+    on_change: Callable[[Set[str]], None],
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+) -> Any:
+    """Watch a directory with OS file notifications, falling back to polling.
+
+    Notifications need the optional watchdog package.
+
+    Args:
+        source_dir: Directory to watch
+        on_change: Called with the set of changed relative paths
+        poll_interval: Seconds between scans when polling
+
+    Returns:
+        Any: Running watcher with a stop() method
+    """
+    if importlib.util.find_spec("watchdog") is None:
+        watcher = PollingWatcher(source_dir, on_change, poll_interval)
+        watcher.start()
+        return watcher
+
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+
+    class Handler(FileSystemEventHandler):
+        def on_any_event(self, event: Any) -> None:
+            # Directory modifications only mean a child changed, which has its own event
+            if event.is_directory and event.event_type == "modified":
+                return
+            paths = {event.src_path, getattr(event, "dest_path", "") or event.src_path}
+            changed = {
+                os.path.relpath(os.fsdecode(p), source_dir).replace(os.sep, "/") for p in paths
+            }
+            on_change({p for p in changed if not any(s.startswith(".") for s in p.split("/"))})
+
+    observer = Observer()
+    observer.schedule(Handler(), source_dir, recursive=True)
+    observer.start()
+    return observer
+
+
+class _Rebuilder:
+    """Debounces change notifications and rebuilds affected files in the background."""
+
+    def __init__(
+        self, cache: SiteCache, live_reload: LiveReload, log: Callable[[str], None]
+    ) -> None:
+        self.cache = cache
+        self.live_reload = live_reload
+        self.log = log
+        self._pending: Set[str] = set()
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def __call__(self, changed: Set[str]) -> None:
+        with self._lock:
+            self._pending.update(changed)
+        self._wakeup.set()
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait()
+            time.sleep(DEBOUNCE_SECONDS)
+            with self._lock:
+                changed, self._pending = self._pending, set()
+                self._wakeup.clear()
+            if not changed:
+                continue
+            start = time.perf_counter()
+            rebuilt = self.cache.update(changed)
+            if rebuilt:
+                browsers = self.live_reload.notify()
+                elapsed = (time.perf_counter() - start) * 1000
+                self.log(
+                    f"Rebuilt {len(rebuilt)} file(s) in {elapsed:.1f} ms, "
+                    f"reloading {browsers} browser(s)"
+                )
+
+
+def make_handler(cache: SiteCache, live_reload: LiveReload) -> type:
+    """Create a request handler class serving pages straight from the cache.
+
+    Args:
+        cache: Site cache to serve
+        live_reload: Live-reload event hub
+
+    Returns:
+        type: BaseHTTPRequestHandler subclass
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+        def do_HEAD(self) -> None:
+            self._serve(send_body=False)
+
+        def do_GET(self) -> None:
+            if urlsplit(self.path).path == LIVERELOAD_PATH:
+                self._stream_events()
+            else:
+                self._serve(send_body=True)
+
+        def _serve(self, send_body: bool) -> None:
+            page = cache.get(urlsplit(self.path).path)
+            if page is None:
+                body, content_type, status = b"Not Found", "text/plain; charset=utf-8", 404
+            else:
+                (body, content_type), status = page, 200
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Cache-Control", "no-store")
+            self.end_headers()
+            if send_body:
+                self.wfile.write(body)
+
+        def _stream_events(self) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-store")
+            self.end_headers()
+            events = live_reload.subscribe()
+            try:
+                self.wfile.write(b": connected\n\n")
+                self.wfile.flush()
+                while True:
+                    try:
+                        message = events.get(timeout=KEEPALIVE_SECONDS)
+                        self.wfile.write(f"data: {message}\n\n".encode("utf-8"))
+                    except queue.Empty:
+                        self.wfile.write(b": keepalive\n\n")
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+            finally:
+                live_reload.unsubscribe(events)
+
+    return Handler
+
+
+def create_server(
+    source_dir: str,
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    log: Callable[[str], None] = print,
+) -> Tuple[ThreadingHTTPServer, Any]:
+    """Build the site into memory and create a live-reloading server for it.
+
+    Args:
+        source_dir: Site source directory
+        host: Interface to listen on
+        port: Port to listen on (0: any free port)
+        poll_interval: Seconds between scans when polling for changes
+        log: Function used to report progress
+
+    Returns:
+        Tuple[ThreadingHTTPServer, Any]: Server (not yet serving) and running watcher
+    """
+    cache = SiteCache(source_dir)
+    start = time.perf_counter()
+    count = cache.load_all()
+    log(f"Built {count} files in {(time.perf_counter() - start) * 1000:.0f} ms")
+    live_reload = LiveReload()
+    watcher = start_watcher(source_dir, _Rebuilder(cache, live_reload, log), poll_interval)
+    server = ThreadingHTTPServer((host, port), make_handler(cache, live_reload))
+    server.daemon_threads = True
+    return server, watcher
+
+
+def serve_site(
+    source_dir: str,
+    host: str = "127.0.0.1",
+    port: int = 8000,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    log: Callable[[str], None] = print,
+) -> None:
+    """Serve a site from memory, rebuilding changed files and reloading browsers.
+
+    Args:
+        source_dir: Site source directory
+        host: Interface to listen on
+        port: Port to listen on
+        poll_interval: Seconds between scans when polling for changes
+        log: Function used to report progress
+    """
+    server, watcher = create_server(source_dir, host, port, poll_interval, log)
+    log(f"Serving {source_dir} at http://{host}:{server.server_address[1]}/ (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.stop()
+        server.server_close()
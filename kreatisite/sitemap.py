@@ -0,0 +1,145 @@
+"""Streaming sitemap writer for Kreatisite CLI."""
+
+import os
+import time
+from typing import Any, List, Optional, TextIO
+from xml.sax.saxutils import escape
+
+# Sitemap protocol limits per file
+MAX_URLS = 50000
+MAX_BYTES = 50 * 1024 * 1024
+SITEMAP_NAME = "sitemap.xml"
+
+_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+)
+_FOOTER = "</urlset>\n"
+_INDEX_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+)
+_INDEX_FOOTER = "</sitemapindex>\n"
+
+
+def _w3c_date(timestamp: float) -> str:
+    """Format a timestamp as a W3C date."""
+    return time.strftime("%Y-%m-%d", time.gmtime(timestamp))
+
+
+class SitemapWriter:
+    """Write sitemap entries to disk as they arrive, one shard at a time.
+
+    Entries are appended to sitemap-1.xml, sitemap-2.xml, ... and a new shard
+    is started before a shard would exceed the protocol limits. On close a
+    single shard becomes sitemap.xml; several shards are listed in a
+    sitemap.xml index instead. Only the current shard's counters are kept in
+    memory, whatever the number of URLs.
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        base_url: str,
+        max_urls: int = MAX_URLS,
+        max_bytes: int = MAX_BYTES,
+    ) -> None:
+        """Initialize the writer.
+
+        Args:
+            output_dir: Directory to write the sitemap files to
+            base_url: Site origin, used to list shards in the index
+            max_urls: Maximum URLs per shard
+            max_bytes: Maximum uncompressed bytes per shard
+        """
+        self.output_dir = output_dir
+        self.base_url = base_url.rstrip("/")
+        self.max_urls = max_urls
+        self.max_bytes = max_bytes
+        self.shards = 0
+        self.urls = 0
+        self.files: List[str] = []
+        self._file: Optional[TextIO] = None
+        self._shard_urls = 0
+        self._shard_bytes = 0
+
+    def __enter__(self) -> "SitemapWriter":
+        """Return the writer."""
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Close the writer (discarding the current shard if an error occurred)."""
+        if exc_info[0] is None:
+            self.close()
+        elif self._file is not None:
+            self._file.close()
+
+    def _shard_name(self, number: int) -> str:
+        return f"sitemap-{number}.xml"
+
+    def _open_shard(self) -> None:
+        self.shards += 1
+        path = os.path.join(self.output_dir, self._shard_name(self.shards))
+        self._file = open(path, "w", encoding="utf-8")
+        self._file.write(_HEADER)
+        self._shard_urls = 0
+        self._shard_bytes = len(_HEADER.encode())
+
+    def _close_shard(self) -> None:
+        if self._file is not None:
+            self._file.write(_FOOTER)
+            self._file.close()
+            self._file = None
+
+    def add(self, loc: str, lastmod: Optional[float] = None) -> None:
+        """Append a URL to the sitemap.
+
+        Args:
+            loc: Absolute page URL
+            lastmod: Last modification timestamp
+        """
+        entry = f"<url><loc>{escape(loc)}</loc>"
+        if lastmod is not None:
+            entry += f"<lastmod>{_w3c_date(lastmod)}</lastmod>"
+        entry += "</url>\n"
+        size = len(entry.encode())
+        if self._file is not None and (
+            self._shard_urls >= self.max_urls
+            or self._shard_bytes + size + len(_FOOTER) > self.max_bytes
+        ):
+            self._close_shard()
+        if self._file is None:
+            self._open_shard()
+        assert self._file is not None
+        self._file.write(entry)
+        self._shard_urls += 1
+        self._shard_bytes += size
+        self.urls += 1
+
+    def close(self) -> List[str]:
+        """Finish the sitemap and write the index if it was split.
+
+        Returns:
+            List[str]: Files written, relative to the output directory
+        """
+        if self.files:
+            return self.files
+        self._close_shard()
+        index_path = os.path.join(self.output_dir, SITEMAP_NAME)
+        if self.shards <= 1:
+            if self.shards == 1:
+                os.replace(os.path.join(self.output_dir, self._shard_name(1)), index_path)
+            else:
+                with open(index_path, "w", encoding="utf-8") as f:
+                    f.write(_HEADER + _FOOTER)
+            self.files = [SITEMAP_NAME]
+            return self.files
+
+        names = [self._shard_name(number) for number in range(1, self.shards + 1)]
+        with open(index_path, "w", encoding="utf-8") as f:
+            f.write(_INDEX_HEADER)
+            for name in names:
+                f.write(f"<sitemap><loc>{escape(f'{self.base_url}/{name}')}</loc></sitemap>\n")
+            f.write(_INDEX_FOOTER)
+        self.files = [SITEMAP_NAME] + names
+        return self.files
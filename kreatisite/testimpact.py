@@ -0,0 +1,256 @@
+"""Test-impact selection for the development test scripts.
+
+A full test run with per-test coverage contexts records which functions of
+the package each test executes. Later runs hash the functions of the files
+changed since then and run only the tests that executed a changed function.
+Changes the map cannot account for (new modules, test configuration, an
+unknown recording commit) select the full suite again.
+"""
+
+import ast
+import hashlib
+import json
+import os
+import subprocess
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+IMPACT_MAP_VERSION = 1
+IMPACT_DIR = ".kreatisite-cache"
+PACKAGE_DIR = "kreatisite"
+TESTS_DIR = "tests"
+# Code outside any function: imports, constants and class bodies
+MODULE_UNIT = "<module>"
+# Changes to these files may affect any test
+GLOBAL_FILES = ("pyproject.toml", "poetry.lock", "setup.cfg", ".coveragerc", "pytest.ini")
+
+
+def impact_map_path(marker: str) -> str:
+    """Return the path of the impact map of the tests with a marker."""
+    return os.path.join(IMPACT_DIR, f"test-impact-{marker}.json")
+
+
+def function_units(source: str) -> Dict[str, str]:
+    """Hash every function of a module, and the code outside functions.
+
+    Methods are named Class.method; nested functions belong to their
+    enclosing function.
+
+    Args:
+        source: Module source code
+
+    Returns:
+        Dict[str, str]: Qualified function name (or MODULE_UNIT) to content hash
+    """
+    lines = source.splitlines()
+    units: Dict[str, str] = {}
+    module_lines = set(range(1, len(lines) + 1))
+    for name, start, end in _function_ranges(ast.parse(source)):
+        units[name] = hashlib.sha256("\n".join(lines[start - 1 : end]).encode()).hexdigest()
+        module_lines -= set(range(start, end + 1))
+    module = "\n".join(lines[i - 1] for i in sorted(module_lines))
+    units[MODULE_UNIT] = hashlib.sha256(module.encode()).hexdigest()
+    return units
+
+
+def _function_ranges(tree: ast.Module) -> List[Tuple[str, int, int]]:
+    """Return (qualified name, first line, last line) of top-level functions and methods."""
+    ranges: List[Tuple[str, int, int]] = []
+
+    def visit(nodes: Iterable[ast.stmt], prefix: str) -> None:
+        for node in nodes:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                start = min([node.lineno] + [d.lineno for d in node.decorator_list])
+                ranges.append((prefix + node.name, start, node.end_lineno or node.lineno))
+            elif isinstance(node, ast.ClassDef):
+                visit(node.body, f"{prefix}{node.name}.")
+
+    visit(tree.body, "")
+    return ranges
+
+
+def _unit_lines(source: str) -> Dict[int, str]:
+    """Map each line inside a function to the function's qualified name."""
+    owners = {}
+    for name, start, end in _function_ranges(ast.parse(source)):
+        for line in range(start, end + 1):
+            owners[line] = name
+    return owners
+
+
+def _read(path: str) -> Optional[str]:
+    """Return a file's text, or None if it does not exist."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def _file_hash(path: str) -> Optional[str]:
+    """Return the SHA-256 of a file, or None if it does not exist."""
+    text = _read(path)
+    return None if text is None else hashlib.sha256(text.encode()).hexdigest()
+
+
+def _git_head() -> Optional[str]:
+    """Return the current commit, or None outside a git checkout."""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def build_impact_map(data_file: str = ".coverage") -> Dict[str, Any]:
+    """Build the impact map from coverage data recorded with --cov-context=test.
+
+    Args:
+        data_file: Coverage data file of a full test run
+
+    Returns:
+        Dict[str, Any]: Map of test node IDs to the package functions they
+        executed, with the function hashes and test file hashes at recording time
+    """
+    from coverage import CoverageData
+
+    data = CoverageData(basename=data_file)
+    data.read()
+    tests: Dict[str, Set[str]] = {}
+    # Files coverage omits are hashed too, so changing them is not mistaken for a new module
+    files: Dict[str, Dict[str, str]] = {}
+    for root, _, names in os.walk(PACKAGE_DIR):
+        for name in names:
+            if name.endswith(".py"):
+                path = os.path.join(root, name).replace(os.sep, "/")
+                files[path] = function_units(_read(path) or "")
+    for measured in data.measured_files():
+        path = os.path.relpath(measured).replace(os.sep, "/")
+        source = _read(path)
+        if source is None or path not in files:
+            continue
+        owners = _unit_lines(source)
+        for line, contexts in data.contexts_by_lineno(measured).items():
+            unit = f"{path}::{owners.get(line, MODULE_UNIT)}"
+            for context in contexts:
+                if context:
+                    tests.setdefault(context.rsplit("|", 1)[0], set()).add(unit)
+    for context in data.measured_contexts():
+        if context:
+            tests.setdefault(context.rsplit("|", 1)[0], set())
+    test_files = sorted({nodeid.split("::", 1)[0] for nodeid in tests})
+    return {
+        "version": IMPACT_MAP_VERSION,
+        "commit": _git_head(),
+        "files": files,
+        "test_files": {path: _file_hash(path) for path in test_files},
+        "tests": {nodeid: sorted(units) for nodeid, units in sorted(tests.items())},
+    }
+
+
+def save_impact_map(impact: Dict[str, Any], path: str) -> None:
+    """Write an impact map."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(impact, f, indent=1, sort_keys=True)
+
+
+def load_impact_map(path: str) -> Optional[Dict[str, Any]]:
+    """Read an impact map, or return None if it is missing or from another version."""
+    try:
+        with open(path, "r") as f:
+            impact: Dict[str, Any] = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return impact if impact.get("version") == IMPACT_MAP_VERSION else None
+
+
+def changed_files(impact: Dict[str, Any]) -> Optional[List[str]]:
+    """List the files changed since the impact map was recorded, using git.
+
+    Committed, staged and unstaged changes since the recording commit count,
+    as do untracked files.
+
+    Args:
+        impact: Impact map
+
+    Returns:
+        Optional[List[str]]: Changed paths, or None if git cannot tell
+    """
+    commit = impact.get("commit")
+    if not commit:
+        return None
+    try:
+        diff = subprocess.run(
+            ["git", "diff", "--name-only", commit],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        untracked = subprocess.run(
+            ["git", "ls-files", "--others", "--exclude-standard"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return sorted(set(diff.stdout.split()) | set(untracked.stdout.split()))
+
+
+def select_tests(impact: Dict[str, Any], changed: Iterable[str]) -> Optional[List[str]]:
+    """Select the tests affected by changed files.
+
+    Args:
+        impact: Impact map
+        changed: Changed paths, relative to the project root
+
+    Returns:
+        Optional[List[str]]: Test files and node IDs to run, or None if the map
+        cannot account for the changes and the full suite must run
+    """
+    files: Dict[str, Dict[str, str]] = impact["files"]
+    tests: Dict[str, List[str]] = impact["tests"]
+    changed_units: Set[str] = set()
+    changed_modules: Set[str] = set()
+    test_files: Set[str] = set()
+    for path in (p.replace(os.sep, "/") for p in changed):
+        name = os.path.basename(path)
+        if path in GLOBAL_FILES or name == "conftest.py":
+            return None
+        if path.startswith(TESTS_DIR + "/"):
+            if path.endswith(".py") and os.path.exists(path):
+                test_files.add(path)
+        elif path.startswith(PACKAGE_DIR + "/"):
+            source = _read(path)
+            if not path.endswith(".py") or path not in files or source is None:
+                return None
+            try:
+                current = function_units(source)
+            except SyntaxError:
+                return None
+            recorded = files[path]
+            if current[MODULE_UNIT] != recorded.get(MODULE_UNIT):
+                changed_modules.add(path)
+            changed_units.update(
+                f"{path}::{unit}"
+                for unit, key in recorded.items()
+                if unit != MODULE_UNIT and current.get(unit) != key
+            )
+
+    # Test files edited since recording run whole, as their tests may have changed
+    for path, key in impact.get("test_files", {}).items():
+        if _file_hash(path) != key and os.path.exists(path):
+            test_files.add(path)
+
+    selected = set(test_files)
+    for nodeid, units in tests.items():
+        if nodeid.split("::", 1)[0] in test_files:
+            continue
+        touched = not units or any(
+            unit in changed_units or unit.split("::", 1)[0] in changed_modules for unit in units
+        )
+        if touched and os.path.exists(nodeid.split("::", 1)[0]):
+            selected.add(nodeid)
+    return sorted(selected)
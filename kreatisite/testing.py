@@ -0,0 +1,95 @@
+"""In-process test harness for Kreatisite CLI.
+
+run_cli() runs the kreatisite console script's entry point inside the
+calling process, with its own argv, environment, working directory and
+standard streams, so end-to-end tests do not pay for a new interpreter (or
+Poetry's startup) per command. AWS calls can go to an in-memory fake.
+"""
+
+import io
+import os
+import sys
+import traceback
+from contextlib import redirect_stderr, redirect_stdout
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence
+
+from .aws import Backend, set_backend, set_deadline
+from .trace import stop_tracing
+
+
+@dataclass
+class CliResult:
+    """Outcome of a CLI run, like a finished subprocess."""
+
+    returncode: int
+    stdout: str
+    stderr: str
+    exception: Optional[BaseException] = None
+
+
+def run_cli(
+    argv: Sequence[str],
+    backend: Optional[Backend] = None,
+    env: Optional[Dict[str, str]] = None,
+    cwd: Optional[str] = None,
+    stdin: str = "",
+) -> CliResult:
+    """Run the CLI in-process, as "kreatisite *argv" would run in a shell.
+
+    The AWS backend, deadline and tracing state are restored afterwards, so
+    runs do not leak into each other. Runs must not overlap, as the
+    environment, the working directory and the standard streams are
+    process-wide.
+
+    Args:
+        argv: Arguments after the program name
+        backend: Backend receiving every AWS call, of every account (e.g., a
+            FakeBackend), handed to the CLI in place of the one --aws-backend
+            selects, so no AWS CLI is needed
+        env: Environment variables to set for the run
+        cwd: Working directory of the run
+        stdin: Text the command reads from standard input
+
+    Returns:
+        CliResult: Return code and captured output; an uncaught exception
+        gives return code 1 with its traceback on stderr, like the interpreter
+    """
+    from .cli import main
+
+    stdout, stderr = io.StringIO(), io.StringIO()
+    previous_env = {name: os.environ.get(name) for name in env or {}}
+    previous_stdin = sys.stdin
+    previous_backend = set_backend(None)
+    previous_cwd = os.getcwd()
+    exception: Optional[BaseException] = None
+    try:
+        os.environ.update(env or {})
+        sys.stdin = io.StringIO(stdin)
+        with redirect_stdout(stdout), redirect_stderr(stderr):
+            if cwd is not None:
+                os.chdir(cwd)
+            try:
+                returncode = main(argv, backend) or 0
+            except SystemExit as e:
+                if e.code is None or isinstance(e.code, int):
+                    returncode = e.code or 0
+                else:
+                    print(e.code, file=sys.stderr)
+                    returncode = 1
+            except Exception as e:
+                exception = e
+                traceback.print_exc()
+                returncode = 1
+    finally:
+        os.chdir(previous_cwd)
+        sys.stdin = previous_stdin
+        for name, value in previous_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+        set_backend(previous_backend)
+        set_deadline(None)
+        stop_tracing()
+    return CliResult(returncode, stdout.getvalue(), stderr.getvalue(), exception)
@@ -0,0 +1,131 @@
+"""Lightweight span tracing for Kreatisite CLI.
+
+Spans are written in the Chrome trace-event format, which chrome://tracing
+and https://ui.perfetto.dev display as a timeline per thread. While tracing
+is disabled, span() returns a shared no-op context manager, so instrumented
+code pays a single global lookup.
+"""
+
+import contextlib
+import json
+import os
+import threading
+import time
+from typing import Any, ContextManager, Dict, Iterator, List, Optional
+
+
+class Tracer:
+    """Collects completed spans with monotonic timestamps."""
+
+    def __init__(self) -> None:
+        """Initialize the tracer."""
+        self.events: List[Dict[str, Any]] = []
+        self._threads: Dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, start_ns: int, end_ns: int, **args: Any) -> None:
+        """Record a completed span.
+
+        Args:
+            name: Span name
+            start_ns: Start, from time.perf_counter_ns()
+            end_ns: End, from time.perf_counter_ns()
+            args: Details shown with the span
+        """
+        thread = threading.current_thread()
+        event = {
+            "name": name,
+            "ph": "X",
+            "ts": start_ns / 1000,
+            "dur": (end_ns - start_ns) / 1000,
+            "pid": os.getpid(),
+            "tid": thread.ident,
+        }
+        if args:
+            event["args"] = {key: str(value) for key, value in args.items()}
+        with self._lock:
+            self.events.append(event)
+            if thread.ident is not None:
+                self._threads.setdefault(thread.ident, thread.name)
+
+    @contextlib.contextmanager
+    def span(self, name: str, **args: Any) -> Iterator[None]:
+        """Record the block as a span.
+
+        Args:
+            name: Span name
+            args: Details shown with the span
+        """
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.add(name, start, time.perf_counter_ns(), **args)
+
+    def write(self, path: str) -> None:
+        """Write the spans as a Chrome trace-event JSON file.
+
+        Args:
+            path: Output file path
+        """
+        with self._lock:
+            events = sorted(self.events, key=lambda event: event["ts"])
+            threads = [
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": os.getpid(),
+                    "tid": ident,
+                    "args": {"name": name},
+                }
+                for ident, name in self._threads.items()
+            ]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": threads + events, "displayTimeUnit": "ms"}, f)
+
+
+_tracer: Optional[Tracer] = None
+_NO_SPAN: ContextManager[None] = contextlib.nullcontext()
+
+
+def start_tracing() -> Tracer:
+    """Start recording spans.
+
+    Returns:
+        Tracer: The tracer receiving the spans
+    """
+    global _tracer
+    _tracer = Tracer()
+    return _tracer
+
+
+def stop_tracing() -> Optional[Tracer]:
+    """Stop recording spans.
+
+    Returns:
+        Optional[Tracer]: The tracer that was active, if any
+    """
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+def get_tracer() -> Optional[Tracer]:
+    """Return the active tracer, or None if tracing is disabled."""
+    return _tracer
+
+
+def span(name: str, **args: Any) -> ContextManager[None]:
+    """Record the block as a span if tracing is enabled.
+
+    Args:
+        name: Span name (e.g., "aws s3:PutObject")
+        args: Details shown with the span
+
+    Returns:
+        ContextManager[None]: Context manager timing the block
+    """
+    tracer = _tracer
+    if tracer is None:
+        return _NO_SPAN
+    return tracer.span(name, **args)
@@ -0,0 +1,105 @@
+"""Polling and backoff functions for Kreatisite CLI."""
+
+import random
+import time
+from typing import Callable, Iterable, Iterator, List, Optional, TypeVar
+
+DEFAULT_INITIAL_DELAY = 2.0
+DEFAULT_MAX_DELAY = 30.0
+
+T = TypeVar("T")
+
+
+def backoff_delays(
+    initial: float = DEFAULT_INITIAL_DELAY,
+    maximum: float = DEFAULT_MAX_DELAY,
+    factor: float = 2.0,
+    jitter: float = 0.1,
+) -> Iterator[float]:
+    """Generate exponentially growing delays with a little random jitter.
+
+    Args:
+        initial: First delay in seconds
+        maximum: Largest delay in seconds
+        factor: Growth factor between delays
+        jitter: Maximum fraction of each delay added or removed at random
+
+    Yields:
+        float: Delay in seconds
+    """
+    delay = initial
+    while True:
+        yield delay * (1 + random.uniform(-jitter, jitter))
+        delay = min(delay * factor, maximum)
+
+
+def wait_until(
+    check: Callable[[], bool],
+    timeout: float,
+    initial: float = DEFAULT_INITIAL_DELAY,
+    maximum: float = DEFAULT_MAX_DELAY,
+    sleep: Optional[Callable[[float], None]] = None,
+    clock: Optional[Callable[[], float]] = None,
+) -> None:
+    """Poll a condition with exponential backoff until it holds.
+
+    Args:
+        check: Function returning True once the awaited state is reached
+        timeout: Maximum number of seconds to wait
+        initial: First delay between polls
+        maximum: Largest delay between polls
+        sleep: Function used to sleep (default: time.sleep)
+        clock: Monotonic clock (default: time.monotonic)
+
+    Raises:
+        TimeoutError: If the condition does not hold within the timeout
+    """
+    sleep = sleep or time.sleep
+    clock = clock or time.monotonic
+    deadline = clock() + timeout
+    for delay in backoff_delays(initial, maximum):
+        if check():
+            return
+        remaining = deadline - clock()
+        if remaining <= 0:
+            raise TimeoutError(f"Gave up waiting after {timeout:g} seconds")
+        sleep(min(delay, remaining))
+
+
+def wait_for_all(
+    items: Iterable[T],
+    check: Callable[[List[T]], Iterable[T]],
+    timeout: float,
+    initial: float = DEFAULT_INITIAL_DELAY,
+    maximum: float = DEFAULT_MAX_DELAY,
+    sleep: Optional[Callable[[float], None]] = None,
+    clock: Optional[Callable[[], float]] = None,
+) -> None:
+    """Wait for many items with one shared backoff loop instead of a loop per item.
+
+    Each poll passes all still-pending items to check at once, so it can ask
+    for their state with a single bulk request.
+
+    Args:
+        items: Items to wait for
+        check: Function taking the pending items and returning those now done
+        timeout: Maximum number of seconds to wait for all items
+        initial: First delay between polls
+        maximum: Largest delay between polls
+        sleep: Function used to sleep (default: time.sleep)
+        clock: Monotonic clock (default: time.monotonic)
+
+    Raises:
+        TimeoutError: If some items are still pending after the timeout
+    """
+    pending = list(items)
+
+    def all_done() -> bool:
+        done = set(check(list(pending)))
+        pending[:] = [item for item in pending if item not in done]
+        return not pending
+
+    try:
+        wait_until(all_done, timeout, initial, maximum, sleep, clock)
+    except TimeoutError:
+        raise TimeoutError(f"Gave up waiting after {timeout:g} seconds; {len(pending)} pending")
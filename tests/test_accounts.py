@@ -0,0 +1,70 @@
+"""Tests for the accounts module."""
+
+import pytest
+
+from kreatisite.accounts import ThrottledBackend, fan_out, read_profiles
+from kreatisite.aws import call
+from kreatisite.fakeaws import FakeBackend
+
+
+def registered(account):
+    """Yield the domains registered in the current account."""
+    for domain in call("route53domains", "ListDomains")["Domains"]:
+        yield domain["DomainName"]
+
+
+@pytest.mark.unit
+def test_read_profiles(tmp_path) -> None:
+    """Test profiles from the list and the file are merged without duplicates."""
+    path = tmp_path / "profiles.txt"
+    path.write_text("# accounts\nstaging\n\nsandbox  # old\n")
+
+    assert read_profiles("prod, staging,", str(path)) == ["prod", "staging", "sandbox"]
+    assert read_profiles() == []
+
+
+@pytest.mark.unit
+def test_fan_out_tags_results_with_their_account() -> None:
+    """Test every account's calls go through its own backend and results are merged."""
+    backends = {"a": FakeBackend(), "b": FakeBackend()}
+    for account, names in (("a", ["a.com"]), ("b", ["b.com", "b.org"])):
+        for name in names:
+            backends[account].call("route53domains", "RegisterDomain", {"DomainName": name})
+
+    results = list(fan_out(["a", "b"], registered, backends.get, rate=1000.0))
+
+    assert sorted((r.account, r.item) for r in results) == [
+        ("a", "a.com"),
+        ("b", "b.com"),
+        ("b", "b.org"),
+    ]
+
+
+@pytest.mark.unit
+def test_fan_out_reports_failed_accounts() -> None:
+    """Test an account whose work fails yields its error and the others still finish."""
+
+    def factory(account):
+        if account == "broken":
+            raise RuntimeError("The config profile (broken) could not be found")
+        return FakeBackend()
+
+    results = list(fan_out(["ok", "broken"], registered, factory, rate=1000.0))
+
+    assert [(r.account, r.error) for r in results] == [
+        ("broken", "The config profile (broken) could not be found")
+    ]
+
+
+@pytest.mark.unit
+def test_throttled_backend_limits_call_rate() -> None:
+    """Test each call takes a token from the account's rate limiter."""
+    fake = FakeBackend()
+    backend = ThrottledBackend(fake, rate=0.01, burst=3)
+
+    for _ in range(3):
+        backend.call("route53domains", "ListDomains")
+
+    assert fake.calls == {"route53domains:ListDomains": 3}
+    assert backend.multipart_uploads is False
+    assert backend.limiter.try_acquire() is False
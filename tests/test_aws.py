@@ -0,0 +1,263 @@
+"""Tests for the aws module."""
+
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from kreatisite.aws import (
+    AwsError,
+    Backend,
+    SubprocessBackend,
+    build_cli_command,
+    call,
+    call_with_retries,
+    cli_name,
+    create_backend,
+    get_backend,
+    run_process,
+    set_backend,
+    set_deadline,
+)
+
+
+@pytest.mark.unit
+def test_cli_name() -> None:
+    """Test API names are converted to AWS CLI spelling."""
+    assert cli_name("ListObjectsV2") == "list-objects-v2"
+    assert cli_name("ContentMD5") == "content-md5"
+    assert cli_name("DomainName") == "domain-name"
+    assert cli_name("ACL") == "acl"
+
+
+@pytest.mark.unit
+def test_build_cli_command() -> None:
+    """Test parameters are rendered as AWS CLI flags."""
+    cmd = build_cli_command(
+        "s3",
+        "DeleteObjects",
+        {"Bucket": "b", "Delete": {"Quiet": True}, "BypassGovernanceRetention": False},
+        endpoint_url="http://localhost:9000",
+    )
+
+    assert cmd == [
+        "aws",
+        "s3api",
+        "delete-objects",
+        "--bucket",
+        "b",
+        "--delete",
+        '{"Quiet": true}',
+        "--no-bypass-governance-retention",
+        "--endpoint-url",
+        "http://localhost:9000",
+        "--output",
+        "json",
+    ]
+    assert build_cli_command("acm", "ListCertificates", region="us-east-1")[-4:] == [
+        "--region",
+        "us-east-1",
+        "--output",
+        "json",
+    ]
+    assert build_cli_command("s3", "GetObject", {"Key": "k"}, outfile="/tmp/out") == [
+        "aws",
+        "s3api",
+        "get-object",
+        "--key",
+        "k",
+        "/tmp/out",
+        "--output",
+        "json",
+    ]
+
+
+@pytest.mark.unit
+def test_call_decodes_response(fp) -> None:
+    """Test successful calls return the decoded JSON response."""
+    fp.register(
+        ["aws", "s3api", "list-objects-v2", "--bucket", "b", "--output", "json"],
+        stdout='{"Contents": [{"Key": "index.html"}]}',
+    )
+
+    assert call("s3", "ListObjectsV2", {"Bucket": "b"}) == {"Contents": [{"Key": "index.html"}]}
+
+
+@pytest.mark.unit
+def test_call_empty_output(fp) -> None:
+    """Test operations without output return an empty response."""
+    fp.register(["aws", "s3api", "delete-bucket", "--bucket", "b", "--output", "json"])
+
+    assert call("s3", "DeleteBucket", {"Bucket": "b"}) == {}
+
+
+@pytest.mark.unit
+def test_call_error_code(fp) -> None:
+    """Test failures raise AwsError carrying the AWS error code."""
+    fp.register(
+        ["aws", "s3api", "list-objects-v2", "--bucket", "b", "--output", "json"],
+        stderr="An error occurred (NoSuchBucket) when calling the ListObjectsV2 operation",
+        returncode=254,
+    )
+
+    with pytest.raises(AwsError) as excinfo:
+        call("s3", "ListObjectsV2", {"Bucket": "b"})
+    assert excinfo.value.code == "NoSuchBucket"
+
+
+class RecordingBackend(Backend):
+    """Backend answering from a list of responses and errors."""
+
+    def __init__(self, *responses) -> None:
+        self.responses = list(responses)
+        self.calls = []
+
+    def call(self, service, operation, params=None, endpoint_url=None, region=None, outfile=None):
+        self.calls.append((service, operation, params, region))
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+@pytest.mark.unit
+def test_call_routes_through_active_backend() -> None:
+    """Test call() uses the backend installed with set_backend()."""
+    backend = RecordingBackend({"Availability": "AVAILABLE"})
+    previous = set_backend(backend)
+    try:
+        response = call("route53domains", "CheckDomainAvailability", {"DomainName": "a.com"})
+    finally:
+        set_backend(previous)
+
+    assert response == {"Availability": "AVAILABLE"}
+    assert backend.calls == [
+        ("route53domains", "CheckDomainAvailability", {"DomainName": "a.com"}, None)
+    ]
+
+
+@pytest.mark.unit
+def test_default_backend_from_environment(monkeypatch) -> None:
+    """Test the default backend is named by the environment, falling back to the CLI."""
+    previous = set_backend(None)
+    try:
+        monkeypatch.delenv("KREATISITE_AWS_BACKEND", raising=False)
+        assert isinstance(get_backend(), SubprocessBackend)
+        set_backend(None)
+        monkeypatch.setenv("KREATISITE_AWS_BACKEND", "fake")
+        assert get_backend().name == "fake"
+    finally:
+        set_backend(previous)
+
+
+@pytest.mark.unit
+def test_create_backend_rejects_unknown_names() -> None:
+    """Test unknown backend names are reported with the valid choices."""
+    with pytest.raises(ValueError, match="cli, native, fake"):
+        create_backend("carrier-pigeon")
+
+
+@pytest.mark.unit
+def test_call_with_retries() -> None:
+    """Test throttled calls are retried with backoff and other errors are not."""
+    throttled = AwsError("Rate exceeded", "ThrottlingException")
+    backend = RecordingBackend(
+        throttled, throttled, {"ok": True}, AwsError("Denied", "AccessDenied")
+    )
+    sleeps = []
+    previous = set_backend(backend)
+    try:
+        assert call_with_retries("acm", "ListCertificates", sleep=sleeps.append) == {"ok": True}
+        with pytest.raises(AwsError, match="Denied"):
+            call_with_retries("acm", "ListCertificates", sleep=sleeps.append)
+        backend.responses = [throttled, throttled]
+        with pytest.raises(AwsError, match="Rate exceeded"):
+            call_with_retries("acm", "ListCertificates", retries=1, sleep=sleeps.append)
+    finally:
+        set_backend(previous)
+
+    assert len(sleeps) == 3
+    assert len(backend.calls) == 6
+
+
+@pytest.mark.unit
+def test_run_process_reads_output_incrementally() -> None:
+    """Test output larger than the pipe buffers is read without deadlocking."""
+    script = "import sys; sys.stdout.write('x' * 1000000); sys.stderr.write('done')"
+
+    returncode, stdout, stderr = run_process([sys.executable, "-c", script], timeout=30)
+
+    assert (returncode, len(stdout), stderr) == (0, 1000000, "done")
+
+
+@pytest.mark.unit
+@pytest.mark.skipif(not hasattr(os, "killpg"), reason="needs process groups")
+def test_run_process_kills_process_group_on_timeout(tmp_path) -> None:
+    """Test a timed-out process is killed together with the processes it started."""
+    pid_file = tmp_path / "pid"
+    script = (
+        "import subprocess, sys, time; "
+        "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)']); "
+        f"open({str(pid_file)!r}, 'w').write(str(child.pid)); "
+        "time.sleep(60)"
+    )
+    start = time.monotonic()
+
+    with pytest.raises(subprocess.TimeoutExpired):
+        run_process([sys.executable, "-c", script], timeout=1)
+
+    assert time.monotonic() - start < 10
+    child_pid = int(pid_file.read_text())
+    for _ in range(50):
+        try:
+            os.kill(child_pid, 0)
+        except ProcessLookupError:
+            break
+        time.sleep(0.1)
+    else:
+        pytest.fail("child process survived the timeout")
+
+
+@pytest.mark.unit
+def test_subprocess_backend_timeout(monkeypatch) -> None:
+    """Test a hung AWS CLI process becomes a RequestTimeout error."""
+    monkeypatch.setattr(
+        "kreatisite.aws.build_cli_command",
+        lambda *args: [sys.executable, "-c", "import time; time.sleep(60)"],
+    )
+
+    with pytest.raises(AwsError) as excinfo:
+        SubprocessBackend(timeout=0.5).call("s3", "ListBuckets")
+    assert excinfo.value.code == "RequestTimeout"
+
+
+@pytest.mark.unit
+def test_deadline_stops_calls_and_retries() -> None:
+    """Test no call starts after the deadline and no retry waits beyond it."""
+    throttled = AwsError("Rate exceeded", "ThrottlingException")
+    backend = RecordingBackend(throttled)
+    sleeps = []
+    previous = set_backend(backend)
+    try:
+        set_deadline(0.2)
+        with pytest.raises(AwsError, match="Rate exceeded"):
+            call_with_retries("acm", "ListCertificates", sleep=sleeps.append)
+        set_deadline(0)
+        with pytest.raises(AwsError) as excinfo:
+            call("acm", "ListCertificates")
+    finally:
+        set_deadline(None)
+        set_backend(previous)
+
+    assert excinfo.value.code == "DeadlineExceeded"
+    assert sleeps == []
+    assert len(backend.calls) == 1
+
+
+@pytest.mark.unit
+def test_backend_is_abstract() -> None:
+    """Test a backend must implement call to be created."""
+    with pytest.raises(TypeError):
+        Backend()
@@ -6,12 +6,16 @@ import pytest
 
 from kreatisite.cmd import check_domain_availability, register_domain
 
+# Appended to every command by the AWS CLI backend
+OUTPUT_JSON = ["--output", "json"]
+
 
 @pytest.mark.unit
 def test_check_domain_availability_success(fp):
     """Test check_domain_availability with mocked successful AWS response."""
     fp.register(
-        ["aws", "route53domains", "check-domain-availability", "--domain-name", "example.com"],
+        ["aws", "route53domains", "check-domain-availability", "--domain-name", "example.com"]
+        + OUTPUT_JSON,
         stdout='{"Available": true}',
         returncode=0,
     )
@@ -25,7 +29,8 @@ def test_check_domain_availability_success(fp):
 def test_check_domain_availability_unavailable(fp):
     """Test check_domain_availability with domain unavailable response."""
     fp.register(
-        ["aws", "route53domains", "check-domain-availability", "--domain-name", "taken.com"],
+        ["aws", "route53domains", "check-domain-availability", "--domain-name", "taken.com"]
+        + OUTPUT_JSON,
         stdout='{"Available": false}',
         returncode=0,
     )
@@ -39,7 +44,8 @@ def test_check_domain_availability_unavailable(fp):
 def test_check_domain_availability_aws_error(fp):
     """Test check_domain_availability with AWS CLI error."""
     fp.register(
-        ["aws", "route53domains", "check-domain-availability", "--domain-name", "invalid-domain"],
+        ["aws", "route53domains", "check-domain-availability", "--domain-name", "invalid-domain"]
+        + OUTPUT_JSON,
         stderr="An error occurred (ValidationException): Invalid domain",
         returncode=1,
     )
@@ -53,7 +59,8 @@ def test_check_domain_availability_aws_error(fp):
 def test_check_domain_availability_network_timeout(fp):
     """Test check_domain_availability with network timeout."""
     fp.register(
-        ["aws", "route53domains", "check-domain-availability", "--domain-name", "example.com"],
+        ["aws", "route53domains", "check-domain-availability", "--domain-name", "example.com"]
+        + OUTPUT_JSON,
         stderr="Unable to locate credentials",
         returncode=255,
     )
@@ -89,8 +96,9 @@ AdminContact:
             "--privacy-protect-admin-contact",
             "--privacy-protect-registrant-contact",
             "--privacy-protect-tech-contact",
-            "--cli-input-yaml",
-            f"file://{config_file}",
+            "--admin-contact",
+            '{"FirstName": "John", "LastName": "Doe"}',
+            *OUTPUT_JSON,
         ],
         stdout='{"OperationId": "12345678-1234-1234-1234-123456789012"}',
         returncode=0,
@@ -133,8 +141,9 @@ AdminContact:
             "--privacy-protect-admin-contact",
             "--privacy-protect-registrant-contact",
             "--privacy-protect-tech-contact",
-            "--cli-input-yaml",
-            f"file://{config_file}",
+            "--admin-contact",
+            '{"FirstName": "John", "LastName": "Doe"}',
+            *OUTPUT_JSON,
         ],
         stdout='{"OperationId": "test-operation-id"}',
         returncode=0,
@@ -177,8 +186,9 @@ AdminContact:
             "--privacy-protect-admin-contact",
             "--privacy-protect-registrant-contact",
             "--privacy-protect-tech-contact",
-            "--cli-input-yaml",
-            f"file://{config_file}",
+            "--admin-contact",
+            '{"FirstName": "John", "LastName": "Doe"}',
+            *OUTPUT_JSON,
         ],
         stderr="An error occurred (InvalidParameterValue): Invalid domain name",
         returncode=1,
@@ -221,8 +231,9 @@ AdminContact:
             "--privacy-protect-admin-contact",
             "--privacy-protect-registrant-contact",
             "--privacy-protect-tech-contact",
-            "--cli-input-yaml",
-            f"file://{config_file}",
+            "--admin-contact",
+            '{"FirstName": "John", "LastName": "Doe"}',
+            *OUTPUT_JSON,
         ],
         stderr="An error occurred (AccessDenied): User is not authorized",
         returncode=1,
@@ -245,19 +256,22 @@ def test_multiple_aws_calls_in_sequence(fp):
     """Test multiple AWS CLI calls with different responses."""
     # Register multiple calls
     fp.register(
-        ["aws", "route53domains", "check-domain-availability", "--domain-name", "available.com"],
+        ["aws", "route53domains", "check-domain-availability", "--domain-name", "available.com"]
+        + OUTPUT_JSON,
         stdout='{"Available": true}',
         returncode=0,
     )
 
     fp.register(
-        ["aws", "route53domains", "check-domain-availability", "--domain-name", "taken.com"],
+        ["aws", "route53domains", "check-domain-availability", "--domain-name", "taken.com"]
+        + OUTPUT_JSON,
         stdout='{"Available": false}',
         returncode=0,
     )
 
     fp.register(
-        ["aws", "route53domains", "check-domain-availability", "--domain-name", "error.com"],
+        ["aws", "route53domains", "check-domain-availability", "--domain-name", "error.com"]
+        + OUTPUT_JSON,
         stderr="AWS error",
         returncode=1,
     )
@@ -272,7 +286,8 @@ def test_multiple_aws_calls_in_sequence(fp):
 def test_aws_cli_command_parameters(fp):
     """Test that AWS CLI commands are called with correct parameters."""
     fp.register(
-        ["aws", "route53domains", "check-domain-availability", "--domain-name", "test-domain.com"],
+        ["aws", "route53domains", "check-domain-availability", "--domain-name", "test-domain.com"]
+        + OUTPUT_JSON,
         stdout='{"Available": true}',
         returncode=0,
     )
@@ -0,0 +1,108 @@
+"""Tests for the bloom module."""
+
+import pytest
+
+from kreatisite.bloom import BloomError, BloomFilter, build_filter, filter_size
+from kreatisite.fakeaws import FakeBackend
+from kreatisite.history import HistoryStore
+from kreatisite.testing import run_cli
+
+
+@pytest.mark.unit
+def test_filter_size() -> None:
+    """Test the filter is sized by the standard formulas."""
+    bits, hashes = filter_size(1_000_000, 0.01)
+    assert 9_500_000 < bits < 9_600_000
+    assert hashes == 7
+    with pytest.raises(ValueError):
+        filter_size(1000, 1.5)
+
+
+@pytest.mark.unit
+def test_filter_full_at_capacity(tmp_path) -> None:
+    """Test the filter reports when it holds its capacity."""
+    with BloomFilter.create(str(tmp_path / "taken.bloom"), capacity=10) as bloom:
+        bloom.add("a.com")
+        assert not bloom.full
+        for i in range(20):
+            bloom.add(f"{i}.com")
+        assert bloom.full
+
+
+@pytest.mark.unit
+def test_filter_has_no_false_negatives_and_few_false_positives(tmp_path) -> None:
+    """Test added names are always found and others rarely are, after reopening."""
+    path = str(tmp_path / "taken.bloom")
+    with BloomFilter.create(path, capacity=5000, error_rate=0.01) as bloom:
+        for i in range(5000):
+            bloom.add(f"taken{i}.com")
+        assert not bloom.add("taken0.com")
+
+    with BloomFilter(path) as bloom:
+        # Names colliding with earlier ones are not counted
+        assert 4900 < bloom.count <= 5000
+        assert all(f"taken{i}.com" in bloom for i in range(5000))
+        false_positives = sum(f"free{i}.com" in bloom for i in range(10000))
+    assert false_positives < 200
+
+
+@pytest.mark.unit
+def test_filter_rejects_other_files(tmp_path) -> None:
+    """Test missing, empty and truncated files are reported."""
+    path = tmp_path / "taken.bloom"
+    with pytest.raises(BloomError):
+        BloomFilter(str(path))
+    path.write_bytes(b"")
+    with pytest.raises(BloomError):
+        BloomFilter(str(path))
+    BloomFilter.create(str(path), capacity=100).close()
+    path.write_bytes(path.read_bytes()[:-1])
+    with pytest.raises(BloomError):
+        BloomFilter(str(path))
+
+
+@pytest.mark.unit
+def test_build_filter_replaces_file(tmp_path) -> None:
+    """Test a rebuild replaces the filter, forgetting names no longer given."""
+    path = str(tmp_path / "taken.bloom")
+    assert build_filter(path, ["a.com", "b.com"], 2) == 2
+    assert build_filter(path, ["b.com"], 1) == 1
+
+    with BloomFilter(path) as bloom:
+        assert "b.com" in bloom and "a.com" not in bloom
+        assert bloom.capacity == 1000
+    assert [p.name for p in tmp_path.iterdir()] == ["taken.bloom"]
+
+
+@pytest.mark.unit
+def test_check_domains_skips_known_taken_names(tmp_path) -> None:
+    """Test names in the filter are not checked and names found taken are added."""
+    db = str(tmp_path / "history.db")
+    bloom = str(tmp_path / "taken.bloom")
+    with HistoryStore(db) as store:
+        store.record([("old.com", "UNAVAILABLE", "s"), ("free.com", "AVAILABLE", "s")])
+    built = run_cli(["history", "build-filter", bloom, "--history", db])
+    assert built.returncode == 0, built.stderr
+    assert "Wrote 1 taken names" in built.stdout
+
+    backend = FakeBackend(taken=["old.com", "new.com"])
+    names = ["old.com", "new.com", "free.com"]
+    first = run_cli(["check-domains", *names, "--skip-taken", bloom], backend)
+    second = run_cli(["check-domains", *names, "--skip-taken", bloom], backend)
+
+    assert "1 available, 1 unavailable, 0 errors, 1 skipped as known taken" in first.stdout
+    assert "1 available, 0 unavailable, 0 errors, 2 skipped as known taken" in second.stdout
+    assert backend.calls == {"route53domains:CheckDomainAvailability": 3}
+
+
+@pytest.mark.unit
+def test_check_domains_reports_missing_filter(tmp_path) -> None:
+    """Test a missing filter is reported as such, with the command that builds it."""
+    bloom = str(tmp_path / "taken.bloom")
+
+    result = run_cli(["check-domains", "a.com", "--skip-taken", bloom], FakeBackend())
+
+    assert result.returncode == 1
+    assert "Error reading the taken-names filter: Cannot open filter" in result.stderr
+    assert f"kreatisite history build-filter {bloom}" in result.stderr
+    assert "domain names" not in result.stderr
@@ -0,0 +1,184 @@
+"""Tests for the build module."""
+
+import gzip
+import json
+from argparse import Namespace
+
+import pytest
+
+from kreatisite.build import (
+    MANIFEST_NAME,
+    BuildError,
+    build_site,
+    fingerprint_name,
+    is_fingerprinted,
+    minify_css,
+    minify_html,
+    minify_js,
+    rewrite_references,
+)
+from kreatisite.cmd import build
+
+
+def make_site(root) -> None:
+    """Create a small site with HTML, CSS, JS and an image."""
+    (root / "css").mkdir(parents=True)
+    (root / "img").mkdir()
+    (root / "index.html").write_text(
+        "<html>\n  <head>\n    <!-- styles -->\n"
+        '    <link rel="stylesheet" href="css/app.css">\n'
+        '    <script src="/app.js"></script>\n  </head>\n'
+        "  <body>\n    <pre>  keep   this  </pre>\n  </body>\n</html>\n"
+    )
+    (root / "css" / "app.css").write_text(
+        "/* main */\nbody {\n  color: red;\n  background: url('../img/logo.png');\n}\n"
+    )
+    (root / "app.js").write_text("function hello() {\n    return 1;\n}\n\n")
+    (root / "img" / "logo.png").write_bytes(b"\x89PNG fake")
+    (root / "robots.txt").write_text("User-agent: *\n")
+
+
+@pytest.mark.unit
+def test_minify_css() -> None:
+    """Test CSS comments and whitespace are removed but strings are kept."""
+    css = '/* c */ a , b {\n  color: red;\n  content: "a  /* b */";\n}\n'
+    assert minify_css(css) == 'a,b{color:red;content:"a  /* b */"}'
+
+
+@pytest.mark.unit
+def test_minify_js_keeps_template_literals() -> None:
+    """Test JS minification is skipped for scripts with template literals."""
+    assert minify_js("  a();\n\n  b();\n") == "a();\nb();"
+    assert minify_js("const s = `\n  x\n`;\n") == "const s = `\n  x\n`;"
+
+
+@pytest.mark.unit
+def test_minify_html_preserves_pre() -> None:
+    """Test HTML comments are removed and pre blocks are untouched."""
+    html = "<p>\n  a   b\n</p><!-- gone --><pre>  x\n  y</pre>"
+    assert minify_html(html) == "<p> a b </p><pre>  x\n  y</pre>"
+
+
+@pytest.mark.unit
+def test_fingerprint_name_and_detection() -> None:
+    """Test fingerprinted names embed a content hash that can be detected."""
+    name = fingerprint_name("css/app.css", b"body{}")
+    assert name.startswith("css/app.") and name.endswith(".css")
+    assert is_fingerprinted(name)
+    assert not is_fingerprinted("css/app.css")
+    assert fingerprint_name("css/app.css", b"body{}") == name
+    assert fingerprint_name("css/app.css", b"p{}") != name
+
+
+@pytest.mark.unit
+def test_rewrite_references() -> None:
+    """Test relative and absolute references are rewritten, external ones are not."""
+    mapping = {"css/app.css": "css/app.12345678.css", "app.js": "app.abcdef12.js"}
+    html = (
+        '<link href="css/app.css?v=1"><script src="/app.js"></script>'
+        '<a href="https://cdn.example.com/app.js">x</a>'
+    )
+    result = rewrite_references(html, "index.html", mapping)
+    assert 'href="css/app.12345678.css?v=1"' in result
+    assert 'src="/app.abcdef12.js"' in result
+    assert 'href="https://cdn.example.com/app.js"' in result
+
+
+@pytest.mark.unit
+def test_build_site(tmp_path) -> None:
+    """Test a full build fingerprints assets, rewrites references and gzips text."""
+    source = tmp_path / "site"
+    output = tmp_path / "dist"
+    make_site(source)
+
+    result = build_site(
+        str(source), str(output), cache_dir=str(tmp_path / "cache"), jobs=1, log=lambda _: None
+    )
+
+    manifest = json.loads((output / MANIFEST_NAME).read_text())
+    assert set(manifest) == {"css/app.css", "app.js", "img/logo.png"}
+    css = (output / manifest["css/app.css"]).read_text()
+    assert posix_name(manifest["img/logo.png"]) in css
+    index = (output / "index.html").read_text()
+    assert manifest["css/app.css"] in index
+    assert "/" + manifest["app.js"] in index
+    assert "<!--" not in index
+    assert "<pre>  keep   this  </pre>" in index
+    assert gzip.decompress((output / "index.html.gz").read_bytes()).decode() == index
+    assert (output / "robots.txt").exists()
+    assert result.compressed == 4
+    assert result.cache_hits == 0
+
+
+@pytest.mark.unit
+def test_build_site_fingerprints_imported_stylesheets_first(tmp_path) -> None:
+    """Test a stylesheet importing another one refers to its fingerprinted name."""
+    source = tmp_path / "site"
+    (source / "css").mkdir(parents=True)
+    (source / "a.css").write_text('@import "css/z.css";\nbody { color: red; }\n')
+    (source / "css" / "z.css").write_text('@import url("../b.css");\np { margin: 0; }\n')
+    (source / "b.css").write_text("a { color: blue; }\n")
+    output = tmp_path / "dist"
+
+    build_site(
+        str(source), str(output), cache_dir=str(tmp_path / "cache"), jobs=1, log=lambda _: None
+    )
+
+    manifest = json.loads((output / MANIFEST_NAME).read_text())
+    a_css = (output / manifest["a.css"]).read_text()
+    z_css = (output / manifest["css/z.css"]).read_text()
+    assert posix_name(manifest["css/z.css"]) in a_css
+    assert posix_name(manifest["b.css"]) in z_css
+
+
+@pytest.mark.unit
+def test_build_site_reuses_compression_cache(tmp_path) -> None:
+    """Test unchanged files are served from the compression cache on rebuild."""
+    source = tmp_path / "site"
+    make_site(source)
+    kwargs = dict(cache_dir=str(tmp_path / "cache"), jobs=1, log=lambda _: None)
+
+    build_site(str(source), str(tmp_path / "dist"), **kwargs)
+    (source / "robots.txt").write_text("User-agent: *\nDisallow: /x\n")
+    result = build_site(str(source), str(tmp_path / "dist"), **kwargs)
+
+    assert result.compressed == 4
+    assert result.cache_hits == 3
+
+
+@pytest.mark.unit
+def test_build_site_refuses_foreign_output(tmp_path) -> None:
+    """Test the build does not wipe an output directory it did not create."""
+    source = tmp_path / "site"
+    make_site(source)
+    output = tmp_path / "dist"
+    output.mkdir()
+    (output / "important.txt").write_text("data")
+
+    with pytest.raises(BuildError):
+        build_site(str(source), str(output), log=lambda _: None)
+    assert (output / "important.txt").exists()
+
+
+@pytest.mark.unit
+def test_build_command_missing_source(tmp_path, capsys) -> None:
+    """Test the build command reports a missing source directory."""
+    args = Namespace(
+        source_dir=str(tmp_path / "missing"),
+        output_dir=str(tmp_path / "dist"),
+        cache_dir=str(tmp_path / "cache"),
+        jobs=1,
+        minify=True,
+        base_url=None,
+        search_index=False,
+        shared_cache=None,
+        cache_size=1024,
+    )
+
+    assert build(args) == 1
+    assert "Error building site:" in capsys.readouterr().err
+
+
+def posix_name(rel_path: str) -> str:
+    """Return the final component of a relative path."""
+    return rel_path.rsplit("/", 1)[-1]
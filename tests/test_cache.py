@@ -0,0 +1,220 @@
+"""Tests for the cache module."""
+
+import os
+
+import pytest
+
+from kreatisite.aws import AwsError
+from kreatisite.build import build_site
+from kreatisite.cache import (
+    CacheBackend,
+    DirectoryCache,
+    LocalCache,
+    S3Cache,
+    TieredCache,
+    cache_key,
+    open_cache,
+)
+
+
+class FakeS3:
+    """In-memory stand-in for the S3 operations used by the cache."""
+
+    def __init__(self) -> None:
+        self.objects = {}
+        self.calls = []
+
+    def __call__(
+        self, service, operation, params=None, endpoint_url=None, region=None, outfile=None
+    ):
+        self.calls.append(operation)
+        if operation == "ListObjectsV2":
+            keys = [k for k in self.objects if k.startswith(params["Prefix"])]
+            return {"Contents": [{"Key": k} for k in keys]}
+        if operation == "GetObject":
+            if params["Key"] not in self.objects:
+                raise AwsError("An error occurred (NoSuchKey)", "NoSuchKey")
+            with open(outfile, "wb") as f:
+                f.write(self.objects[params["Key"]])
+            return {}
+        if operation == "PutObject":
+            with open(params["Body"], "rb") as f:
+                self.objects[params["Key"]] = f.read()
+            return {}
+        raise AssertionError(operation)
+
+
+class BrokenCache(CacheBackend):
+    """Cache whose storage is unreachable."""
+
+    name = "broken"
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def get(self, key):
+        self.calls += 1
+        raise OSError("unreachable")
+
+    def put(self, key, data):
+        self.calls += 1
+        raise OSError("unreachable")
+
+
+@pytest.mark.unit
+def test_cache_key() -> None:
+    """Test keys depend on every part and on how the parts are split."""
+    assert cache_key("a", b"b") == cache_key(b"a", "b")
+    assert cache_key("ab", "") != cache_key("a", "b")
+    assert len(cache_key("x")) == 64
+
+
+@pytest.mark.unit
+def test_directory_cache(tmp_path) -> None:
+    """Test entries round-trip through a directory."""
+    cache = DirectoryCache(str(tmp_path / "shared"))
+
+    assert cache.get("ab12") is None
+    cache.put("ab12", b"data")
+
+    assert cache.get("ab12") == b"data"
+    assert (tmp_path / "shared" / "ab" / "ab12").exists()
+
+
+@pytest.mark.unit
+def test_local_cache_evicts_least_recently_used(tmp_path) -> None:
+    """Test the local cache drops the entries unused for longest when full."""
+    cache = LocalCache(str(tmp_path), max_bytes=35)
+    for i, key in enumerate(["aa1", "bb2", "cc3"]):
+        cache.put(key, b"x" * 10)
+        os.utime(cache._path(key), (i, i))
+    # Reading the oldest entry makes it the most recently used
+    assert cache.get("aa1") == b"x" * 10
+
+    cache.put("dd4", b"y" * 10)
+
+    assert cache.get("bb2") is None
+    assert cache.get("cc3") is None
+    assert cache.get("aa1") is not None
+    assert cache.get("dd4") is not None
+
+
+@pytest.mark.unit
+def test_s3_cache(monkeypatch) -> None:
+    """Test the S3 cache lists once, skips requests for misses and round-trips entries."""
+    s3 = FakeS3()
+    monkeypatch.setattr("kreatisite.cache.call", s3)
+    cache = open_cache("s3://bucket/builds/")
+
+    assert isinstance(cache, S3Cache)
+    assert cache.get("ab12") is None
+    cache.put("ab12", b"data")
+
+    assert s3.objects == {"builds/ab/ab12": b"data"}
+    assert cache.get("ab12") == b"data"
+    assert cache.get("cd34") is None
+    assert s3.calls == ["ListObjectsV2", "PutObject", "GetObject"]
+
+
+@pytest.mark.unit
+def test_tiered_cache_backfills_faster_tiers(tmp_path) -> None:
+    """Test hits in a slower tier are copied into the faster ones."""
+    local = LocalCache(str(tmp_path / "local"))
+    shared = DirectoryCache(str(tmp_path / "shared"))
+    shared.put("ab12", b"data")
+
+    with TieredCache([local, shared], log=lambda _: None) as cache:
+        assert cache.get("ab12") == b"data"
+        assert cache.get("ab12") == b"data"
+        assert cache.get("cd34") is None
+        cache.put("cd34", b"new")
+
+    assert cache.hits == [1, 1]
+    assert cache.misses == 1
+    assert shared.get("cd34") == b"new"
+    assert cache.summary() == "2 hits (local 1, shared 1), 1 misses"
+
+
+@pytest.mark.unit
+def test_tiered_cache_disables_failing_tier(tmp_path) -> None:
+    """Test an unreachable tier is reported once and then skipped."""
+    messages = []
+    broken = BrokenCache()
+    with TieredCache([LocalCache(str(tmp_path)), broken], log=messages.append) as cache:
+        assert cache.get("ab12") is None
+        cache.put("ab12", b"data")
+        assert cache.get("cd34") is None
+
+    assert broken.calls == 1
+    assert messages == ["Warning: broken cache disabled: unreachable"]
+    assert cache.get("ab12") == b"data"
+
+
+@pytest.mark.unit
+def test_build_reuses_shared_cache_on_fresh_machine(tmp_path) -> None:
+    """Test a build with an empty local cache reuses outputs from the shared cache."""
+    source = tmp_path / "site"
+    (source / "css").mkdir(parents=True)
+    (source / "index.html").write_text('<link rel="stylesheet" href="css/app.css">\n')
+    (source / "css" / "app.css").write_text("body {\n  color: red;\n}\n")
+    (source / "app.js").write_text("function a() {\n    return 1;\n}\n")
+    shared = str(tmp_path / "shared")
+
+    first = build_site(
+        str(source),
+        str(tmp_path / "dist1"),
+        cache_dir=str(tmp_path / "runner1"),
+        jobs=1,
+        shared_cache=shared,
+        log=lambda _: None,
+    )
+    messages = []
+    second = build_site(
+        str(source),
+        str(tmp_path / "dist2"),
+        cache_dir=str(tmp_path / "runner2"),
+        jobs=1,
+        shared_cache=shared,
+        log=messages.append,
+    )
+
+    assert first.render_hits == 0
+    assert second.render_hits == 3
+    assert second.cache_hits == 3
+    assert second.manifest == first.manifest
+    for rel_path in first.files:
+        assert (tmp_path / "dist2" / rel_path).read_bytes() == (
+            tmp_path / "dist1" / rel_path
+        ).read_bytes()
+    assert "Build cache: 6 hits (local 0, shared 6), 0 misses" in messages
+
+
+@pytest.mark.unit
+def test_build_cache_invalidated_by_asset_changes(tmp_path) -> None:
+    """Test pages are re-rendered when an asset they reference changes."""
+    source = tmp_path / "site"
+    source.mkdir()
+    (source / "index.html").write_text('<script src="app.js"></script>\n')
+    (source / "app.js").write_text("var a = 1;\n")
+    kwargs = dict(cache_dir=str(tmp_path / "cache"), jobs=1, log=lambda _: None)
+
+    build_site(str(source), str(tmp_path / "dist"), **kwargs)
+    (source / "app.js").write_text("var a = 2;\n")
+    result = build_site(str(source), str(tmp_path / "dist"), **kwargs)
+
+    assert result.render_hits == 0
+    assert result.manifest["app.js"] in (tmp_path / "dist" / "index.html").read_text()
+
+
+@pytest.mark.unit
+def test_cache_backend_is_abstract() -> None:
+    """Test a cache backend must implement get and put to be created."""
+
+    class GetOnly(CacheBackend):
+        def get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        CacheBackend()
+    with pytest.raises(TypeError):
+        GetOnly()
@@ -0,0 +1,143 @@
+"""Tests for the cassette module."""
+
+import time
+
+import pytest
+
+from kreatisite.aws import AwsError, Backend, call, set_backend
+from kreatisite.cassette import (
+    CassetteError,
+    RecordingBackend,
+    ReplayBackend,
+    load_cassette,
+    request_key,
+)
+from kreatisite.fakeaws import FakeBackend
+from kreatisite.launch import launch_steps
+from kreatisite.pipeline import run_pipeline
+from kreatisite.testing import run_cli
+from kreatisite.waiter import wait_until
+
+
+@pytest.fixture
+def backend():
+    """Restore the active backend after the test."""
+    previous = set_backend(None)
+    yield
+    set_backend(previous)
+
+
+def quiet(_: str) -> None:
+    """Discard progress messages."""
+
+
+def write_site(root) -> tuple:
+    """Create a site source directory and a contacts file under root."""
+    source = root / "site"
+    source.mkdir(parents=True)
+    (source / "index.html").write_text("<p>Home</p>")
+    config = root / "contacts.yaml"
+    config.write_text("AdminContact:\n  FirstName: Jane\n")
+    return str(source), str(config)
+
+
+@pytest.mark.unit
+def test_request_key_ignores_volatile_parts(tmp_path) -> None:
+    """Test bodies match by content and caller references are ignored."""
+    first, second = tmp_path / "a.html", tmp_path / "b.html"
+    first.write_text("same")
+    second.write_text("same")
+
+    a = request_key("s3", "PutObject", {"Body": str(first), "CallerReference": "1"}, None)
+    b = request_key("s3", "PutObject", {"CallerReference": "2", "Body": str(second)}, None)
+
+    assert a == b
+    assert a != request_key("s3", "PutObject", {"Body": str(first)}, "eu-west-1")
+
+
+@pytest.mark.unit
+def test_record_and_replay(backend, tmp_path) -> None:
+    """Test responses, errors and downloads are served back in recorded order."""
+    cassette = str(tmp_path / "aws.jsonl.gz")
+    body = tmp_path / "body.txt"
+    body.write_text("hello")
+    recorder = RecordingBackend(FakeBackend(), cassette)
+    set_backend(recorder)
+    call("s3", "CreateBucket", {"Bucket": "b"})
+    before = call("s3", "ListObjectsV2", {"Bucket": "b"})
+    call("s3", "PutObject", {"Bucket": "b", "Key": "k", "Body": str(body)})
+    after = call("s3", "ListObjectsV2", {"Bucket": "b"})
+    call("s3", "GetObject", {"Bucket": "b", "Key": "k"}, outfile=str(tmp_path / "out"))
+    with pytest.raises(AwsError):
+        call("s3", "HeadObject", {"Bucket": "b", "Key": "missing"})
+    recorder.save()
+
+    set_backend(ReplayBackend(cassette))
+    call("s3", "CreateBucket", {"Bucket": "b"})
+    assert call("s3", "ListObjectsV2", {"Bucket": "b"}) == before
+    call("s3", "PutObject", {"Bucket": "b", "Key": "k", "Body": str(body)})
+    assert call("s3", "ListObjectsV2", {"Bucket": "b"}) == after
+    call("s3", "GetObject", {"Bucket": "b", "Key": "k"}, outfile=str(tmp_path / "replayed"))
+    assert (tmp_path / "replayed").read_text() == "hello"
+    with pytest.raises(AwsError) as e:
+        call("s3", "HeadObject", {"Bucket": "b", "Key": "missing"})
+    assert e.value.code == "404"
+    with pytest.raises(CassetteError, match="s3:DeleteBucket"):
+        call("s3", "DeleteBucket", {"Bucket": "b"})
+
+
+@pytest.mark.unit
+def test_polling_is_collapsed(backend, tmp_path) -> None:
+    """Test repeated reads with no change in between keep only the last response."""
+
+    class Propagating(Backend):
+        statuses = iter(["PENDING", "PENDING", "INSYNC"])
+
+        def call(self, *args, **kwargs):
+            return {"ChangeInfo": {"Status": next(self.statuses)}}
+
+    recorder = RecordingBackend(Propagating(), str(tmp_path / "aws.jsonl"))
+    set_backend(recorder)
+
+    def in_sync() -> bool:
+        return call("route53", "GetChange", {"Id": "C1"})["ChangeInfo"]["Status"] == "INSYNC"
+
+    wait_until(in_sync, timeout=10, sleep=lambda _: None)
+    recorder.save()
+
+    interactions = load_cassette(str(tmp_path / "aws.jsonl"))
+    assert [i["response"]["ChangeInfo"]["Status"] for i in interactions] == ["INSYNC"]
+
+
+@pytest.mark.unit
+def test_launch_replays_offline(backend, tmp_path) -> None:
+    """Test a recorded launch replays from another checkout without the backend."""
+    cassette = str(tmp_path / "launch.jsonl.gz")
+    source, config = write_site(tmp_path / "recorded")
+    recorder = RecordingBackend(FakeBackend(), cassette)
+    set_backend(recorder)
+    steps = launch_steps("example.com", config, source, str(tmp_path / "d1"), log=quiet)
+    recorded = run_pipeline(steps, log=quiet)
+    recorder.save()
+
+    source, config = write_site(tmp_path / "replayed")
+    set_backend(ReplayBackend(cassette))
+    start = time.perf_counter()
+    steps = launch_steps("example.com", config, source, str(tmp_path / "d2"), log=quiet)
+    replayed = run_pipeline(steps, log=quiet)
+
+    assert time.perf_counter() - start < 5
+    assert replayed.results == recorded.results
+
+
+@pytest.mark.unit
+def test_cassettes_are_refused_across_accounts(tmp_path) -> None:
+    """Test --record and --replay are rejected with --profiles, as cassettes hold one account."""
+    cassette = str(tmp_path / "aws.jsonl")
+    recorded = run_cli(["--record", cassette, "check-domains", "a.com", "--profiles", "a,b"])
+    replayed = run_cli(["--replay", cassette, "inventory", "--profiles", "a"])
+
+    assert recorded.returncode == 1
+    assert "--record cannot be used with --profiles" in recorded.stderr
+    assert replayed.returncode == 1
+    assert "--replay cannot be used with --profiles" in replayed.stderr
@@ -0,0 +1,143 @@
+"""Tests for the cert module."""
+
+import threading
+from argparse import Namespace
+from unittest.mock import patch
+
+import pytest
+
+from kreatisite.cert import (
+    CertificateError,
+    certificate_names,
+    provision_certificates,
+    wait_for_certificates,
+)
+from kreatisite.cmd import cert
+
+
+class FakeAws:
+    """Minimal in-memory ACM and Route53 stand-in for the calls made by cert."""
+
+    def __init__(self, issue_after_polls=1, fail=()) -> None:
+        """Create the stand-in; certificates are issued after some status polls."""
+        self.issue_after_polls = issue_after_polls
+        self.fail = set(fail)
+        self.certificates = {}
+        self.changes = []
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, service, operation, params=None, endpoint_url=None, region=None):
+        """Handle an AWS API call."""
+        with self.lock:
+            self.calls.append(operation)
+            return getattr(self, operation)(params, region)
+
+    def RequestCertificate(self, params, region):
+        """Create a certificate (idempotent per token)."""
+        arn = f"arn:aws:acm:{region}:123:certificate/{params['IdempotencyToken'][:8]}"
+        self.certificates.setdefault(arn, params["SubjectAlternativeNames"])
+        return {"CertificateArn": arn}
+
+    def DescribeCertificate(self, params, region):
+        """Return validation options; names sharing a base domain share a record."""
+        names = self.certificates[params["CertificateArn"]]
+        options = []
+        for name in names:
+            base = name[2:] if name.startswith("*.") else name
+            record = {"Name": f"_v.{base}.", "Type": "CNAME", "Value": f"_x.{base}.acm."}
+            options.append({"DomainName": name, "ResourceRecord": record})
+        return {"Certificate": {"DomainValidationOptions": options}}
+
+    def ListHostedZones(self, params, region):
+        """Return one hosted zone per site."""
+        return {
+            "HostedZones": [{"Id": "/hostedzone/ZA", "Name": "a.com."}]
+            + [{"Id": "/hostedzone/ZB", "Name": "b.com."}]
+        }
+
+    def ChangeResourceRecordSets(self, params, region):
+        """Record a change batch."""
+        self.changes.append((params["HostedZoneId"], params["ChangeBatch"]["Changes"]))
+        return {"ChangeInfo": {"Id": f"/change/C{len(self.changes)}"}}
+
+    def ListCertificates(self, params, region):
+        """Report certificates as issued once they have been polled enough."""
+        polls = self.calls.count("ListCertificates")
+        summaries = []
+        for arn, names in self.certificates.items():
+            if names[0] in self.fail:
+                status = "FAILED"
+            elif polls > self.issue_after_polls:
+                status = "ISSUED"
+            else:
+                status = "PENDING_VALIDATION"
+            summaries.append({"CertificateArn": arn, "DomainName": names[0], "Status": status})
+        return {"CertificateSummaryList": summaries}
+
+
+@pytest.mark.unit
+def test_certificate_names() -> None:
+    """Test certificates cover the apex, www and optionally a wildcard."""
+    assert certificate_names("a.com") == ["a.com", "www.a.com"]
+    assert certificate_names("a.com", wildcard=True) == ["a.com", "www.a.com", "*.a.com"]
+
+
+@pytest.mark.unit
+def test_provision_certificates_batches_and_shares_polling() -> None:
+    """Test many certificates need one batch per zone and one listing per poll."""
+    aws = FakeAws(issue_after_polls=2)
+
+    with patch("kreatisite.cert.call", aws), patch("kreatisite.dns.call", aws):
+        with patch("kreatisite.waiter.time.sleep"):
+            arns = provision_certificates(["a.com", "b.com"], wildcard=True, log=lambda _: None)
+
+    assert set(arns) == {"a.com", "b.com"}
+    assert aws.calls.count("RequestCertificate") == 2
+    assert aws.calls.count("DescribeCertificate") == 2
+    assert aws.calls.count("ListHostedZones") == 1
+    assert aws.calls.count("ListCertificates") == 3
+    assert sorted(zone for zone, _ in aws.changes) == ["ZA", "ZB"]
+    # a.com and *.a.com share a validation record, so each zone gets two records
+    assert [len(changes) for _, changes in aws.changes] == [2, 2]
+
+
+@pytest.mark.unit
+def test_wait_for_certificates_fails_fast() -> None:
+    """Test a failed validation stops the wait with an error."""
+    aws = FakeAws(fail={"a.com"})
+
+    with patch("kreatisite.cert.call", aws), patch("kreatisite.waiter.time.sleep"):
+        arn = aws.RequestCertificate(
+            {"IdempotencyToken": "t" * 32, "SubjectAlternativeNames": ["a.com"]}, "us-east-1"
+        )["CertificateArn"]
+        with pytest.raises(CertificateError, match="FAILED"):
+            wait_for_certificates([arn])
+
+
+@pytest.mark.unit
+def test_cert_command_no_wait(capsys) -> None:
+    """Test the cert command writes validation records and prints the ARNs."""
+    aws = FakeAws()
+    args = Namespace(
+        domain_names=["a.com"], wildcard=False, region="us-east-1", wait=False, timeout=60
+    )
+
+    with patch("kreatisite.cert.call", aws), patch("kreatisite.dns.call", aws):
+        assert cert(args) == 0
+
+    assert "ListCertificates" not in aws.calls
+    assert "a.com: arn:aws:acm:us-east-1:123:certificate/" in capsys.readouterr().out
+
+
+@pytest.mark.unit
+def test_cert_command_missing_zone(capsys) -> None:
+    """Test a domain without a hosted zone is reported as an error."""
+    args = Namespace(
+        domain_names=["c.org"], wildcard=False, region="us-east-1", wait=False, timeout=60
+    )
+
+    with patch("kreatisite.cert.call", FakeAws()), patch("kreatisite.dns.call", FakeAws()):
+        assert cert(args) == 1
+
+    assert "No hosted zone found" in capsys.readouterr().err
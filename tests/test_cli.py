@@ -1,8 +1,19 @@
 """Tests for the CLI module."""
 
+import subprocess
+import sys
+from argparse import Namespace
 from unittest.mock import Mock, patch
 
 from kreatisite.cli import main, print_help
+from kreatisite.parser import create_parser
+
+
+def _args(**overrides) -> Namespace:
+    """Return the parsed arguments of a bare command line, with overrides."""
+    args = create_parser().parse_args([])
+    vars(args).update(overrides)
+    return args
 
 
 def test_print_help(capsys) -> None:
@@ -21,8 +32,7 @@ def test_print_help(capsys) -> None:
 def test_main_no_command(mock_create_parser, capsys) -> None:
     """Test main function with no command shows help."""
     mock_parser = Mock()
-    mock_args = Mock()
-    mock_args.command = None
+    mock_args = _args()
     mock_parser.parse_args.return_value = mock_args
     mock_create_parser.return_value = mock_parser
 
@@ -37,8 +47,7 @@ def test_main_no_command(mock_create_parser, capsys) -> None:
 def test_main_help_command(mock_create_parser, capsys) -> None:
     """Test main function with help command."""
     mock_parser = Mock()
-    mock_args = Mock()
-    mock_args.command = "help"
+    mock_args = _args(command="help")
     mock_parser.parse_args.return_value = mock_args
     mock_create_parser.return_value = mock_parser
 
@@ -54,9 +63,7 @@ def test_main_help_command(mock_create_parser, capsys) -> None:
 def test_main_check_domain_command(mock_create_parser, mock_check_domain) -> None:
     """Test main function with check-domain command."""
     mock_parser = Mock()
-    mock_args = Mock()
-    mock_args.command = "check-domain"
-    mock_args.domain_name = "example.com"
+    mock_args = _args(command="check-domain", domain_name="example.com")
     mock_parser.parse_args.return_value = mock_args
     mock_create_parser.return_value = mock_parser
     mock_check_domain.return_value = 0
@@ -72,8 +79,7 @@ def test_main_check_domain_command(mock_create_parser, mock_check_domain) -> Non
 def test_main_register_domain_command(mock_create_parser, mock_register_domain) -> None:
     """Test main function with register-domain command."""
     mock_parser = Mock()
-    mock_args = Mock()
-    mock_args.command = "register-domain"
+    mock_args = _args(command="register-domain")
     mock_parser.parse_args.return_value = mock_args
     mock_create_parser.return_value = mock_parser
     mock_register_domain.return_value = 0
@@ -88,8 +94,7 @@ def test_main_register_domain_command(mock_create_parser, mock_register_domain)
 def test_main_invalid_command(mock_create_parser) -> None:
     """Test main function with invalid command."""
     mock_parser = Mock()
-    mock_args = Mock()
-    mock_args.command = "invalid-command"
+    mock_args = _args(command="invalid-command")
     mock_parser.parse_args.return_value = mock_args
     mock_create_parser.return_value = mock_parser
 
@@ -107,3 +112,18 @@ def test_python_version_check() -> None:
     import kreatisite.cli
 
     assert hasattr(kreatisite.cli, "main")
+
+
+def test_cli_startup_does_not_load_command_modules() -> None:
+    """Test importing the CLI and building its parser loads no command's feature modules."""
+    heavy = {"http.server", "yaml", "kreatisite.build", "kreatisite.cassette", "kreatisite.launch"}
+    code = (
+        "import sys; from kreatisite.cli import create_parser; "
+        "create_parser().parse_args(['check-domain', 'example.com']); "
+        f"print(sorted({heavy!r} & set(sys.modules)))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+
+    assert result.stdout.splitlines()[-1] == "[]"
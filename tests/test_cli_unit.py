@@ -1,6 +1,6 @@
-"""Unit tests for CLI using clirunner and mocked subprocess calls."""
+"""Unit tests for CLI using clirunner and mocked AWS CLI processes."""
 
-from unittest.mock import Mock, patch
+from unittest.mock import patch
 
 import pytest
 from clirunner import CliRunner
@@ -42,11 +42,11 @@ def test_invalid_command():
 
 @pytest.mark.unit
 @patch("kreatisite.cli.check_dependencies")
-@patch("subprocess.run")
+@patch("kreatisite.aws.run_process")
 def test_check_domain_success(mock_run, mock_deps):
     """Test check-domain command with successful AWS response."""
     mock_deps.return_value = None
-    mock_run.return_value = Mock(stdout='{"Available": true}', stderr="", returncode=0)
+    mock_run.return_value = (0, '{"Available": true}', "")
 
     runner = CliRunner()
     result = runner.invoke(main, ["check-domain", "example.com"])
@@ -63,13 +63,11 @@ def test_check_domain_success(mock_run, mock_deps):
 
 @pytest.mark.unit
 @patch("kreatisite.cli.check_dependencies")
-@patch("subprocess.run")
+@patch("kreatisite.aws.run_process")
 def test_check_domain_aws_error(mock_run, mock_deps):
     """Test check-domain command with AWS error response."""
     mock_deps.return_value = None
-    mock_run.return_value = Mock(
-        stdout="", stderr="An error occurred (ValidationException)", returncode=1
-    )
+    mock_run.return_value = (1, "", "An error occurred (ValidationException)")
 
     runner = CliRunner()
     result = runner.invoke(main, ["check-domain", "invalid-domain"])
@@ -81,7 +79,7 @@ def test_check_domain_aws_error(mock_run, mock_deps):
 
 @pytest.mark.unit
 @patch("kreatisite.cli.check_dependencies")
-@patch("subprocess.run", side_effect=Exception("Network error"))
+@patch("kreatisite.aws.run_process", side_effect=Exception("Network error"))
 def test_check_domain_subprocess_exception(mock_run, mock_deps):
     """Test check-domain command with subprocess exception."""
     mock_deps.return_value = None
@@ -130,10 +128,8 @@ def test_register_domain_with_config(mock_deps):
         with open("config.yaml", "w") as f:
             f.write("AdminContact:\n  FirstName: Test\n")
 
-        with patch("subprocess.run") as mock_run:
-            mock_run.return_value = Mock(
-                stdout='{"OperationId": "test-123"}', stderr="", returncode=0
-            )
+        with patch("kreatisite.aws.run_process") as mock_run:
+            mock_run.return_value = (0, '{"OperationId": "test-123"}', "")
 
             result = runner.invoke(
                 main, ["register-domain", "example.com", "--config-file", "config.yaml"]
@@ -5,14 +5,10 @@ from unittest.mock import Mock, mock_open, patch
 from kreatisite.cmd import check_domain_availability, register_domain
 
 
-@patch("kreatisite.cmd.subprocess.run")
+@patch("kreatisite.aws.run_process")
 def test_check_domain_availability_success(mock_run, capsys) -> None:
     """Test successful domain availability check."""
-    mock_result = Mock()
-    mock_result.stdout = '{"Availability": "AVAILABLE"}\n'
-    mock_result.stderr = ""
-    mock_result.returncode = 0
-    mock_run.return_value = mock_result
+    mock_run.return_value = (0, '{"Availability": "AVAILABLE"}\n', "")
 
     result = check_domain_availability("example.com")
 
@@ -20,21 +16,23 @@ def test_check_domain_availability_success(mock_run, capsys) -> None:
     captured = capsys.readouterr()
     assert '{"Availability": "AVAILABLE"}' in captured.out
     mock_run.assert_called_once_with(
-        ["aws", "route53domains", "check-domain-availability", "--domain-name", "example.com"],
-        capture_output=True,
-        text=True,
-        check=False,
+        [
+            "aws",
+            "route53domains",
+            "check-domain-availability",
+            "--domain-name",
+            "example.com",
+            "--output",
+            "json",
+        ],
+        timeout=None,
     )
 
 
-@patch("kreatisite.cmd.subprocess.run")
+@patch("kreatisite.aws.run_process")
 def test_check_domain_availability_error(mock_run, capsys) -> None:
     """Test domain availability check with AWS error."""
-    mock_result = Mock()
-    mock_result.stdout = ""
-    mock_result.stderr = "An error occurred (AccessDenied)"
-    mock_result.returncode = 1
-    mock_run.return_value = mock_result
+    mock_run.return_value = (1, "", "An error occurred (AccessDenied)")
 
     result = check_domain_availability("example.com")
 
@@ -43,9 +41,9 @@ def test_check_domain_availability_error(mock_run, capsys) -> None:
     assert "Error: An error occurred (AccessDenied)" in captured.err
 
 
-@patch("kreatisite.cmd.subprocess.run")
+@patch("kreatisite.aws.run_process")
 def test_check_domain_availability_exception(mock_run, capsys) -> None:
-    """Test domain availability check with subprocess exception."""
+    """Test domain availability check with an unexpected exception."""
     mock_run.side_effect = Exception("Connection error")
 
     result = check_domain_availability("example.com")
@@ -84,15 +82,11 @@ def test_register_domain_invalid_yaml(capsys) -> None:
     assert "Error parsing YAML config file:" in captured.err
 
 
-@patch("kreatisite.cmd.subprocess.run")
+@patch("kreatisite.aws.run_process")
 @patch("builtins.open", mock_open(read_data="AdminContact:\n  FirstName: John"))
 def test_register_domain_success(mock_run, capsys) -> None:
     """Test successful domain registration."""
-    mock_result = Mock()
-    mock_result.stdout = '{"OperationId": "12345"}\n'
-    mock_result.stderr = ""
-    mock_result.returncode = 0
-    mock_run.return_value = mock_result
+    mock_run.return_value = (0, '{"OperationId": "12345"}\n', "")
 
     mock_args = Mock()
     mock_args.config_file = "config.yaml"
@@ -106,7 +100,7 @@ def test_register_domain_success(mock_run, capsys) -> None:
     captured = capsys.readouterr()
     assert '{"OperationId": "12345"}' in captured.out
 
-    # Verify the AWS CLI command was constructed correctly
+    # Verify the AWS CLI command was constructed correctly, with contacts from the YAML file
     expected_cmd = [
         "aws",
         "route53domains",
@@ -119,21 +113,19 @@ def test_register_domain_success(mock_run, capsys) -> None:
         "--privacy-protect-admin-contact",
         "--privacy-protect-registrant-contact",
         "--privacy-protect-tech-contact",
-        "--cli-input-yaml",
-        "file://config.yaml",
+        "--admin-contact",
+        '{"FirstName": "John"}',
+        "--output",
+        "json",
     ]
-    mock_run.assert_called_once_with(expected_cmd, capture_output=True, text=True, check=False)
+    mock_run.assert_called_once_with(expected_cmd, timeout=None)
 
 
-@patch("kreatisite.cmd.subprocess.run")
+@patch("kreatisite.aws.run_process")
 @patch("builtins.open", mock_open(read_data="AdminContact:\n  FirstName: John"))
 def test_register_domain_no_auto_renew(mock_run) -> None:
     """Test domain registration with auto-renew disabled."""
-    mock_result = Mock()
-    mock_result.stdout = ""
-    mock_result.stderr = ""
-    mock_result.returncode = 0
-    mock_run.return_value = mock_result
+    mock_run.return_value = (0, "", "")
 
     mock_args = Mock()
     mock_args.config_file = "config.yaml"
@@ -158,21 +150,19 @@ def test_register_domain_no_auto_renew(mock_run) -> None:
         "--privacy-protect-admin-contact",
         "--privacy-protect-registrant-contact",
         "--privacy-protect-tech-contact",
-        "--cli-input-yaml",
-        "file://config.yaml",
+        "--admin-contact",
+        '{"FirstName": "John"}',
+        "--output",
+        "json",
     ]
-    mock_run.assert_called_once_with(expected_cmd, capture_output=True, text=True, check=False)
+    mock_run.assert_called_once_with(expected_cmd, timeout=None)
 
 
-@patch("kreatisite.cmd.subprocess.run")
+@patch("kreatisite.aws.run_process")
 @patch("builtins.open", mock_open(read_data="AdminContact:\n  FirstName: John"))
 def test_register_domain_aws_error(mock_run, capsys) -> None:
     """Test domain registration with AWS error."""
-    mock_result = Mock()
-    mock_result.stdout = ""
-    mock_result.stderr = "Domain already exists"
-    mock_result.returncode = 1
-    mock_run.return_value = mock_result
+    mock_run.return_value = (1, "", "Domain already exists")
 
     mock_args = Mock()
     mock_args.config_file = "config.yaml"
@@ -187,10 +177,10 @@ def test_register_domain_aws_error(mock_run, capsys) -> None:
     assert "Error: Domain already exists" in captured.err
 
 
-@patch("kreatisite.cmd.subprocess.run")
+@patch("kreatisite.aws.run_process")
 @patch("builtins.open", mock_open(read_data="AdminContact:\n  FirstName: John"))
 def test_register_domain_subprocess_exception(mock_run, capsys) -> None:
-    """Test domain registration with subprocess exception."""
+    """Test domain registration with an unexpected exception."""
     mock_run.side_effect = Exception("AWS CLI not found")
 
     mock_args = Mock()
@@ -204,3 +194,41 @@ def test_register_domain_subprocess_exception(mock_run, capsys) -> None:
     assert result == 1
     captured = capsys.readouterr()
     assert "Error executing AWS command: AWS CLI not found" in captured.err
+
+
+@patch("builtins.open", mock_open(read_data="- AdminContact\n- TechContact\n"))
+def test_register_domain_contacts_not_a_mapping(capsys) -> None:
+    """Test register domain with a config file that is not a mapping of contacts."""
+    mock_args = Mock()
+    mock_args.config_file = "list.yaml"
+    mock_args.domain_name = "example.com"
+
+    result = register_domain(mock_args)
+
+    assert result == 1
+    captured = capsys.readouterr()
+    assert "Error: Config file 'list.yaml' must be a mapping of contacts" in captured.err
+
+
+@patch("kreatisite.aws.run_process")
+@patch(
+    "builtins.open",
+    mock_open(read_data="DomainName: other.com\nPrivacyProtectTechContact: false\n"),
+)
+def test_register_domain_contacts_cannot_override_settings(mock_run) -> None:
+    """Test the config file cannot change the domain name or turn privacy protection off."""
+    mock_run.return_value = (0, '{"OperationId": "12345"}\n', "")
+
+    mock_args = Mock()
+    mock_args.config_file = "config.yaml"
+    mock_args.domain_name = "example.com"
+    mock_args.duration_in_years = 1
+    mock_args.auto_renew = True
+
+    assert register_domain(mock_args) == 0
+
+    cmd = mock_run.call_args[0][0]
+    assert cmd[cmd.index("--domain-name") + 1] == "example.com"
+    assert "other.com" not in cmd
+    assert "--privacy-protect-tech-contact" in cmd
+    assert "--no-privacy-protect-tech-contact" not in cmd
@@ -0,0 +1,197 @@
+"""Tests for the deploy module."""
+
+import hashlib
+from argparse import Namespace
+from unittest.mock import patch
+from urllib.parse import unquote
+
+import pytest
+
+from kreatisite.aws import AwsError
+from kreatisite.cmd import deploy
+from kreatisite.deploy import (
+    IMMUTABLE_CACHE_CONTROL,
+    REVALIDATE_CACHE_CONTROL,
+    deploy_site,
+    object_headers,
+    plan_deploy,
+)
+
+
+class FakeS3:
+    """Minimal in-memory S3 stand-in for the calls made by deploy."""
+
+    def __init__(self, objects=None) -> None:
+        """Create the stand-in with an initial key to content mapping."""
+        self.objects = dict(objects or {})
+        self.calls = []
+        self.protected = set()
+
+    def __call__(self, service, operation, params=None, endpoint_url=None):
+        """Handle an AWS API call."""
+        self.calls.append(operation)
+        if operation == "ListObjectsV2":
+            return {
+                "Contents": [
+                    {"Key": key, "ETag": f'"{hashlib.md5(data).hexdigest()}"'}
+                    for key, data in sorted(self.objects.items())
+                    if key.startswith(params["Prefix"])
+                ]
+            }
+        if operation == "PutObject":
+            with open(params["Body"], "rb") as f:
+                self.objects[params["Key"]] = f.read()
+        elif operation == "CopyObject":
+            source = unquote(params["CopySource"]).split("/", 1)[1]
+            self.objects[params["Key"]] = self.objects[source]
+        elif operation == "DeleteObjects":
+            errors = []
+            for obj in params["Delete"]["Objects"]:
+                if obj["Key"] in self.protected:
+                    errors.append({"Key": obj["Key"], "Code": "AccessDenied", "Message": "Denied"})
+                else:
+                    del self.objects[obj["Key"]]
+            return {"Errors": errors} if errors else {}
+        return {}
+
+
+def make_output(root) -> None:
+    """Create a small build output directory."""
+    (root / "css").mkdir(parents=True)
+    (root / "index.html").write_text("<p>home</p>")
+    (root / "about.html").write_text("<p>about</p>")
+    (root / "css" / "app.1234abcd.css").write_text("p{}")
+
+
+@pytest.mark.unit
+def test_plan_deploy() -> None:
+    """Test the plan uploads, copies and deletes only the differences."""
+    local = {"index.html": "a", "new.html": "b", "moved.css": "c", "same.txt": "d"}
+    remote = {"index.html": "old", "old.css": "c", "same.txt": "d", "gone.txt": "e"}
+
+    plan = plan_deploy(local, remote)
+
+    assert plan.uploads == ["index.html", "new.html"]
+    assert plan.copies == [("old.css", "moved.css")]
+    assert plan.deletes == ["gone.txt", "old.css"]
+    assert plan.unchanged == 1
+    assert plan.changed_keys == ["gone.txt", "index.html", "moved.css", "new.html", "old.css"]
+
+
+@pytest.mark.unit
+def test_plan_deploy_uploads_pages_last() -> None:
+    """Test assets are uploaded before the pages that reference them."""
+    plan = plan_deploy({"a.html": "1", "b.css": "2", "a.html.gz": "3"}, {})
+
+    assert plan.uploads == ["b.css", "a.html", "a.html.gz"]
+
+
+@pytest.mark.unit
+def test_object_headers() -> None:
+    """Test caching and encoding headers depend on the key."""
+    assert object_headers("app.1234abcd.css")["CacheControl"] == IMMUTABLE_CACHE_CONTROL
+    headers = object_headers("index.html.gz")
+    assert headers["CacheControl"] == REVALIDATE_CACHE_CONTROL
+    assert headers["ContentEncoding"] == "gzip"
+    assert headers["ContentType"].startswith("text/html")
+
+
+@pytest.mark.unit
+def test_deploy_site_only_transfers_changes(tmp_path) -> None:
+    """Test a second deploy after a one-page change uploads a single object."""
+    output = tmp_path / "dist"
+    make_output(output)
+    s3 = FakeS3({"site/stale.html": b"old"})
+
+    with patch("kreatisite.deploy.call", s3):
+        first = deploy_site(str(output), "bucket", prefix="site", jobs=2, log=lambda _: None)
+        (output / "about.html").write_text("<p>about us</p>")
+        s3.calls.clear()
+        second = deploy_site(str(output), "bucket", prefix="site", jobs=2, log=lambda _: None)
+
+    assert sorted(first.uploads) == ["about.html", "css/app.1234abcd.css", "index.html"]
+    assert first.deletes == ["stale.html"]
+    assert second.uploads == ["about.html"]
+    assert second.unchanged == 2
+    assert s3.calls == ["ListObjectsV2", "PutObject"]
+    assert s3.objects["site/about.html"] == b"<p>about us</p>"
+    assert "site/stale.html" not in s3.objects
+
+
+@pytest.mark.unit
+def test_deploy_site_copies_keys_with_special_characters(tmp_path) -> None:
+    """Test the copy source is URL-encoded, so keys with spaces, + and % copy."""
+    output = tmp_path / "dist"
+    output.mkdir()
+    name = "café menu+50%.a1b2c3d4.pdf"
+    (output / name).write_bytes(b"menu")
+    s3 = FakeS3({"old%20menu+1.pdf": b"menu"})
+
+    with patch("kreatisite.deploy.call", s3):
+        plan = deploy_site(str(output), "bucket", delete=False, log=lambda _: None)
+
+    assert plan.copies == [("old%20menu+1.pdf", name)]
+    assert s3.objects[name] == b"menu"
+
+
+@pytest.mark.unit
+def test_deploy_site_reports_failed_deletes(tmp_path) -> None:
+    """Test keys DeleteObjects could not delete are reported as an error."""
+    output = tmp_path / "dist"
+    make_output(output)
+    s3 = FakeS3({"stale.html": b"old", "locked.html": b"old"})
+    s3.protected.add("locked.html")
+
+    with patch("kreatisite.deploy.call", s3), pytest.raises(AwsError, match="locked.html"):
+        deploy_site(str(output), "bucket", log=lambda _: None)
+    assert "stale.html" not in s3.objects
+
+
+@pytest.mark.unit
+def test_deploy_site_dry_run(tmp_path) -> None:
+    """Test a dry run only lists the bucket."""
+    output = tmp_path / "dist"
+    make_output(output)
+    s3 = FakeS3()
+
+    with patch("kreatisite.deploy.call", s3):
+        plan = deploy_site(str(output), "bucket", dry_run=True, log=lambda _: None)
+
+    assert len(plan.uploads) == 3
+    assert s3.calls == ["ListObjectsV2"]
+    assert s3.objects == {}
+
+
+@pytest.mark.unit
+def test_deploy_command_missing_output(tmp_path, capsys) -> None:
+    """Test the deploy command requires a build output directory."""
+    args = Namespace(output_dir=str(tmp_path / "missing"), domain_name="example.com")
+
+    assert deploy(args) == 1
+    assert "Run 'kreatisite build' first" in capsys.readouterr().err
+
+
+@pytest.mark.unit
+def test_deploy_command_plans_invalidation(tmp_path, capsys) -> None:
+    """Test a first dry-run deploy invalidates the whole distribution with one path."""
+    output = tmp_path / "dist"
+    make_output(output)
+    args = Namespace(
+        output_dir=str(output),
+        domain_name="example.com",
+        bucket=None,
+        prefix="",
+        endpoint_url=None,
+        jobs=2,
+        delete=True,
+        dry_run=True,
+        distribution_id="DIST",
+        max_invalidation_paths=100,
+        wait=False,
+    )
+
+    with patch("kreatisite.deploy.call", FakeS3()):
+        assert deploy(args) == 0
+
+    out = capsys.readouterr().out
+    assert "Invalidating 1 path(s): /*" in out
@@ -0,0 +1,252 @@
+"""Tests for the dns module."""
+
+from argparse import Namespace
+from unittest.mock import patch
+
+import pytest
+
+from kreatisite.cmd import dns
+from kreatisite.dns import (
+    MAX_BATCH_RECORDS,
+    MAX_BATCH_VALUE_CHARS,
+    DnsConfigError,
+    apply_zone_file,
+    batch_changes,
+    find_hosted_zone_id,
+    load_zone_file,
+    normalize_name,
+    plan_changes,
+)
+
+ZONE_FILE = """
+zone: example.com
+records:
+  - name: "@"
+    type: A
+    alias:
+      hosted_zone_id: Z2FDTNDATAQYW2
+      dns_name: d111.cloudfront.net
+  - name: www
+    type: CNAME
+    ttl: 300
+    values: [example.com]
+  - name: "@"
+    type: TXT
+    value: v=spf1 -all
+"""
+
+
+def record(name, rtype, *values, ttl=300):
+    """Build a Route53 resource record set."""
+    return {
+        "Name": name,
+        "Type": rtype,
+        "TTL": ttl,
+        "ResourceRecords": [{"Value": v} for v in values],
+    }
+
+
+APEX_RECORDS = [
+    record("example.com.", "NS", "ns-1.awsdns-01.org.", ttl=172800),
+    record("example.com.", "SOA", "ns-1.awsdns-01.org. hostmaster 1 7200 900 1209600 86400"),
+]
+
+
+class FakeRoute53:
+    """Minimal in-memory Route53 stand-in for the calls made by dns."""
+
+    def __init__(self, records) -> None:
+        """Create the stand-in with an initial list of record sets."""
+        self.records = list(records)
+        self.calls = []
+
+    def __call__(self, service, operation, params=None, endpoint_url=None):
+        """Handle an AWS API call."""
+        self.calls.append(operation)
+        if operation == "ListHostedZones":
+            return {
+                "HostedZones": [
+                    {"Id": "/hostedzone/ZROOT", "Name": "com."},
+                    {"Id": "/hostedzone/ZEXAMPLE", "Name": "example.com."},
+                    {
+                        "Id": "/hostedzone/ZPRIVATE",
+                        "Name": "example.com.",
+                        "Config": {"PrivateZone": True},
+                    },
+                ]
+            }
+        if operation == "ListResourceRecordSets":
+            return {"ResourceRecordSets": self.records}
+        if operation == "ChangeResourceRecordSets":
+            for change in params["ChangeBatch"]["Changes"]:
+                rrset = change["ResourceRecordSet"]
+                key = (rrset["Name"], rrset["Type"])
+                self.records = [r for r in self.records if (r["Name"], r["Type"]) != key]
+                if change["Action"] != "DELETE":
+                    self.records.append(rrset)
+            return {"ChangeInfo": {"Id": f"/change/C{len(self.calls)}", "Status": "PENDING"}}
+        if operation == "GetChange":
+            return {"ChangeInfo": {"Id": params["Id"], "Status": "INSYNC"}}
+        raise AssertionError(f"Unexpected call {operation}")
+
+
+@pytest.fixture
+def zone_file(tmp_path):
+    """Write the sample zone file."""
+    path = tmp_path / "zone.yaml"
+    path.write_text(ZONE_FILE)
+    return str(path)
+
+
+@pytest.mark.unit
+def test_normalize_name() -> None:
+    """Test names are made fully qualified, lowercase and unescaped."""
+    assert normalize_name("@", "example.com") == "example.com."
+    assert normalize_name("WWW", "example.com") == "www.example.com."
+    assert normalize_name("www.example.com", "example.com") == "www.example.com."
+    assert normalize_name("other.org.", "example.com") == "other.org."
+    assert normalize_name("\\052.example.com.") == "*.example.com."
+
+
+@pytest.mark.unit
+def test_load_zone_file(zone_file) -> None:
+    """Test zone file entries become Route53 record sets."""
+    zone, hosted_zone_id, records = load_zone_file(zone_file)
+
+    assert zone == "example.com"
+    assert hosted_zone_id is None
+    assert records[0]["AliasTarget"]["DNSName"] == "d111.cloudfront.net."
+    assert records[1] == record("www.example.com.", "CNAME", "example.com")
+    assert records[2]["ResourceRecords"] == [{"Value": '"v=spf1 -all"'}]
+
+
+@pytest.mark.unit
+def test_load_zone_file_errors(tmp_path) -> None:
+    """Test missing files, missing values and duplicates are rejected."""
+    with pytest.raises(DnsConfigError, match="not found"):
+        load_zone_file(str(tmp_path / "missing.yaml"))
+
+    path = tmp_path / "zone.yaml"
+    path.write_text("zone: example.com\nrecords:\n  - {name: www, type: A}\n")
+    with pytest.raises(DnsConfigError, match="no values"):
+        load_zone_file(str(path))
+
+    path.write_text(
+        "zone: example.com\nrecords:\n"
+        "  - {name: www, type: A, value: 192.0.2.1}\n"
+        "  - {name: WWW.example.com., type: A, value: 192.0.2.2}\n"
+    )
+    with pytest.raises(DnsConfigError, match="Duplicate"):
+        load_zone_file(str(path))
+
+
+@pytest.mark.unit
+def test_plan_changes() -> None:
+    """Test only missing and different records are changed; deletes need prune."""
+    current = APEX_RECORDS + [
+        record("www.example.com.", "A", "192.0.2.2", "192.0.2.1"),
+        record("old.example.com.", "A", "192.0.2.9"),
+        record("api.example.com.", "A", "192.0.2.3"),
+    ]
+    desired = [
+        record("www.example.com.", "A", "192.0.2.1", "192.0.2.2"),
+        record("api.example.com.", "A", "192.0.2.4"),
+        record("new.example.com.", "CNAME", "example.com"),
+    ]
+
+    plan = plan_changes(current, desired, "example.com")
+    assert [(c["Action"], c["ResourceRecordSet"]["Name"]) for c in plan.changes] == [
+        ("UPSERT", "api.example.com."),
+        ("CREATE", "new.example.com."),
+    ]
+    assert plan.unchanged == 1
+
+    plan = plan_changes(current, desired, "example.com", prune=True)
+    assert plan.changes[0]["Action"] == "DELETE"
+    assert [c["ResourceRecordSet"]["Name"] for c in plan.changes if c["Action"] == "DELETE"] == [
+        "old.example.com."
+    ]
+    assert plan.summary() == "1 to create, 1 to update, 1 to delete, 1 unchanged"
+
+
+@pytest.mark.unit
+def test_batch_changes_respects_limits() -> None:
+    """Test changes are packed into as few batches as the record and size limits allow."""
+    creates = [
+        {"Action": "CREATE", "ResourceRecordSet": record(f"h{i}.example.com.", "A", "192.0.2.1")}
+        for i in range(2500)
+    ]
+    batches = batch_changes(creates)
+    assert [len(b) for b in batches] == [MAX_BATCH_RECORDS, MAX_BATCH_RECORDS, 500]
+
+    upserts = [dict(c, Action="UPSERT") for c in creates[:1500]]
+    assert [len(b) for b in batch_changes(upserts)] == [500, 500, 500]
+
+    long_value = "x" * 255
+    txt = [
+        {"Action": "CREATE", "ResourceRecordSet": record(f"t{i}.example.com.", "TXT", long_value)}
+        for i in range(300)
+    ]
+    batches = batch_changes(txt)
+    assert len(batches) == 3
+    assert all(len(b) * 255 <= MAX_BATCH_VALUE_CHARS for b in batches)
+    assert batch_changes([]) == []
+
+
+@pytest.mark.unit
+def test_find_hosted_zone_id() -> None:
+    """Test the longest matching public zone is chosen."""
+    with patch("kreatisite.dns.call", FakeRoute53([])):
+        assert find_hosted_zone_id("_acme.www.example.com") == "ZEXAMPLE"
+        with pytest.raises(DnsConfigError):
+            find_hosted_zone_id("example.org")
+
+
+@pytest.mark.unit
+def test_apply_zone_file(zone_file) -> None:
+    """Test applying a zone file converges in one batch and is then a no-op."""
+    route53 = FakeRoute53(APEX_RECORDS + [record("stale.example.com.", "A", "192.0.2.9")])
+
+    with patch("kreatisite.dns.call", route53), patch("kreatisite.waiter.time.sleep"):
+        plan = apply_zone_file(zone_file, prune=True, wait=True, log=lambda _: None)
+        assert len(plan.changes) == 4
+        assert route53.calls.count("ChangeResourceRecordSets") == 1
+        assert route53.calls[-1] == "GetChange"
+        assert {r["Name"] for r in route53.records} == {"example.com.", "www.example.com."}
+
+        route53.calls.clear()
+        plan = apply_zone_file(zone_file, prune=True, log=lambda _: None)
+        assert plan.changes == []
+        assert "ChangeResourceRecordSets" not in route53.calls
+
+
+@pytest.mark.unit
+def test_dns_command_dry_run(zone_file, capsys) -> None:
+    """Test a dry run reports the plan without submitting changes."""
+    route53 = FakeRoute53(APEX_RECORDS)
+    args = Namespace(
+        dns_command="apply", zone_file=zone_file, prune=False, dry_run=True, wait=False
+    )
+
+    with patch("kreatisite.dns.call", route53):
+        assert dns(args) == 0
+
+    out = capsys.readouterr().out
+    assert "CREATE www.example.com. CNAME" in out
+    assert "3 to create, 0 to update, 0 to delete, 0 unchanged" in out
+    assert "ChangeResourceRecordSets" not in route53.calls
+
+
+@pytest.mark.unit
+def test_dns_command_invalid_zone_file(tmp_path, capsys) -> None:
+    """Test an invalid zone file is reported as an error."""
+    args = Namespace(
+        dns_command="apply",
+        zone_file=str(tmp_path / "missing.yaml"),
+        prune=False,
+        dry_run=False,
+        wait=False,
+    )
+
+    assert dns(args) == 1
+    assert "Error applying zone file" in capsys.readouterr().err
@@ -0,0 +1,108 @@
+"""Tests for the domains module."""
+
+from argparse import Namespace
+
+import pytest
+
+from kreatisite.aws import set_backend
+from kreatisite.cmd import check_domains
+from kreatisite.domains import check_availability
+from kreatisite.fakeaws import FakeBackend
+
+
+@pytest.fixture
+def fake():
+    """Route every AWS call to a fresh in-memory backend."""
+    backend = FakeBackend(taken=["taken.com"])
+    previous = set_backend(backend)
+    yield backend
+    set_backend(previous)
+
+
+@pytest.mark.unit
+def test_check_availability(fake) -> None:
+    """Test each distinct domain is checked once, in the given order."""
+    results = check_availability(["Taken.com", "free.com", "taken.com"], jobs=4)
+
+    assert [(r.domain_name, r.status) for r in results] == [
+        ("taken.com", "UNAVAILABLE"),
+        ("free.com", "AVAILABLE"),
+    ]
+    assert fake.calls == {"route53domains:CheckDomainAvailability": 2}
+
+
+@pytest.mark.unit
+def test_check_availability_retries_throttled_requests(fake, monkeypatch) -> None:
+    """Test throttled checks are retried until they succeed or run out of retries."""
+    fake.throttle_rate = 1e-9
+    fake.throttle_burst = 3
+    monkeypatch.setattr("kreatisite.aws.time.sleep", lambda _: None)
+
+    results = check_availability([f"name{i}.com" for i in range(5)], jobs=1, retries=2)
+
+    assert [r.status for r in results[:3]] == ["AVAILABLE"] * 3
+    assert all("ThrottlingException" in r.error for r in results[3:])
+    assert fake.throttled == 6
+
+
+@pytest.mark.unit
+def test_check_domains_command(fake, tmp_path, capsys) -> None:
+    """Test the command prints one line per domain and a summary."""
+    names = tmp_path / "names.txt"
+    names.write_text("free.org\n")
+    args = Namespace(
+        domain_names=["taken.com", "free.com"],
+        file=str(names),
+        jobs=2,
+        profiles=None,
+        profiles_file=None,
+        checkpoint=None,
+        chunk_size=1000,
+        history=None,
+        skip_taken=None,
+    )
+
+    assert check_domains(args) == 0
+
+    out = capsys.readouterr().out
+    assert "taken.com UNAVAILABLE\nfree.com AVAILABLE\nfree.org AVAILABLE\n" in out
+    assert "2 available, 1 unavailable, 0 errors" in out
+
+
+@pytest.mark.unit
+def test_check_domains_command_without_names(capsys) -> None:
+    """Test the command fails when no domains are given."""
+    args = Namespace(domain_names=[], file=None, jobs=1, profiles=None, profiles_file=None)
+    assert check_domains(args) == 1
+    assert "No domain names given" in capsys.readouterr().err
+
+
+@pytest.mark.unit
+def test_check_domains_across_accounts(monkeypatch, capsys) -> None:
+    """Test the list is split between accounts and every result names its account."""
+    backends = {"a": FakeBackend(taken=["taken.com"]), "b": FakeBackend(taken=["taken.com"])}
+    monkeypatch.setattr("kreatisite.cmd.create_backend", lambda name, timeout, p: backends[p])
+    args = Namespace(
+        domain_names=["taken.com", "free.com", "other.com"],
+        file=None,
+        jobs=2,
+        profiles="a,b",
+        profiles_file=None,
+        account_rate=1000.0,
+        aws_backend="fake",
+        aws_timeout=None,
+        checkpoint=None,
+        chunk_size=1000,
+        history=None,
+        skip_taken=None,
+    )
+
+    assert check_domains(args) == 0
+
+    out = capsys.readouterr().out
+    assert "taken.com UNAVAILABLE [a]\n" in out
+    assert "free.com AVAILABLE [b]\n" in out
+    assert "other.com AVAILABLE [a]\n" in out
+    assert "2 available, 1 unavailable, 0 errors" in out
+    assert backends["a"].calls == {"route53domains:CheckDomainAvailability": 2}
+    assert backends["b"].calls == {"route53domains:CheckDomainAvailability": 1}
@@ -0,0 +1,154 @@
+"""Tests for the fakeaws module."""
+
+import pytest
+
+from kreatisite.aws import AwsError, call, set_backend
+from kreatisite.cert import provision_certificates
+from kreatisite.deploy import deploy_site
+from kreatisite.dns import apply_zone_file, list_records
+from kreatisite.fakeaws import FakeBackend
+from kreatisite.launch import launch_steps
+from kreatisite.pipeline import run_pipeline
+
+
+@pytest.fixture
+def fake():
+    """Route every AWS call to a fresh in-memory backend."""
+    backend = FakeBackend()
+    previous = set_backend(backend)
+    yield backend
+    set_backend(previous)
+
+
+def quiet(_: str) -> None:
+    """Discard progress messages."""
+
+
+@pytest.mark.unit
+def test_domains(fake) -> None:
+    """Test availability follows the taken list and registrations."""
+    fake.taken = {"taken.com"}
+
+    assert call("route53domains", "CheckDomainAvailability", {"DomainName": "taken.com"}) == {
+        "Availability": "UNAVAILABLE"
+    }
+    operation = call("route53domains", "RegisterDomain", {"DomainName": "new.com"})
+    detail = call("route53domains", "GetOperationDetail", operation)
+
+    assert detail["Status"] == "SUCCESSFUL"
+    assert not fake.is_available("new.com")
+    with pytest.raises(AwsError) as e:
+        call("route53domains", "RegisterDomain", {"DomainName": "taken.com"})
+    assert e.value.code == "DomainLimitExceeded"
+
+
+@pytest.mark.unit
+def test_taken_fraction_is_deterministic() -> None:
+    """Test the share of taken domains is stable across instances."""
+    names = [f"name{i}.com" for i in range(1000)]
+
+    first = [FakeBackend(taken_fraction=0.3).is_available(n) for n in names]
+    second = [FakeBackend(taken_fraction=0.3).is_available(n) for n in names]
+
+    assert first == second
+    assert 600 < sum(first) < 800
+
+
+@pytest.mark.unit
+def test_latency_and_throttling() -> None:
+    """Test calls take the configured latency and are throttled beyond the rate."""
+    now = [0.0]
+    sleeps = []
+
+    def sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    fake = FakeBackend(
+        latency=0.01, throttle_rate=5, throttle_burst=2, clock=lambda: now[0], sleep=sleep
+    )
+    params = {"DomainName": "example.com"}
+
+    fake.call("route53domains", "CheckDomainAvailability", params)
+    fake.call("route53domains", "CheckDomainAvailability", params)
+    with pytest.raises(AwsError) as e:
+        fake.call("route53domains", "CheckDomainAvailability", params)
+
+    assert e.value.code == "ThrottlingException"
+    assert fake.throttled == 1
+    assert sleeps == [0.01, 0.01, 0.01]
+    assert fake.calls == {"route53domains:CheckDomainAvailability": 3}
+    # Other services have their own limit
+    fake.call("s3", "CreateBucket", {"Bucket": "b"})
+
+
+@pytest.mark.unit
+def test_unsupported_operation(fake) -> None:
+    """Test operations the fake does not simulate fail clearly."""
+    with pytest.raises(AwsError, match="not simulated"):
+        call("ec2", "DescribeInstances")
+
+
+@pytest.mark.unit
+def test_deploy_site(fake, tmp_path) -> None:
+    """Test a deploy uploads, then skips unchanged files and deletes removed ones."""
+    output = tmp_path / "dist"
+    output.mkdir()
+    (output / "index.html").write_text("<p>Home</p>")
+    (output / "old.html").write_text("<p>Old</p>")
+    call("s3", "CreateBucket", {"Bucket": "site"})
+
+    deploy_site(str(output), "site", log=quiet)
+    (output / "old.html").unlink()
+    plan = deploy_site(str(output), "site", log=quiet)
+
+    assert plan.unchanged == 1
+    assert plan.deletes == ["old.html"]
+    assert sorted(fake.buckets["site"]) == ["index.html"]
+    assert fake.buckets["site"]["index.html"]["ContentType"].startswith("text/html")
+
+
+@pytest.mark.unit
+def test_apply_zone_file(fake, tmp_path) -> None:
+    """Test zone files are applied and re-applying changes nothing."""
+    zone_id = call("route53", "CreateHostedZone", {"Name": "example.com", "CallerReference": "r"})
+    zone_id = zone_id["HostedZone"]["Id"].split("/")[-1]
+    zone_file = tmp_path / "zone.yaml"
+    zone_file.write_text(
+        "zone: example.com\nrecords:\n  - name: www\n    type: CNAME\n    value: example.com\n"
+    )
+
+    apply_zone_file(str(zone_file), wait=True, log=quiet)
+    plan = apply_zone_file(str(zone_file), prune=True, log=quiet)
+
+    assert not plan.changes
+    assert [r["Type"] for r in list_records(zone_id)] == ["NS", "SOA", "CNAME"]
+
+
+@pytest.mark.unit
+def test_provision_certificates(fake) -> None:
+    """Test certificates are issued once their validation records are written."""
+    call("route53", "CreateHostedZone", {"Name": "example.com", "CallerReference": "r"})
+
+    arns = provision_certificates(["example.com"], wildcard=True, log=quiet)
+
+    status = call("acm", "DescribeCertificate", {"CertificateArn": arns["example.com"]})
+    assert status["Certificate"]["Status"] == "ISSUED"
+
+
+@pytest.mark.unit
+def test_launch_offline(fake, tmp_path) -> None:
+    """Test the whole launch pipeline runs against the fake."""
+    source = tmp_path / "site"
+    source.mkdir()
+    (source / "index.html").write_text("<p>Home</p>")
+    config = tmp_path / "contacts.yaml"
+    config.write_text("AdminContact:\n  FirstName: Jane\n")
+
+    steps = launch_steps("example.com", str(config), str(source), str(tmp_path / "dist"), log=quiet)
+    result = run_pipeline(steps, log=quiet)
+
+    assert result.results["register"] == "registered"
+    assert result.results["deploy"] > 0
+    zone = fake.zones[result.results["zone"]]
+    assert ("www.example.com.", "A", "") in zone["Records"]
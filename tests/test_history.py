@@ -0,0 +1,134 @@
+"""Tests for the history module."""
+
+import json
+
+import pytest
+
+from kreatisite.fakeaws import FakeBackend
+from kreatisite.history import HistoryStore, format_time, parse_time, tld_of
+from kreatisite.testing import run_cli
+
+DAY = 86400
+START = 1_760_000_000
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Return a history store in a temporary directory."""
+    with HistoryStore(str(tmp_path / "history.db")) as history:
+        yield history
+
+
+@pytest.mark.unit
+def test_parse_time_ages_and_dates() -> None:
+    """Test ages count back from now and dates without an offset are UTC."""
+    assert parse_time("7d", now=START) == START - 7 * DAY
+    assert parse_time("12h", now=START) == START - 12 * 3600
+    assert parse_time("2025-10-09") == 1759968000
+    assert parse_time("2025-10-09T01:00:00+01:00") == 1759968000
+    assert format_time(1759968000) == "2025-10-09T00:00:00Z"
+    with pytest.raises(ValueError):
+        parse_time("last week")
+
+
+@pytest.mark.unit
+def test_tld_of() -> None:
+    """Test the TLD is everything after the first label."""
+    assert tld_of("example.io") == "io"
+    assert tld_of("example.co.uk") == "co.uk"
+
+
+@pytest.mark.unit
+def test_record_marks_status_changes(store) -> None:
+    """Test only results that change a known status are marked as changes."""
+    store.record([("a.io", "UNAVAILABLE", "prod"), ("b.com", "AVAILABLE", "prod")], START)
+    store.record([("a.io", "UNAVAILABLE", "prod"), ("b.com", "AVAILABLE", "prod")], START + DAY)
+    store.record([("a.io", "AVAILABLE", "prod"), ("b.com", "AVAILABLE", "prod")], START + 2 * DAY)
+
+    assert len(store) == 6
+    change = store.last_change("a.io")
+    assert change is not None
+    assert (change.status, change.checked_at, change.source) == (
+        "AVAILABLE",
+        START + 2 * DAY,
+        "prod",
+    )
+    assert store.last_change("b.com") is None
+
+
+@pytest.mark.unit
+def test_query_filters(store) -> None:
+    """Test results filter by TLD, status, time and change, newest first."""
+    store.record([("a.io", "UNAVAILABLE", "s"), ("b.io", "UNAVAILABLE", "s")], START)
+    store.record([("a.io", "AVAILABLE", "s"), ("c.com", "UNAVAILABLE", "s")], START + DAY)
+    store.record([("b.io", "AVAILABLE", "s"), ("c.com", "AVAILABLE", "s")], START + 10 * DAY)
+
+    became_available = store.query(tld="io", status="AVAILABLE", changes_only=True)
+    assert [(r.domain_name, r.checked_at) for r in became_available] == [
+        ("b.io", START + 10 * DAY),
+        ("a.io", START + DAY),
+    ]
+    recent = store.query(tld="io", status="AVAILABLE", changes_only=True, since=START + 2 * DAY)
+    assert [r.domain_name for r in recent] == ["b.io"]
+    assert [r.checked_at for r in store.query("c.com", until=START + 2 * DAY)] == [START + DAY]
+    assert len(store.query(limit=2)) == 2
+    assert store.query(status="PENDING") == []
+
+
+@pytest.mark.unit
+def test_compact_keeps_changes_and_run_ends(store) -> None:
+    """Test compaction drops unchanged repeats but not the first, latest or changed results."""
+    statuses = ["UNAVAILABLE"] * 4 + ["AVAILABLE"] * 3
+    for day, status in enumerate(statuses):
+        store.record([("a.io", status, "s")], START + day * DAY)
+
+    assert store.compact(START + 100 * DAY) == 4
+
+    kept = [(r.checked_at - START) // DAY for r in store.query("a.io")]
+    assert kept == [6, 4, 0]
+    store.record([("a.io", "UNAVAILABLE", "s")], START + 7 * DAY)
+    assert store.last_change("a.io").checked_at == START + 7 * DAY
+
+
+@pytest.mark.unit
+def test_prune_keeps_latest_status(store) -> None:
+    """Test pruning deletes old results but later changes are still detected."""
+    store.record([("a.io", "UNAVAILABLE", "s")], START)
+    store.record([("a.io", "UNAVAILABLE", "s")], START + DAY)
+
+    assert store.prune(START + 2 * DAY) == 2
+    assert len(store) == 0
+
+    store.record([("a.io", "AVAILABLE", "s")], START + 3 * DAY)
+    assert store.last_change("a.io").checked_at == START + 3 * DAY
+
+
+@pytest.mark.unit
+def test_check_domains_records_history(tmp_path) -> None:
+    """Test check-domains records its results and history query lists the changes."""
+    db = str(tmp_path / "history.db")
+    names = ["taken.io", "free.io", "free.com"]
+
+    first = run_cli(["check-domains", *names, "--history", db], FakeBackend(taken=["taken.io"]))
+    second = run_cli(["check-domains", *names, "--history", db], FakeBackend(taken=["free.io"]))
+    query = run_cli(
+        ["history", "query", "--tld", "io", "--status", "available", "--changes", "--json"]
+        + ["--since", "1h", "--history", db]
+    )
+
+    assert (first.returncode, second.returncode, query.returncode) == (0, 0, 0), query.stderr
+    records = [json.loads(line) for line in query.stdout.splitlines()]
+    assert [(r["domain_name"], r["source"]) for r in records] == [("taken.io", "default")]
+
+    compact = run_cli(["history", "compact", "--older-than", "2025-01-01", "--history", db])
+    assert compact.returncode == 0
+    assert "Removed 0 results" in compact.stdout
+
+
+@pytest.mark.unit
+def test_history_query_rejects_bad_times(tmp_path) -> None:
+    """Test an unparseable time is reported as an error."""
+    result = run_cli(["history", "query", "--since", "yesterday", "--history", str(tmp_path / "h")])
+
+    assert result.returncode == 1
+    assert "Invalid time" in result.stderr
@@ -0,0 +1,201 @@
+"""Tests for the ingest module."""
+
+import gzip
+import io
+import os
+from argparse import Namespace
+
+import pytest
+
+from kreatisite.aws import AwsError, set_backend
+from kreatisite.cmd import check_domains
+from kreatisite.fakeaws import FakeBackend
+from kreatisite.ingest import IngestError, SeenNames, iter_domain_names, stream_chunks
+
+
+class InterruptedBackend(FakeBackend):
+    """Fake backend whose process is interrupted when a given domain is checked."""
+
+    def __init__(self, stop_at: str) -> None:
+        super().__init__()
+        self.stop_at = stop_at
+        self.checked: list = []
+
+    def call(self, service, operation, params=None, *args, **kwargs):
+        if params and params.get("DomainName") == self.stop_at:
+            raise KeyboardInterrupt
+        self.checked.append(params and params.get("DomainName"))
+        return super().call(service, operation, params, *args, **kwargs)
+
+
+class FailingBackend(FakeBackend):
+    """Fake backend failing the availability checks of given domains."""
+
+    def __init__(self, failing=()) -> None:
+        super().__init__()
+        self.failing = set(failing)
+        self.checked: list = []
+
+    def call(self, service, operation, params=None, *args, **kwargs):
+        name = params and params.get("DomainName")
+        self.checked.append(name)
+        if name in self.failing:
+            raise AwsError(f"Could not check {name}", "InternalFailure")
+        return super().call(service, operation, params, *args, **kwargs)
+
+
+def sweep_args(path, checkpoint, chunk_size=2) -> Namespace:
+    """Return check-domains arguments for a candidate list."""
+    return Namespace(
+        domain_names=[],
+        file=str(path),
+        jobs=1,
+        profiles=None,
+        profiles_file=None,
+        checkpoint=str(checkpoint),
+        chunk_size=chunk_size,
+        history=None,
+        skip_taken=None,
+    )
+
+
+@pytest.mark.unit
+def test_iter_domain_names_reads_plain_gzip_and_stdin(tmp_path, monkeypatch) -> None:
+    """Test lists are read lazily from plain and gzip files and standard input."""
+    plain = tmp_path / "names.txt"
+    plain.write_text("a.com\n\n# comment\nb.com  # note\n")
+    compressed = tmp_path / "names.gz"
+    compressed.write_bytes(gzip.compress(b"c.com\nd.com\n"))
+    monkeypatch.setattr("sys.stdin", io.StringIO("e.com\n"))
+
+    assert list(iter_domain_names(str(plain))) == ["a.com", "b.com"]
+    assert list(iter_domain_names(str(compressed))) == ["c.com", "d.com"]
+    assert list(iter_domain_names("-")) == ["e.com"]
+
+
+@pytest.mark.unit
+def test_stream_chunks_skip_committed_and_seen_names(tmp_path) -> None:
+    """Test chunks exclude duplicates and a reopened set resumes at its offset."""
+    path = str(tmp_path / "seen.db")
+    names = ["a.com", "b.com", "a.com", "c.com", "b.com", "d.com"]
+
+    with SeenNames(path, "names.txt") as seen:
+        chunks = stream_chunks(iter(names), seen, chunk_size=3)
+        chunk, offset = next(chunks)
+        assert (chunk, offset) == (["a.com", "b.com"], 3)
+        seen.commit(chunk, offset)
+
+    with SeenNames(path, "names.txt") as seen:
+        assert list(stream_chunks(iter(names), seen, chunk_size=3)) == [(["c.com", "d.com"], 6)]
+        assert len(seen) == 2
+
+
+@pytest.mark.unit
+def test_seen_names_refuse_another_input_and_remove_temporary_files(tmp_path) -> None:
+    """Test a checkpoint is tied to its input and temporary sets leave nothing behind."""
+    path = str(tmp_path / "seen.db")
+    SeenNames(path, "a.txt").close()
+    with pytest.raises(IngestError, match="belongs to another input"):
+        SeenNames(path, "b.txt")
+
+    with SeenNames() as seen:
+        seen.commit(["a.com"], 1)
+        temporary = seen.path
+    assert not os.path.exists(temporary)
+
+
+@pytest.mark.unit
+def test_check_domains_resumes_after_interruption(tmp_path, capsys) -> None:
+    """Test an interrupted sweep resumes without checking committed names again."""
+    names = tmp_path / "names.txt.gz"
+    names.write_bytes(gzip.compress(b"a.com\nb.com\na.com\nc.com\nd.com\nb.com\ne.com\n"))
+    checkpoint = tmp_path / "sweep.db"
+
+    first = InterruptedBackend(stop_at="d.com")
+    set_backend(first)
+    try:
+        with pytest.raises(KeyboardInterrupt):
+            check_domains(sweep_args(names, checkpoint))
+        second = InterruptedBackend(stop_at="none")
+        set_backend(second)
+        assert check_domains(sweep_args(names, checkpoint)) == 0
+    finally:
+        set_backend(None)
+
+    assert first.checked == ["a.com", "b.com", "c.com"]
+    assert second.checked == ["d.com", "e.com"]
+    out = capsys.readouterr().out
+    assert "Resuming after 4 names" in out
+    assert "2 available, 0 unavailable, 0 errors" in out
+
+
+@pytest.mark.unit
+def test_check_domains_resume_retries_failed_names(tmp_path, capsys) -> None:
+    """Test names whose check failed are not committed, so a resume checks them again."""
+    names = tmp_path / "names.txt"
+    names.write_text("a.com\nb.com\nc.com\nd.com\ne.com\n")
+    checkpoint = tmp_path / "sweep.db"
+
+    first = FailingBackend(failing=["b.com"])
+    second = FailingBackend()
+    try:
+        set_backend(first)
+        assert check_domains(sweep_args(names, checkpoint)) == 1
+        set_backend(second)
+        assert check_domains(sweep_args(names, checkpoint)) == 0
+    finally:
+        set_backend(None)
+
+    assert first.checked == ["a.com", "b.com", "c.com", "d.com", "e.com"]
+    assert second.checked == ["b.com"]
+    out = capsys.readouterr().out
+    assert "1 available, 0 unavailable, 0 errors" in out
+
+
+@pytest.mark.unit
+def test_check_domains_creates_account_backends_once(tmp_path, monkeypatch) -> None:
+    """Test each account's backend is created once for the sweep, not once per chunk."""
+    names = tmp_path / "names.txt"
+    names.write_text("".join(f"name{i}.com\n" for i in range(10)))
+    created = []
+
+    def create_backend(name, timeout=None, profile=None):
+        created.append(profile)
+        return FakeBackend()
+
+    monkeypatch.setattr("kreatisite.cmd.create_backend", create_backend)
+    args = sweep_args(names, tmp_path / "sweep.db")
+    args.profiles, args.aws_backend, args.aws_timeout, args.account_rate = (
+        "a,b",
+        "fake",
+        None,
+        1000.0,
+    )
+
+    assert check_domains(args) == 0
+    assert sorted(created) == ["a", "b"]
+
+
+@pytest.mark.unit
+def test_check_domains_reuses_one_pool_across_chunks(tmp_path, monkeypatch) -> None:
+    """Test the chunks of a sweep share one worker pool."""
+    from concurrent import futures
+
+    names = tmp_path / "names.txt"
+    names.write_text("".join(f"name{i}.com\n" for i in range(10)))
+    pools = []
+
+    class Pool(futures.ThreadPoolExecutor):
+        def __init__(self, *args, **kwargs) -> None:
+            pools.append(self)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(futures, "ThreadPoolExecutor", Pool)
+    monkeypatch.setattr("kreatisite.domains.ThreadPoolExecutor", Pool)
+    previous = set_backend(FakeBackend())
+    try:
+        assert check_domains(sweep_args(names, tmp_path / "sweep.db")) == 0
+    finally:
+        set_backend(previous)
+
+    assert len(pools) == 1
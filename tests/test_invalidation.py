@@ -0,0 +1,105 @@
+"""Tests for the invalidation module."""
+
+from unittest.mock import patch
+
+import pytest
+
+from kreatisite.invalidation import (
+    MAX_WILDCARD_PATHS,
+    create_invalidation,
+    plan_invalidation,
+    wait_for_invalidation,
+)
+
+
+@pytest.mark.unit
+def test_plan_skips_fingerprinted_assets() -> None:
+    """Test immutable fingerprinted assets are never invalidated."""
+    changed = ["css/app.1234abcd.css", "css/app.1234abcd.css.gz", "about.html"]
+
+    assert plan_invalidation(changed) == ["/about.html"]
+    assert plan_invalidation(["js/app.abcdef12.js"]) == []
+
+
+@pytest.mark.unit
+def test_plan_index_pages_include_directory_url() -> None:
+    """Test index pages are also invalidated under their directory URL."""
+    site = ["index.html", "blog/index.html", "blog/a.html", "blog/b.html", "blog/c.html"]
+
+    assert plan_invalidation(["blog/index.html"], site) == ["/blog/", "/blog/index.html"]
+    assert plan_invalidation(["index.html"], site) == ["/", "/index.html"]
+
+
+@pytest.mark.unit
+def test_plan_wildcards_mostly_changed_directories() -> None:
+    """Test a directory where most files changed becomes a single wildcard."""
+    site = [f"docs/page{i}.html" for i in range(10)] + [f"page{i}.html" for i in range(20)]
+    changed = [f"docs/page{i}.html" for i in range(8)] + ["page1.html"]
+
+    assert plan_invalidation(changed, site) == ["/docs/*", "/page1.html"]
+
+
+@pytest.mark.unit
+def test_plan_keeps_individual_paths_for_sparse_changes() -> None:
+    """Test a few changes in a large directory are invalidated one by one."""
+    site = [f"docs/page{i}.html" for i in range(100)]
+
+    assert plan_invalidation(["docs/page1.html", "docs/page2.html"], site) == [
+        "/docs/page1.html",
+        "/docs/page2.html",
+    ]
+
+
+@pytest.mark.unit
+def test_plan_collapses_to_fit_path_budget() -> None:
+    """Test directories are collapsed until the plan fits the path budget."""
+    site = [f"{d}/page{i}.html" for d in ("a", "b", "c") for i in range(100)]
+    changed = [f"a/page{i}.html" for i in range(10)] + ["b/page1.html", "c/page1.html"]
+
+    assert plan_invalidation(changed, site, max_paths=5) == [
+        "/a/*",
+        "/b/page1.html",
+        "/c/page1.html",
+    ]
+    assert plan_invalidation(changed, site, max_paths=1) == ["/*"]
+
+
+@pytest.mark.unit
+def test_plan_respects_wildcard_limit() -> None:
+    """Test the plan never exceeds CloudFront's in-flight wildcard limit."""
+    changed = [f"section{d}/sub/page{i}.html" for d in range(20) for i in range(2)]
+
+    paths = plan_invalidation(changed, changed)
+
+    assert sum(path.endswith("*") for path in paths) <= MAX_WILDCARD_PATHS
+
+
+@pytest.mark.unit
+def test_plan_url_encodes_paths() -> None:
+    """Test paths with special characters are URL encoded."""
+    assert plan_invalidation(["my page.html"]) == ["/my%20page.html"]
+
+
+@pytest.mark.unit
+def test_create_and_wait_for_invalidation() -> None:
+    """Test the invalidation is submitted in one request and polled until complete."""
+    calls = []
+    statuses = iter(["InProgress", "Completed"])
+
+    def fake_call(service, operation, params=None, endpoint_url=None):
+        calls.append((operation, params))
+        if operation == "CreateInvalidation":
+            return {"Invalidation": {"Id": "I1", "Status": "InProgress"}}
+        return {"Invalidation": {"Id": "I1", "Status": next(statuses)}}
+
+    with patch("kreatisite.invalidation.call", fake_call), patch("time.sleep"):
+        invalidation_id = create_invalidation("DIST", ["/a.html", "/b/*"])
+        wait_for_invalidation("DIST", invalidation_id)
+
+    batch = calls[0][1]["InvalidationBatch"]
+    assert batch["Paths"] == {"Quantity": 2, "Items": ["/a.html", "/b/*"]}
+    assert [operation for operation, _ in calls] == [
+        "CreateInvalidation",
+        "GetInvalidation",
+        "GetInvalidation",
+    ]
@@ -0,0 +1,86 @@
+"""Tests for the inventory module."""
+
+import json
+from argparse import Namespace
+
+import pytest
+
+from kreatisite.aws import set_backend
+from kreatisite.cmd import inventory
+from kreatisite.fakeaws import FakeBackend
+from kreatisite.inventory import Resource, list_resources
+
+
+def populated() -> FakeBackend:
+    """Return a fake account with one domain, zone and certificate."""
+    fake = FakeBackend()
+    fake.call("route53domains", "RegisterDomain", {"DomainName": "example.com"})
+    fake.call("route53", "CreateHostedZone", {"Name": "example.com", "CallerReference": "r"})
+    fake.call(
+        "acm",
+        "RequestCertificate",
+        {"DomainName": "example.com", "ValidationMethod": "DNS"},
+        region="us-east-1",
+    )
+    return fake
+
+
+def inventory_args(**kwargs) -> Namespace:
+    """Return inventory command arguments."""
+    args = Namespace(
+        regions=["us-east-1"],
+        json=False,
+        profiles=None,
+        profiles_file=None,
+        account_rate=1000.0,
+        aws_backend="fake",
+        aws_timeout=None,
+    )
+    vars(args).update(kwargs)
+    return args
+
+
+@pytest.mark.unit
+def test_list_resources() -> None:
+    """Test domains, zones and certificates are listed."""
+    previous = set_backend(populated())
+    try:
+        resources = list(list_resources(["us-east-1"]))
+    finally:
+        set_backend(previous)
+
+    assert [(r.kind, r.name, r.region) for r in resources] == [
+        ("domain", "example.com", None),
+        ("zone", "example.com", None),
+        ("certificate", "example.com", "us-east-1"),
+    ]
+    assert resources[0] == Resource("domain", "example.com", detail="auto-renew")
+    assert resources[2].detail == "PENDING_VALIDATION"
+
+
+@pytest.mark.unit
+def test_inventory_command_across_accounts(monkeypatch, capsys) -> None:
+    """Test every resource is printed once, tagged with its account."""
+    backends = {"prod": populated(), "staging": FakeBackend()}
+    monkeypatch.setattr("kreatisite.cmd.create_backend", lambda name, timeout, p: backends[p])
+
+    assert inventory(inventory_args(profiles="prod,staging", json=True)) == 0
+
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert {line["account"] for line in lines} == {"prod"}
+    assert sorted(line["kind"] for line in lines) == ["certificate", "domain", "zone"]
+
+
+@pytest.mark.unit
+def test_inventory_command_default_account(capsys) -> None:
+    """Test without profiles the active backend is listed as the default account."""
+    previous = set_backend(populated())
+    try:
+        assert inventory(inventory_args()) == 0
+    finally:
+        set_backend(previous)
+
+    out = capsys.readouterr().out
+    assert "default zone example.com (2 records)\n" in out
+    assert "default certificate example.com us-east-1 (PENDING_VALIDATION)\n" in out
+    assert "3 resources in 1 of 1 accounts" in out
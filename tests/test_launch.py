@@ -0,0 +1,243 @@
+"""Tests for the launch module."""
+
+from argparse import Namespace
+from unittest.mock import patch
+
+import pytest
+
+from kreatisite.aws import AwsError, use_backend
+from kreatisite.cmd import launch
+from kreatisite.domains import ContactsError
+from kreatisite.fakeaws import FakeBackend
+from kreatisite.launch import (
+    CLOUDFRONT_HOSTED_ZONE_ID,
+    alias_changes,
+    create_distribution,
+    ensure_bucket,
+    ensure_hosted_zone,
+    launch_steps,
+    register,
+)
+from kreatisite.pipeline import Step, critical_path
+
+
+class FakeAws:
+    """Records calls and answers them from a table of canned responses."""
+
+    def __init__(self, responses=None, errors=None) -> None:
+        """Create the stand-in with responses and errors per operation."""
+        self.responses = responses or {}
+        self.errors = errors or {}
+        self.calls = []
+
+    def __call__(self, service, operation, params=None, endpoint_url=None, region=None):
+        """Handle an AWS API call."""
+        self.calls.append((operation, params))
+        if operation in self.errors:
+            raise self.errors[operation]
+        return self.responses.get(operation, {})
+
+
+@pytest.mark.unit
+def test_register_skips_owned_domain() -> None:
+    """Test a domain the account already owns is not registered again."""
+    aws = FakeAws({"ListDomains": {"Domains": [{"DomainName": "example.com"}]}})
+
+    with patch("kreatisite.launch.call", aws):
+        assert register("example.com", "missing.yaml") == "owned"
+
+    assert [op for op, _ in aws.calls] == ["ListDomains"]
+
+
+@pytest.mark.unit
+def test_register_waits_for_operation(tmp_path) -> None:
+    """Test registration passes the contacts and waits for the operation."""
+    config = tmp_path / "contacts.yaml"
+    config.write_text("AdminContact:\n  FirstName: Jane\n")
+    aws = FakeAws(
+        {
+            "RegisterDomain": {"OperationId": "op-1"},
+            "GetOperationDetail": {"Status": "SUCCESSFUL"},
+        }
+    )
+
+    with patch("kreatisite.launch.call", aws):
+        assert register("example.com", str(config)) == "registered"
+
+    params = dict(aws.calls)["RegisterDomain"]
+    assert params["AdminContact"] == {"FirstName": "Jane"}
+    assert params["PrivacyProtectAdminContact"] is True
+
+
+@pytest.mark.unit
+def test_register_contacts_cannot_override_settings(tmp_path) -> None:
+    """Test the contacts file cannot change the domain name or turn privacy protection off."""
+    config = tmp_path / "contacts.yaml"
+    config.write_text("AdminContact: {}\nDomainName: ''\nPrivacyProtectTechContact: false\n")
+    aws = FakeAws(
+        {
+            "RegisterDomain": {"OperationId": "op-1"},
+            "GetOperationDetail": {"Status": "SUCCESSFUL"},
+        }
+    )
+
+    with patch("kreatisite.launch.call", aws):
+        register("example.com", str(config))
+
+    params = dict(aws.calls)["RegisterDomain"]
+    assert params["DomainName"] == "example.com"
+    assert params["PrivacyProtectTechContact"] is True
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("text", ["", "- a\n- b\n", "contacts\n"])
+def test_register_rejects_contacts_that_are_not_a_mapping(tmp_path, text) -> None:
+    """Test an empty, list or scalar contacts file is reported, not a TypeError."""
+    config = tmp_path / "contacts.yaml"
+    config.write_text(text)
+
+    with patch("kreatisite.launch.call", FakeAws()), pytest.raises(ContactsError):
+        register("example.com", str(config))
+
+
+@pytest.mark.unit
+def test_create_distribution_reruns_after_partial_failure() -> None:
+    """Test a rerun reuses the distribution and origin access control of a failed run."""
+    backend = FakeBackend()
+    backend.call("s3", "CreateBucket", {"Bucket": "site"})
+    failing = patch("kreatisite.launch.call", side_effect=_fail_bucket_policy(backend))
+
+    with use_backend(backend):
+        with failing, pytest.raises(AwsError):
+            create_distribution("example.com", "site", "arn:cert")
+        first = dict(backend.distributions)
+        result = create_distribution("example.com", "site", "arn:cert")
+        again = create_distribution("example.com", "site", "arn:cert")
+
+    assert list(first) == [result["id"]] == [again["id"]]
+    assert len(backend.origin_access_controls) == 1
+    assert backend.calls["s3:PutBucketPolicy"] == 2
+
+
+def _fail_bucket_policy(backend):
+    """Return a call function failing PutBucketPolicy and passing the rest to the backend."""
+
+    def call(service, operation, params=None, endpoint_url=None, region=None):
+        if operation == "PutBucketPolicy":
+            raise AwsError("Access denied", "AccessDenied")
+        return backend.call(service, operation, params)
+
+    return call
+
+
+@pytest.mark.unit
+def test_ensure_hosted_zone() -> None:
+    """Test an existing zone is reused and a missing one is created."""
+    zones = {"HostedZones": [{"Id": "/hostedzone/Z1", "Name": "example.com."}]}
+    with patch("kreatisite.dns.call", FakeAws({"ListHostedZones": zones})):
+        assert ensure_hosted_zone("example.com") == "Z1"
+
+    aws = FakeAws({"CreateHostedZone": {"HostedZone": {"Id": "/hostedzone/Z2"}}})
+    with patch("kreatisite.dns.call", aws), patch("kreatisite.launch.call", aws):
+        assert ensure_hosted_zone("example.org") == "Z2"
+
+
+@pytest.mark.unit
+def test_ensure_bucket_tolerates_existing_bucket() -> None:
+    """Test a bucket the account already owns is reused."""
+    aws = FakeAws(errors={"CreateBucket": AwsError("exists", "BucketAlreadyOwnedByYou")})
+
+    with patch("kreatisite.launch.call", aws):
+        assert ensure_bucket("example.com", "eu-west-1") == "example.com"
+
+    params = dict(aws.calls)
+    assert params["CreateBucket"]["CreateBucketConfiguration"] == {
+        "LocationConstraint": "eu-west-1"
+    }
+    assert "PutPublicAccessBlock" in params
+
+    aws = FakeAws(errors={"CreateBucket": AwsError("taken", "BucketAlreadyExists")})
+    with patch("kreatisite.launch.call", aws), pytest.raises(AwsError):
+        ensure_bucket("example.com")
+
+
+@pytest.mark.unit
+def test_alias_changes() -> None:
+    """Test apex and www get A and AAAA aliases to the distribution."""
+    changes = alias_changes("example.com", "d111.cloudfront.net")
+
+    assert [(c["ResourceRecordSet"]["Name"], c["ResourceRecordSet"]["Type"]) for c in changes] == [
+        ("example.com.", "A"),
+        ("example.com.", "AAAA"),
+        ("www.example.com.", "A"),
+        ("www.example.com.", "AAAA"),
+    ]
+    alias = changes[0]["ResourceRecordSet"]["AliasTarget"]
+    assert alias["HostedZoneId"] == CLOUDFRONT_HOSTED_ZONE_ID
+    assert alias["DNSName"] == "d111.cloudfront.net."
+
+
+@pytest.mark.unit
+def test_launch_steps_run_bucket_alongside_certificate() -> None:
+    """Test the bucket and build do not wait for the registration chain."""
+    steps = {step.name: step for step in launch_steps("example.com", "c.yaml", "site", "dist")}
+
+    assert steps["bucket"].requires == ()
+    assert steps["build"].requires == ()
+    assert set(steps["cdn"].requires) == {"cert", "bucket"}
+    durations = {"register": 1, "zone": 1, "cert": 60, "bucket": 1, "cdn": 300, "build": 1}
+    path = critical_path(list(steps.values()), dict(durations, dns=1, deploy=1))
+    assert path == ["register", "zone", "cert", "cdn", "dns"]
+
+
+@pytest.mark.unit
+def test_launch_command_resumes(tmp_path, capsys) -> None:
+    """Test the launch command checkpoints steps and resumes after a failure."""
+    checkpoint = str(tmp_path / "launch.json")
+    calls = []
+    fail = {"second": True}
+
+    def steps(*args, **kwargs):
+        def run(name):
+            def func(ctx):
+                calls.append(name)
+                if fail.get(name):
+                    raise RuntimeError("unavailable")
+                return name
+
+            return func
+
+        return [Step("first", run("first")), Step("second", run("second"), ("first",))]
+
+    args = Namespace(
+        domain_name="example.com",
+        config_file="c.yaml",
+        register_domain=False,
+        source_dir="site",
+        output_dir="dist",
+        bucket_region="us-east-1",
+        checkpoint=checkpoint,
+        restart=False,
+        jobs=2,
+    )
+
+    with patch("kreatisite.launch.launch_steps", steps):
+        assert launch(args) == 1
+        assert "resume from the failed step" in capsys.readouterr().err
+        fail.clear()
+        assert launch(args) == 0
+
+    assert calls == ["first", "second", "second"]
+    out = capsys.readouterr().out
+    assert "Critical path:" in out
+    assert "(resumed)" in out
+    assert "Site launched: https://example.com/" in out
+
+
+@pytest.mark.unit
+def test_launch_command_requires_contacts(tmp_path, capsys) -> None:
+    """Test registering requires the contact config file."""
+    args = Namespace(config_file=str(tmp_path / "missing.yaml"), register_domain=True)
+
+    assert launch(args) == 1
+    assert "--skip-register" in capsys.readouterr().err
@@ -0,0 +1,167 @@
+"""Tests for the linkcheck module."""
+
+import threading
+from argparse import Namespace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from kreatisite.cmd import links
+from kreatisite.linkcheck import ExternalChecker, LinkIndex, check_links, parse_page
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Serve /ok, reject HEAD on /get-only and answer 404 for everything else."""
+
+    requests = []
+
+    def do_HEAD(self) -> None:
+        """Answer a HEAD request."""
+        self.requests.append(("HEAD", self.path))
+        if self.path == "/get-only":
+            self.send_response(405)
+        else:
+            self.send_response(200 if self.path == "/ok" else 404)
+        self.end_headers()
+
+    def do_GET(self) -> None:
+        """Answer a GET request."""
+        self.requests.append(("GET", self.path))
+        self.send_response(200 if self.path in ("/ok", "/get-only") else 404)
+        self.end_headers()
+
+    def log_message(self, *args) -> None:
+        """Keep test output quiet."""
+
+
+@pytest.fixture
+def stand_in():
+    """Run a local HTTP stand-in for external sites."""
+    StandInHandler.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def make_output(root, external_base="http://127.0.0.1:9") -> None:
+    """Create a built site with good and broken links."""
+    (root / "blog").mkdir(parents=True)
+    (root / "img").mkdir()
+    (root / "img" / "logo.png").write_bytes(b"png")
+    (root / "index.html").write_text(
+        '<h1 id="intro">Home</h1>\n'
+        '<a href="blog/">Blog</a>\n'
+        '<a href="/blog">Blog</a>\n'
+        '<a href="#intro">Intro</a>\n'
+        '<a href="#top">Top</a>\n'
+        '<img src="img/logo.png" srcset="img/logo.png 1x, img/missing.png 2x">\n'
+        '<a href="mailto:me@example.com">Mail</a>\n'
+        f'<a href="{external_base}/ok">Ok</a>\n'
+    )
+    (root / "blog" / "index.html").write_text(
+        '<a name="posts"></a>\n'
+        '<a href="../index.html#intro">Home</a>\n'
+        '<a href="../index.html#nowhere">Bad anchor</a>\n'
+        '<a href="post.html">Missing</a>\n'
+        '<a href="#posts">Posts</a>\n'
+        f'<a href="{external_base}/gone">Gone</a>\n'
+        f'<a href="{external_base}/get-only">Get only</a>\n'
+    )
+
+
+@pytest.mark.unit
+def test_parse_page(tmp_path) -> None:
+    """Test ids, named anchors and links are collected with line numbers."""
+    make_output(tmp_path)
+
+    page = parse_page(str(tmp_path), "blog/index.html")
+
+    assert page.ids == ["posts"]
+    assert page.links[0] == (2, "../index.html#intro")
+
+
+@pytest.mark.unit
+def test_link_index_resolve() -> None:
+    """Test links resolve against served URLs and page anchors."""
+    parsed = [parse_result("index.html", ["a"]), parse_result("docs/index.html", [])]
+    index = LinkIndex(["index.html", "docs/index.html", "my file.txt"], parsed)
+
+    assert index.resolve("docs/index.html", "../#a") is None
+    assert index.resolve("index.html", "docs") is None
+    assert index.resolve("index.html", "my%20file.txt") is None
+    assert index.resolve("index.html", "/docs/#x") == "missing anchor #x"
+    assert index.resolve("index.html", "nope.html") == "not found"
+
+
+def parse_result(path, ids):
+    """Build a parsed page without links."""
+    from kreatisite.linkcheck import PageLinks
+
+    return PageLinks(path, ids, [])
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_check_links_internal(tmp_path, jobs) -> None:
+    """Test broken internal links and anchors are reported with their location."""
+    make_output(tmp_path)
+
+    report = check_links(str(tmp_path), jobs=jobs, log=lambda _: None)
+
+    assert report.pages == 2
+    assert [(b.page, b.line, b.url, b.reason) for b in report.broken] == [
+        ("blog/index.html", 3, "../index.html#nowhere", "missing anchor #nowhere"),
+        ("blog/index.html", 4, "post.html", "not found"),
+        ("index.html", 6, "img/missing.png", "not found"),
+    ]
+    assert report.external == 0
+
+
+@pytest.mark.unit
+def test_check_links_external(tmp_path, stand_in) -> None:
+    """Test external links are checked once each and working results are cached."""
+    make_output(tmp_path, stand_in)
+    cache_file = str(tmp_path / "cache" / "links.json")
+
+    checker = ExternalChecker(jobs=4, host_rate=100, timeout=5, cache_file=cache_file)
+    report = check_links(str(tmp_path / ""), jobs=1, external=checker, log=lambda _: None)
+
+    assert report.external == 3
+    assert [(b.url, b.reason) for b in report.broken if b.url.startswith("http")] == [
+        (f"{stand_in}/gone", "HTTP 404")
+    ]
+    assert ("GET", "/get-only") in StandInHandler.requests
+
+    StandInHandler.requests.clear()
+    checker = ExternalChecker(jobs=4, host_rate=100, timeout=5, cache_file=cache_file)
+    check_links(str(tmp_path), jobs=1, external=checker, log=lambda _: None)
+
+    assert StandInHandler.requests == [("HEAD", "/gone")]
+
+
+@pytest.mark.unit
+def test_external_checker_unreachable() -> None:
+    """Test connection failures are reported as unreachable."""
+    checker = ExternalChecker(timeout=1)
+
+    assert checker.check(["http://127.0.0.1:9/"])["http://127.0.0.1:9/"].startswith("unreachable")
+
+
+@pytest.mark.unit
+def test_links_command(tmp_path, capsys) -> None:
+    """Test the command lists broken links and fails when there are any."""
+    make_output(tmp_path)
+    args = Namespace(output_dir=str(tmp_path), jobs=1, external=False)
+
+    assert links(args) == 1
+
+    out = capsys.readouterr().out
+    assert "blog/index.html:4: post.html (not found)" in out
+    assert "3 broken" in out
+
+    (tmp_path / "blog" / "index.html").write_text('<a href="/">Home</a>')
+    (tmp_path / "index.html").write_text("<p>Home</p>")
+    assert links(args) == 0
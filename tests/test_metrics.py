@@ -0,0 +1,156 @@
+"""Tests for the metrics module."""
+
+import threading
+import urllib.request
+
+import pytest
+
+from kreatisite import metrics
+from kreatisite.aws import AwsError, call, set_backend
+from kreatisite.fakeaws import FakeBackend
+from kreatisite.metrics import (
+    AWS_CALLS,
+    AWS_THROTTLES,
+    REGISTRY,
+    Counter,
+    Gauge,
+    Histogram,
+    render_metrics,
+    serve_metrics,
+    write_textfile,
+)
+
+
+@pytest.fixture
+def registry():
+    """Keep metrics created by a test out of the global registry."""
+    before = list(REGISTRY)
+    yield
+    REGISTRY[:] = before
+
+
+@pytest.mark.unit
+def test_counter_merges_thread_shards(registry) -> None:
+    """Test increments from many threads are all counted."""
+    counter = Counter("test_total", "Test counter", ("kind",))
+
+    def work() -> None:
+        for _ in range(1000):
+            counter.inc("a")
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    counter.inc("b", amount=2.5)
+
+    assert counter.value("a") == 8000
+    assert render_metrics([counter]) == (
+        "# HELP test_total Test counter\n"
+        "# TYPE test_total counter\n"
+        'test_total{kind="a"} 8000\n'
+        'test_total{kind="b"} 2.5\n'
+    )
+
+
+@pytest.mark.unit
+def test_ended_threads_do_not_keep_shards(registry) -> None:
+    """Test the shards of ended threads are folded into the totals."""
+    counter = Counter("test_total", "Test counter", ("kind",))
+    histogram = Histogram("test_seconds", "Test histogram", buckets=(1.0,))
+
+    def work() -> None:
+        counter.inc("a")
+        histogram.observe(0.5)
+
+    for _ in range(100):
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(counter._shards) <= 8
+        assert len(histogram._shards) <= 8
+
+    assert counter.value("a") == 800
+    assert "test_seconds_count 800" in histogram.render()
+
+
+@pytest.mark.unit
+def test_histogram_buckets_are_cumulative(registry) -> None:
+    """Test observations fall in the first bucket whose bound they do not exceed."""
+    histogram = Histogram("test_seconds", "Test histogram", ("op",), buckets=(0.1, 1.0))
+
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, 'say "hi"')
+
+    assert render_metrics([histogram]).splitlines()[2:] == [
+        'test_seconds_bucket{op="say \\"hi\\"",le="0.1"} 2',
+        'test_seconds_bucket{op="say \\"hi\\"",le="1"} 3',
+        'test_seconds_bucket{op="say \\"hi\\"",le="+Inf"} 4',
+        'test_seconds_sum{op="say \\"hi\\""} 3.65',
+        'test_seconds_count{op="say \\"hi\\""} 4',
+    ]
+
+
+@pytest.mark.unit
+def test_gauge_keeps_last_value(registry) -> None:
+    """Test setting a gauge replaces its value."""
+    gauge = Gauge("test_rate", "Test gauge")
+
+    gauge.set(3.0)
+    gauge.set(1.5)
+
+    assert gauge.value() == 1.5
+    assert "# TYPE test_rate gauge\ntest_rate 1.5\n" in render_metrics([gauge])
+
+
+@pytest.mark.unit
+def test_aws_calls_are_counted_by_outcome() -> None:
+    """Test calls, throttles and latencies are recorded for every AWS call."""
+    fake = FakeBackend(throttle_rate=1e-9, throttle_burst=1)
+    previous = set_backend(fake)
+    ok = AWS_CALLS.value("route53domains", "ListDomains", "ok")
+    throttled = AWS_THROTTLES.value("route53domains", "ListDomains")
+    try:
+        call("route53domains", "ListDomains")
+        with pytest.raises(AwsError):
+            call("route53domains", "ListDomains")
+    finally:
+        set_backend(previous)
+
+    assert AWS_CALLS.value("route53domains", "ListDomains", "ok") == ok + 1
+    assert AWS_THROTTLES.value("route53domains", "ListDomains") == throttled + 1
+    text = render_metrics()
+    assert (
+        'kreatisite_aws_call_seconds_count{service="route53domains",operation="ListDomains"}'
+        in text
+    )
+
+
+@pytest.mark.unit
+def test_write_textfile_and_serve(tmp_path) -> None:
+    """Test the textfile and the HTTP endpoint expose the same metrics."""
+    path = tmp_path / "kreatisite.prom"
+    write_textfile(str(path))
+    server = serve_metrics(0)
+    try:
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url) as response:
+            body = response.read().decode()
+            content_type = response.headers["Content-Type"]
+    finally:
+        server.shutdown()
+
+    assert content_type == metrics.CONTENT_TYPE
+    assert "# TYPE kreatisite_aws_calls_total counter" in body
+    assert "# TYPE kreatisite_aws_calls_total counter" in path.read_text()
+    assert list(tmp_path.iterdir()) == [path]
+
+
+@pytest.mark.unit
+def test_metric_is_abstract(registry) -> None:
+    """Test only metric kinds that render their samples can be created."""
+    with pytest.raises(TypeError):
+        metrics.Metric("kreatisite_test", "Test")
@@ -0,0 +1,163 @@
+"""Tests for the multipart module."""
+
+import base64
+import hashlib
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from kreatisite.deploy import deploy_site
+from kreatisite.multipart import multipart_etag, part_size_for, upload_file
+
+PART_SIZE = 64 * 1024
+
+
+class FakeMultipartClient:
+    """In-memory stand-in for the S3 client multipart calls."""
+
+    def __init__(self, fail_part=None, fail_complete=False, fail_abort=False) -> None:
+        """Create the client, optionally failing one part number, completion or abort."""
+        self.fail_part = fail_part
+        self.fail_complete = fail_complete
+        self.fail_abort = fail_abort
+        self.parts = {}
+        self.body_types = set()
+        self.completed = None
+        self.aborted = False
+        self.create_args = None
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def create_multipart_upload(self, **kwargs):
+        """Start an upload."""
+        self.create_args = kwargs
+        return {"UploadId": "upload-1"}
+
+    def upload_part(self, Body, ContentMD5, PartNumber, **kwargs):
+        """Store a part after checking its Content-MD5."""
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            if PartNumber == self.fail_part:
+                raise RuntimeError("connection reset")
+            data = Body.read()
+            assert base64.b64encode(hashlib.md5(data).digest()).decode() == ContentMD5
+            assert kwargs["ContentLength"] == len(data)
+            self.parts[PartNumber] = data
+            return {"ETag": f'"{hashlib.md5(data).hexdigest()}"'}
+        finally:
+            with self.lock:
+                self.active -= 1
+
+    def complete_multipart_upload(self, MultipartUpload, **kwargs):
+        """Finish an upload."""
+        if self.fail_complete:
+            raise RuntimeError("InvalidPart")
+        self.completed = MultipartUpload["Parts"]
+
+    def abort_multipart_upload(self, **kwargs):
+        """Abort an upload."""
+        self.aborted = True
+        if self.fail_abort:
+            raise RuntimeError("abort failed")
+
+
+@pytest.mark.unit
+def test_part_size_for_respects_part_limit() -> None:
+    """Test the part size grows so uploads stay within 10000 parts."""
+    assert part_size_for(100, PART_SIZE) == PART_SIZE
+    size = part_size_for(PART_SIZE * 25000, PART_SIZE)
+    assert size >= PART_SIZE * 2.5
+    assert size % 4096 == 0
+
+
+@pytest.mark.unit
+def test_upload_file_in_parts(tmp_path) -> None:
+    """Test a file is uploaded as ordered parts and its ETag matches S3's."""
+    path = tmp_path / "video.mp4"
+    data = bytes(range(256)) * 1000
+    path.write_bytes(data)
+    client = FakeMultipartClient()
+
+    etag = upload_file(
+        str(path),
+        "bucket",
+        "video.mp4",
+        client,
+        extra_args={"ContentType": "video/mp4"},
+        part_size=PART_SIZE,
+        workers=3,
+        max_in_flight=2,
+    )
+
+    assert client.create_args["ContentType"] == "video/mp4"
+    assert b"".join(client.parts[n] for n in sorted(client.parts)) == data
+    assert [p["PartNumber"] for p in client.completed] == [1, 2, 3, 4]
+    assert client.max_active <= 2
+    assert etag == multipart_etag(str(path), PART_SIZE)
+    assert etag.endswith("-4")
+
+
+@pytest.mark.unit
+def test_upload_file_aborts_on_failure(tmp_path) -> None:
+    """Test a failing part aborts the whole upload."""
+    path = tmp_path / "archive.zip"
+    path.write_bytes(b"x" * (PART_SIZE * 3))
+    client = FakeMultipartClient(fail_part=2)
+
+    with pytest.raises(RuntimeError):
+        upload_file(str(path), "bucket", "archive.zip", client, part_size=PART_SIZE, workers=1)
+
+    assert client.aborted
+    assert client.completed is None
+
+
+@pytest.mark.unit
+def test_upload_file_aborts_when_completion_fails(tmp_path) -> None:
+    """Test a failing completion aborts the upload, so its parts are not kept."""
+    path = tmp_path / "archive.zip"
+    path.write_bytes(b"x" * (PART_SIZE * 2))
+    client = FakeMultipartClient(fail_complete=True)
+
+    with pytest.raises(RuntimeError, match="InvalidPart"):
+        upload_file(str(path), "bucket", "archive.zip", client, part_size=PART_SIZE, workers=1)
+
+    assert client.aborted
+
+
+@pytest.mark.unit
+def test_upload_file_reports_the_failure_when_abort_fails(tmp_path) -> None:
+    """Test a failing abort does not hide the error that caused it."""
+    path = tmp_path / "archive.zip"
+    path.write_bytes(b"x" * (PART_SIZE * 2))
+    client = FakeMultipartClient(fail_part=1, fail_abort=True)
+
+    with pytest.raises(RuntimeError, match="connection reset"):
+        upload_file(str(path), "bucket", "archive.zip", client, part_size=PART_SIZE, workers=1)
+
+    assert client.aborted
+
+
+@pytest.mark.unit
+def test_deploy_site_uses_multipart_for_large_files(tmp_path) -> None:
+    """Test deploy sends large files through the multipart engine."""
+    output = tmp_path / "dist"
+    output.mkdir()
+    (output / "movie.mp4").write_bytes(b"m" * 200)
+    client = FakeMultipartClient()
+
+    def fake_call(service, operation, params=None, endpoint_url=None):
+        assert operation == "ListObjectsV2"
+        return {}
+
+    with patch("kreatisite.deploy.call", fake_call):
+        plan = deploy_site(
+            str(output), "bucket", multipart_threshold=100, client=client, log=lambda _: None
+        )
+
+    assert plan.uploads == ["movie.mp4"]
+    assert client.completed is not None
+    assert client.create_args["ContentType"] == "video/mp4"
@@ -0,0 +1,46 @@
+"""Tests for the pages module."""
+
+import pytest
+
+from kreatisite.pages import extract_page, iter_pages, page_url
+
+
+@pytest.mark.unit
+def test_page_url() -> None:
+    """Test index pages map to their directory URL."""
+    assert page_url("index.html") == "/"
+    assert page_url("blog/index.html") == "/blog/"
+    assert page_url("blog/my post.html", "https://example.com/") == (
+        "https://example.com/blog/my%20post.html"
+    )
+
+
+@pytest.mark.unit
+def test_extract_page() -> None:
+    """Test the title and visible text are extracted, skipping scripts and styles."""
+    markup = (
+        "<html><head><title> Caf&eacute;  menu </title><style>p{}</style></head>"
+        "<body><h1>Menu</h1><script>var x = 1;</script><p>Espresso &amp; tea</p></body></html>"
+    )
+
+    assert extract_page(markup) == ("Café menu", "Menu Espresso & tea", False)
+    assert extract_page('<meta name="robots" content="noindex, follow">')[2] is True
+
+
+@pytest.mark.unit
+def test_iter_pages_skips_noindex(tmp_path) -> None:
+    """Test noindex pages are skipped and last-modified times come from the sources."""
+    (tmp_path / "out").mkdir()
+    (tmp_path / "src").mkdir()
+    (tmp_path / "out" / "index.html").write_text("<title>Home</title><p>Hello</p>")
+    (tmp_path / "out" / "draft.html").write_text(
+        '<meta name="robots" content="noindex"><p>Draft</p>'
+    )
+    (tmp_path / "src" / "index.html").write_text("")
+
+    pages = list(
+        iter_pages(str(tmp_path / "out"), ["index.html", "draft.html"], str(tmp_path / "src"))
+    )
+
+    assert [(p.url, p.title, p.text) for p in pages] == [("/", "Home", "Home Hello")]
+    assert pages[0].lastmod is not None
@@ -170,3 +170,53 @@ def test_parser_invalid_duration_type() -> None:
     # Test invalid duration (non-integer)
     with pytest.raises(SystemExit):
         parser.parse_args(["register-domain", "example.com", "--duration-in-years", "not-a-number"])
+
+
+def test_check_domains_and_aws_backend_parsing() -> None:
+    """Test the check-domains command and the global AWS backend option."""
+    parser = create_parser()
+
+    args = parser.parse_args(["--aws-backend", "fake", "check-domains", "a.com", "b.com"])
+
+    assert args.aws_backend == "fake"
+    assert args.command == "check-domains"
+    assert args.domain_names == ["a.com", "b.com"]
+    assert args.file is None
+    with pytest.raises(SystemExit):
+        parser.parse_args(["--aws-backend", "carrier-pigeon", "check-domains"])
+
+
+def test_timeout_and_deadline_parsing() -> None:
+    """Test the global per-request timeout and whole-command deadline options."""
+    parser = create_parser()
+
+    args = parser.parse_args(["--aws-timeout", "20", "--deadline", "600", "check-domains", "a.com"])
+
+    assert (args.aws_timeout, args.deadline) == (20.0, 600.0)
+    assert parser.parse_args(["check-links", "dist"]).aws_timeout is None
+
+
+def test_aws_timeout_is_separate_from_command_timeouts() -> None:
+    """Test the global AWS timeout and the check-links and cert timeouts do not share a dest."""
+    parser = create_parser()
+
+    links = parser.parse_args(["--aws-timeout", "5", "check-links", "dist", "--timeout", "2"])
+    cert = parser.parse_args(["cert", "example.com", "--timeout", "60"])
+
+    assert (links.aws_timeout, links.timeout) == (5.0, 2.0)
+    assert (cert.aws_timeout, cert.timeout) == (None, 60.0)
+
+
+def test_inventory_parsing() -> None:
+    """Test the inventory command and the account fan-out options."""
+    parser = create_parser()
+
+    args = parser.parse_args(
+        ["inventory", "--profiles", "prod,staging", "--regions", "us-east-1, eu-west-1"]
+    )
+
+    assert args.command == "inventory"
+    assert args.profiles == "prod,staging"
+    assert args.regions == ["us-east-1", "eu-west-1"]
+    assert args.account_rate == 5.0
+    assert parser.parse_args(["inventory"]).regions == ["us-east-1"]
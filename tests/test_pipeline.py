@@ -0,0 +1,146 @@
+"""Tests for the pipeline module."""
+
+import json
+import threading
+import time
+
+import pytest
+
+from kreatisite.pipeline import (
+    Checkpoint,
+    PipelineError,
+    Step,
+    critical_path,
+    format_timings,
+    run_pipeline,
+)
+
+
+def quiet(_: str) -> None:
+    """Discard progress messages."""
+
+
+@pytest.mark.unit
+def test_run_pipeline_passes_results_along() -> None:
+    """Test each step sees the results of the steps it requires."""
+    steps = [
+        Step("a", lambda ctx: 1),
+        Step("b", lambda ctx: ctx["a"] + 1, ("a",)),
+        Step("c", lambda ctx: ctx["a"] + ctx["b"], ("a", "b")),
+    ]
+
+    result = run_pipeline(steps, log=quiet)
+
+    assert result.results == {"a": 1, "b": 2, "c": 3}
+    assert set(result.durations) == {"a", "b", "c"}
+
+
+@pytest.mark.unit
+def test_run_pipeline_runs_independent_steps_concurrently() -> None:
+    """Test independent steps overlap instead of running one after another."""
+    barrier = threading.Barrier(2, timeout=5)
+
+    def meet(ctx):
+        barrier.wait()
+        return True
+
+    steps = [Step("left", meet), Step("right", meet), Step("end", lambda ctx: 0, ("left", "right"))]
+
+    assert run_pipeline(steps, jobs=2, log=quiet).results["end"] == 0
+
+
+@pytest.mark.unit
+def test_run_pipeline_resumes_from_checkpoint(tmp_path) -> None:
+    """Test a rerun skips completed steps and resumes at the failed one."""
+    path = str(tmp_path / "state" / "checkpoint.json")
+    calls = []
+    fail = {"b": True}
+
+    def step(name):
+        def run(ctx):
+            calls.append(name)
+            if fail.get(name):
+                raise RuntimeError("boom")
+            return name.upper()
+
+        return run
+
+    steps = [Step("a", step("a")), Step("b", step("b"), ("a",)), Step("c", step("c"), ("b",))]
+
+    with pytest.raises(PipelineError, match="Step b failed: boom") as excinfo:
+        run_pipeline(steps, Checkpoint(path), log=quiet)
+    assert excinfo.value.step == "b"
+    assert calls == ["a", "b"]
+    with open(path) as f:
+        assert set(json.load(f)["steps"]) == {"a"}
+
+    fail.clear()
+    calls.clear()
+    result = run_pipeline(steps, Checkpoint(path), log=quiet)
+
+    assert calls == ["b", "c"]
+    assert result.resumed == ["a"]
+    assert result.results == {"a": "A", "b": "B", "c": "C"}
+
+
+@pytest.mark.unit
+def test_run_pipeline_lets_running_steps_finish_after_failure(tmp_path) -> None:
+    """Test a failure stops new steps but checkpoints steps already running."""
+    path = str(tmp_path / "checkpoint.json")
+
+    def slow(ctx):
+        time.sleep(0.05)
+        return "slow"
+
+    def fail(ctx):
+        raise RuntimeError("boom")
+
+    steps = [Step("slow", slow), Step("fail", fail), Step("after", lambda ctx: 0, ("slow",))]
+
+    with pytest.raises(PipelineError):
+        run_pipeline(steps, Checkpoint(path), jobs=2, log=quiet)
+
+    assert set(Checkpoint(path).steps) == {"slow"}
+
+
+@pytest.mark.unit
+def test_run_pipeline_rejects_invalid_graphs() -> None:
+    """Test unknown requirements and cycles are rejected before running anything."""
+    with pytest.raises(PipelineError, match="unknown step"):
+        run_pipeline([Step("a", lambda ctx: 0, ("missing",))], log=quiet)
+    with pytest.raises(PipelineError, match="cycle"):
+        run_pipeline(
+            [Step("a", lambda ctx: 0, ("b",)), Step("b", lambda ctx: 0, ("a",))], log=quiet
+        )
+
+
+@pytest.mark.unit
+def test_critical_path() -> None:
+    """Test the critical path follows the slowest chain of dependencies."""
+    steps = [
+        Step("register", lambda ctx: 0),
+        Step("zone", lambda ctx: 0, ("register",)),
+        Step("cert", lambda ctx: 0, ("zone",)),
+        Step("bucket", lambda ctx: 0),
+        Step("cdn", lambda ctx: 0, ("cert", "bucket")),
+        Step("build", lambda ctx: 0),
+    ]
+    durations = {"register": 5, "zone": 1, "cert": 60, "bucket": 2, "cdn": 300, "build": 30}
+
+    assert critical_path(steps, durations) == ["register", "zone", "cert", "cdn"]
+    assert critical_path(steps, dict(durations, bucket=100)) == ["bucket", "cdn"]
+    assert critical_path([], {}) == []
+
+
+@pytest.mark.unit
+def test_format_timings() -> None:
+    """Test the timing report lists the critical path and its total."""
+    steps = [Step("a", lambda ctx: 0), Step("b", lambda ctx: 0, ("a",))]
+    result = run_pipeline(steps, log=quiet)
+    result.durations = {"a": 1.0, "b": 2.5}
+
+    report = format_timings(steps, result)
+
+    assert report.splitlines()[0] == "Critical path:"
+    assert "a" in report.splitlines()[1]
+    assert "3.5s" in report
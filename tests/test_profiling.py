@@ -0,0 +1,102 @@
+"""Tests for the profiling module."""
+
+import pstats
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from kreatisite.profiling import collapsed_stacks, profiled
+
+
+def busy_worker() -> None:
+    """Spend a little CPU time in a worker thread."""
+    sum(i * i for i in range(20000))
+
+
+def command(args) -> int:
+    """Run a worker thread, like commands that check domains concurrently."""
+    thread = threading.Thread(target=busy_worker)
+    thread.start()
+    thread.join()
+    return 0
+
+
+@pytest.mark.unit
+def test_collapsed_stacks_split_time_across_callers() -> None:
+    """Test a function's own time is attributed to each caller by its share."""
+    main = ("/src/app/cli.py", 1, "main")
+    a = ("/src/app/a.py", 5, "a")
+    b = ("/src/app/b.py", 9, "b")
+    leaf = ("/src/app/leaf.py", 3, "leaf")
+    stats = {
+        main: (1, 1, 0.001, 0.005, {}),
+        a: (1, 1, 0.0, 0.003, {main: (1, 1, 0.0, 0.003)}),
+        b: (1, 1, 0.0, 0.001, {main: (1, 1, 0.0, 0.001)}),
+        leaf: (2, 2, 0.004, 0.004, {a: (1, 1, 0.003, 0.003), b: (1, 1, 0.001, 0.001)}),
+    }
+
+    assert collapsed_stacks(stats) == [
+        "app/cli.py:main:1 1000",
+        "app/cli.py:main:1;app/a.py:a:5;app/leaf.py:leaf:3 3000",
+        "app/cli.py:main:1;app/b.py:b:9;app/leaf.py:leaf:3 1000",
+    ]
+
+
+@pytest.mark.unit
+def test_cpu_profile_includes_worker_threads(tmp_path, capsys) -> None:
+    """Test the CPU profile covers threads started by the command."""
+    path = tmp_path / "run.prof"
+
+    assert profiled(command, "cpu", str(path))(None) == 0
+
+    functions = {func[2] for func in pstats.Stats(str(path)).stats}  # type: ignore
+    assert {"command", "busy_worker"} <= functions
+    assert f"Wrote CPU profile to {path}" in capsys.readouterr().err
+
+
+@pytest.mark.unit
+def test_cpu_profile_writes_collapsed_stacks(tmp_path) -> None:
+    """Test .folded output files get one collapsed stack per line."""
+    path = tmp_path / "run.folded"
+
+    profiled(command, "cpu", str(path))(None)
+
+    lines = path.read_text().splitlines()
+    assert any("busy_worker" in line for line in lines)
+    assert all(int(line.rsplit(" ", 1)[1]) > 0 for line in lines)
+
+
+@pytest.mark.unit
+def test_alloc_profile_reports_peak_and_top_sites(tmp_path, capsys) -> None:
+    """Test the allocation profile lists the peak and where memory is held."""
+    path = tmp_path / "alloc.txt"
+    held = []
+
+    def allocate(args) -> int:
+        held.append(bytearray(1_000_000))
+        return 0
+
+    assert profiled(allocate, "alloc", str(path))(None) == 0
+
+    report = path.read_text()
+    assert report.startswith("Peak traced memory: ")
+    assert "test_profiling.py" in report.splitlines()[4]
+    assert "(peak " in capsys.readouterr().err
+
+
+@pytest.mark.unit
+def test_profilers_not_imported_without_flag() -> None:
+    """Test a run without --profile loads neither the module nor the profilers."""
+    code = (
+        "import sys; from kreatisite.cli import main; "
+        "sys.argv = ['kreatisite', '--aws-backend', 'fake', 'check-domain', 'example.com']; "
+        "main(); "
+        "print(sorted({'cProfile', 'tracemalloc', 'kreatisite.profiling'} & set(sys.modules)))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+
+    assert result.stdout.splitlines()[-1] == "[]"
@@ -0,0 +1,74 @@
+"""Tests for the ratelimit module."""
+
+import pytest
+
+from kreatisite.ratelimit import KeyedRateLimiter, RateLimiter
+
+
+class FakeClock:
+    """Clock that only advances when slept on."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.mark.unit
+def test_rate_limiter_burst_then_steady_rate() -> None:
+    """Test a full bucket allows a burst, then tokens arrive at the rate."""
+    clock = FakeClock()
+    limiter = RateLimiter(rate=2.0, burst=2, clock=clock, sleep=clock.sleep)
+
+    waits = [limiter.acquire() for _ in range(4)]
+
+    assert waits == [0.0, 0.0, 0.5, 0.5]
+    assert clock.now == 1.0
+
+
+@pytest.mark.unit
+def test_rate_limiter_refills_while_idle() -> None:
+    """Test idle time refills the bucket up to its capacity."""
+    clock = FakeClock()
+    limiter = RateLimiter(rate=1.0, burst=1, clock=clock, sleep=clock.sleep)
+
+    limiter.acquire()
+    clock.now += 10
+    assert limiter.acquire() == 0.0
+    assert limiter.acquire() == 1.0
+
+
+@pytest.mark.unit
+def test_rate_limiter_rejects_invalid_rate() -> None:
+    """Test the rate must be positive."""
+    with pytest.raises(ValueError):
+        RateLimiter(rate=0)
+
+
+@pytest.mark.unit
+def test_keyed_rate_limiter_separates_keys() -> None:
+    """Test each key gets its own bucket."""
+    limiter = KeyedRateLimiter(rate=1000.0)
+
+    limiter.acquire("a.example")
+    limiter.acquire("b.example")
+
+    assert sorted(limiter._limiters) == ["a.example", "b.example"]
+
+
+@pytest.mark.unit
+def test_rate_limiter_try_acquire_never_waits() -> None:
+    """Test try_acquire refuses instead of waiting once the bucket is empty."""
+    clock = FakeClock()
+    limiter = RateLimiter(rate=2.0, burst=2, clock=clock, sleep=clock.sleep)
+
+    assert [limiter.try_acquire() for _ in range(3)] == [True, True, False]
+    clock.now += 0.5
+    assert limiter.try_acquire() is True
+    assert clock.sleeps == []
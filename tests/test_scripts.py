@@ -1,8 +1,22 @@
 """Tests for the scripts module."""
 
+import sys
 from unittest.mock import Mock, patch
 
-from kreatisite.scripts import check_all, lint, setup_hooks
+from kreatisite.scripts import (
+    Stage,
+    bench,
+    check_all,
+    lint,
+    lint_stage,
+    load_check_cache,
+    record_results,
+    run_stages,
+    run_unit_tests,
+    setup_hooks,
+    type_stage,
+)
+from kreatisite.testimpact import impact_map_path, save_impact_map
 
 
 @patch("kreatisite.scripts.subprocess.run")
@@ -116,3 +130,111 @@ def test_scripts_module_imports() -> None:
     assert callable(test)
     assert callable(check_all)
     assert callable(setup_hooks)
+
+
+@patch("kreatisite.scripts.subprocess.run")
+def test_bench_passes_arguments(mock_run, capsys) -> None:
+    """Test bench runs the benchmark suite with the command line arguments."""
+    mock_run.return_value = Mock(returncode=1)
+
+    with patch("sys.argv", ["bench", "--filter", "plan_deploy"]):
+        result = bench()
+
+    assert result == 1
+    assert "Benchmarks regressed or failed!" in capsys.readouterr().err
+    mock_run.assert_called_once_with(
+        [sys.executable, "-m", "benchmarks", "--filter", "plan_deploy"], check=False
+    )
+
+
+def test_run_stages_prefixes_output(capsys) -> None:
+    """Test stages run concurrently with their output prefixed by stage name."""
+    ok = Stage("ok", [sys.executable, "-c", "print('one'); print('two')"])
+    bad = Stage("bad", [sys.executable, "-c", "import sys; print('oops'); sys.exit(3)"])
+    skipped = Stage("skipped", ["false"], cached=True)
+
+    run_stages([ok, bad, skipped])
+
+    out = capsys.readouterr().out
+    assert "[ok     ] one\n" in out and "[ok     ] two\n" in out
+    assert "[bad    ] oops\n" in out
+    assert (ok.returncode, bad.returncode, skipped.returncode) == (0, 3, None)
+    assert ok.output == ["one", "two"]
+    assert skipped.result == "cached"
+
+
+def test_lint_stage_skips_files_that_passed(tmp_path, monkeypatch) -> None:
+    """Test flake8 only checks files changed or failing since the last run."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "kreatisite").mkdir()
+    (tmp_path / "kreatisite" / "a.py").write_text("a = 1\n")
+    (tmp_path / "kreatisite" / "b.py").write_text("b=1\n")
+    cache: dict = {}
+
+    stage = lint_stage(cache)
+    assert stage.command == ["flake8", "kreatisite/a.py", "kreatisite/b.py"]
+    stage.returncode = 1
+    stage.output = ["kreatisite/b.py:1:2: E225 missing whitespace around operator"]
+    record_results(stage, cache)
+
+    assert lint_stage(cache).command == ["flake8", "kreatisite/b.py"]
+    (tmp_path / "kreatisite" / "b.py").write_text("b = 1\n")
+    stage = lint_stage(cache)
+    stage.returncode = 0
+    record_results(stage, cache)
+    assert lint_stage(cache).cached
+
+
+def test_type_stage_cached_until_a_source_changes(tmp_path, monkeypatch) -> None:
+    """Test mypy is skipped while the sources that passed are unchanged."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "kreatisite").mkdir()
+    (tmp_path / "kreatisite" / "a.py").write_text("a = 1\n")
+    cache: dict = {}
+
+    stage = type_stage(cache)
+    stage.returncode = 0
+    record_results(stage, cache)
+
+    assert type_stage(cache).cached
+    (tmp_path / "kreatisite" / "a.py").write_text("a: int = 1\n")
+    assert not type_stage(cache).cached
+
+
+@patch("kreatisite.scripts.run_stages")
+def test_check_all_fast_runs_independent_stages_together(mock_run, tmp_path, monkeypatch) -> None:
+    """Test --fast runs flake8, mypy and unit tests as one concurrent batch."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "kreatisite").mkdir()
+    (tmp_path / "kreatisite" / "a.py").write_text("a = 1\n")
+
+    def passed(stages):
+        for stage in stages:
+            stage.returncode = 0
+
+    mock_run.side_effect = passed
+
+    assert check_all(["--fast"]) == 0
+
+    mock_run.assert_called_once()
+    assert [stage.name for stage in mock_run.call_args[0][0]] == ["flake8", "mypy", "unit"]
+    assert set(load_check_cache()) == {"flake8", "mypy"}
+
+
+@patch("kreatisite.scripts.subprocess.run")
+def test_unit_tests_impact_runs_affected_tests(mock_run, tmp_path, monkeypatch) -> None:
+    """Test --changed runs only the tests the impact map links to the changed files."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "tests").mkdir()
+    (tmp_path / "tests" / "test_new.py").write_text("def test_new(): pass\n")
+    save_impact_map(
+        {"version": 1, "commit": None, "files": {}, "test_files": {}, "tests": {}},
+        impact_map_path("unit"),
+    )
+    mock_run.return_value = Mock(returncode=0)
+
+    assert run_unit_tests(["--changed", "tests/test_new.py", "README.md"]) == 0
+
+    mock_run.assert_called_once_with(
+        ["pytest", "-v", "-m", "unit", "tests/test_new.py"], check=False
+    )
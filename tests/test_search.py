@@ -0,0 +1,166 @@
+"""Tests for the search module."""
+
+import json
+import shutil
+import subprocess
+
+import pytest
+
+from kreatisite.build import build_site
+from kreatisite.search import (
+    SEARCH_DOCS_NAME,
+    SEARCH_INDEX_NAME,
+    SEARCH_SCRIPT_NAME,
+    SearchIndexBuilder,
+    decode_varint,
+    encode_varint,
+    read_search_index,
+    search,
+    tokenize,
+)
+
+
+@pytest.mark.unit
+def test_varint_roundtrip() -> None:
+    """Test varints use 7 bits per byte and decode back to the same value."""
+    assert encode_varint(0) == b"\x00"
+    assert encode_varint(127) == b"\x7f"
+    assert encode_varint(300) == b"\xac\x02"
+    data = b"".join(encode_varint(n) for n in (5, 300, 2**40))
+    offset, values = 0, []
+    for _ in range(3):
+        value, offset = decode_varint(data, offset)
+        values.append(value)
+    assert values == [5, 300, 2**40]
+
+
+@pytest.mark.unit
+def test_tokenize() -> None:
+    """Test terms are lowercased, deduplicated and length-filtered."""
+    assert tokenize("The Café, the CAFÉ and a tea") == ["and", "café", "tea", "the"]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("max_buffer", [1, 3, 1000])
+def test_index_is_identical_whatever_the_buffer(tmp_path, max_buffer) -> None:
+    """Test spilling sorted runs to disk does not change the resulting index."""
+    index = str(tmp_path / "index.bin")
+    docs = str(tmp_path / "docs.json")
+    builder = SearchIndexBuilder(index, docs, max_buffer=max_buffer, tmp_dir=str(tmp_path))
+    with builder:
+        builder.add("/", "Home", "welcome to the coffee shop")
+        builder.add("/tea/", "Tea", "green tea and black tea")
+        builder.add("/coffee/", "Coffee", "espresso coffee beans")
+
+    assert (builder.docs, builder.terms) == (3, 12)
+    assert max_buffer == 1000 or builder.runs
+    assert dict(read_search_index(index))["coffee"] == [0, 2]
+    assert dict(read_search_index(index))["tea"] == [1]
+    assert json.load(open(docs))[1] == {"url": "/tea/", "title": "Tea"}
+    assert [p.name for p in tmp_path.iterdir() if p.name.startswith("kreatisite-search")] == []
+
+
+@pytest.mark.unit
+def test_front_coding_shares_prefixes(tmp_path) -> None:
+    """Test terms sharing prefixes are stored once in the dictionary."""
+    index = str(tmp_path / "index.bin")
+    words = " ".join(f"international{i:03d}" for i in range(200))
+    with SearchIndexBuilder(index, str(tmp_path / "docs.json")) as builder:
+        builder.add("/", "", words)
+
+    assert len(dict(read_search_index(index))) == 200
+    assert (tmp_path / "index.bin").stat().st_size < len(words) / 2
+
+
+@pytest.mark.unit
+def test_search(tmp_path) -> None:
+    """Test queries return the documents containing every term."""
+    index = str(tmp_path / "index.bin")
+    docs = str(tmp_path / "docs.json")
+    with SearchIndexBuilder(index, docs) as builder:
+        builder.add("/a", "A", "red apples")
+        builder.add("/b", "B", "red berries")
+
+    assert [d["url"] for d in search(index, docs, "red")] == ["/a", "/b"]
+    assert [d["url"] for d in search(index, docs, "Red Berries")] == ["/b"]
+    assert search(index, docs, "red grapes") == []
+    assert search(index, docs, "") == []
+
+
+@pytest.mark.unit
+def test_build_generates_sitemap_and_search_index(tmp_path) -> None:
+    """Test the build stages stream pages into a sitemap and a search index."""
+    source = tmp_path / "site"
+    (source / "blog").mkdir(parents=True)
+    (source / "index.html").write_text("<title>Home</title><p>Welcome home</p>")
+    (source / "blog" / "index.html").write_text("<title>Blog</title><p>Latest posts</p>")
+    (source / "style.css").write_text("body{}")
+    output = tmp_path / "dist"
+
+    result = build_site(
+        str(source),
+        str(output),
+        cache_dir=str(tmp_path / "cache"),
+        jobs=1,
+        base_url="https://example.com",
+        search_index=True,
+        log=lambda _: None,
+    )
+
+    assert {"sitemap.xml", SEARCH_INDEX_NAME, SEARCH_DOCS_NAME, SEARCH_SCRIPT_NAME} <= set(
+        result.files
+    )
+    sitemap = (output / "sitemap.xml").read_text()
+    assert "<loc>https://example.com/blog/</loc>" in sitemap
+    assert (output / "sitemap.xml.gz").exists()
+    hits = search(str(output / SEARCH_INDEX_NAME), str(output / SEARCH_DOCS_NAME), "posts")
+    assert hits == [{"url": "/blog/", "title": "Blog"}]
+
+
+# Loads the reader from the build output and runs each query given as an argument
+_NODE_SEARCH = """
+const fs = require("fs");
+const [dir, ...queries] = process.argv.slice(1);
+const { SearchIndex } = require(dir + "/search.js");
+const index = new SearchIndex(
+  fs.readFileSync(dir + "/search-index.bin"),
+  JSON.parse(fs.readFileSync(dir + "/search-docs.json", "utf8"))
+);
+console.log(JSON.stringify(queries.map((q) => index.search(q))));
+"""
+
+
+@pytest.mark.unit
+@pytest.mark.skipif(not shutil.which("node"), reason="needs node")
+def test_browser_reader_matches_python_search(tmp_path) -> None:
+    """Test the shipped JavaScript reader finds the same pages as search()."""
+    source = tmp_path / "site"
+    source.mkdir()
+    pages = {
+        "index.html": "<title>Home</title><p>Welcome to the café</p>",
+        "menu.html": "<title>Menu</title><p>Café menu: coffee and cakes</p>",
+        "about.html": "<title>About</title><p>About the café team</p>",
+    }
+    for name, html in pages.items():
+        (source / name).write_text(html, encoding="utf-8")
+    output = tmp_path / "dist"
+    build_site(
+        str(source),
+        str(output),
+        cache_dir=str(tmp_path / "cache"),
+        jobs=1,
+        search_index=True,
+        log=lambda _: None,
+    )
+
+    queries = ["café", "CAFÉ menu", "coffee cakes", "missing", "a"]
+    result = subprocess.run(
+        ["node", "-e", _NODE_SEARCH, str(output), *queries],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    index, docs = str(output / SEARCH_INDEX_NAME), str(output / SEARCH_DOCS_NAME)
+    expected = [search(index, docs, query) for query in queries]
+    assert [len(hits) for hits in expected] == [3, 1, 1, 0, 0]
+    assert json.loads(result.stdout) == expected
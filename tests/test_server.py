@@ -0,0 +1,119 @@
+"""Tests for the server module."""
+
+import threading
+import time
+import urllib.request
+
+import pytest
+
+from kreatisite.server import (
+    LIVERELOAD_PATH,
+    LiveReload,
+    PollingWatcher,
+    SiteCache,
+    create_server,
+)
+
+
+def make_site(root) -> None:
+    """Create a small site."""
+    (root / "blog").mkdir(parents=True)
+    (root / "index.html").write_text("<html><body><p>home</p></body></html>")
+    (root / "blog" / "index.html").write_text("<p>blog</p>")
+    (root / "style.css").write_text("p { color: red; }")
+
+
+@pytest.mark.unit
+def test_site_cache_serves_pages_with_live_reload(tmp_path) -> None:
+    """Test pages are served from memory with the live-reload script injected."""
+    make_site(tmp_path)
+    cache = SiteCache(str(tmp_path))
+
+    assert cache.load_all() == 3
+    body, content_type = cache.get("/")
+    assert content_type.startswith("text/html")
+    assert body.endswith(b"</script></body></html>")
+    assert LIVERELOAD_PATH.encode() in body
+    assert cache.get("/blog")[0].startswith(b"<p>blog</p>")
+    assert cache.get("/blog/")[0].startswith(b"<p>blog</p>")
+    assert cache.get("/style.css") == (b"p { color: red; }", "text/css; charset=utf-8")
+    assert cache.get("/missing.html") is None
+
+
+@pytest.mark.unit
+def test_site_cache_update_rebuilds_only_changed_files(tmp_path) -> None:
+    """Test updates rebuild changed files and drop deleted ones."""
+    make_site(tmp_path)
+    cache = SiteCache(str(tmp_path), live_reload=False)
+    cache.load_all()
+
+    (tmp_path / "style.css").write_text("p { color: blue; }")
+    (tmp_path / "blog" / "index.html").unlink()
+    (tmp_path / "blog").rmdir()
+
+    assert cache.update({"style.css", "blog"}) == ["blog/index.html", "style.css"]
+    assert cache.get("/style.css")[0] == b"p { color: blue; }"
+    assert cache.get("/blog/") is None
+    assert cache.get("/")[0] == b"<html><body><p>home</p></body></html>"
+
+
+@pytest.mark.unit
+def test_live_reload_notifies_subscribers() -> None:
+    """Test every subscribed browser receives reload events."""
+    hub = LiveReload()
+    first, second = hub.subscribe(), hub.subscribe()
+    hub.unsubscribe(second)
+
+    assert hub.notify() == 1
+    assert first.get_nowait() == "reload"
+    assert second.empty()
+
+
+@pytest.mark.unit
+def test_polling_watcher_reports_changes(tmp_path) -> None:
+    """Test the polling watcher reports created, modified and deleted files."""
+    make_site(tmp_path)
+    changes = []
+    seen = threading.Event()
+
+    def on_change(changed) -> None:
+        changes.append(changed)
+        seen.set()
+
+    watcher = PollingWatcher(str(tmp_path), on_change, interval=0.01)
+    watcher.start()
+    try:
+        (tmp_path / "new.html").write_text("<p>new</p>")
+        (tmp_path / "style.css").unlink()
+        assert seen.wait(2)
+    finally:
+        watcher.stop()
+
+    assert set().union(*changes) == {"new.html", "style.css"}
+
+
+@pytest.mark.unit
+def test_server_reloads_browser_after_edit(tmp_path) -> None:
+    """Test an edit is rebuilt in memory and pushed to connected browsers."""
+    make_site(tmp_path)
+    server, watcher = create_server(str(tmp_path), port=0, poll_interval=0.01, log=lambda _: None)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        with urllib.request.urlopen(base + "/blog/") as response:
+            assert b"<p>blog</p>" in response.read()
+
+        with urllib.request.urlopen(base + LIVERELOAD_PATH, timeout=5) as events:
+            assert events.readline() == b": connected\n"
+            events.readline()
+            time.sleep(0.05)
+            (tmp_path / "blog" / "index.html").write_text("<p>edited</p>")
+            assert events.readline() == b"data: reload\n"
+
+        with urllib.request.urlopen(base + "/blog/") as response:
+            assert b"<p>edited</p>" in response.read()
+    finally:
+        watcher.stop()
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,66 @@
+"""Tests for the sitemap module."""
+
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from kreatisite.sitemap import SITEMAP_NAME, SitemapWriter
+
+NS = {"sm": "http://www.sitemaps.org/schemas/sitemap/0.9"}
+
+
+def locs(path, tag="url"):
+    """Return the <loc> values of a sitemap or sitemap index."""
+    root = ET.parse(path).getroot()
+    return [el.findtext("sm:loc", namespaces=NS) for el in root.findall(f"sm:{tag}", NS)]
+
+
+@pytest.mark.unit
+def test_single_shard_becomes_sitemap(tmp_path) -> None:
+    """Test a small site gets a single sitemap.xml with escaped URLs and dates."""
+    with SitemapWriter(str(tmp_path), "https://example.com") as sitemap:
+        sitemap.add("https://example.com/")
+        sitemap.add("https://example.com/a?b=1&c=2", lastmod=0)
+
+    assert sitemap.files == [SITEMAP_NAME]
+    assert locs(tmp_path / SITEMAP_NAME) == [
+        "https://example.com/",
+        "https://example.com/a?b=1&c=2",
+    ]
+    assert "<lastmod>1970-01-01</lastmod>" in (tmp_path / SITEMAP_NAME).read_text()
+    assert sorted(p.name for p in tmp_path.iterdir()) == [SITEMAP_NAME]
+
+
+@pytest.mark.unit
+def test_shards_split_at_url_limit(tmp_path) -> None:
+    """Test sitemaps are split into shards listed in a sitemap index."""
+    with SitemapWriter(str(tmp_path), "https://example.com/", max_urls=2) as sitemap:
+        for i in range(5):
+            sitemap.add(f"https://example.com/{i}.html")
+
+    assert sitemap.files == [SITEMAP_NAME, "sitemap-1.xml", "sitemap-2.xml", "sitemap-3.xml"]
+    assert locs(tmp_path / SITEMAP_NAME, "sitemap") == [
+        f"https://example.com/sitemap-{i}.xml" for i in (1, 2, 3)
+    ]
+    assert locs(tmp_path / "sitemap-3.xml") == ["https://example.com/4.html"]
+
+
+@pytest.mark.unit
+def test_shards_split_at_byte_limit(tmp_path) -> None:
+    """Test no shard exceeds the byte limit."""
+    with SitemapWriter(str(tmp_path), "https://example.com", max_bytes=400) as sitemap:
+        for i in range(20):
+            sitemap.add(f"https://example.com/page-{i:04d}.html")
+
+    shards = sitemap.files[1:]
+    assert len(shards) > 1
+    assert all((tmp_path / name).stat().st_size <= 400 for name in shards)
+    assert sum(len(locs(tmp_path / name)) for name in shards) == 20
+
+
+@pytest.mark.unit
+def test_empty_sitemap(tmp_path) -> None:
+    """Test a site without pages still gets a valid, empty sitemap."""
+    SitemapWriter(str(tmp_path), "https://example.com").close()
+
+    assert locs(tmp_path / SITEMAP_NAME) == []
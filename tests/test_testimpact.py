@@ -0,0 +1,107 @@
+"""Tests for the testimpact module."""
+
+import pytest
+
+from kreatisite.testimpact import MODULE_UNIT, function_units, select_tests
+
+SOURCE = '''"""Module."""
+
+LIMIT = 3
+
+
+def helper(x):
+    return x + 1
+
+
+class Client:
+    retries = 2
+
+    @property
+    def name(self):
+        return "client"
+
+    def call(self):
+        def inner():
+            return 1
+
+        return inner()
+'''
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """Create a project with one module and two test files, and its impact map."""
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "kreatisite").mkdir()
+    (tmp_path / "tests").mkdir()
+    (tmp_path / "kreatisite" / "mod.py").write_text(SOURCE)
+    (tmp_path / "tests" / "test_a.py").write_text("def test_helper(): pass\n")
+    (tmp_path / "tests" / "test_b.py").write_text("def test_call(): pass\n")
+    return {
+        "version": 1,
+        "commit": None,
+        "files": {"kreatisite/mod.py": function_units(SOURCE)},
+        "test_files": {},
+        "tests": {
+            "tests/test_a.py::test_helper": ["kreatisite/mod.py::helper"],
+            "tests/test_b.py::test_call": ["kreatisite/mod.py::Client.call"],
+            "tests/test_b.py::test_unmapped": [],
+        },
+    }
+
+
+@pytest.mark.unit
+def test_function_units_name_methods_and_keep_nested_functions_in_their_parent() -> None:
+    """Test units are top-level functions and methods, plus the module-level code."""
+    units = function_units(SOURCE)
+    assert set(units) == {"helper", "Client.name", "Client.call", MODULE_UNIT}
+
+    edited = function_units(SOURCE.replace("return 1", "return 2"))
+    assert [unit for unit in units if units[unit] != edited[unit]] == ["Client.call"]
+
+    edited = function_units(SOURCE.replace("retries = 2", "retries = 5"))
+    assert [unit for unit in units if units[unit] != edited[unit]] == [MODULE_UNIT]
+
+
+@pytest.mark.unit
+def test_select_tests_runs_tests_of_changed_functions(project, tmp_path) -> None:
+    """Test only tests covering a changed function run, plus tests without coverage."""
+    path = tmp_path / "kreatisite" / "mod.py"
+    path.write_text(SOURCE.replace("x + 1", "x + 2"))
+
+    assert select_tests(project, ["kreatisite/mod.py", "README.md"]) == [
+        "tests/test_a.py::test_helper",
+        "tests/test_b.py::test_unmapped",
+    ]
+
+
+@pytest.mark.unit
+def test_select_tests_runs_all_tests_of_a_module_whose_module_code_changed(
+    project, tmp_path
+) -> None:
+    """Test a change outside functions selects every test that touched the module."""
+    path = tmp_path / "kreatisite" / "mod.py"
+    path.write_text(SOURCE.replace("LIMIT = 3", "LIMIT = 4"))
+
+    assert select_tests(project, ["kreatisite/mod.py"]) == [
+        "tests/test_a.py::test_helper",
+        "tests/test_b.py::test_call",
+        "tests/test_b.py::test_unmapped",
+    ]
+
+
+@pytest.mark.unit
+def test_select_tests_runs_changed_test_files_whole(project) -> None:
+    """Test edited test files run completely instead of their recorded tests."""
+    project["tests"].pop("tests/test_b.py::test_unmapped")
+
+    assert select_tests(project, ["tests/test_b.py"]) == ["tests/test_b.py"]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("path", ["kreatisite/new.py", "tests/conftest.py", "pyproject.toml"])
+def test_select_tests_falls_back_to_full_suite(project, tmp_path, path) -> None:
+    """Test changes the map cannot account for select the full suite."""
+    (tmp_path / path).write_text("")
+
+    assert select_tests(project, [path]) is None
@@ -0,0 +1,61 @@
+"""Tests for the testing module."""
+
+import os
+
+import pytest
+
+from kreatisite.aws import get_backend, set_backend
+from kreatisite.fakeaws import FakeBackend
+from kreatisite.testing import run_cli
+
+
+@pytest.mark.unit
+def test_run_cli_isolates_environment_and_backend(tmp_path) -> None:
+    """Test a run's environment, working directory and backend do not leak."""
+    previous = FakeBackend()
+    set_backend(previous)
+    cwd = os.getcwd()
+    try:
+        result = run_cli(
+            ["check-domain", "example.com"],
+            backend=FakeBackend(taken=["example.com"]),
+            env={"KREATISITE_SMOKE": "1"},
+            cwd=str(tmp_path),
+        )
+
+        assert result.returncode == 0
+        assert '"UNAVAILABLE"' in result.stdout
+        assert "KREATISITE_SMOKE" not in os.environ
+        assert os.getcwd() == cwd
+        assert get_backend() is previous
+    finally:
+        set_backend(None)
+
+
+@pytest.mark.unit
+def test_run_cli_reports_exit_codes_and_exceptions(monkeypatch) -> None:
+    """Test argparse exits and uncaught exceptions become return codes."""
+    assert run_cli(["--no-such-option"]).returncode == 2
+
+    def broken(args):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr("kreatisite.cli.check_domains", broken)
+    result = run_cli(["check-domains", "example.com"], backend=FakeBackend())
+
+    assert result.returncode == 1
+    assert isinstance(result.exception, RuntimeError)
+    assert "RuntimeError: boom" in result.stderr
+
+
+@pytest.mark.unit
+def test_run_cli_backend_serves_every_account() -> None:
+    """Test commands run across accounts send their calls to the given backend too."""
+    backend = FakeBackend(taken=["b.com"])
+
+    result = run_cli(["check-domains", "a.com", "b.com", "--profiles", "x,y"], backend)
+
+    assert result.returncode == 0, result.stderr
+    assert "a.com AVAILABLE [x]" in result.stdout
+    assert "b.com UNAVAILABLE [y]" in result.stdout
+    assert backend.calls == {"route53domains:CheckDomainAvailability": 2}
@@ -0,0 +1,74 @@
+"""Tests for the trace module."""
+
+import json
+import threading
+
+import pytest
+
+from kreatisite import trace
+from kreatisite.aws import get_backend, set_backend
+from kreatisite.cli import main
+from kreatisite.trace import span, start_tracing, stop_tracing
+
+
+@pytest.mark.unit
+def test_span_is_a_shared_no_op_when_disabled() -> None:
+    """Test disabled tracing records nothing and allocates no context manager."""
+    assert trace.get_tracer() is None
+    assert span("a") is span("b", detail=1)
+    with span("a"):
+        pass
+
+
+@pytest.mark.unit
+def test_nested_spans_across_threads(tmp_path) -> None:
+    """Test spans nest in time and are written in Chrome trace-event format."""
+
+    def in_thread() -> None:
+        with span("in thread"):
+            pass
+
+    tracer = start_tracing()
+    try:
+        with span("outer", kind="test"):
+            with span("inner"):
+                pass
+            thread = threading.Thread(target=in_thread, name="w1")
+            thread.start()
+            thread.join()
+    finally:
+        stop_tracing()
+    path = tmp_path / "trace.json"
+    tracer.write(str(path))
+
+    events = json.loads(path.read_text())["traceEvents"]
+    spans = {e["name"]: e for e in events if e["ph"] == "X"}
+    outer, inner = spans["outer"], spans["inner"]
+    assert outer["ts"] <= inner["ts"]
+    assert inner["ts"] + inner["dur"] <= outer["ts"] + outer["dur"]
+    assert outer["args"] == {"kind": "test"}
+    assert spans["in thread"]["tid"] != outer["tid"]
+    names = {e["args"]["name"] for e in events if e["ph"] == "M"}
+    assert "w1" in names
+
+
+@pytest.mark.unit
+def test_cli_trace_covers_every_layer(tmp_path, monkeypatch) -> None:
+    """Test --trace records the startup, command and AWS call spans."""
+    path = tmp_path / "trace.json"
+    monkeypatch.setattr(
+        "sys.argv",
+        ["kreatisite", "--aws-backend", "fake", "--trace", str(path), "check-domain", "a.com"],
+    )
+    previous = set_backend(None)
+    try:
+        assert main() == 0
+        assert get_backend().name == "fake"
+    finally:
+        set_backend(previous)
+
+    names = [e["name"] for e in json.loads(path.read_text())["traceEvents"]]
+    for name in ("import", "create_parser", "parse_args", "command check-domain", "output"):
+        assert name in names
+    assert "aws route53domains:CheckDomainAvailability" in names
+    assert trace.get_tracer() is None
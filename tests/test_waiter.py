@@ -0,0 +1,81 @@
+"""Tests for the waiter module."""
+
+import pytest
+
+from kreatisite.waiter import backoff_delays, wait_for_all, wait_until
+
+
+class FakeClock:
+    """Clock that advances only when slept on."""
+
+    def __init__(self) -> None:
+        """Start the clock at zero."""
+        self.now = 0.0
+        self.sleeps = []
+
+    def sleep(self, seconds: float) -> None:
+        """Advance the clock."""
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    def __call__(self) -> float:
+        """Return the current time."""
+        return self.now
+
+
+@pytest.mark.unit
+def test_backoff_delays_grow_to_maximum() -> None:
+    """Test delays double until they reach the maximum."""
+    delays = backoff_delays(initial=1, maximum=5, jitter=0)
+
+    assert [next(delays) for _ in range(5)] == [1, 2, 4, 5, 5]
+
+
+@pytest.mark.unit
+def test_wait_until_polls_with_backoff() -> None:
+    """Test the condition is polled with growing delays until it holds."""
+    clock = FakeClock()
+    results = iter([False, False, True])
+
+    wait_until(lambda: next(results), 60, initial=1, sleep=clock.sleep, clock=clock)
+
+    assert len(clock.sleeps) == 2
+    assert clock.sleeps[1] > clock.sleeps[0]
+
+
+@pytest.mark.unit
+def test_wait_until_times_out() -> None:
+    """Test waiting stops with TimeoutError once the timeout has passed."""
+    clock = FakeClock()
+
+    with pytest.raises(TimeoutError):
+        wait_until(lambda: False, 10, initial=1, sleep=clock.sleep, clock=clock)
+    assert clock.now == pytest.approx(10)
+
+
+@pytest.mark.unit
+def test_wait_for_all_polls_pending_items_together() -> None:
+    """Test one shared loop polls all pending items and drops finished ones."""
+    clock = FakeClock()
+    ready_at = {"a": 0, "b": 2, "c": 5}
+    polls = []
+
+    def check(pending):
+        polls.append(list(pending))
+        return [item for item in pending if ready_at[item] <= clock.now]
+
+    wait_for_all(["a", "b", "c"], check, timeout=60, initial=1, sleep=clock.sleep, clock=clock)
+
+    assert polls[0] == ["a", "b", "c"]
+    assert polls[1] == ["b", "c"]
+    assert polls[-1] == ["c"]
+    assert len(polls) <= 4
+
+
+@pytest.mark.unit
+def test_wait_for_all_timeout_reports_pending() -> None:
+    """Test the timeout error says how many items are still pending."""
+    clock = FakeClock()
+
+    with pytest.raises(TimeoutError, match="2 pending"):
+        wait_for_all(["a", "b"], lambda pending: [], timeout=5, sleep=clock.sleep, clock=clock)